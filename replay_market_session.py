@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Market Session Record / Replay
+==============================
+
+Record raw Binance market-data frames to a compressed log, then replay them
+offline through the WebSocket kline manager to benchmark ingest, indicator
+and signal throughput without touching the exchange.
+
+    python replay_market_session.py record --symbols BTCUSDT,ETHUSDT --intervals 1m,5m --minutes 30
+    python replay_market_session.py replay trading_data/recordings/session.log.gz --speed max
+    python replay_market_session.py replay session.log.gz --speed 10 --strategy rsi_oversold
+    python replay_market_session.py bench-json session.log.gz
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+# Offline replays must not write into the live candle store
+os.environ.setdefault('KLINE_STORE_ENABLED', 'false')
+
+from src.config.trading_config import trading_config_manager
+from src.data_fetcher.fast_json import benchmark_decoders
+from src.data_fetcher.price_fetcher import PriceFetcher
+from src.data_fetcher.stream_recorder import StreamReplayer
+from src.data_fetcher.websocket_manager import websocket_manager
+from src.strategy_processor.signal_processor import SignalProcessor
+
+
+def record_session(args):
+    symbols = [symbol.strip().upper() for symbol in args.symbols.split(',') if symbol.strip()]
+    intervals = [interval.strip() for interval in args.intervals.split(',') if interval.strip()]
+    output = args.output or f"trading_data/recordings/session_{datetime.now():%Y%m%d_%H%M%S}.log.gz"
+
+    print(f"⏺️ Recording {len(symbols)} symbols x {intervals} for {args.minutes} minutes")
+    for symbol in symbols:
+        for interval in intervals:
+            websocket_manager.add_symbol_interval(symbol, interval)
+
+    websocket_manager.start_recording(output)
+    websocket_manager.start()
+    try:
+        deadline = time.time() + args.minutes * 60
+        while time.time() < deadline:
+            time.sleep(5)
+            print(f"   📡 {websocket_manager.recorder.frames_written} frames recorded")
+    except KeyboardInterrupt:
+        print("⏹️ Stopped by user")
+    finally:
+        websocket_manager.stop()
+        websocket_manager.stop_recording()
+
+    print(f"✅ Session saved to {output}")
+
+
+def replay_session(args):
+    speed = None if args.speed == 'max' else float(args.speed)
+    replayer = StreamReplayer(args.log)
+
+    evaluations = {'count': 0, 'signals': 0, 'seconds': 0.0}
+    if args.strategy:
+        config = trading_config_manager.get_strategy_config(args.strategy)
+        price_fetcher = PriceFetcher(None)
+        signal_processor = SignalProcessor()
+
+        def on_kline(symbol, interval, kline):
+            if not kline['is_closed'] or symbol != config['symbol'] or interval != config['timeframe']:
+                return
+            started = time.perf_counter()
+            df = websocket_manager.get_kline_dataframe(symbol, interval, limit=200)
+            if df is not None and len(df) >= 50:
+                df = price_fetcher.calculate_indicators(df)
+                if signal_processor.evaluate_entry_conditions(df, config):
+                    evaluations['signals'] += 1
+            evaluations['count'] += 1
+            evaluations['seconds'] += time.perf_counter() - started
+
+        websocket_manager.add_update_callback(on_kline)
+        print(f"🎯 Evaluating {args.strategy} on {config['symbol']} {config['timeframe']} closes")
+
+    label = 'max speed' if speed is None else f"{speed:g}x"
+    print(f"▶️ Replaying {args.log} at {label}")
+    stats = replayer.replay_into(websocket_manager, speed)
+    websocket_manager.dispatcher.flush(timeout=60)
+
+    print("\n📊 REPLAY RESULTS")
+    print(f"   Frames:            {stats['frames']}")
+    print(f"   Recorded span:     {stats['recorded_seconds']:.1f}s")
+    print(f"   Wall time:         {stats['elapsed_seconds']:.3f}s")
+    print(f"   Ingest throughput: {stats['frames_per_second']:,.0f} frames/s")
+    print(f"   Klines processed:  {websocket_manager.stats['klines_processed']}")
+    if args.strategy:
+        per_eval = evaluations['seconds'] / evaluations['count'] * 1000 if evaluations['count'] else 0
+        print(f"   Evaluations:       {evaluations['count']} ({per_eval:.2f} ms each)")
+        print(f"   Signals:           {evaluations['signals']}")
+
+
+def benchmark_json(args):
+    frames = [frame for _, frame in StreamReplayer(args.log).frames()]
+    print(f"⏱️ Decoding {len(frames)} recorded frames (best of {args.repeat})")
+
+    results = benchmark_decoders(frames, repeat=args.repeat)
+    baseline = results['json']['kline_seconds']
+    print(f"\n   {'backend':<10}{'decode/s':>14}{'decode+kline/s':>18}{'speedup':>10}")
+    for name, result in results.items():
+        speedup = baseline / result['kline_seconds'] if result['kline_seconds'] > 0 else 0
+        print(f"   {name:<10}{result['decode_frames_per_second']:>14,.0f}"
+              f"{result['kline_frames_per_second']:>18,.0f}{speedup:>9.2f}x")
+    print(f"\n   Live decoder: {websocket_manager.json_decoder.name} (set JSON_DECODER=json|orjson to override)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay Binance market-data sessions")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help="Record live frames to a gzip log")
+    record.add_argument('--symbols', default='BTCUSDT,ETHUSDT,SOLUSDT')
+    record.add_argument('--intervals', default='1m')
+    record.add_argument('--minutes', type=float, default=10)
+    record.add_argument('--output')
+
+    replay = commands.add_parser('replay', help="Replay a recorded log offline")
+    replay.add_argument('log')
+    replay.add_argument('--speed', default='max', help="'max', or a multiple of real time (1, 10, ...)")
+    replay.add_argument('--strategy', help="Strategy name to evaluate on each candle close")
+
+    bench = commands.add_parser('bench-json', help="Compare JSON decoder backends on a recorded log")
+    bench.add_argument('log')
+    bench.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record_session(args)
+    elif args.command == 'bench-json':
+        benchmark_json(args)
+    else:
+        replay_session(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
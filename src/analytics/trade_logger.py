@@ -7,6 +7,8 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 import pandas as pd
 
+from src.indicators.rsi import latest_rsi
+
 @dataclass
 class TradeRecord:
     """Complete trade record for analytics"""
@@ -450,34 +452,8 @@ class TradeLogger:
     def _calculate_rsi(self, prices: List[float], period: int = 14) -> Optional[float]:
         """Calculate RSI indicator"""
         try:
-            if len(prices) < period + 1:
-                return None
-
-            gains = []
-            losses = []
-
-            for i in range(1, len(prices)):
-                change = prices[i] - prices[i-1]
-                if change > 0:
-                    gains.append(change)
-                    losses.append(0)
-                else:
-                    gains.append(0)
-                    losses.append(abs(change))
-
-            if len(gains) < period:
-                return None
-
-            avg_gain = sum(gains[-period:]) / period
-            avg_loss = sum(losses[-period:]) / period
-
-            if avg_loss == 0:
-                return 100
-
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-
-            return round(rsi, 2)
+            rsi = latest_rsi(prices, period)
+            return round(rsi, 2) if rsi is not None else None
 
         except Exception:
             return None
@@ -0,0 +1,287 @@
+import logging
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.parameter_sweep import strategy_kind
+from src.data_fetcher.kline_buffer import interval_to_ms
+from src.execution_engine.order_manager import Position, fallback_symbol_info, position_quantity
+from src.execution_engine.strategies.smart_money_config import SmartMoneyStrategy
+from src.strategy_processor.signal_processor import SignalProcessor, SignalType, TradingSignal
+from src.strategy_processor.strategy_interface import CandleFrame
+
+
+@dataclass
+class FillModel:
+    """How simulated orders fill
+
+    Market orders (entries and strategy exits) fill at the close of the
+    candle the decision was made on, moved `slippage_bps` against the order.
+    Stop losses rest on the exchange and trigger inside later candles,
+    filling at the stop or at an open that gapped through it, plus slippage.
+    Take profits are limit orders: the target, or a better open. Every fill
+    pays `fee_rate` of its notional.
+    """
+    fee_rate: float = 0.0004
+    slippage_bps: float = 0.0
+
+    def market(self, price: float, side: int) -> float:
+        """Fill price of a market order; side is 1 to buy, -1 to sell"""
+        return price * (1 + side * self.slippage_bps / 10_000)
+
+    def stop(self, side: int, stop_loss: float, open_: float, high: float, low: float) -> Optional[float]:
+        """Fill price of a position's stop loss in this candle, or None if not reached"""
+        if side == 1 and low <= stop_loss:
+            return self.market(min(open_, stop_loss), -1)
+        if side == -1 and high >= stop_loss:
+            return self.market(max(open_, stop_loss), 1)
+        return None
+
+    def take_profit(self, side: int, target: float, open_: float, high: float, low: float) -> Optional[float]:
+        """Fill price of a position's take profit in this candle, or None if not reached"""
+        if side == 1 and high >= target:
+            return max(open_, target)
+        if side == -1 and low <= target:
+            return min(open_, target)
+        return None
+
+    def fee(self, quantity: float, price: float) -> float:
+        return quantity * price * self.fee_rate
+
+
+@dataclass
+class BacktestTrade:
+    side: str  # BUY or SELL
+    entry_time: int  # Open time (ms) of the candle the position was opened on
+    entry_price: float
+    quantity: float
+    margin: float  # Actual margin used after quantity rounding
+    stop_loss: float
+    take_profit: float
+    exit_time: Optional[int] = None
+    exit_price: Optional[float] = None
+    reason: str = ""
+    fees: float = 0.0
+    pnl: float = 0.0  # After fees
+
+
+@dataclass
+class BacktestResult:
+    strategy_name: str
+    symbol: str
+    interval: str
+    candles: int
+    signals: int
+    trades: List[BacktestTrade]
+    equity: np.ndarray  # Realized plus open PnL at each candle close
+    open_trade: Optional[BacktestTrade] = None
+    margin: float = 0.0
+    seconds: float = 0.0
+
+    def summary(self) -> Dict:
+        """Trade counts and PnL, with the same names as the parameter sweep's columns"""
+        realized = sum(trade.pnl for trade in self.trades)
+        open_pnl = self.open_trade.pnl if self.open_trade else 0.0
+        wins = sum(trade.pnl > 0 for trade in self.trades)
+        drawdown = np.maximum.accumulate(np.maximum(self.equity, 0.0)) - self.equity if len(self.equity) else [0.0]
+        return {
+            'signals': self.signals,
+            'trades': len(self.trades),
+            'wins': wins,
+            'win_rate': wins / len(self.trades) if self.trades else float('nan'),
+            'stop_outs': sum(trade.reason == 'Stop Loss' for trade in self.trades),
+            'realized_pnl': realized,
+            'open_pnl': open_pnl,
+            'pnl': realized + open_pnl,
+            'return_pct': (realized + open_pnl) / self.margin * 100 if self.margin else 0.0,
+            'max_drawdown': float(np.max(drawdown)),
+            'fees': sum(trade.fees for trade in self.trades) + (self.open_trade.fees if self.open_trade else 0.0),
+        }
+
+    def trades_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([asdict(trade) for trade in self.trades])
+
+
+class Backtester:
+    """Replays stored candles through the live strategy code, one closed candle at a time
+
+    Each close is handled as `BotManager._evaluate_strategy` handles it: the
+    strategy sees the last `window` closed candles as a CandleFrame and,
+    while flat, decides entries through `SignalProcessor.evaluate_entry_frame`
+    (Smart Money through its own `evaluate_entry`); with a position open it
+    only checks exits, through `evaluate_exit_frame` (the strategies'
+    `evaluate_exit_signal` rules). Entries are sized by `position_quantity`,
+    the rounding `OrderManager` uses, against `symbol_info` lot rules.
+
+    Stop losses from the entry signal are simulated as exchange stop orders;
+    Smart Money, which has no exit rules of its own, also gets its take profit.
+    `window=None` feeds the whole history so far, for comparing with the
+    parameter sweep on short histories.
+    """
+
+    PROTECTIVE_TAKE_PROFIT = ('smart_money',)  # Strategies whose exits are their stop and take profit
+
+    def __init__(self, config: Dict, frame: CandleFrame, fill_model: Optional[FillModel] = None,
+                 symbol_info: Optional[Dict] = None, window: Optional[int] = 200):
+        self.logger = logging.getLogger(__name__)
+        self.config = dict(config)
+        self.kind = strategy_kind(self.config.get('name', ''))
+        if self.kind is None:
+            raise ValueError(f"No backtest for strategy '{self.config.get('name')}'")
+        if window is not None and window < 1:
+            raise ValueError("window must be at least one candle")
+
+        self.symbol = (self.config.get('symbol') or frame.symbol or '').upper()
+        self.interval = self.config.get('timeframe') or frame.interval
+        self.frame = self._with_close_times(frame)
+        # Replayed windows carry no symbol or interval, so they stay out of the shared indicator cache
+        self._replay = replace(self.frame, symbol='', interval='', indicators={})
+        self.fill_model = fill_model or FillModel()
+        self.symbol_info = symbol_info or fallback_symbol_info(self.symbol)
+        self.window = window
+
+        self.processor = SignalProcessor()
+        self.smart_money = None
+        if self.kind == 'smart_money':
+            self.smart_money = SmartMoneyStrategy(self.config)
+            self.smart_money.clock = self._candle_clock
+        self._now: Optional[datetime] = None
+
+    @classmethod
+    def from_store(cls, store, config: Dict, limit: Optional[int] = None, **kwargs) -> 'Backtester':
+        """Backtest over the candles a KlineStore holds for the strategy's symbol and timeframe"""
+        rows = store.load(config['symbol'], config['timeframe'], limit or store.max_records)
+        return cls(config, CandleFrame.from_rows(rows, config['symbol'], config['timeframe']), **kwargs)
+
+    def _with_close_times(self, frame: CandleFrame) -> CandleFrame:
+        """Close times tell the incremental evaluators which candles are new"""
+        if frame.close_time is not None:
+            return frame
+        interval_ms = interval_to_ms(self.interval)
+        if not interval_ms:
+            raise ValueError("Candles need close times or a known timeframe")
+        return CandleFrame(frame.symbol, frame.interval, frame.open_time, frame.open, frame.high, frame.low,
+                           frame.close, frame.volume, close_time=frame.open_time + interval_ms - 1)
+
+    def _candle_clock(self) -> datetime:
+        return self._now
+
+    def _window(self, end: int) -> CandleFrame:
+        """Closed candles up to `end`, as the bot's cache would hold them"""
+        return self._replay.slice(0 if self.window is None else max(0, end - self.window), end)
+
+    def _entry_signal(self, frame: CandleFrame) -> Optional[TradingSignal]:
+        if self.smart_money is not None:
+            return self.smart_money.evaluate_entry(frame)
+        return self.processor.evaluate_entry_frame(frame, self.config)
+
+    def _exit_reason(self, frame: CandleFrame, position: Dict) -> Optional[str]:
+        if self.smart_money is not None:
+            return self.smart_money.evaluate_exit(frame, position)
+        return self.processor.evaluate_exit_frame(frame, position, self.config)
+
+    def _open(self, signal: TradingSignal, t: int) -> Optional[BacktestTrade]:
+        """Size the signal like OrderManager and fill it at market"""
+        margin = self.config.get('margin', 50.0)
+        leverage = self.config.get('leverage', 5)
+        precision = self.config.get('decimals', self.symbol_info['precision'])
+        quantity, _ = position_quantity(margin, leverage, signal.entry_price, self.symbol_info['min_qty'],
+                                        self.symbol_info['step_size'], precision)
+        if quantity <= 0:
+            return None
+
+        side = 'BUY' if signal.signal_type == SignalType.BUY else 'SELL'
+        price = self.fill_model.market(float(self.frame.close[t]), 1 if side == 'BUY' else -1)
+        fee = self.fill_model.fee(quantity, price)
+        return BacktestTrade(side, int(self.frame.open_time[t]), price, quantity, quantity * price / leverage,
+                             signal.stop_loss, signal.take_profit, fees=fee, pnl=-fee)
+
+    def _position(self, trade: BacktestTrade) -> Dict:
+        """The position as exit rules receive it from the bot"""
+        position = Position(self.config.get('name', ''), self.symbol, trade.side, trade.entry_price, trade.quantity,
+                            trade.stop_loss, trade.take_profit, 'LONG' if trade.side == 'BUY' else 'SHORT',
+                            strategy_config=self.config, original_quantity=trade.quantity,
+                            remaining_quantity=trade.quantity, actual_margin_used=trade.margin)
+        return asdict(position)
+
+    def _close(self, trade: BacktestTrade, t: int, price: float, reason: str):
+        side = 1 if trade.side == 'BUY' else -1
+        trade.exit_time = int(self.frame.open_time[t])
+        trade.exit_price = price
+        trade.reason = reason
+        trade.fees += self.fill_model.fee(trade.quantity, price)
+        trade.pnl = side * (price - trade.entry_price) * trade.quantity - trade.fees
+
+    def _protective_fill(self, trade: BacktestTrade, t: int):
+        """(price, reason) if the stop loss, or a protective take profit, filled inside candle t"""
+        f = self.frame
+        side = 1 if trade.side == 'BUY' else -1
+        open_, high, low = float(f.open[t]), float(f.high[t]), float(f.low[t])
+        if trade.stop_loss:
+            price = self.fill_model.stop(side, trade.stop_loss, open_, high, low)
+            if price is not None:
+                return price, 'Stop Loss'
+        if trade.take_profit and self.kind in self.PROTECTIVE_TAKE_PROFIT:
+            price = self.fill_model.take_profit(side, trade.take_profit, open_, high, low)
+            if price is not None:
+                return price, 'Take Profit'
+        return None, None
+
+    def run(self) -> BacktestResult:
+        """Replay every candle and return the trades, equity curve and timing"""
+        started = time.perf_counter()
+        f = self.frame
+        count = len(f)
+        first = 0 if self.window is None else self.window - 1  # The bot's frame path needs a full window
+        equity = np.zeros(count)
+        trades: List[BacktestTrade] = []
+        trade, position = None, None
+        realized, signals = 0.0, 0
+
+        for t in range(first, count):
+            if trade is not None:
+                price, reason = self._protective_fill(trade, t)
+                if price is not None:
+                    self._close(trade, t, price, reason)
+                    realized += trade.pnl
+                    trades.append(trade)
+                    trade = None
+
+            if self.smart_money is not None:
+                self._now = datetime.fromtimestamp((int(f.close_time[t]) + 1) / 1000, tz=timezone.utc)
+            frame = self._window(t + 1)
+
+            # As in the bot: a strategy with a position only checks exits, and re-enters a candle later
+            if trade is not None:
+                reason = self._exit_reason(frame, position)
+                if reason:
+                    side = 1 if trade.side == 'BUY' else -1
+                    self._close(trade, t, self.fill_model.market(float(f.close[t]), -side), reason)
+                    realized += trade.pnl
+                    trades.append(trade)
+                    trade = None
+            else:
+                signal = self._entry_signal(frame)
+                if signal is not None:
+                    signals += 1
+                    trade = self._open(signal, t)
+                    position = self._position(trade) if trade is not None else None
+
+            equity[t] = realized
+            if trade is not None:
+                side = 1 if trade.side == 'BUY' else -1
+                equity[t] += side * (f.close[t] - trade.entry_price) * trade.quantity - trade.fees
+
+        if trade is not None:
+            side = 1 if trade.side == 'BUY' else -1
+            trade.pnl = side * (float(f.close[-1]) - trade.entry_price) * trade.quantity - trade.fees
+
+        result = BacktestResult(self.config.get('name', ''), self.symbol, self.interval, count, signals, trades,
+                                equity, trade, self.config.get('margin', 50.0), time.perf_counter() - started)
+        self.logger.info(f"🧪 BACKTEST | {result.strategy_name} | {self.symbol} {self.interval} | {count} candles | "
+                         f"{len(trades)} trades | PnL ${result.summary()['pnl']:.2f} | {result.seconds:.1f}s")
+        return result
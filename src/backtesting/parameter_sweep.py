@@ -0,0 +1,319 @@
+import itertools
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.indicators.rsi import wilder_rsi
+from src.strategy_processor.strategy_interface import CandleFrame
+
+
+def strategy_kind(name: str) -> Optional[str]:
+    """Strategy type from its name, routed the way SignalProcessor routes entries"""
+    name = (name or '').lower()
+    if 'rsi' in name and 'engulfing' not in name:
+        return 'rsi'
+    if 'macd' in name:
+        return 'macd'
+    if 'engulfing' in name:
+        return 'engulfing'
+    if 'smart' in name and 'money' in name:
+        return 'smart_money'
+    return None
+
+
+def parameter_grid(**values: Sequence) -> List[Dict]:
+    """Every combination of the given values, e.g. parameter_grid(rsi_long_entry=[25, 30], rsi_short_entry=[70, 75])"""
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.full(len(values), np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+class _RsiRules:
+    """SignalProcessor's RSI entry (_rsi_signal) and exit (_rsi_exit_reason) rules on the 14-period pipeline RSI"""
+    PARAMETERS = ('rsi_long_entry', 'rsi_short_entry', 'rsi_long_exit', 'rsi_short_exit',
+                  'margin', 'leverage', 'max_loss_pct')
+    DEFAULTS = {'rsi_long_entry': 30, 'rsi_short_entry': 70, 'rsi_long_exit': 70, 'rsi_short_exit': 30,
+                'margin': 50.0, 'leverage': 5, 'max_loss_pct': 5}
+
+    def shared(self, frame: CandleFrame) -> Dict[str, np.ndarray]:
+        return {}
+
+    def indicator_key(self, config: Dict) -> tuple:
+        return ()
+
+    def indicators(self, frame: CandleFrame, key: tuple) -> Dict[str, np.ndarray]:
+        return {'rsi': wilder_rsi(frame.close, 14)}
+
+    def warmup(self, config: Dict) -> int:
+        return 50
+
+    def stop_pct(self, config: Dict) -> float:
+        return config['max_loss_pct'] / config['leverage']
+
+    def rules(self, ind: Dict, par: Dict, close: np.ndarray) -> Tuple[np.ndarray, ...]:
+        rsi = ind['rsi']
+        valid = (par['rsi_long_entry'] < 50) & (par['rsi_short_entry'] > 50)  # Invalid configs never signal
+        long_entry = valid & (rsi <= par['rsi_long_entry'])
+        short_entry = valid & ~long_entry & (rsi >= par['rsi_short_entry'])
+        return long_entry, short_entry, rsi >= par['rsi_long_exit'], rsi <= par['rsi_short_exit']
+
+
+class _MacdRules:
+    """MACDDivergenceStrategy's pre-crossover entry and momentum-peak exit rules"""
+    PARAMETERS = ('macd_fast', 'macd_slow', 'macd_signal', 'min_histogram_threshold', 'macd_exit_threshold',
+                  'margin', 'leverage')
+    DEFAULTS = {'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9, 'min_histogram_threshold': 0.0001,
+                'macd_exit_threshold': 0.002, 'margin': 50.0, 'leverage': 5}
+
+    def shared(self, frame: CandleFrame) -> Dict[str, np.ndarray]:
+        return {}
+
+    def indicator_key(self, config: Dict) -> tuple:
+        return int(config['macd_fast']), int(config['macd_slow']), int(config['macd_signal'])
+
+    def indicators(self, frame: CandleFrame, key: tuple) -> Dict[str, np.ndarray]:
+        fast, slow, signal = key
+        close = pd.Series(frame.close)
+        macd = close.ewm(span=fast).mean() - close.ewm(span=slow).mean()  # Adjusted EWM, as the strategy uses
+        macd_signal = macd.ewm(span=signal).mean()
+        histogram = (macd - macd_signal).to_numpy()
+        return {'macd': macd.to_numpy(), 'macd_signal': macd_signal.to_numpy(), 'histogram': histogram,
+                'histogram_1': _shift(histogram, 1), 'histogram_2': _shift(histogram, 2)}
+
+    def warmup(self, config: Dict) -> int:
+        return max(50, int(config['macd_slow']) + int(config['macd_signal']))
+
+    def stop_pct(self, config: Dict) -> float:
+        return 2.0
+
+    def rules(self, ind: Dict, par: Dict, close: np.ndarray) -> Tuple[np.ndarray, ...]:
+        histogram, previous, previous_2 = ind['histogram'], ind['histogram_1'], ind['histogram_2']
+        momentum = histogram - previous
+        trend = histogram - previous_2
+        previous_momentum = previous - previous_2
+
+        strong = np.abs(momentum) >= par['min_histogram_threshold']
+        long_entry = (ind['macd'] < ind['macd_signal']) & (momentum > 0) & (trend > 0) & strong
+        short_entry = (ind['macd'] > ind['macd_signal']) & (momentum < 0) & (trend < 0) & strong
+
+        reversing = np.abs(momentum) >= par['macd_exit_threshold']
+        long_exit = (histogram > 0) & (previous > previous_2) & (momentum < previous_momentum) & reversing
+        short_exit = (histogram < 0) & (previous < previous_2) & (momentum > previous_momentum) & reversing
+        return long_entry, short_entry, long_exit, short_exit
+
+
+class _EngulfingRules:
+    """EngulfingPatternStrategy's pattern, stable candle, RSI and lookback rules with its RSI exits"""
+    PARAMETERS = ('rsi_period', 'rsi_threshold', 'stable_candle_ratio', 'price_lookback_bars',
+                  'rsi_long_exit', 'rsi_short_exit', 'margin', 'leverage', 'max_loss_pct')
+    DEFAULTS = {'rsi_period': 14, 'rsi_threshold': 50, 'stable_candle_ratio': 0.2, 'price_lookback_bars': 5,
+                'rsi_long_exit': 70, 'rsi_short_exit': 30, 'margin': 50.0, 'leverage': 5, 'max_loss_pct': 10}
+
+    def shared(self, frame: CandleFrame) -> Dict[str, np.ndarray]:
+        """Pattern flags and body/range ratio, which no swept parameter changes"""
+        open_, high, low, close = frame.open, frame.high, frame.low, frame.close
+        prev_open, prev_close = _shift(open_, 1), _shift(close, 1)
+        prev_body, body = np.abs(prev_open - prev_close), np.abs(open_ - close)
+        min_body = close * 0.0002
+        with np.errstate(invalid='ignore'):
+            sized = (body > prev_body * 0.3) & (prev_body > min_body) & (body > min_body)
+            bullish = (prev_close < prev_open) & (close > open_) & (open_ < prev_close) & (close > prev_open) & sized
+            bearish = (prev_close > prev_open) & (close < open_) & (open_ > prev_close) & (close < prev_open) & sized
+
+        true_range = high - low
+        true_range[1:] = np.maximum(true_range[1:], np.maximum(np.abs(high[1:] - close[:-1]),
+                                                               np.abs(low[1:] - close[:-1])))
+        body_ratio = body / np.where(true_range == 0, np.finfo(float).eps, true_range)
+        return {'bullish': bullish, 'bearish': bearish, 'body_ratio': body_ratio, 'meaningful': body > close * 0.0005}
+
+    def indicator_key(self, config: Dict) -> tuple:
+        return int(config['rsi_period']), int(config['price_lookback_bars'])
+
+    def indicators(self, frame: CandleFrame, key: tuple) -> Dict[str, np.ndarray]:
+        period, lookback = key
+        return {'rsi': wilder_rsi(frame.close, period), 'close_ago': _shift(frame.close, lookback)}
+
+    def warmup(self, config: Dict) -> int:
+        return max(50, int(config['rsi_period']) + int(config['price_lookback_bars']) + 5)
+
+    def stop_pct(self, config: Dict) -> float:
+        return max(1.0, min(config['max_loss_pct'] / config['leverage'], 15.0))
+
+    def rules(self, ind: Dict, par: Dict, close: np.ndarray) -> Tuple[np.ndarray, ...]:
+        rsi, close_ago = ind['rsi'], ind['close_ago']
+        stable = (ind['body_ratio'] > par['stable_candle_ratio']) & ind['meaningful']
+        long_entry = ind['bullish'] & stable & (rsi < par['rsi_threshold']) & (close < close_ago)
+        short_entry = ind['bearish'] & stable & (rsi > par['rsi_threshold']) & (close > close_ago) & ~long_entry
+        return long_entry, short_entry, rsi >= par['rsi_long_exit'], rsi <= par['rsi_short_exit']
+
+
+RULES = {'rsi': _RsiRules, 'macd': _MacdRules, 'engulfing': _EngulfingRules}
+
+
+class ParameterSweep:
+    """Evaluates many parameter sets of one strategy over the same candles in one vectorized pass
+
+    Indicators are computed once per distinct indicator setting (RSI period,
+    MACD spans, lookback) and shared by every parameter set using it. Entry
+    and exit rules are broadcast over (parameter sets x candles), then a
+    single walk over the candles simulates every set at once: entries fill
+    at the close of the signal candle, stop losses fill inside later candles
+    (at the stop, or the open if it gapped through), and strategy exits fill
+    at the close. As in the bot, a strategy with a position only checks
+    exits, so it can re-enter no earlier than the candle after a strategy
+    exit. Indicators run over the whole history rather than the bot's
+    200-candle window, so early values can differ slightly from live ones.
+    """
+
+    CHUNK = 512  # Candles of signals materialized at a time
+
+    def __init__(self, base_config: Dict, frame: CandleFrame, fee_rate: float = 0.0004):
+        self.logger = logging.getLogger(__name__)
+        self.kind = strategy_kind(base_config.get('name', ''))
+        if self.kind not in RULES:
+            raise ValueError(f"No parameter sweep for strategy '{base_config.get('name')}'")
+        self.rules = RULES[self.kind]()
+        self.base_config = base_config
+        self.frame = frame
+        self.fee_rate = fee_rate
+        self._shared = self.rules.shared(frame)
+        self._indicators: Dict[tuple, Dict[str, np.ndarray]] = {}
+
+    def _indicator_set(self, key: tuple) -> Dict[str, np.ndarray]:
+        if key not in self._indicators:
+            self._indicators[key] = self.rules.indicators(self.frame, key)
+        return self._indicators[key]
+
+    def _prepare(self, grid: Union[Dict[str, Sequence], Iterable[Dict]]):
+        grid = parameter_grid(**grid) if isinstance(grid, dict) else list(grid)
+        unknown = {name for params in grid for name in params} - set(self.rules.PARAMETERS)
+        if unknown:
+            raise ValueError(f"Not sweepable for {self.kind} strategies: {sorted(unknown)}")
+
+        base = {name: self.base_config[name] for name in self.rules.PARAMETERS if name in self.base_config}
+        configs = [{**self.rules.DEFAULTS, **base, **params} for params in grid]
+        par = {name: np.array([config[name] for config in configs], dtype=np.float64)[:, None]
+               for name in self.rules.PARAMETERS}
+
+        # One indicator computation per distinct setting, gathered per parameter set
+        keys = [self.rules.indicator_key(config) for config in configs]
+        unique = list(dict.fromkeys(keys))
+        position = {key: i for i, key in enumerate(unique)}
+        index = np.array([position[key] for key in keys], dtype=np.intp)
+        stacked = {}
+        if unique:
+            for name in self._indicator_set(unique[0]):
+                stacked[name] = np.vstack([self._indicator_set(key)[name] for key in unique])
+
+        warmup = np.array([self.rules.warmup(config) for config in configs], dtype=np.int64)
+        stop_pct = np.array([self.rules.stop_pct(config) for config in configs], dtype=np.float64)
+        return grid, par, index, stacked, warmup, stop_pct
+
+    def _chunks(self, par, index, stacked, warmup):
+        """(start, long_entry, short_entry, long_exit, short_exit) for each block of candles"""
+        close = self.frame.close
+        candle_count = np.arange(1, len(close) + 1)
+        for start in range(0, len(close), self.CHUNK):
+            end = min(len(close), start + self.CHUNK)
+            ind = {name: values[index, start:end] for name, values in stacked.items()}
+            ind.update({name: values[None, start:end] for name, values in self._shared.items()})
+            with np.errstate(invalid='ignore'):
+                long_entry, short_entry, long_exit, short_exit = self.rules.rules(ind, par, close[None, start:end])
+            ready = candle_count[None, start:end] >= warmup[:, None]
+            yield start, long_entry & ready, short_entry & ready, long_exit, short_exit
+
+    def entry_signals(self, grid: Union[Dict[str, Sequence], Iterable[Dict]]) -> np.ndarray:
+        """(parameter sets x candles) int8: 1 for a long entry signal, -1 for short, 0 for none"""
+        grid, par, index, stacked, warmup, _ = self._prepare(grid)
+        signals = np.zeros((len(grid), len(self.frame)), dtype=np.int8)
+        for start, long_entry, short_entry, _, _ in self._chunks(par, index, stacked, warmup):
+            block = signals[:, start:start + long_entry.shape[1]]
+            block[long_entry] = 1
+            block[short_entry] = -1
+        return signals
+
+    def run(self, grid: Union[Dict[str, Sequence], Iterable[Dict]]) -> pd.DataFrame:
+        """One row per parameter set: its parameters, signal and trade counts, and simulated PnL"""
+        started = time.perf_counter()
+        grid, par, index, stacked, warmup, stop_pct = self._prepare(grid)
+        count = len(grid)
+        if not count or not len(self.frame):
+            return pd.DataFrame(grid)
+        notional = (par['margin'] * par['leverage'])[:, 0]
+        fee = 2 * self.fee_rate * notional  # Entry and exit
+        open_, high, low, close = self.frame.open, self.frame.high, self.frame.low, self.frame.close
+
+        side = np.zeros(count, dtype=np.int8)
+        entry_price = np.ones(count)
+        stop = np.zeros(count)
+        realized = np.zeros(count)
+        peak = np.zeros(count)
+        max_drawdown = np.zeros(count)
+        trades = np.zeros(count, dtype=np.int64)
+        wins = np.zeros(count, dtype=np.int64)
+        stop_outs = np.zeros(count, dtype=np.int64)
+        signals = np.zeros(count, dtype=np.int64)
+
+        def settle(closing: np.ndarray, fill: np.ndarray):
+            pnl = side * (fill - entry_price) / entry_price * notional - fee
+            realized[closing] += pnl[closing]
+            trades[closing] += 1
+            wins[closing & (pnl > 0)] += 1
+            side[closing] = 0
+            np.maximum(peak, realized, out=peak)
+            np.maximum(max_drawdown, peak - realized, out=max_drawdown)
+
+        for start, long_entry, short_entry, long_exit, short_exit in self._chunks(par, index, stacked, warmup):
+            signals += long_entry.sum(axis=1) + short_entry.sum(axis=1)
+            for offset in range(long_entry.shape[1]):
+                t = start + offset
+
+                # Stop orders fill inside the candle, at the stop or at an open that gapped through it
+                long_stop = (side == 1) & (low[t] <= stop)
+                short_stop = (side == -1) & (high[t] >= stop)
+                stopped = long_stop | short_stop
+                if stopped.any():
+                    fill = np.where(long_stop, np.minimum(open_[t], stop), np.maximum(open_[t], stop))
+                    stop_outs[stopped] += 1
+                    settle(stopped, fill)
+
+                # Strategy exits on the close; those strategies wait for the next candle to re-enter
+                exiting = ((side == 1) & long_exit[:, offset]) | ((side == -1) & short_exit[:, offset])
+                if exiting.any():
+                    settle(exiting, np.full(count, close[t]))
+
+                flat = (side == 0) & ~exiting
+                go_long = flat & long_entry[:, offset]
+                go_short = flat & short_entry[:, offset]
+                opening = go_long | go_short
+                if opening.any():
+                    side[go_long] = 1
+                    side[go_short] = -1
+                    entry_price[opening] = close[t]
+                    stop[opening] = close[t] * (1 - side[opening] * stop_pct[opening] / 100)
+
+        open_pnl = np.where(side != 0, side * (close[-1] - entry_price) / entry_price * notional - fee / 2, 0.0)
+        results = pd.DataFrame(grid)
+        results['signals'] = signals
+        results['trades'] = trades
+        results['wins'] = wins
+        results['win_rate'] = np.where(trades > 0, wins / np.maximum(trades, 1), np.nan)
+        results['stop_outs'] = stop_outs
+        results['realized_pnl'] = realized
+        results['open_pnl'] = open_pnl
+        results['pnl'] = realized + open_pnl
+        results['return_pct'] = results['pnl'] / par['margin'][:, 0] * 100
+        results['max_drawdown'] = max_drawdown
+
+        self.logger.info(f"🧪 SWEEP | {self.base_config.get('name')} | {count} parameter sets x {len(close)} "
+                         f"candles in {time.perf_counter() - started:.2f}s")
+        return results
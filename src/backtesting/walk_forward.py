@@ -0,0 +1,238 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.backtest_engine import Backtester, FillModel
+from src.backtesting.parameter_sweep import RULES, ParameterSweep, parameter_grid, strategy_kind
+from src.strategy_processor.strategy_interface import CandleFrame
+
+
+def walk_forward_windows(count: int, train: int, test: int, step: Optional[int] = None,
+                         anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """(train_start, test_start, test_end) candle indices of consecutive train/test windows
+
+    Each test window directly follows its training window; windows advance by
+    `step` candles (default: one test window, so test windows tile the
+    history). Anchored windows keep training from the first candle.
+    """
+    if train < 1 or test < 1:
+        raise ValueError("train and test windows need at least one candle")
+    step = step or test
+    windows = []
+    test_start = train
+    while test_start + test <= count:
+        windows.append((0 if anchored else test_start - train, test_start, test_start + test))
+        test_start += step
+    return windows
+
+
+@dataclass(frozen=True)
+class _Block:
+    """Where one symbol's candles live in shared memory: (7, n) float64, one row per REST column"""
+    name: str
+    length: int
+
+
+@dataclass(frozen=True)
+class _Task:
+    block: _Block
+    symbol: str
+    interval: str
+    config: Dict
+    grid: List[Dict]
+    window: int
+    train_start: int
+    test_start: int
+    test_end: int
+    objective: str
+    min_trades: int
+    fee_rate: float
+    replay_window: int
+    symbol_info: Optional[Dict]
+
+
+# Shared memory blocks attached by this worker process, by block name
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, CandleFrame]] = {}
+
+
+def _frame(block: _Block, symbol: str, interval: str) -> CandleFrame:
+    """Candle columns read in place from shared memory"""
+    if block.name not in _attached:
+        shm = shared_memory.SharedMemory(name=block.name)
+        columns = np.ndarray((7, block.length), dtype=np.float64, buffer=shm.buf)
+        _attached[block.name] = shm, CandleFrame.from_rows(columns.T, symbol, interval)
+    return _attached[block.name][1]
+
+
+def _train(config: Dict, frame: CandleFrame, task: _Task) -> Tuple[Dict, pd.Series]:
+    """Best parameter set on the training candles, and its training statistics
+
+    Strategies with vectorized rules are swept in one pass; others (Smart
+    Money) replay each parameter set through the backtest engine.
+    """
+    if strategy_kind(config['name']) in RULES:
+        table = ParameterSweep(config, frame, task.fee_rate).run(task.grid)
+    else:
+        summaries = [Backtester({**config, **params}, frame, FillModel(task.fee_rate), task.symbol_info,
+                                task.replay_window).run().summary() for params in task.grid]
+        table = pd.concat([pd.DataFrame(task.grid), pd.DataFrame(summaries)], axis=1)
+
+    table = table.reset_index(drop=True)
+    eligible = table[table['trades'] >= task.min_trades]
+    ranked = (eligible if not eligible.empty else table)[task.objective].fillna(-np.inf)
+    best = int(ranked.idxmax())
+    return task.grid[best], table.iloc[best]
+
+
+def _evaluate_window(task: _Task) -> Dict:
+    """Train on one window and replay the chosen parameters over the following test window"""
+    started = time.perf_counter()
+    frame = _frame(task.block, task.symbol, task.interval)
+    config = {**task.config, 'symbol': task.symbol, 'timeframe': task.interval}
+
+    params, train_stats = _train(config, frame.slice(task.train_start, task.test_start), task)
+
+    # The replay's first decision lands on the first test candle, with a full window of history before it
+    warmup_start = max(0, task.test_start - (task.replay_window - 1))
+    test = Backtester({**config, **params}, frame.slice(warmup_start, task.test_end), FillModel(task.fee_rate),
+                      task.symbol_info, task.replay_window).run().summary()
+
+    return {
+        'symbol': task.symbol,
+        'strategy': config['name'],
+        'window': task.window,
+        'train_start': int(frame.open_time[task.train_start]),
+        'test_start': int(frame.open_time[task.test_start]),
+        'test_end': int(frame.open_time[task.test_end - 1]),
+        'params': params,
+        'train_trades': int(train_stats['trades']),
+        'train_pnl': float(train_stats['pnl']),
+        'test_trades': test['trades'],
+        'test_wins': test['wins'],
+        'test_pnl': test['pnl'],
+        'test_return_pct': test['return_pct'],
+        'test_max_drawdown': test['max_drawdown'],
+        'seconds': time.perf_counter() - started,
+    }
+
+
+class WalkForwardOptimizer:
+    """Walk-forward parameter selection for several strategies over several symbols
+
+    For every symbol, strategy and window, the best parameter set on the
+    training candles (by `objective`, among sets with at least `min_trades`
+    trades) is replayed through the backtest engine over the test candles
+    that follow, so each test result is out of sample. Windows are
+    independent tasks for a process pool. Each symbol's candles are copied
+    once into shared memory, and tasks carry only its name and the window
+    bounds, so no candle data or DataFrames are pickled.
+    """
+
+    OBJECTIVES = ('pnl', 'realized_pnl', 'return_pct', 'win_rate')  # Columns both training paths report
+
+    def __init__(self, candles: Dict[str, np.ndarray], interval: str,
+                 strategies: Sequence[Tuple[Dict, Union[Dict[str, Sequence], List[Dict]]]],
+                 train: int, test: int, step: Optional[int] = None, anchored: bool = False,
+                 objective: str = 'pnl', min_trades: int = 1, fee_rate: float = 0.0004,
+                 max_workers: Optional[int] = None, replay_window: int = 200,
+                 symbol_info: Optional[Dict[str, Dict]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.candles = {symbol.upper(): np.asarray(rows, dtype=np.float64) for symbol, rows in candles.items()}
+        self.interval = interval
+        self.strategies = []
+        for config, grid in strategies:
+            grid = parameter_grid(**grid) if isinstance(grid, dict) else list(grid)
+            if strategy_kind(config.get('name', '')) is None:
+                raise ValueError(f"No backtest for strategy '{config.get('name')}'")
+            self.strategies.append((dict(config), grid or [{}]))
+        if objective not in self.OBJECTIVES:
+            raise ValueError(f"objective must be one of {self.OBJECTIVES}")
+        self.train, self.test, self.step, self.anchored = train, test, step, anchored
+        self.objective = objective
+        self.min_trades = min_trades
+        self.fee_rate = fee_rate
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.replay_window = replay_window
+        self.symbol_info = {symbol.upper(): info for symbol, info in (symbol_info or {}).items()}
+
+    @classmethod
+    def from_store(cls, store, symbols: Sequence[str], interval: str, strategies, limit: Optional[int] = None,
+                   **kwargs) -> 'WalkForwardOptimizer':
+        """Optimizer over the candles a KlineStore holds for each symbol"""
+        candles = {symbol: store.load(symbol, interval, limit or store.max_records) for symbol in symbols}
+        return cls(candles, interval, strategies, **kwargs)
+
+    def _tasks(self, blocks: Dict[str, _Block]) -> List[_Task]:
+        tasks = []
+        for symbol, block in blocks.items():
+            windows = walk_forward_windows(block.length, self.train, self.test, self.step, self.anchored)
+            for config, grid in self.strategies:
+                for window, (train_start, test_start, test_end) in enumerate(windows):
+                    tasks.append(_Task(block, symbol, self.interval, config, grid, window, train_start, test_start,
+                                       test_end, self.objective, self.min_trades, self.fee_rate,
+                                       self.replay_window, self.symbol_info.get(symbol)))
+        return tasks
+
+    def run(self) -> pd.DataFrame:
+        """One row per symbol, strategy and window: chosen parameters and in/out-of-sample results"""
+        started = time.perf_counter()
+        memory: List[shared_memory.SharedMemory] = []
+        try:
+            blocks = {}
+            for symbol, rows in self.candles.items():
+                shm = shared_memory.SharedMemory(create=True, size=max(1, rows.nbytes))
+                memory.append(shm)
+                np.ndarray((7, len(rows)), dtype=np.float64, buffer=shm.buf)[:] = rows.T
+                blocks[symbol] = _Block(shm.name, len(rows))
+
+            tasks = self._tasks(blocks)
+            self.logger.info(f"🧪 WALK-FORWARD | {len(self.candles)} symbols x {len(self.strategies)} strategies | "
+                             f"{len(tasks)} windows on {self.max_workers} workers")
+            rows = []
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(_evaluate_window, task): task for task in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    task = futures[future]
+                    try:
+                        rows.append(future.result())
+                    except Exception as e:
+                        self.logger.error(f"❌ WALK-FORWARD | {task.symbol} | {task.config.get('name')} | "
+                                          f"window {task.window} failed: {e}")
+                    if done % 50 == 0:
+                        self.logger.info(f"🧪 WALK-FORWARD | {done}/{len(tasks)} windows")
+        finally:
+            for shm in memory:
+                shm.close()
+                shm.unlink()
+
+        results = pd.DataFrame(rows, columns=['symbol', 'strategy', 'window', 'train_start', 'test_start', 'test_end',
+                                              'params', 'train_trades', 'train_pnl', 'test_trades', 'test_wins',
+                                              'test_pnl', 'test_return_pct', 'test_max_drawdown', 'seconds'])
+        results = results.sort_values(['symbol', 'strategy', 'window'], ignore_index=True)
+        self.logger.info(f"🧪 WALK-FORWARD | {len(results)} windows in {time.perf_counter() - started:.1f}s")
+        return results
+
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """One row per symbol and strategy: out-of-sample totals and the parameters of the latest window"""
+    if results.empty:
+        return pd.DataFrame(columns=['symbol', 'strategy', 'windows', 'profitable_windows', 'test_trades',
+                                     'test_win_rate', 'test_pnl', 'worst_window_pnl', 'params'])
+    ordered = results.sort_values('window')
+    grouped = ordered.groupby(['symbol', 'strategy'], sort=True)
+    summary = grouped.agg(windows=('window', 'size'),
+                          profitable_windows=('test_pnl', lambda pnl: int((pnl > 0).sum())),
+                          test_trades=('test_trades', 'sum'), test_wins=('test_wins', 'sum'),
+                          test_pnl=('test_pnl', 'sum'), worst_window_pnl=('test_pnl', 'min'),
+                          params=('params', 'last'))
+    summary['test_win_rate'] = summary['test_wins'] / summary['test_trades'].where(summary['test_trades'] > 0)
+    return summary.drop(columns='test_wins').reset_index()[
+        ['symbol', 'strategy', 'windows', 'profitable_windows', 'test_trades', 'test_win_rate', 'test_pnl',
+         'worst_window_pnl', 'params']]
@@ -283,6 +283,24 @@ class BinanceClientWrapper:
             self.logger.error(f"Error getting klines for {symbol}: {e}")
             return None
 
+    def get_klines_range(self, symbol: str, interval: str, start_time: int, end_time: int,
+                         limit: int = 1000) -> Optional[List]:
+        """Get klines whose open time falls within [start_time, end_time] (ms) with rate limiting"""
+        try:
+            self._rate_limit()
+            if self.is_futures:
+                return self.client.futures_klines(symbol=symbol, interval=interval, startTime=start_time,
+                                                  endTime=end_time, limit=limit)
+            else:
+                return self.client.get_klines(symbol=symbol, interval=interval, startTime=start_time,
+                                              endTime=end_time, limit=limit)
+        except BinanceAPIException as e:
+            self.logger.error(f"Error getting kline range for {symbol}: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Unexpected error getting kline range for {symbol}: {e}")
+            return None
+
     def get_historical_klines(self, symbol: str, interval: str, limit: int = 100) -> Optional[list]:
         """Get historical klines with rate limiting"""
         try:
@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import time
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
@@ -14,7 +15,14 @@ from src.config.global_config import global_config
 from src.config.trading_config import trading_config_manager
 from src.data_fetcher.price_fetcher import PriceFetcher
 from src.data_fetcher.balance_fetcher import BalanceFetcher
+from src.data_fetcher.price_feed import price_feed
+from src.data_fetcher.websocket_manager import websocket_manager
+from src.indicators.incremental import indicator_engine
+from src.strategy_processor.candle_event_bus import CandleCloseEvent, CandleCloseEventBus
+from src.strategy_processor.evaluation_pool import EvaluationPool
 from src.strategy_processor.signal_processor import SignalProcessor
+from src.strategy_processor.strategy_scheduler import StrategyScheduler
+from src.strategy_processor.strategy_interface import CandleFrame
 
 class BotManager:
     """Enhanced Bot Manager with integrated orphan detection"""
@@ -33,8 +41,14 @@ class BotManager:
         self.price_fetcher = None
         self.balance_fetcher = None
 
-        # Processing
+        # Processing - strategies are evaluated when their candle closes
         self.signal_processor = None
+        self.evaluation_pool = None
+        self.candle_bus = CandleCloseEventBus()
+        # ...and re-assessed every assessment_interval, aligned to candle boundaries
+        self.scheduler = StrategyScheduler(settle_seconds=global_config.STRATEGY_SETTLE_SECONDS)
+        self._last_evaluated: Dict[str, int] = {}  # strategy -> open time of the last candle evaluated
+        self.last_balance_check = datetime.now()
 
         # State management
         self.is_running = False
@@ -68,18 +82,19 @@ class BotManager:
             )
 
             # Initialize order manager
-            self.order_manager = OrderManager(self.binance_client, self.telegram_reporter)
+            self.order_manager = OrderManager(self.binance_client, trade_logger, self.telegram_reporter)
 
             # Initialize data fetchers
             self.price_fetcher = PriceFetcher(self.binance_client)
             self.balance_fetcher = BalanceFetcher(self.binance_client)
 
             # Initialize signal processor
-            self.signal_processor = SignalProcessor(
-                self.binance_client,
-                self.order_manager,
-                self.telegram_reporter
-            )
+            self.signal_processor = SignalProcessor()
+            self.evaluation_pool = EvaluationPool(global_config.STRATEGY_EVALUATION_WORKERS)
+
+            # Subscribe each enabled strategy to its symbol/timeframe candle closes
+            self.candle_bus.attach(websocket_manager)
+            self._subscribe_strategies()
 
             # Load existing positions
             await self._load_existing_positions()
@@ -94,6 +109,146 @@ class BotManager:
             self.logger.error(f"❌ Bot initialization failed: {e}")
             return False
 
+    def _subscribe_strategies(self):
+        """Route candle closes to the strategies trading each symbol/timeframe"""
+        current = self.candle_bus.subscriptions()
+        strategies = trading_config_manager.get_all_strategies()
+        for strategy_name, config in strategies.items():
+            if not config.get('enabled', True):
+                self.scheduler.unschedule(strategy_name)
+                self.signal_processor.release_strategy(strategy_name)
+                if strategy_name in current:
+                    self.candle_bus.unsubscribe(strategy_name)
+                    self.logger.info(f"📭 {strategy_name}: disabled - no longer evaluated")
+                continue
+
+            symbol, timeframe = config['symbol'].upper(), config['timeframe']
+            if current.get(strategy_name) != (symbol, timeframe):
+                self.candle_bus.subscribe(strategy_name, symbol, timeframe)
+                websocket_manager.add_symbol_interval(symbol, timeframe)
+                self.logger.info(f"📬 {strategy_name}: evaluating on {symbol} {timeframe} candle close")
+            for name, params in self.signal_processor.stream_indicators(config):
+                indicator_engine.track(symbol, timeframe, name, **params)
+            price_feed.track(symbol)  # Live prices for the positions this strategy opens
+            if 'smart' in strategy_name.lower() and 'money' in strategy_name.lower():
+                # Swings are kept up to date as candles close instead of rescanned per evaluation
+                smart_money = self.signal_processor.smart_money_strategy(
+                    trading_config_manager.get_strategy_config(strategy_name))
+                smart_money.attach(websocket_manager)
+
+            assessment_interval = config.get('assessment_interval', 0)
+            if assessment_interval > 0:
+                self.scheduler.schedule(strategy_name, assessment_interval, timeframe)
+            else:
+                self.scheduler.unschedule(strategy_name)
+
+        for strategy_name in set(self.scheduler.schedules()) - set(strategies):
+            self.scheduler.unschedule(strategy_name)
+
+        if not websocket_manager.is_running:
+            websocket_manager.start()
+
+    def _evaluate_strategy(self, event: CandleCloseEvent):
+        """Evaluate one strategy on the candle that just closed (runs on an evaluation worker)"""
+        strategy_name = event.subscriber
+        self._last_evaluated[strategy_name] = event.open_time
+        try:
+            config = trading_config_manager.get_strategy_config(strategy_name)
+            position = self.order_manager.active_positions.get(strategy_name)
+
+            # Hot path: a snapshot of the closed candles in the WebSocket cache, once the stream is trustworthy.
+            # It is copied because a backfill merge may rewrite the ring while this worker evaluates.
+            frame = None
+            if self._stream_ready(event.symbol, event.interval):
+                frame = CandleFrame.from_manager(websocket_manager, event.symbol, event.interval, 200,
+                                                 engine=indicator_engine, copy=True)
+            if frame is not None and len(frame) >= 200:
+                if position:
+                    exit_reason = self.signal_processor.evaluate_exit_frame(frame, asdict(position), config)
+                else:
+                    signal = self.signal_processor.evaluate_entry_frame(frame, config)
+            else:
+                # Cache cold, stale or gapped - the DataFrame path backfills or bootstraps history over REST.
+                # Both paths decide on closed candles only.
+                df = self.price_fetcher.load_market_data(event.symbol, event.interval, 200, include_forming=False)
+                if df is None or df.empty:
+                    self.logger.warning(f"⚠️ {strategy_name}: no market data for {event.symbol} {event.interval}")
+                    return
+                df = self.price_fetcher.calculate_indicators(df, event.symbol, event.interval)
+                if position:
+                    exit_reason = self.signal_processor.evaluate_exit_conditions(df, asdict(position), config)
+                else:
+                    signal = self.signal_processor.evaluate_entry_conditions(df, config)
+
+            if position:
+                if exit_reason:
+                    self.order_manager.close_position(strategy_name, exit_reason)
+                return
+
+            if signal:
+                signal.symbol = event.symbol
+                signal.strategy_name = strategy_name
+                self.order_manager.execute_signal(signal, config)
+
+        except Exception as e:
+            self.logger.error(f"❌ Error evaluating {strategy_name}: {e}")
+
+    @staticmethod
+    def _stream_ready(symbol: str, interval: str, limit: int = 200) -> bool:
+        """Whether the last `limit` cached candles are fresh and gap-free, so decisions can be made on them"""
+        return (websocket_manager.is_data_fresh(symbol, interval, max_age_seconds=120)
+                and websocket_manager.is_continuous(symbol, interval, limit))
+
+    def _assess_strategy(self, strategy_name: str):
+        """Timed assessment: re-check an open position, or catch a close the candle bus did not deliver"""
+        try:
+            config = trading_config_manager.get_strategy_config(strategy_name)
+            symbol, timeframe = config['symbol'].upper(), config['timeframe']
+            open_time = websocket_manager.get_last_closed_open_time(symbol, timeframe)
+            has_position = strategy_name in self.order_manager.active_positions
+
+            # Only assess on a stream that can be trusted; the candle bus still evaluates closes
+            if open_time is None or not self._stream_ready(symbol, timeframe):
+                log = self.logger.warning if has_position else self.logger.debug
+                log(f"⏸️ {strategy_name}: skipping assessment, {symbol} {timeframe} stream is stale or gapped")
+                return
+
+            if not has_position and self._last_evaluated.get(strategy_name) == open_time:
+                return  # Entries only change when a candle closes
+
+            event = CandleCloseEvent(strategy_name, symbol, timeframe, open_time, 0.0, time.time())
+            self._evaluate_strategy(event)
+
+        except Exception as e:
+            self.logger.error(f"❌ Error assessing {strategy_name}: {e}")
+
+    @staticmethod
+    def _timed(evaluate, arg) -> float:
+        """Run an evaluation and return how long it took"""
+        started = time.perf_counter()
+        evaluate(arg)
+        return time.perf_counter() - started
+
+    async def _run_evaluations(self, events: List[CandleCloseEvent], assessments: List[str]):
+        """Evaluate concurrently across symbols, in order within each symbol, and wait for all of them
+
+        The scan takes as long as the busiest symbol rather than the sum of all
+        evaluations. Durations go to the scheduler, which flags overruns.
+        """
+        jobs, names = [], []
+        for event in events:
+            jobs.append((event.symbol, self._timed, (self._evaluate_strategy, event)))
+            names.append(event.subscriber)
+        subscriptions = self.candle_bus.subscriptions()
+        for strategy_name in assessments:
+            symbol = subscriptions.get(strategy_name, (strategy_name,))[0]
+            jobs.append((symbol, self._timed, (self._assess_strategy, strategy_name)))
+            names.append(strategy_name)
+
+        for strategy_name, duration in zip(names, await self.evaluation_pool.run_all(jobs)):
+            if isinstance(duration, float):
+                self.scheduler.record_run(strategy_name, duration)
+
     async def _load_existing_positions(self):
         """Load existing positions with orphan detection"""
         try:
@@ -108,6 +263,7 @@ class BotManager:
                 # Attempt to recover positions
                 for candidate in candidates:
                     try:
+                        price_feed.track(candidate['symbol'])
                         await self.order_manager.recover_position_from_data(candidate)
                         self.logger.info(f"✅ Recovered position: {candidate['symbol']}")
                     except Exception as recovery_error:
@@ -164,20 +320,31 @@ class BotManager:
             except Exception as notification_error:
                 self.logger.warning(f"Startup notification failed: {notification_error}")
 
-            # Main trading loop
+            # Main trading loop - idle until a subscribed candle closes or a timed assessment is due
             while self.is_running:
                 try:
+                    timeout = self.orphan_check_interval
+                    next_assessment = self.scheduler.seconds_until_next()
+                    if next_assessment is not None:
+                        timeout = min(timeout, next_assessment)
+                    events = await self.candle_bus.wait_for_events(timeout=timeout)
+
+                    # Strategies whose candle closed, plus timed assessments for the others
+                    evaluated = {event.subscriber for event in events}
+                    assessments = [name for name in self.scheduler.pop_due() if name not in evaluated]
+                    if events or assessments:
+                        await self._run_evaluations(events, assessments)
+
+                    # Pick up strategies enabled or retargeted from the dashboard
+                    self._subscribe_strategies()
+
                     # Run orphan detection
                     await self._run_orphan_check()
 
-                    # Process trading signals
-                    await self.signal_processor.process_all_strategies()
-
                     # Update balances
-                    await self.balance_fetcher.update_balance()
-
-                    # Short sleep to prevent excessive CPU usage
-                    await asyncio.sleep(1)
+                    if (datetime.now() - self.last_balance_check).total_seconds() >= global_config.BALANCE_CHECK_INTERVAL:
+                        self.balance_fetcher.get_account_balance()
+                        self.last_balance_check = datetime.now()
 
                 except Exception as loop_error:
                     self.logger.error(f"❌ Trading loop error: {loop_error}")
@@ -195,6 +362,9 @@ class BotManager:
         try:
             self.logger.info("⏹️ Stopping trading bot...")
             self.is_running = False
+            self.candle_bus.stop()
+            if self.evaluation_pool:
+                self.evaluation_pool.shutdown()  # Let in-flight evaluations finish placing orders
 
             # Run final orphan check
             await self._run_orphan_check()
@@ -250,6 +420,11 @@ class BotManager:
             if self.order_manager:
                 status['active_positions'] = len(self.order_manager.active_positions)
 
+            status['candle_events'] = self.candle_bus.get_statistics()
+            status['scheduler'] = self.scheduler.get_statistics()
+            if self.evaluation_pool:
+                status['evaluation_pool'] = self.evaluation_pool.get_statistics()
+
             return status
 
         except Exception as e:
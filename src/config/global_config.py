@@ -30,6 +30,18 @@ class GlobalConfig:
         self.PRICE_UPDATE_INTERVAL = 1  # seconds
         self.BALANCE_CHECK_INTERVAL = 30  # seconds
 
+        # Timed strategy assessments fire this long after each aligned boundary, once the close has landed
+        self.STRATEGY_SETTLE_SECONDS = float(os.getenv('STRATEGY_SETTLE_SECONDS', '2'))
+        # Worker threads evaluating strategies concurrently (evaluations for one symbol stay in order)
+        self.STRATEGY_EVALUATION_WORKERS = int(os.getenv('STRATEGY_EVALUATION_WORKERS', '4'))
+
+        # Closed candles are kept on disk so restarts don't re-download history
+        self.KLINE_STORE_ENABLED = os.getenv('KLINE_STORE_ENABLED', 'true').lower() == 'true'
+        self.KLINE_STORE_DIR = os.getenv('KLINE_STORE_DIR', 'trading_data/klines')
+
+        # Stream frame decoder: 'auto' uses orjson when installed, else stdlib json
+        self.JSON_DECODER = os.getenv('JSON_DECODER', 'auto')
+
         # Timezone settings for chart alignment - Set to Dubai/UAE time
         self.USE_LOCAL_TIMEZONE = os.getenv('USE_LOCAL_TIMEZONE', 'true').lower() == 'true'
         self.TIMEZONE_OFFSET_HOURS = float(os.getenv('TIMEZONE_OFFSET_HOURS', '4'))  # Dubai is UTC+4
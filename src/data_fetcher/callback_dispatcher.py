@@ -0,0 +1,216 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+DROP_OLDEST = 'drop_oldest'
+COALESCE = 'coalesce'
+
+
+class _Subscriber:
+    """One registered callback with its own bounded queue and stats"""
+
+    def __init__(self, callback: Callable, policy: str, max_queue: int):
+        if policy not in (DROP_OLDEST, COALESCE):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.callback = callback
+        self.policy = policy
+        self.max_queue = max_queue
+        self.name = getattr(callback, '__qualname__', repr(callback))
+
+        # DROP_OLDEST: deque of events. COALESCE: ordered key -> event, where forming
+        # ticks share one key per stream and closed candles keep their own key.
+        self.events = deque() if policy == DROP_OLDEST else OrderedDict()
+        self.forming = OrderedDict()  # COALESCE: queued forming-tick keys, oldest first
+        self.scheduled = False  # Queued for, or running on, a worker
+
+        self.calls = 0
+        self.errors = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed_overflow = 0  # COALESCE: closed candles queued beyond max_queue rather than dropped
+        self.total_run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def push(self, event: tuple) -> bool:
+        """Queue an event; True if a closed candle had to be queued beyond `max_queue`
+
+        Under COALESCE a full queue evicts its oldest forming tick. Closed
+        candles are never evicted: with no forming tick left to evict, a new
+        tick is dropped and a new close is queued over the bound.
+        """
+        symbol, interval, kline, _ = event
+        if self.policy == DROP_OLDEST:
+            if len(self.events) >= self.max_queue:
+                self.events.popleft()
+                self.dropped += 1
+            self.events.append(event)
+            return False
+
+        is_closed = bool(kline.get('is_closed'))
+        key = (symbol, interval, kline['timestamp']) if is_closed else (symbol, interval)
+        overflow = False
+        if key in self.events:
+            del self.events[key]
+            self.forming.pop(key, None)
+            self.coalesced += 1
+        elif len(self.events) >= self.max_queue:
+            if self.forming:
+                oldest, _ = self.forming.popitem(last=False)
+                del self.events[oldest]
+                self.dropped += 1
+            elif not is_closed:
+                self.dropped += 1
+                return False
+            else:
+                self.closed_overflow += 1
+                overflow = True
+        self.events[key] = event
+        if not is_closed:
+            self.forming[key] = None
+        return overflow
+
+    def pop(self) -> tuple:
+        if self.policy == DROP_OLDEST:
+            return self.events.popleft()
+        key, event = self.events.popitem(last=False)
+        self.forming.pop(key, None)
+        return event
+
+    def clear(self):
+        self.events.clear()
+        self.forming.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'policy': self.policy,
+            'queue_depth': len(self.events),
+            'calls': self.calls,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'closed_overflow': self.closed_overflow,
+            'avg_run_ms': self.total_run_seconds / self.calls * 1000 if self.calls else 0.0,
+            'max_run_ms': self.max_run_seconds * 1000,
+            'avg_queue_wait_ms': self.total_wait_seconds / self.calls * 1000 if self.calls else 0.0,
+            'max_queue_wait_ms': self.max_wait_seconds * 1000
+        }
+
+
+class CallbackDispatcher:
+    """Runs kline update callbacks on a worker pool instead of the socket thread
+
+    `dispatch()` only appends to each subscriber's bounded queue, so the
+    receive loop never waits on a consumer. Each subscriber is served by at
+    most one worker at a time, which keeps its events in order, while
+    different subscribers run in parallel. On overflow a subscriber either
+    drops its oldest event (`drop_oldest`) or, with `coalesce`, keeps only the
+    newest forming tick per stream; closed candles are never coalesced away or
+    evicted, since a lost close would skip an evaluation.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 1000, batch_size: int = 50):
+        self.logger = logging.getLogger(__name__)
+        self.workers = workers
+        self.max_queue = max_queue
+        self.batch_size = batch_size  # Events run per turn before yielding the worker
+
+        self._subscribers: List[_Subscriber] = []
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+
+    def register(self, callback: Callable, policy: str = DROP_OLDEST, max_queue: Optional[int] = None):
+        """Add a `callback(symbol, interval, kline)` subscriber"""
+        subscriber = _Subscriber(callback, policy, max_queue or self.max_queue)
+        with self._lock:
+            # Copy-on-write so dispatch() can iterate without holding the lock for long
+            self._subscribers = self._subscribers + [subscriber]
+        self._ensure_workers()
+
+    def unregister(self, callback: Callable):
+        with self._lock:
+            for subscriber in self._subscribers:
+                if subscriber.callback == callback:
+                    subscriber.clear()
+            self._subscribers = [s for s in self._subscribers if s.callback != callback]
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for _ in range(self.workers - len(self._threads)):
+                thread = threading.Thread(target=self._run, daemon=True, name="kline-callback-worker")
+                thread.start()
+                self._threads.append(thread)
+
+    def dispatch(self, symbol: str, interval: str, kline: Dict[str, Any]):
+        """Queue an update for every subscriber (non-blocking)"""
+        event = (symbol, interval, kline, time.perf_counter())
+        with self._lock:
+            for subscriber in self._subscribers:
+                if subscriber.push(event) and len(subscriber.events) == subscriber.max_queue + 1:
+                    self.logger.warning(f"⚠️ {subscriber.name} is behind: closed candles queued past "
+                                        f"{subscriber.max_queue} events instead of being dropped")
+                if not subscriber.scheduled:
+                    subscriber.scheduled = True
+                    self._ready.put(subscriber)
+
+    def _run(self):
+        while True:
+            subscriber = self._ready.get()
+            for _ in range(self.batch_size):
+                with self._lock:
+                    if not subscriber.events:
+                        break
+                    symbol, interval, kline, queued_at = subscriber.pop()
+
+                started = time.perf_counter()
+                try:
+                    subscriber.callback(symbol, interval, kline)
+                except Exception as e:
+                    subscriber.errors += 1
+                    self.logger.error(f"Error in update callback {subscriber.name}: {e}")
+                finished = time.perf_counter()
+
+                subscriber.calls += 1
+                wait, run = started - queued_at, finished - started
+                subscriber.total_wait_seconds += wait
+                subscriber.max_wait_seconds = max(subscriber.max_wait_seconds, wait)
+                subscriber.total_run_seconds += run
+                subscriber.max_run_seconds = max(subscriber.max_run_seconds, run)
+
+            with self._lock:
+                if subscriber.events:
+                    self._ready.put(subscriber)  # More work - go to the back of the line
+                else:
+                    subscriber.scheduled = False
+                    self._idle.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been handled"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while any(subscriber.scheduled for subscriber in self._subscribers):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {}
+            for subscriber in self._subscribers:
+                name = subscriber.name if subscriber.name not in stats else f"{subscriber.name}#{len(stats)}"
+                stats[name] = subscriber.stats()
+        return {
+            'workers': len(self._threads),
+            'queue_depth': sum(s['queue_depth'] for s in stats.values()),
+            'dropped': sum(s['dropped'] for s in stats.values()),
+            'callbacks': stats
+        }
@@ -0,0 +1,128 @@
+from math import gcd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.data_fetcher.kline_buffer import interval_to_ms
+
+# Binance kline intervals in ascending order
+KLINE_INTERVALS = ('1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d', '3d', '1w', '1M')
+
+# Candles that are not aligned to multiples of their length from the epoch
+# (weeks start on Monday, months vary) are always streamed from the exchange
+UNALIGNED_INTERVALS = ('3d', '1w', '1M')
+
+
+def is_aggregatable(interval: str) -> bool:
+    """True if candles of this interval can be built from a shorter epoch-aligned interval"""
+    return interval not in UNALIGNED_INTERVALS and interval_to_ms(interval) is not None
+
+
+def base_interval_for(intervals: Iterable[str]) -> Optional[str]:
+    """Longest Binance interval that every aggregatable interval in the set is a multiple of"""
+    lengths = [interval_to_ms(interval) for interval in intervals if is_aggregatable(interval)]
+    if not lengths:
+        return None
+
+    common = 0
+    for length in lengths:
+        common = gcd(common, length)
+    for interval in reversed(KLINE_INTERVALS):
+        length = interval_to_ms(interval)
+        if is_aggregatable(interval) and length <= common and common % length == 0:
+            return interval
+    return '1m'
+
+
+class _BucketState:
+    """Running OHLCV of the closed base candles inside one higher-timeframe candle"""
+
+    __slots__ = ('bucket_open', 'next_base_open', 'complete', 'has_data',
+                 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, bucket_open: int, first_base_open: int):
+        self.bucket_open = bucket_open
+        self.next_base_open = first_base_open
+        # A bucket joined mid-way is missing base candles and is never committed
+        self.complete = first_base_open == bucket_open
+        self.has_data = False
+        self.open = self.high = self.low = self.close = self.volume = 0.0
+
+
+class CandleAggregator:
+    """Builds higher-timeframe klines for one symbol from its lowest-timeframe stream
+
+    Every base tick yields a tick for each target interval, aligned to the same
+    epoch boundaries the exchange uses. The target candle is forming until the
+    last base candle of its bucket closes. A bucket with a missing base candle
+    (stream gap, or aggregation started mid-bucket) is never marked closed, so
+    the target stream's own continuity check backfills the real candle instead.
+    """
+
+    def __init__(self, base_interval: str, targets: Iterable[str] = ()):
+        self.base_interval = base_interval
+        self.base_ms = interval_to_ms(base_interval)
+        self._states: Dict[str, Optional[_BucketState]] = {}
+        for interval in targets:
+            self.add_target(interval)
+
+    @property
+    def targets(self) -> List[str]:
+        return list(self._states)
+
+    def add_target(self, interval: str):
+        length = interval_to_ms(interval)
+        if not is_aggregatable(interval) or length <= self.base_ms or length % self.base_ms:
+            raise ValueError(f"{interval} candles cannot be built from {self.base_interval} candles")
+        if interval not in self._states:
+            # Copy-on-write: targets change from caller threads while ticks arrive on the loop
+            self._states = {**self._states, interval: None}
+
+    def remove_target(self, interval: str):
+        self._states = {key: state for key, state in self._states.items() if key != interval}
+
+    def update(self, open_time: int, open_: float, high: float, low: float, close: float,
+               volume: float, is_closed: bool, received_at: float = 0.0) -> List[Tuple[str, Dict]]:
+        """Apply a base-interval tick and return (interval, kline) ticks for every target"""
+        ticks = []
+        states = self._states
+        for interval, state in states.items():
+            length = interval_to_ms(interval)
+            bucket_open = open_time - open_time % length
+
+            if state is not None and bucket_open < state.bucket_open:
+                continue  # Late repeat of a base candle from an earlier bucket
+            if state is None or state.bucket_open != bucket_open:
+                state = states[interval] = _BucketState(bucket_open, open_time)
+
+            if open_time < state.next_base_open:
+                continue  # Repeated close of a base candle already folded in
+            if open_time > state.next_base_open:
+                state.complete = False
+                state.next_base_open = open_time
+
+            if state.has_data:
+                candle_open = state.open
+                candle_high = max(state.high, high)
+                candle_low = min(state.low, low)
+                candle_volume = state.volume + volume
+            else:
+                candle_open, candle_high, candle_low, candle_volume = open_, high, low, volume
+
+            if is_closed:
+                state.open, state.high, state.low = candle_open, candle_high, candle_low
+                state.close, state.volume = close, candle_volume
+                state.has_data = True
+                state.next_base_open = open_time + self.base_ms
+
+            bucket_closed = is_closed and open_time + self.base_ms == bucket_open + length
+            ticks.append((interval, {
+                'timestamp': bucket_open,
+                'open': candle_open,
+                'high': candle_high,
+                'low': candle_low,
+                'close': close,
+                'volume': candle_volume,
+                'close_time': bucket_open + length - 1,
+                'is_closed': bucket_closed and state.complete,
+                'received_at': received_at
+            }))
+        return ticks
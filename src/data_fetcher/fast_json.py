@@ -0,0 +1,122 @@
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Binance REST kline row layout: open time, o, h, l, c, v, close time, ...
+REST_KLINE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+
+
+class JsonDecoder:
+    """A named JSON `loads` backend
+
+    Every backend accepts `str` or `bytes` and raises a `json.JSONDecodeError`
+    subclass on bad input, so callers can swap them freely.
+    """
+
+    def __init__(self, name: str, loads: Callable[[Any], Any]):
+        self.name = name
+        self.loads = loads
+
+    def __repr__(self):
+        return f"JsonDecoder({self.name})"
+
+
+def _orjson_decoder() -> JsonDecoder:
+    return JsonDecoder('orjson', orjson.loads)
+
+
+DECODERS: Dict[str, Callable[[], JsonDecoder]] = {'json': lambda: JsonDecoder('json', json.loads)}
+if ORJSON_AVAILABLE:
+    DECODERS['orjson'] = _orjson_decoder
+
+
+def available_decoders() -> List[str]:
+    return list(DECODERS)
+
+
+def get_decoder(name: Optional[str] = None) -> JsonDecoder:
+    """Decoder by name; 'auto' (or None) picks the fastest installed backend"""
+    if name in (None, '', 'auto'):
+        name = 'orjson' if ORJSON_AVAILABLE else 'json'
+    factory = DECODERS.get(name)
+    if factory is None:
+        logger.warning(f"⚠️ JSON decoder '{name}' not available - using stdlib json")
+        factory = DECODERS['json']
+    return factory()
+
+
+def kline_values(kline: Dict[str, Any]) -> Tuple[int, int, float, float, float, float, float, bool]:
+    """(open time, close time, o, h, l, c, v, is_closed) from a stream kline payload
+
+    Argument order of `KlineRingBuffer.update`, so a frame goes into the
+    buffer without an intermediate dict.
+    """
+    return (int(kline['t']), int(kline['T']), float(kline['o']), float(kline['h']),
+            float(kline['l']), float(kline['c']), float(kline['v']), kline['x'])
+
+
+def rest_klines_to_array(rows: Sequence[Sequence]) -> np.ndarray:
+    """(n, 7) float64 array from Binance REST kline rows, parsed in one pass"""
+    if not len(rows):
+        return np.empty((0, 7), dtype=np.float64)
+    return np.array([row[:7] for row in rows], dtype=np.float64)
+
+
+def rest_klines_to_dataframe(rows) -> pd.DataFrame:
+    """OHLCV DataFrame indexed by open time, from REST rows or their parsed array"""
+    array = rows if isinstance(rows, np.ndarray) else rest_klines_to_array(rows)
+    df = pd.DataFrame({
+        'open': array[:, 1],
+        'high': array[:, 2],
+        'low': array[:, 3],
+        'close': array[:, 4],
+        'volume': array[:, 5],
+        'close_time': array[:, 6].astype(np.int64)
+    }, index=pd.to_datetime(array[:, 0].astype(np.int64), unit='ms'))
+    df.index.name = 'timestamp'
+    return df
+
+
+def benchmark_decoders(frames: Iterable, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Decode throughput per backend on `frames`, plain and with kline extraction
+
+    Best of `repeat` runs, so one-off pauses (GC, scheduling) do not skew results.
+    """
+    frames = list(frames)
+    results = {}
+    for name in available_decoders():
+        loads = get_decoder(name).loads
+        decode_best = extract_best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for frame in frames:
+                loads(frame)
+            decode_best = min(decode_best, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for frame in frames:
+                data = loads(frame).get('data')
+                if data is not None and 'k' in data:
+                    kline_values(data['k'])
+            extract_best = min(extract_best, time.perf_counter() - started)
+
+        results[name] = {
+            'frames': len(frames),
+            'decode_seconds': decode_best,
+            'decode_frames_per_second': len(frames) / decode_best if decode_best > 0 else 0.0,
+            'kline_seconds': extract_best,
+            'kline_frames_per_second': len(frames) / extract_best if extract_best > 0 else 0.0
+        }
+    return results
@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from src.data_fetcher.kline_buffer import interval_to_ms
+
+
+class KlineGapBackfiller:
+    """Background REST backfill for candles missed while a stream was down
+
+    Only the missing open-time range is requested, and requests draw from a
+    per-minute REST weight budget so a reconnect storm across many streams
+    cannot push the IP towards a ban. Fetched candles are handed to
+    `on_candles(symbol, interval, rows)` for merging into the kline cache.
+    """
+
+    MAX_LIMIT = 1000  # Binance max candles per klines request
+
+    def __init__(self, on_candles: Callable[[str, str, List], None], weight_per_minute: int = 200):
+        self.logger = logging.getLogger(__name__)
+        self.client = None
+        self.on_candles = on_candles
+        self.weight_per_minute = weight_per_minute
+
+        self._tokens = float(weight_per_minute)
+        self._last_refill = time.monotonic()
+        self._pending: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.stats = {
+            'backfills_requested': 0,
+            'backfills_completed': 0,
+            'backfill_failures': 0,
+            'candles_backfilled': 0,
+            'weight_used': 0,
+            'budget_waits': 0
+        }
+
+    def set_client(self, client):
+        """Binance client wrapper used for REST kline requests"""
+        self.client = client
+
+    @staticmethod
+    def request_weight(limit: int) -> int:
+        """REST weight of a futures klines request for the given limit"""
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+
+    def request(self, symbol: str, interval: str, start_ms: int, end_ms: int):
+        """Queue a backfill of candles with open times in [start_ms, end_ms]"""
+        key = (symbol, interval)
+        with self._lock:
+            self.stats['backfills_requested'] += 1
+            if key in self._pending:
+                # Widen the outstanding request instead of queueing a second one
+                pending_start, pending_end = self._pending[key]
+                self._pending[key] = (min(pending_start, start_ms), max(pending_end, end_ms))
+                return
+            self._pending[key] = (start_ms, end_ms)
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+        self._queue.put(key)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            key = self._queue.get()
+            with self._lock:
+                window = self._pending.pop(key, None)
+            if window is None:
+                continue
+            self._backfill(key[0], key[1], window[0], window[1])
+
+    def _acquire(self, weight: int):
+        """Block until the weight budget can cover a request"""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.weight_per_minute,
+                               self._tokens + (now - self._last_refill) * self.weight_per_minute / 60.0)
+            self._last_refill = now
+            if self._tokens >= weight:
+                self._tokens -= weight
+                self.stats['weight_used'] += weight
+                return
+            self.stats['budget_waits'] += 1
+            time.sleep((weight - self._tokens) * 60.0 / self.weight_per_minute)
+
+    def _backfill(self, symbol: str, interval: str, start_ms: int, end_ms: int):
+        interval_ms = interval_to_ms(interval)
+        if self.client is None or not interval_ms:
+            self.logger.warning(f"⚠️ Cannot backfill {symbol} {interval}: no REST client configured")
+            self.stats['backfill_failures'] += 1
+            return
+
+        cursor = start_ms
+        fetched = 0
+        while cursor <= end_ms:
+            limit = min(self.MAX_LIMIT, (end_ms - cursor) // interval_ms + 1)
+            self._acquire(self.request_weight(limit))
+
+            rows = self.client.get_klines_range(symbol, interval, cursor, end_ms, limit)
+            if rows is None:
+                self.stats['backfill_failures'] += 1
+                self.logger.error(f"❌ Backfill failed for {symbol} {interval} from {cursor}")
+                return
+            if not rows:
+                break
+
+            self.on_candles(symbol, interval, rows)
+            fetched += len(rows)
+            cursor = int(rows[-1][0]) + interval_ms
+
+        self.stats['backfills_completed'] += 1
+        self.stats['candles_backfilled'] += fetched
+        self.logger.info(f"🧩 Backfilled {fetched} candles for {symbol} {interval}")
+
+    def get_statistics(self) -> Dict:
+        stats = dict(self.stats)
+        stats['pending_backfills'] = self.pending_count()
+        return stats
@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+INTERVAL_UNITS_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def interval_to_ms(interval: str) -> Optional[int]:
+    """Length of a Binance kline interval in milliseconds (None for calendar months)"""
+    try:
+        return int(interval[:-1]) * INTERVAL_UNITS_MS[interval[-1]]
+    except (KeyError, ValueError):
+        return None
+
+
+class KlineRingBuffer:
+    """Fixed-capacity columnar kline storage for a single symbol/interval stream
+
+    Closed candles live in preallocated NumPy arrays that wrap around once the
+    capacity is reached. The candle that is still forming occupies the slot
+    after the newest closed candle and is updated in place on every tick; the
+    buffer only advances when the exchange marks the candle as closed.
+
+    Every slot is mirrored into a second copy of the arrays, so any window of
+    recent candles is a contiguous slice. That lets `view()` and
+    `to_dataframe()` hand out read-only NumPy views without copying. Views
+    track live data: the forming row changes on each tick and rows are reused
+    once the ring wraps, so callers that keep data across candles must copy.
+    `merge_closed()` rewrites the whole ring, so readers on other threads
+    (evaluation workers) take `copy=True` snapshots, which retry until no
+    merge overlapped the copy.
+    """
+
+    PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity: int = 1000, interval_ms: Optional[int] = None):
+        self.capacity = capacity
+        self.interval_ms = interval_ms
+        # One spare slot so the forming candle never overwrites a closed one
+        self._slots = capacity + 1
+
+        # Storage is doubled: slot i is also written at i + _slots
+        self.prices = np.zeros((len(self.PRICE_FIELDS), 2 * self._slots), dtype=np.float64)
+        self.open_time = np.zeros(2 * self._slots, dtype=np.int64)
+        self.close_time = np.zeros(2 * self._slots, dtype=np.int64)
+        self.received_at = np.zeros(2 * self._slots, dtype=np.float64)
+
+        self._head = 0  # Slot of the forming candle / next closed candle
+        self._count = 0  # Number of closed candles stored
+        self.has_forming = False
+        self.version = 0  # Odd while merge_closed() rewrites the ring
+
+    def __len__(self) -> int:
+        return self._count + (1 if self.has_forming else 0)
+
+    @property
+    def closed_count(self) -> int:
+        return self._count
+
+    def _last_closed_slot(self) -> int:
+        return (self._head - 1) % self._slots
+
+    @property
+    def last_closed_open_time(self) -> Optional[int]:
+        if self._count == 0:
+            return None
+        return int(self.open_time[self._last_closed_slot()])
+
+    @property
+    def expected_next_open_time(self) -> Optional[int]:
+        """Open time the next candle must have for the closed series to stay continuous"""
+        if self._count == 0 or not self.interval_ms:
+            return None
+        return int(self.open_time[self._last_closed_slot()]) + self.interval_ms
+
+    def _write(self, slot: int, open_time: int, close_time: int, open_: float, high: float,
+               low: float, close: float, volume: float, received_at: float):
+        prices = self.prices
+        for index in (slot, slot + self._slots):
+            prices[0, index] = open_
+            prices[1, index] = high
+            prices[2, index] = low
+            prices[3, index] = close
+            prices[4, index] = volume
+            self.open_time[index] = open_time
+            self.close_time[index] = close_time
+            self.received_at[index] = received_at
+
+    def update(self, open_time: int, close_time: int, open_: float, high: float, low: float,
+               close: float, volume: float, is_closed: bool, received_at: float = 0.0) -> bool:
+        """Apply a kline tick. Returns False if the tick was stale and ignored."""
+        last_open = self.last_closed_open_time
+        if last_open is not None:
+            if open_time < last_open:
+                return False
+            if open_time == last_open:
+                # Repeated close for a candle we already committed - refresh it in place
+                self._write(self._last_closed_slot(), open_time, close_time, open_, high,
+                            low, close, volume, received_at)
+                return True
+
+        self._write(self._head, open_time, close_time, open_, high, low, close, volume, received_at)
+
+        if is_closed:
+            self._head = (self._head + 1) % self._slots
+            self._count = min(self._count + 1, self.capacity)
+            self.has_forming = False
+        else:
+            self.has_forming = True
+
+        return True
+
+    def merge_closed(self, rows: Sequence[Sequence]) -> int:
+        """Merge closed candles fetched out of band (REST backfill/bootstrap) in open-time order
+
+        Rows use the Binance REST layout: [open_time, open, high, low, close, volume, close_time, ...],
+        either as lists or as a 2-D float array.
+        Candles already in the buffer win over incoming duplicates, rows at or after the
+        forming candle are ignored, and only the newest `capacity` candles are kept.
+        Returns the number of candles added.
+        """
+        if len(rows) == 0:
+            return 0
+
+        if isinstance(rows, np.ndarray):
+            incoming = rows[:, :7].astype(np.float64)
+        else:
+            incoming = np.array([[float(value) for value in row[:7]] for row in rows], dtype=np.float64)
+        incoming_open = incoming[:, 0].astype(np.int64)
+        if self.has_forming:
+            keep = incoming_open < self.open_time[self._head]
+            incoming, incoming_open = incoming[keep], incoming_open[keep]
+        if len(incoming) == 0:
+            return 0
+
+        existing = self.view()
+        open_time = np.concatenate([existing['timestamp'], incoming_open])
+        close_time = np.concatenate([existing['close_time'], incoming[:, 6].astype(np.int64)])
+        prices = np.concatenate([
+            np.vstack([existing[field] for field in self.PRICE_FIELDS]),
+            incoming[:, 1:6].T
+        ], axis=1)
+        received_at = np.concatenate([self.received_at[self._window(None, False)], np.zeros(len(incoming))])
+
+        # np.unique keeps the first occurrence, so cached candles take priority
+        _, first = np.unique(open_time, return_index=True)
+        order = first[-self.capacity:]
+        added = int(np.count_nonzero(order >= len(existing['timestamp'])))
+
+        forming = self.latest() if self.has_forming else None
+        count = len(order)
+        self.version += 1
+        for target in (slice(0, count), slice(self._slots, self._slots + count)):
+            self.prices[:, target] = prices[:, order]
+            self.open_time[target] = open_time[order]
+            self.close_time[target] = close_time[order]
+            self.received_at[target] = received_at[order]
+        self._head = count % self._slots
+        self._count = count
+        self.has_forming = False
+        self.version += 1
+
+        if forming:
+            self.update(forming['timestamp'], forming['close_time'], forming['open'], forming['high'],
+                        forming['low'], forming['close'], forming['volume'], False, forming['received_at'])
+
+        return added
+
+    def _ordered_slots(self, limit: Optional[int], include_forming: bool) -> np.ndarray:
+        """Slot indices from oldest to newest for the requested window"""
+        closed = self._count if limit is None else min(limit, self._count)
+        slots = (self._head - closed + np.arange(closed)) % self._slots
+        if include_forming and self.has_forming:
+            slots = np.append(slots, self._head)
+        return slots
+
+    def _row_to_dict(self, slot: int, is_closed: bool) -> Dict:
+        return {
+            'timestamp': int(self.open_time[slot]),
+            'open': float(self.prices[0, slot]),
+            'high': float(self.prices[1, slot]),
+            'low': float(self.prices[2, slot]),
+            'close': float(self.prices[3, slot]),
+            'volume': float(self.prices[4, slot]),
+            'close_time': int(self.close_time[slot]),
+            'is_closed': is_closed,
+            'received_at': float(self.received_at[slot])
+        }
+
+    def to_dicts(self, limit: Optional[int] = None, include_forming: bool = True) -> List[Dict]:
+        """Return the newest candles as kline dicts, oldest first"""
+        closed_limit = limit
+        if limit is not None and include_forming and self.has_forming:
+            closed_limit = max(limit - 1, 0)
+
+        slots = self._ordered_slots(closed_limit, include_forming)
+        rows = []
+        for position, slot in enumerate(slots):
+            is_forming = include_forming and self.has_forming and position == len(slots) - 1
+            rows.append(self._row_to_dict(int(slot), not is_forming))
+        return rows
+
+    def _window(self, limit: Optional[int], include_forming: bool) -> slice:
+        """Contiguous slice over the mirrored arrays covering the requested candles"""
+        closed = self._count if limit is None else max(0, min(limit, self._count))
+        forming = 1 if include_forming and self.has_forming else 0
+        end = self._head + self._slots + forming
+        return slice(end - closed - forming, end)
+
+    def view(self, limit: Optional[int] = None, include_forming: bool = False,
+             copy: bool = False) -> Dict[str, np.ndarray]:
+        """Read-only column views over the last `limit` closed candles, oldest first
+
+        With `include_forming` the still-forming candle is appended as the last row.
+        With `copy` the columns are a consistent snapshot that later writes cannot touch.
+        """
+        if copy:
+            while True:
+                version = self.version
+                columns = {name: values.copy() for name, values in self.view(limit, include_forming).items()}
+                if version % 2 == 0 and version == self.version:
+                    return columns
+
+        window = self._window(limit, include_forming)
+        columns = {'timestamp': self.open_time[window], 'close_time': self.close_time[window]}
+        for row, field in enumerate(self.PRICE_FIELDS):
+            columns[field] = self.prices[row, window]
+
+        for column in columns.values():
+            column.flags.writeable = False
+        return columns
+
+    def to_dataframe(self, limit: Optional[int] = None, include_forming: bool = False,
+                     time_offset_ms: int = 0, copy: bool = False) -> Optional[pd.DataFrame]:
+        """DataFrame indexed by candle open time whose columns share memory with the buffer (unless `copy`)"""
+        columns = self.view(limit, include_forming, copy)
+        if len(columns['timestamp']) == 0:
+            return None
+
+        index = pd.DatetimeIndex(pd.to_datetime(columns.pop('timestamp') + time_offset_ms, unit='ms'),
+                                 name='timestamp')
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def latest(self) -> Optional[Dict]:
+        """Most recent candle - the forming one if present, otherwise the last closed"""
+        if self.has_forming:
+            return self._row_to_dict(self._head, False)
+        if self._count:
+            return self._row_to_dict(self._last_closed_slot(), True)
+        return None
+
+    def latest_close(self) -> Optional[float]:
+        if self.has_forming:
+            return float(self.prices[3, self._head])
+        if self._count:
+            return float(self.prices[3, self._last_closed_slot()])
+        return None
+
+    def latest_received_at(self) -> Optional[float]:
+        if self.has_forming:
+            return float(self.received_at[self._head])
+        if self._count:
+            return float(self.received_at[self._last_closed_slot()])
+        return None
+
+    def clear(self):
+        self.version += 2
+        self._head = 0
+        self._count = 0
+        self.has_forming = False
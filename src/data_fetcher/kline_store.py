@@ -0,0 +1,133 @@
+import logging
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+# On-disk record layout, little-endian, 56 bytes per candle
+RECORD_DTYPE = np.dtype([
+    ('open_time', '<i8'), ('close_time', '<i8'),
+    ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')
+])
+_RECORD = struct.Struct('<qq5d')
+
+
+class KlineStore:
+    """Append-only on-disk store of closed candles, one file per symbol/interval
+
+    Closed candles are appended as fixed-size binary records and read back
+    through `np.memmap`, so restoring the newest few thousand candles on
+    startup only touches the tail of the file. Records may arrive out of
+    order (backfills) or repeat; `load()` sorts and dedups by open time, the
+    last written record winning. Files past `max_records` are compacted on
+    load.
+    """
+
+    def __init__(self, root: str = "trading_data/klines", max_records: int = 200_000):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.max_records = max_records
+        self._files: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self.root / f"{symbol.upper()}_{interval}.klines"
+
+    def _handle(self, path: Path):
+        key = str(path)
+        handle = self._files.get(key)
+        if handle is None:
+            self._truncate_torn_record(path)
+            handle = self._files[key] = open(path, 'ab')
+        return handle
+
+    def _truncate_torn_record(self, path: Path):
+        """Cut a partial trailing record left by a crash, so appends stay aligned to whole records"""
+        size = path.stat().st_size if path.exists() else 0
+        torn = size % RECORD_DTYPE.itemsize
+        if torn:
+            os.truncate(path, size - torn)
+            self.logger.warning(f"⚠️ Truncated {torn} bytes of a partial record from {path.name}")
+
+    def append(self, symbol: str, interval: str, open_time: int, close_time: int, open_: float,
+               high: float, low: float, close: float, volume: float):
+        """Append one closed candle"""
+        record = _RECORD.pack(int(open_time), int(close_time), open_, high, low, close, volume)
+        with self._lock:
+            handle = self._handle(self._path(symbol, interval))
+            handle.write(record)
+            handle.flush()
+
+    def append_rows(self, symbol: str, interval: str, rows: np.ndarray):
+        """Append closed candles given as an (n, 7) array in Binance REST column order"""
+        if len(rows) == 0:
+            return
+        records = np.empty(len(rows), dtype=RECORD_DTYPE)
+        records['open_time'] = rows[:, 0]
+        records['close_time'] = rows[:, 6]
+        for column, field in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+            records[field] = rows[:, column]
+
+        with self._lock:
+            handle = self._handle(self._path(symbol, interval))
+            handle.write(records.tobytes())
+            handle.flush()
+
+    def _read(self, path: Path, limit: Optional[int]) -> np.ndarray:
+        """Sorted, deduplicated records from the tail of a file"""
+        count = path.stat().st_size // RECORD_DTYPE.itemsize if path.exists() else 0
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        # A torn trailing record from a crash is ignored by sizing the map to whole records
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        # Read some slack so duplicates and late backfills near the tail are covered
+        tail = np.array(records[-2 * limit:] if limit else records)
+        del records
+
+        newest_first = tail[::-1]
+        _, first = np.unique(newest_first['open_time'], return_index=True)
+        unique = newest_first[first]
+        return unique[-limit:] if limit else unique
+
+    def load(self, symbol: str, interval: str, limit: int = 1000) -> np.ndarray:
+        """Newest `limit` stored candles as an (n, 7) array in Binance REST column order"""
+        path = self._path(symbol, interval)
+        with self._lock:
+            try:
+                if path.exists() and path.stat().st_size // RECORD_DTYPE.itemsize > self.max_records:
+                    self._compact(path)
+                records = self._read(path, limit)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"❌ Could not read kline store {path}: {e}")
+                return np.empty((0, 7))
+
+        rows = np.empty((len(records), 7))
+        rows[:, 0] = records['open_time']
+        for column, field in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+            rows[:, column] = records[field]
+        rows[:, 6] = records['close_time']
+        return rows
+
+    def _compact(self, path: Path):
+        """Rewrite a file keeping the newest half of `max_records` unique candles"""
+        handle = self._files.pop(str(path), None)
+        if handle is not None:
+            handle.close()
+
+        records = self._read(path, self.max_records // 2)
+        temp_path = path.with_suffix('.tmp')
+        records.tofile(temp_path)
+        os.replace(temp_path, path)
+        self.logger.info(f"🗜️ Compacted {path.name} to {len(records)} candles")
+
+    def close(self):
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files.clear()
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.data_fetcher.websocket_manager import websocket_manager
+
+
+class PriceQuote:
+    """Latest mark price and top of book for one symbol"""
+
+    __slots__ = ('mark_price', 'bid', 'ask', 'updated_at', 'event_time')
+
+    def __init__(self):
+        self.mark_price = None
+        self.bid = None
+        self.ask = None
+        self.updated_at = None  # time.monotonic() of the last update
+        self.event_time = None  # Exchange event time (ms)
+
+    @property
+    def price(self) -> Optional[float]:
+        """Mark price, or the book mid when no mark price has arrived yet"""
+        if self.mark_price is not None:
+            return self.mark_price
+        if self.bid is not None and self.ask is not None:
+            return (self.bid + self.ask) / 2
+        return None
+
+
+class PriceFeed:
+    """Current prices from `@markPrice` / `@bookTicker` streams
+
+    Streams are carried by the kline manager's shards. Lookups are plain dict
+    reads with no network or reconnect side effects. Every quote comes with
+    its age, so callers decide what is too stale instead of getting a silent
+    REST fallback.
+    """
+
+    def __init__(self, manager=websocket_manager, max_age_seconds: float = 5.0,
+                 use_book_ticker: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.manager = manager
+        self.max_age_seconds = max_age_seconds
+        self.use_book_ticker = use_book_ticker
+        self._quotes: Dict[str, PriceQuote] = {}
+        self._lock = threading.Lock()
+
+    def _streams(self, symbol: str):
+        streams = [f"{symbol.lower()}@markPrice@1s"]
+        if self.use_book_ticker:
+            streams.append(f"{symbol.lower()}@bookTicker")
+        return streams
+
+    def track(self, symbol: str):
+        """Start streaming prices for a symbol (no-op if already tracked)"""
+        symbol = symbol.upper()
+        with self._lock:
+            if symbol in self._quotes:
+                return
+            self._quotes[symbol] = PriceQuote()
+
+        self.manager.add_stream(self._streams(symbol)[0], self._on_mark_price)
+        if self.use_book_ticker:
+            self.manager.add_stream(self._streams(symbol)[1], self._on_book_ticker)
+        self.logger.info(f"💲 Tracking live price for {symbol}")
+
+    def untrack(self, symbol: str):
+        symbol = symbol.upper()
+        with self._lock:
+            if self._quotes.pop(symbol, None) is None:
+                return
+        for stream in self._streams(symbol):
+            self.manager.remove_stream(stream)
+
+    def is_tracked(self, symbol: str) -> bool:
+        return symbol.upper() in self._quotes
+
+    def _on_mark_price(self, data: Dict[str, Any]):
+        quote = self._quotes.get(data['s'])
+        if quote is None:
+            return
+        quote.mark_price = float(data['p'])
+        quote.event_time = data.get('E')
+        quote.updated_at = time.monotonic()
+
+    def _on_book_ticker(self, data: Dict[str, Any]):
+        quote = self._quotes.get(data['s'])
+        if quote is None:
+            return
+        quote.bid = float(data['b'])
+        quote.ask = float(data['a'])
+        quote.event_time = data.get('E', quote.event_time)
+        quote.updated_at = time.monotonic()
+
+    def get_price(self, symbol: str) -> Tuple[Optional[float], Optional[float]]:
+        """(price, age in seconds) - both None if no update has arrived yet"""
+        quote = self._quotes.get(symbol.upper())
+        if quote is None or quote.updated_at is None:
+            return None, None
+        return quote.price, time.monotonic() - quote.updated_at
+
+    def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest quote with its age and whether it is older than `max_age_seconds`"""
+        quote = self._quotes.get(symbol.upper())
+        if quote is None or quote.updated_at is None:
+            return None
+
+        age = time.monotonic() - quote.updated_at
+        return {
+            'symbol': symbol.upper(),
+            'price': quote.price,
+            'mark_price': quote.mark_price,
+            'bid': quote.bid,
+            'ask': quote.ask,
+            'age_seconds': age,
+            'is_stale': age > self.max_age_seconds,
+            'event_time': quote.event_time
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        ages = [now - quote.updated_at for quote in list(self._quotes.values()) if quote.updated_at is not None]
+        return {
+            'tracked_symbols': len(self._quotes),
+            'symbols_with_price': len(ages),
+            'stale_symbols': sum(1 for age in ages if age > self.max_age_seconds),
+            'max_age_seconds': max(ages) if ages else None
+        }
+
+
+# Global price feed instance
+price_feed = PriceFeed()
@@ -6,7 +6,14 @@ import logging
 from src.binance_client.client import BinanceClientWrapper
 from datetime import datetime, timezone, timedelta
 from src.config.global_config import global_config
+from src.data_fetcher.fast_json import rest_klines_to_array, rest_klines_to_dataframe
+from src.data_fetcher.kline_buffer import interval_to_ms
+from src.data_fetcher.kline_store import KlineStore
+from src.data_fetcher.price_feed import price_feed
 from src.data_fetcher.websocket_manager import websocket_manager
+from src.indicators.incremental import indicator_engine
+from src.indicators.indicator_cache import frozen_columns, indicator_cache
+from src.indicators.rsi import rsi_series
 import time
 import asyncio
 
@@ -18,6 +25,16 @@ class PriceFetcher:
         self.logger = logging.getLogger(__name__)
         self.price_cache = {}
 
+        # Candles missed during a stream reconnect are backfilled over REST
+        websocket_manager.set_backfill_client(binance_client)
+
+        # Streaming indicators advance once per closed candle instead of rescanning history
+        indicator_engine.attach(websocket_manager)
+
+        # Closed candles persist across restarts, so only the tail since shutdown is fetched
+        if global_config.KLINE_STORE_ENABLED and websocket_manager.kline_store is None:
+            websocket_manager.set_kline_store(KlineStore(global_config.KLINE_STORE_DIR))
+
         # Timezone configuration for chart alignment
         self.use_local_timezone = global_config.USE_LOCAL_TIMEZONE
         self.timezone_offset_hours = global_config.TIMEZONE_OFFSET_HOURS
@@ -29,41 +46,47 @@ class PriceFetcher:
         else:
             self.logger.info("🕐 TIMEZONE: Using UTC (default)")
 
-    def _adjust_timestamp_for_timezone(self, timestamp_ms: int) -> int:
-        """Adjust timestamp for local timezone if enabled (non-invasive)"""
+    def _timezone_offset_ms(self) -> int:
+        """Chart alignment offset applied to candle timestamps (0 keeps UTC)"""
         if not self.use_local_timezone and self.timezone_offset_hours == 0:
-            return timestamp_ms  # No change - preserve existing behavior
+            return 0  # No change - preserve existing behavior
 
         try:
-            # Convert to datetime
-            dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
-
             if self.use_local_timezone:
-                # Convert to local timezone
-                local_dt = dt.astimezone()
-                # Align to local timezone boundaries
-                local_offset = local_dt.utcoffset().total_seconds() / 3600
+                # Offset of the local timezone right now
+                local_offset = datetime.now(timezone.utc).astimezone().utcoffset().total_seconds() / 3600
             else:
                 # Use manual offset
                 local_offset = self.timezone_offset_hours
 
-            # Adjust timestamp by offset (preserve original data, just shift perspective)
-            adjusted_dt = dt + timedelta(hours=local_offset)
-            return int(adjusted_dt.timestamp() * 1000)
+            return int(local_offset * 3600 * 1000)
 
         except Exception as e:
-            self.logger.warning(f"Timezone adjustment failed: {e}, using original timestamp")
-            return timestamp_ms  # Fallback to original - safe
+            self.logger.warning(f"Timezone adjustment failed: {e}, using original timestamps")
+            return 0  # Fallback to original - safe
 
-    def get_current_price(self, symbol: str) -> Optional[float]:
-        """Get current price for symbol from WebSocket cache or REST fallback"""
+    def get_price_quote(self, symbol: str) -> Optional[Dict]:
+        """Streamed mark price / top of book with its age - a plain read, None for untracked symbols"""
+        return price_feed.get_quote(symbol)
+
+    def get_current_price(self, symbol: str, allow_rest: bool = False) -> Optional[float]:
+        """Get current price for symbol from the price feed, the kline cache or (with `allow_rest`) REST"""
         try:
-            # First try WebSocket cache
+            # Mark price stream first
+            quote = self.get_price_quote(symbol)
+            if quote and not quote['is_stale']:
+                self.price_cache[symbol] = quote['price']
+                return quote['price']
+
+            # Then the kline cache
             ws_price = websocket_manager.get_current_price(symbol)
             if ws_price and websocket_manager.is_data_fresh(symbol, '1m', max_age_seconds=30):
                 self.price_cache[symbol] = ws_price
                 return ws_price
 
+            if not allow_rest:
+                return None
+
             # Fallback to REST API if WebSocket data is unavailable
             self.logger.debug(f"Using REST API fallback for {symbol} current price")
             ticker = self.binance_client.get_symbol_ticker(symbol)
@@ -79,19 +102,32 @@ class PriceFetcher:
 
     async def get_market_data(self, symbol: str, interval: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Get market data with enhanced historical data bootstrapping"""
+        return self.load_market_data(symbol, interval, limit)
+
+    def load_market_data(self, symbol: str, interval: str, limit: int = 100,
+                         include_forming: bool = True) -> Optional[pd.DataFrame]:
+        """Blocking form of get_market_data, for evaluation worker threads
+
+        `include_forming=False` returns closed candles only, as strategy evaluation uses.
+        """
         try:
             # Always ensure minimum data requirements for indicators
             min_required = max(limit, 200)  # MACD needs 26, RSI needs 14, plus buffer for accuracy
 
-            # Try WebSocket data first
-            websocket_data = websocket_manager.get_cached_klines(symbol, interval, min_required)
+            # Try WebSocket data first - a snapshot of the kline cache, safe to use off the socket thread
+            df = self._get_websocket_dataframe(symbol, interval, min_required, include_forming, copy=True)
 
-            if websocket_data and len(websocket_data) >= min_required:
+            if df is not None and len(df) >= min_required:
                 if websocket_manager.is_data_fresh(symbol, interval, max_age_seconds=120):
-                    df = self._convert_websocket_to_dataframe(websocket_data)
-                    if len(df) >= min_required:
-                        self.logger.debug(f"✅ Using WebSocket data: {symbol} {interval} ({len(df)} candles)")
-                        return df
+                    self.logger.debug(f"✅ Using WebSocket data: {symbol} {interval} ({len(df)} candles)")
+                    return df
+
+            # Cache restored from disk - fetch only the candles closed since it was written
+            if self._fill_tail_gap(symbol, interval, min_required):
+                df = self._get_websocket_dataframe(symbol, interval, min_required, include_forming, copy=True)
+                if df is not None and len(df) >= min_required:
+                    self.logger.debug(f"✅ Using stored data: {symbol} {interval} ({len(df)} candles)")
+                    return df
 
             # If WebSocket data is insufficient, bootstrap with REST API
             self.logger.info(f"🔄 Bootstrapping historical data for {symbol} {interval}")
@@ -116,19 +152,16 @@ class PriceFetcher:
                 self.logger.warning(f"No REST API data received for {symbol} {interval}")
                 return None
 
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
+            # Parse the rows once into float64 columns - no pandas object columns
+            rows = rest_klines_to_array(klines)
 
-            # Convert data types
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            # Keep the closed candles so the stream cache starts with full history
+            websocket_manager.seed_klines(symbol, interval, rows)
+            if not include_forming:
+                rows = rows[rows[:, 6] < time.time() * 1000]
 
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df = df.set_index('timestamp')
+            # Convert to DataFrame
+            df = rest_klines_to_dataframe(rows)
 
             # Validate we have sufficient data
             if len(df) >= min_required:
@@ -142,6 +175,31 @@ class PriceFetcher:
             self.logger.error(f"Error fetching market data for {symbol} {interval}: {e}")
             return None
 
+    def _fill_tail_gap(self, symbol: str, interval: str, min_required: int) -> bool:
+        """Top up cached candles with the ones closed since the newest cached candle
+
+        Returns False when the cache is too short or too old to be worth topping up.
+        """
+        arrays = websocket_manager.restore_klines(symbol, interval)
+        interval_ms = interval_to_ms(interval)
+        if arrays is None or not interval_ms or len(arrays['timestamp']) < min_required:
+            return False
+
+        next_open = int(arrays['timestamp'][-1]) + interval_ms
+        now_ms = int(time.time() * 1000)
+        missing = (now_ms - next_open) // interval_ms  # Candles closed since the newest cached one
+        if missing <= 0:
+            return True
+        if missing >= min_required:
+            return False
+
+        rows = self.binance_client.get_klines_range(symbol, interval, next_open, now_ms, missing + 1)
+        if rows is None:
+            return False
+        websocket_manager.seed_klines(symbol, interval, rows)
+        self.logger.info(f"🧩 Topped up {symbol} {interval} with {len(rows)} candles")
+        return True
+
     def get_ohlcv_data(self, symbol: str, interval: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Get OHLCV data as DataFrame with enhanced accuracy"""
         try:
@@ -183,11 +241,11 @@ class PriceFetcher:
                         self.logger.info(f"⏳ Waiting for WebSocket connection... {wait_time}/{max_wait}s")
 
             # Try to get cached data with more flexible freshness requirements
-            cached_data = websocket_manager.get_cached_klines(symbol, interval, limit)
+            cached_df = self._get_websocket_dataframe(symbol, interval, limit)
 
-            if cached_data and len(cached_data) > 0:
-                self.logger.info(f"📡 Using WebSocket data for {symbol} {interval} ({len(cached_data)} klines)")
-                return self._convert_websocket_to_dataframe(cached_data)
+            if cached_df is not None:
+                self.logger.info(f"📡 Using WebSocket data for {symbol} {interval} ({len(cached_df)} klines)")
+                return cached_df
 
             # If WebSocket is connected but no data yet, wait for initial data
             if websocket_manager.is_connected:
@@ -201,10 +259,10 @@ class PriceFetcher:
                     time.sleep(2)  # Check every 2 seconds
                     data_wait += 2
 
-                    cached_data = websocket_manager.get_cached_klines(symbol, interval, limit)
-                    if cached_data and len(cached_data) > 0:
+                    cached_df = self._get_websocket_dataframe(symbol, interval, limit)
+                    if cached_df is not None:
                         self.logger.info(f"📡 Got initial WebSocket data for {symbol} {interval} after {data_wait}s")
-                        return self._convert_websocket_to_dataframe(cached_data)
+                        return cached_df
 
                     if data_wait % 10 == 0:  # Log every 10 seconds
                         self.logger.info(f"⏳ Waiting for WebSocket data... {data_wait}/{max_data_wait}s")
@@ -219,72 +277,75 @@ class PriceFetcher:
             self.logger.error(f"Error getting OHLCV data for {symbol}: {e}")
             return None
 
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate technical indicators with enhanced validation and error handling"""
+    def calculate_indicators(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                             interval: Optional[str] = None) -> pd.DataFrame:
+        """Calculate technical indicators with enhanced validation and error handling
+
+        With `symbol` and `interval`, results come from the shared indicator cache, so
+        strategies evaluating the same candle reuse one computation.
+        """
         try:
             df = df.copy()
+            close = df['close']
+
+            def cached(indicator: str, params: Dict, compute):
+                for column, values in indicator_cache.for_frame(symbol, interval, df, indicator, params,
+                                                                lambda: frozen_columns(compute())).items():
+                    df[column] = values
 
             if len(df) < 26:  # Need at least 26 for MACD
                 self.logger.warning("Insufficient data for accurate indicator calculation")
                 # Still calculate what we can with available data
-                if len(df) >= 14:
-                    # Calculate RSI with available data
-                    delta = df['close'].diff()
-                    gain = (delta.where(delta > 0, 0)).rolling(window=min(14, len(df)-1)).mean()
-                    loss = (-delta.where(delta < 0, 0)).rolling(window=min(14, len(df)-1)).mean()
-                    rs = gain / loss
-                    df['rsi'] = 100 - (100 / (1 + rs))
+                if len(df) >= 15:
+                    cached('rsi', {'period': 14}, lambda: {'rsi': rsi_series(close, 14)})
 
                 return df
 
-            # RSI (14-period) - Enhanced calculation
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-
-            # Avoid division by zero
-            rs = gain / loss.replace(0, 0.000001)
-            df['rsi'] = 100 - (100 / (1 + rs))
+            # RSI (14-period) - Wilder smoothing, same values as Binance
+            cached('rsi', {'period': 14}, lambda: {'rsi': rsi_series(close, 14)})
 
             # MACD (12, 26, 9) - Enhanced calculation
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-
-            df['macd'] = exp1 - exp2
-            df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-            df['macd_histogram'] = df['macd'] - df['macd_signal']
+            def macd():
+                line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+                signal = line.ewm(span=9, adjust=False).mean()
+                return {'macd': line, 'macd_signal': signal, 'macd_histogram': line - signal}
+            cached('macd', {'fast': 12, 'slow': 26, 'signal': 9}, macd)
 
             # Simple Moving Averages
             if len(df) >= 20:
-                df['sma_20'] = df['close'].rolling(window=20).mean()
+                cached('sma', {'window': 20}, lambda: {'sma_20': close.rolling(window=20).mean()})
             if len(df) >= 50:
-                df['sma_50'] = df['close'].rolling(window=50).mean()
+                cached('sma', {'window': 50}, lambda: {'sma_50': close.rolling(window=50).mean()})
 
             # Bollinger Bands (20-period)
             if len(df) >= 20:
-                sma20 = df['close'].rolling(window=20).mean()
-                std20 = df['close'].rolling(window=20).std()
-                df['bb_upper'] = sma20 + (std20 * 2)
-                df['bb_lower'] = sma20 - (std20 * 2)
-                df['bb_middle'] = sma20
+                def bollinger():
+                    sma20 = close.rolling(window=20).mean()
+                    std20 = close.rolling(window=20).std()
+                    return {'bb_upper': sma20 + (std20 * 2), 'bb_lower': sma20 - (std20 * 2), 'bb_middle': sma20}
+                cached('bollinger', {'window': 20, 'num_std': 2}, bollinger)
 
             # Candlestick patterns (requires at least 2 candles)
             if len(df) >= 2:
-                # Bullish Engulfing
-                df['bullish_engulfing'] = (
-                    (df['close'].shift(1) < df['open'].shift(1)) &  # Previous candle was bearish
-                    (df['close'] > df['open']) &  # Current candle is bullish
-                    (df['open'] < df['close'].shift(1)) &  # Current open below previous close
-                    (df['close'] > df['open'].shift(1))  # Current close above previous open
-                )
-
-                # Bearish Engulfing
-                df['bearish_engulfing'] = (
-                    (df['close'].shift(1) > df['open'].shift(1)) &  # Previous candle was bullish
-                    (df['close'] < df['open']) &  # Current candle is bearish
-                    (df['open'] > df['close'].shift(1)) &  # Current open above previous close
-                    (df['close'] < df['open'].shift(1))  # Current close below previous open
-                )
+                def engulfing():
+                    open_, prev_open, prev_close = df['open'], df['open'].shift(1), close.shift(1)
+                    return {
+                        # Bullish Engulfing
+                        'bullish_engulfing': (
+                            (prev_close < prev_open) &  # Previous candle was bearish
+                            (close > open_) &  # Current candle is bullish
+                            (open_ < prev_close) &  # Current open below previous close
+                            (close > prev_open)  # Current close above previous open
+                        ),
+                        # Bearish Engulfing
+                        'bearish_engulfing': (
+                            (prev_close > prev_open) &  # Previous candle was bullish
+                            (close < open_) &  # Current candle is bearish
+                            (open_ > prev_close) &  # Current open above previous close
+                            (close < prev_open)  # Current close below previous open
+                        )
+                    }
+                cached('engulfing', {}, engulfing)
 
             # Log successful indicator calculation
             indicators_calculated = []
@@ -309,72 +370,18 @@ class PriceFetcher:
         if len(prices) < period + 1:
             return pd.Series([None] * len(prices))
 
-        # Calculate price changes
-        deltas = pd.Series(prices).diff()
-
-        # Separate gains and losses
-        gains = deltas.where(deltas > 0, 0)
-        losses = -deltas.where(deltas < 0, 0)
-
-        # Calculate Wilder's smoothed moving averages (Binance uses this method)
-        avg_gains = gains.rolling(window=period, min_periods=period).mean()
-        avg_losses = losses.rolling(window=period, min_periods=period).mean()
-
-        # Apply Wilder's smoothing for subsequent periods
-        for i in range(period, len(gains)):
-            avg_gains.iloc[i] = (avg_gains.iloc[i-1] * (period - 1) + gains.iloc[i]) / period
-            avg_losses.iloc[i] = (avg_losses.iloc[i-1] * (period - 1) + losses.iloc[i]) / period
-
-        # Calculate RSI
-        rs = avg_gains / avg_losses
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
-
-    def _convert_websocket_to_dataframe(self, cached_data: List[Dict], limit: int = None) -> pd.DataFrame:
-        """Convert WebSocket data to DataFrame format"""
-        df_data = []
-        for kline in cached_data:
-            df_data.append([
-                kline['timestamp'], kline['open'], kline['high'], kline['low'],
-                kline['close'], kline['volume'], kline['close_time'],
-                0, 0, 0, 0, 0  # Placeholder values for additional columns
-            ])
-
-        df = pd.DataFrame(df_data, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'number_of_trades',
-            'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-        ])
-
-        # Apply timezone adjustment if configured (preserves all existing logic)
-        if self.use_local_timezone or self.timezone_offset_hours != 0:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df['timestamp'] = df['timestamp'].apply(lambda x: self._adjust_timestamp_for_timezone(int(x.timestamp() * 1000)))
-        else:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-
-        # Convert to proper data types with high precision
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Sort by timestamp to ensure proper order
-        df = df.sort_values(by='timestamp')
-
-        # Remove any duplicate timestamps
-        df = df.drop_duplicates(subset=['timestamp'], keep='last')
-
-        # Remove any rows with NaN values
-        df = df.dropna()
-
-        if df.empty:
-            self.logger.warning(f"DataFrame is empty after processing")
-            return None
-
-        df.set_index('timestamp', inplace=True)
-
-        # Return only requested amount if limit specified
-        if limit:
-            return df.tail(limit)
-        return df
\ No newline at end of file
+        # Wilder's smoothing, vectorized (Binance uses this method)
+        return rsi_series(pd.Series(prices, dtype=float), period)
+
+    def _get_websocket_dataframe(self, symbol: str, interval: str, limit: int,
+                                 include_forming: bool = True, copy: bool = False) -> Optional[pd.DataFrame]:
+        """DataFrame of the last `limit` closed candles (plus the forming one), backed by the kline cache
+
+        With `copy` the frame is a snapshot instead, for use on evaluation workers.
+        Candles are already unique and ordered in the ring buffer, so no sort/dedup pass is
+        needed and the timezone shift is a single vectorized offset on the index.
+        """
+        return websocket_manager.get_kline_dataframe(
+            symbol, interval, limit, include_forming=include_forming,
+            time_offset_ms=self._timezone_offset_ms(), copy=copy
+        )
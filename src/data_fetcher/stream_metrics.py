@@ -0,0 +1,172 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram - O(1) memory, O(log buckets) per sample"""
+
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms', 'min_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.min_ms = None
+
+    def add(self, value_ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+        if self.min_ms is None or value_ms < self.min_ms:
+            self.min_ms = value_ms
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile (q in 0..100)"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': self.total_ms / self.count if self.count else None,
+            'min_ms': self.min_ms,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms if self.count else None,
+            'buckets': {
+                (f"<={bound}" if index < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}"): bucket_count
+                for index, (bound, bucket_count) in enumerate(
+                    zip(LATENCY_BUCKETS_MS + (None,), self.counts)) if bucket_count
+            }
+        }
+
+
+class _StreamCounters:
+    """Metrics for one stream"""
+
+    __slots__ = ('messages', 'event_lag', 'decode', 'handle', 'last_message_at',
+                 'window_start', 'window_messages', 'messages_per_second')
+
+    def __init__(self, now: float):
+        self.messages = 0
+        self.event_lag = LatencyHistogram()  # Exchange event time -> receive
+        self.decode = LatencyHistogram()  # JSON decode
+        self.handle = LatencyHistogram()  # Our processing after decode
+        self.last_message_at = None  # time.monotonic()
+        self.window_start = now
+        self.window_messages = 0
+        self.messages_per_second = 0.0
+
+
+class StreamMetrics:
+    """Per-stream feed lag, decode/processing time, throughput and candle age
+
+    Exchange lag compares the payload's `E` (exchange event time, epoch ms) to
+    the local wall clock, so it includes any clock offset to Binance. All ages
+    use `time.monotonic()` and are unaffected by wall-clock adjustments.
+    Message rates are computed over tumbling windows of `rate_window` seconds.
+    """
+
+    def __init__(self, rate_window: float = 10.0):
+        self.rate_window = rate_window
+        self._streams: Dict[str, _StreamCounters] = {}
+        self._last_close: Dict[str, float] = {}  # "SYMBOL interval" -> monotonic time of last close
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+
+    def record_message(self, stream: str, event_time_ms: Optional[int], decode_seconds: float,
+                       handle_seconds: float, received_wall: Optional[float] = None):
+        """Record one frame; `received_wall` is time.time() at receipt"""
+        now = time.monotonic()
+        counters = self._streams.get(stream)
+        if counters is None:
+            with self._lock:
+                counters = self._streams.setdefault(stream, _StreamCounters(now))
+
+        counters.messages += 1
+        counters.last_message_at = now
+        counters.window_messages += 1
+        elapsed = now - counters.window_start
+        if elapsed >= self.rate_window:
+            counters.messages_per_second = counters.window_messages / elapsed
+            counters.window_start = now
+            counters.window_messages = 0
+
+        if event_time_ms:
+            wall = received_wall if received_wall is not None else time.time()
+            counters.event_lag.add(max(0.0, wall * 1000 - event_time_ms))
+        counters.decode.add(decode_seconds * 1000)
+        counters.handle.add(handle_seconds * 1000)
+
+    def record_close(self, symbol: str, interval: str):
+        self._last_close[f"{symbol} {interval}"] = time.monotonic()
+
+    def last_close_age(self, symbol: str, interval: str) -> Optional[float]:
+        """Seconds since the last closed candle for a stream was received"""
+        closed_at = self._last_close.get(f"{symbol} {interval}")
+        return time.monotonic() - closed_at if closed_at is not None else None
+
+    def last_message_age(self) -> Optional[float]:
+        latest = max((c.last_message_at for c in list(self._streams.values()) if c.last_message_at), default=None)
+        return time.monotonic() - latest if latest is not None else None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            streams = dict(self._streams)
+
+        per_stream = {}
+        total_lag, total_decode, total_handle = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        total_rate = 0.0
+        for stream, counters in streams.items():
+            # A stream that went quiet keeps its old rate until the next message - report the live window instead
+            window = now - counters.window_start
+            rate = counters.messages_per_second
+            if window >= self.rate_window:
+                rate = counters.window_messages / window
+            total_rate += rate
+            per_stream[stream] = {
+                'messages': counters.messages,
+                'messages_per_second': rate,
+                'last_message_age_seconds': now - counters.last_message_at if counters.last_message_at else None,
+                'event_lag': counters.event_lag.summary(),
+                'decode': counters.decode.summary(),
+                'handle': counters.handle.summary()
+            }
+            for total, histogram in ((total_lag, counters.event_lag), (total_decode, counters.decode),
+                                     (total_handle, counters.handle)):
+                _merge(total, histogram)
+
+        return {
+            'streams': per_stream,
+            'messages_per_second': total_rate,
+            'event_lag': total_lag.summary(),
+            'decode': total_decode.summary(),
+            'handle': total_handle.summary(),
+            'last_close_age_seconds': {key: now - closed_at for key, closed_at in list(self._last_close.items())}
+        }
+
+
+def _merge(target: LatencyHistogram, source: LatencyHistogram):
+    for index, bucket_count in enumerate(source.counts):
+        target.counts[index] += bucket_count
+    target.count += source.count
+    target.total_ms += source.total_ms
+    target.max_ms = max(target.max_ms, source.max_ms)
+    if source.min_ms is not None and (target.min_ms is None or source.min_ms < target.min_ms):
+        target.min_ms = source.min_ms
@@ -0,0 +1,108 @@
+import gzip
+import logging
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+
+class StreamRecorder:
+    """Appends raw WebSocket frames with their receive time to a gzip log
+
+    One line per frame: `<received_at>\\t<raw frame>`. Each recording session
+    is appended as a separate gzip member, so a log can be extended across
+    restarts and read back as a single stream. The compressor is flushed every
+    `flush_interval` seconds; a crash loses at most that much data.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.frames_written = 0
+
+        self._file = gzip.open(self.path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, frame, received_at: Optional[float] = None):
+        if isinstance(frame, bytes):
+            frame = frame.decode('utf-8')
+        line = f"{received_at if received_at is not None else time.time():.6f}\t{frame}\n"
+
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self.frames_written += 1
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = now
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.logger.info(f"💾 Recorded {self.frames_written} frames to {self.path}")
+
+
+class StreamReplayer:
+    """Plays a recorded frame log back into a message handler
+
+    `speed` is the playback rate relative to the recording (1.0 = real time,
+    10.0 = ten times faster); `None` or 0 replays as fast as possible.
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+
+    def frames(self) -> Iterator[Tuple[float, str]]:
+        """(received_at, raw frame) pairs in recording order"""
+        with gzip.open(self.path, 'rt', encoding='utf-8') as log:
+            try:
+                for line in log:
+                    received_at, _, frame = line.rstrip('\n').partition('\t')
+                    if frame:
+                        yield float(received_at), frame
+            except (EOFError, zlib.error):
+                # Log cut off mid-write (crash or still recording) - replay what is complete
+                self.logger.warning(f"⚠️ {self.path} ends with a truncated block")
+
+    def replay(self, on_message: Callable[[str], None], speed: Optional[float] = None) -> Dict[str, float]:
+        """Feed every frame to `on_message` and return throughput statistics"""
+        frames = 0
+        first_received = None
+        started = time.perf_counter()
+        busy = 0.0
+
+        for received_at, frame in self.frames():
+            if first_received is None:
+                first_received = received_at
+            if speed:
+                due = started + (received_at - first_received) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            handle_start = time.perf_counter()
+            on_message(frame)
+            busy += time.perf_counter() - handle_start
+            frames += 1
+
+        elapsed = time.perf_counter() - started
+        return {
+            'frames': frames,
+            'elapsed_seconds': elapsed,
+            'handler_seconds': busy,
+            'frames_per_second': frames / busy if busy > 0 else 0.0,
+            'recorded_seconds': (received_at - first_received) if frames else 0.0
+        }
+
+    def replay_into(self, manager, speed: Optional[float] = None) -> Dict[str, float]:
+        """Replay through `WebSocketKlineManager._on_message` as if frames came off a shard"""
+        return self.replay(lambda frame: manager._on_message(None, frame), speed)
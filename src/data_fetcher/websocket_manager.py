@@ -3,30 +3,49 @@ import json
 import logging
 import threading
 import time
-from websocket import WebSocketApp
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Callable
-from collections import defaultdict, deque
-import ssl
+from collections import defaultdict
+from src.config.global_config import global_config
+from src.data_fetcher.callback_dispatcher import DROP_OLDEST, CallbackDispatcher
+from src.data_fetcher.candle_aggregator import CandleAggregator, base_interval_for, is_aggregatable
+from src.data_fetcher.fast_json import get_decoder, kline_values, rest_klines_to_array
+from src.data_fetcher.gap_backfill import KlineGapBackfiller
+from src.data_fetcher.kline_buffer import KlineRingBuffer, interval_to_ms
+from src.data_fetcher.stream_metrics import StreamMetrics
+from src.data_fetcher.stream_recorder import StreamRecorder
+from src.data_fetcher.websocket_shard import StreamShard
 
 class WebSocketKlineManager:
-    """Persistent WebSocket manager for live kline data caching"""
+    """Persistent WebSocket manager for live kline data caching
+
+    Streams are sharded across several combined-stream connections that all run
+    on one asyncio event loop in a background thread. Each shard reconnects on
+    its own, so a single bad socket only affects the streams it carries.
+
+    Only the lowest timeframe needed for a symbol is streamed; higher
+    timeframes requested for the same symbol are aggregated locally from it
+    and served from the same cache.
+    """
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
         # WebSocket configuration
-        self.base_url = "wss://fstream.binance.com/ws/"
-        self.ws = None
-        self.ws_thread = None
-        self.is_connected = False
+        self.base_url = "wss://fstream.binance.com/stream?streams="
+        self.max_streams_per_shard = 200  # Binance USD-M per-connection stream limit
+        self.shards: List[StreamShard] = []
+        self.loop = None
+        self.loop_thread = None
         self.is_running = False
 
         # Data storage - organized by symbol and interval
-        self.kline_cache = defaultdict(lambda: defaultdict(lambda: deque(maxlen=1000)))
-        self.latest_klines = defaultdict(dict)  # symbol -> interval -> latest_kline
-        self.last_updates = defaultdict(dict)   # symbol -> interval -> timestamp
+        self.cache_capacity = 1000  # Closed candles kept per stream
+        self.kline_cache = defaultdict(dict)  # symbol -> interval -> KlineRingBuffer
+        self.last_updates = defaultdict(dict)   # symbol -> interval -> time.monotonic() of last update
+        self.kline_store = None  # Optional KlineStore - closed candles survive restarts
 
         # Subscriptions management
         self.subscribed_streams = set()
@@ -34,24 +53,40 @@ class WebSocketKlineManager:
         self.symbols = set()
         self.intervals = set()
 
-        # Connection health monitoring
-        self.last_ping = time.time()
-        self.ping_interval = 30  # seconds (unused - ping disabled)
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 20  # Increased attempts
-        self.connection_recovery_mode = True
+        # Multi-timeframe aggregation - one base stream per symbol
+        self.aggregate_timeframes = True
+        self.requested_intervals = defaultdict(set)  # symbol -> intervals consumers asked for
+        self.stream_intervals = defaultdict(set)  # symbol -> intervals actually streamed
+        self.aggregators: Dict[str, CandleAggregator] = {}
 
-        # Callbacks for real-time data updates
+        # Callbacks for real-time data updates - run on a worker pool, never on the socket thread
         self.update_callbacks = []
+        self.dispatcher = CallbackDispatcher(workers=2)
+        self.history_callbacks: List[Callable] = []  # (symbol, interval) after out-of-band candles are merged
+        self.stream_handlers: Dict[str, Callable] = {}  # non-kline stream -> payload handler
+        self.recorder = None  # Optional StreamRecorder capturing raw frames for replay
+
+        # Continuity tracking - candles skipped while a shard was down are refetched over REST
+        self.backfiller = KlineGapBackfiller(self._merge_backfill)
+        self.gap_stats = defaultdict(dict)  # symbol -> interval -> gap counters
 
         # Statistics
         self.stats = {
             'messages_received': 0,
             'klines_processed': 0,
             'connection_uptime': 0,
-            'last_message_time': None,
-            'reconnections': 0
+            'reconnections': 0,
+            'gaps_detected': 0,
+            'candles_missing': 0
         }
+        self.last_message_at = None  # time.monotonic() of the last frame
+        self.metrics = StreamMetrics()  # Per-stream lag / decode / throughput
+        self.json_decoder = get_decoder(global_config.JSON_DECODER)  # orjson when installed
+
+    @property
+    def is_connected(self) -> bool:
+        """True while at least one shard has a live connection"""
+        return any(shard.is_connected for shard in self.shards)
 
     def add_symbol_interval(self, symbol: str, interval: str):
         """Add a symbol/interval pair for WebSocket streaming"""
@@ -60,42 +95,90 @@ class WebSocketKlineManager:
         self.subscribed_symbols.add(symbol)  # Update subscribed_symbols
         self.intervals.add(interval)
 
-        stream_name = f"{symbol.lower()}@kline_{interval}"
-        if stream_name not in self.subscribed_streams:
-            self.subscribed_streams.add(stream_name)
-            self.logger.info(f"📡 Added WebSocket stream: {stream_name}")
+        if interval not in self.requested_intervals[symbol]:
+            self.requested_intervals[symbol].add(interval)
 
             # Initialize cache structure
-            if symbol not in self.kline_cache:
-                self.kline_cache[symbol] = defaultdict(lambda: deque(maxlen=1000))
-            if interval not in self.kline_cache[symbol]:
-                self.kline_cache[symbol][interval] = deque(maxlen=1000)
-
-            # If already connected, update subscription
-            if self.is_connected and self.ws:
-                self._update_subscription()
+            self._get_buffer(symbol, interval)
+            self._update_symbol_streams(symbol)
 
     def remove_symbol_interval(self, symbol: str, interval: str):
         """Remove a symbol/interval pair from WebSocket streaming"""
         symbol = symbol.upper()
-        stream_name = f"{symbol.lower()}@kline_{interval}"
 
+        if interval in self.requested_intervals.get(symbol, ()):
+            self.requested_intervals[symbol].discard(interval)
+            self._update_symbol_streams(symbol)
+
+            # Clean up cache for intervals that are neither requested nor feeding an aggregate
+            keep = self.requested_intervals[symbol] | self.stream_intervals[symbol]
+            for cached in list(self.kline_cache.get(symbol, {})):
+                if cached not in keep:
+                    del self.kline_cache[symbol][cached]
+            if symbol in self.kline_cache and not self.kline_cache[symbol]:
+                del self.kline_cache[symbol]
+
+    def _update_symbol_streams(self, symbol: str):
+        """Stream the lowest needed timeframe of a symbol and aggregate the others from it"""
+        requested = self.requested_intervals[symbol]
+        base = base_interval_for(requested) if self.aggregate_timeframes else None
+
+        if base is None:
+            streamed = set(requested)
+            targets = set()
+        else:
+            streamed = {interval for interval in requested if not is_aggregatable(interval)} | {base}
+            targets = {interval for interval in requested if is_aggregatable(interval)} - {base}
+
+        aggregator = self.aggregators.get(symbol)
+        if not targets:
+            self.aggregators.pop(symbol, None)
+        elif aggregator is None or aggregator.base_interval != base:
+            self.aggregators[symbol] = CandleAggregator(base, targets)
+            self.logger.info(f"🧮 {symbol}: aggregating {sorted(targets)} from {base}")
+        else:
+            for interval in set(aggregator.targets) - targets:
+                aggregator.remove_target(interval)
+            for interval in targets - set(aggregator.targets):
+                aggregator.add_target(interval)
+
+        previous = self.stream_intervals[symbol]
+        self.stream_intervals[symbol] = streamed
+        for interval in sorted(streamed - previous):
+            self._get_buffer(symbol, interval)
+            self._subscribe_stream(f"{symbol.lower()}@kline_{interval}")
+        for interval in sorted(previous - streamed):
+            self._unsubscribe_stream(f"{symbol.lower()}@kline_{interval}")
+
+    def add_stream(self, stream_name: str, handler: Callable[[Dict[str, Any]], None]):
+        """Subscribe a non-kline stream (e.g. `btcusdt@markPrice@1s`) and route its payloads to `handler`"""
+        self.stream_handlers[stream_name] = handler
+        self._subscribe_stream(stream_name)
+
+    def remove_stream(self, stream_name: str):
+        self.stream_handlers.pop(stream_name, None)
+        self._unsubscribe_stream(stream_name)
+
+    def _subscribe_stream(self, stream_name: str):
+        if stream_name not in self.subscribed_streams:
+            self.subscribed_streams.add(stream_name)
+            self.logger.info(f"📡 Added WebSocket stream: {stream_name}")
+
+            # If already running, place the stream on a shard
+            if self.is_running:
+                self._run_on_loop(self._add_stream_to_shard(stream_name))
+
+    def _unsubscribe_stream(self, stream_name: str):
         if stream_name in self.subscribed_streams:
             self.subscribed_streams.remove(stream_name)
             self.logger.info(f"📡 Removed WebSocket stream: {stream_name}")
 
-            # Clean up cache
-            if symbol in self.kline_cache and interval in self.kline_cache[symbol]:
-                del self.kline_cache[symbol][interval]
-                if not self.kline_cache[symbol]:
-                    del self.kline_cache[symbol]
-
-            # Update subscription if connected
-            if self.is_connected and self.ws:
-                self._update_subscription()
+            # Update the shard carrying the stream if running
+            if self.is_running:
+                self._run_on_loop(self._remove_stream_from_shard(stream_name))
 
     def start(self):
-        """Start the WebSocket connection in a background thread"""
+        """Start the sharded WebSocket connections on a background event loop"""
         if self.is_running:
             self.logger.warning("WebSocket manager is already running")
             return
@@ -105,150 +188,126 @@ class WebSocketKlineManager:
             return
 
         self.is_running = True
-        self.ws_thread = threading.Thread(target=self._run_websocket, daemon=True)
-        self.ws_thread.start()
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.loop_thread.start()
+
+        self._run_on_loop(self._start_shards())
 
         self.logger.info(f"🚀 WebSocket manager started with {len(self.subscribed_streams)} streams")
 
     def stop(self):
-        """Stop the WebSocket connection"""
+        """Stop all shard connections and the event loop"""
         self.is_running = False
 
-        if self.ws:
+        if self.loop and self.loop.is_running():
+            future = self._run_on_loop(self._stop_shards())
             try:
-                self.ws.close()
+                future.result(timeout=10.0)
             except Exception as e:
-                self.logger.error(f"Error closing WebSocket: {e}")
+                self.logger.error(f"Error closing WebSocket shards: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
 
-        if self.ws_thread and self.ws_thread.is_alive():
-            self.ws_thread.join(timeout=5.0)
+        if self.loop_thread and self.loop_thread.is_alive():
+            self.loop_thread.join(timeout=5.0)
 
-        self.is_connected = False
+        self.shards = []
         self.logger.info("🛑 WebSocket manager stopped")
 
-    def _run_websocket(self):
-        """Main WebSocket connection loop"""
-        while self.is_running:
-            try:
-                self._connect_websocket()
-
-                # Keep connection alive without ping monitoring
-                while self.is_running and self.is_connected:
-                    time.sleep(5)  # Longer sleep since no ping needed
-
-                    # Update ping timestamp to prevent timeout logic
-                    if self.is_connected:
-                        self.last_ping = time.time()
-
-            except Exception as e:
-                self.logger.error(f"WebSocket connection error: {e}")
-                self.is_connected = False
-
-                if self.is_running:
-                    self.reconnect_attempts += 1
-                    if self.reconnect_attempts < self.max_reconnect_attempts:
-                        wait_time = min(30, 2 ** self.reconnect_attempts)
-                        self.logger.info(f"🔄 Reconnecting in {wait_time}s (attempt {self.reconnect_attempts})")
-                        time.sleep(wait_time)
-                    else:
-                        self.logger.error("❌ Max reconnection attempts reached. Stopping.")
-                        break
-
-    def _connect_websocket(self):
-        """Establish WebSocket connection with deployment-optimized settings"""
+    def _run_loop(self):
+        """Event loop thread body"""
+        asyncio.set_event_loop(self.loop)
         try:
-            # Use proper Binance Futures WebSocket URL format
-            if len(self.subscribed_streams) == 1:
-                # Single stream - direct connection
-                stream = list(self.subscribed_streams)[0]
-                url = f"wss://fstream.binance.com/ws/{stream}"
-            else:
-                # Multiple streams - use proper Binance Futures combined stream format
-                streams_list = list(sorted(self.subscribed_streams))
-                # Binance Futures uses different combined stream format
-                combined_params = "/".join(streams_list)
-                url = f"wss://fstream.binance.com/ws/{combined_params}"
-
-            self.logger.info(f"🔗 Connecting to WebSocket: {url}")
-            self.logger.info(f"📡 Streams: {list(self.subscribed_streams)}")
-
-            # Create WebSocket connection with production-ready settings
-            self.ws = WebSocketApp(
-                url,
-                on_open=self._on_open,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-                header={
-                    "User-Agent": "python-binance-websocket/1.0",
-                    "Origin": "https://www.binance.com",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Cache-Control": "no-cache",
-                    "Pragma": "no-cache"
-                }
-            )
-
-            # Enhanced deployment-ready WebSocket settings
-            self.ws.run_forever(
-                sslopt={
-                    "cert_reqs": ssl.CERT_NONE,
-                    "check_hostname": False,
-                    "ssl_version": ssl.PROTOCOL_TLS,
-                    "ciphers": "HIGH:!aNULL:!eNULL:!EXPORT:!DES:!RC4:!MD5:!PSK:!SRP:!CAMELLIA"
-                },
-                ping_interval=None,  # Disable automatic ping to prevent socket errors
-                ping_timeout=None,   # Disable ping timeout 
-                suppress_origin=False,
-                origin="https://www.binance.com",
-                skip_utf8_validation=True,  # Skip validation for better performance
-                sockopt=[(
-                    __import__('socket').SOL_SOCKET,
-                    __import__('socket').SO_KEEPALIVE,
-                    1
-                )]  # Enable socket keepalive for deployment
-            )
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def _run_on_loop(self, coro):
+        """Schedule a coroutine on the manager's event loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _new_shard(self, streams) -> StreamShard:
+        shard = StreamShard(
+            shard_id=len(self.shards),
+            streams=streams,
+            base_url=self.base_url,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_open=self._on_open
+        )
+        self.shards.append(shard)
+        self.loop.create_task(shard.run())
+        return shard
+
+    async def _start_shards(self):
+        """Split the subscribed streams into shards under the per-connection limit"""
+        streams = sorted(self.subscribed_streams)
+        for i in range(0, len(streams), self.max_streams_per_shard):
+            self._new_shard(streams[i:i + self.max_streams_per_shard])
+        self.logger.info(f"📡 {len(streams)} streams across {len(self.shards)} shards")
+
+    async def _stop_shards(self):
+        for shard in self.shards:
+            await shard.stop()
+
+    async def _add_stream_to_shard(self, stream_name: str):
+        """Subscribe a new stream on the first shard with spare capacity (or a new shard)
+
+        Running shards receive a live SUBSCRIBE, so streams already flowing are untouched.
+        """
+        for shard in self.shards:
+            if stream_name in shard.streams:
+                return
+        for shard in self.shards:
+            if len(shard.streams) < self.max_streams_per_shard:
+                shard.subscribe([stream_name])
+                return
+        self._new_shard([stream_name])
 
-        except Exception as e:
-            self.logger.error(f"Failed to connect WebSocket: {e}")
-            import traceback
-            self.logger.error(f"Full traceback: {traceback.format_exc()}")
-            time.sleep(2)  # Shorter delay for faster recovery
-
-    def _on_open(self, ws):
-        """WebSocket connection opened with verification"""
-        self.is_connected = True
-        self.reconnect_attempts = 0
-        self.last_ping = time.time()
-        self.stats['connection_uptime'] = time.time()
-        self.stats['reconnections'] += 1
+    async def _remove_stream_from_shard(self, stream_name: str):
+        for shard in self.shards:
+            if stream_name in shard.streams:
+                shard.unsubscribe([stream_name])
+                return
 
-        self.logger.info(f"✅ WebSocket Connected Successfully!")
-        self.logger.info(f"📡 Active Streams: {len(self.subscribed_streams)}")
-        for stream in self.subscribed_streams:
-            self.logger.info(f"   🔗 {stream}")
+    def get_shard_health(self) -> List[Dict[str, Any]]:
+        """Per-shard connection health"""
+        return [shard.get_health() for shard in self.shards]
 
-        # Send a test ping to verify bidirectional communication
-        try:
-            self._send_ping()
-            self.logger.info("📤 Test ping sent to verify connection")
-        except Exception as e:
-            self.logger.warning(f"⚠️ Could not send test ping: {e}")
+    def start_recording(self, path: str):
+        """Append every raw market-data frame to a gzip log that StreamReplayer can play back"""
+        self.stop_recording()
+        self.recorder = StreamRecorder(path)
+        self.logger.info(f"⏺️ Recording WebSocket frames to {path}")
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
 
     def _on_message(self, ws, message):
         """Process incoming WebSocket message with improved format handling"""
+        if self.recorder is not None and ws is not None:
+            self.recorder.record(message)
         try:
-            data = json.loads(message)
+            decode_start = time.perf_counter()
+            data = self.json_decoder.loads(message)
+            decoded_at = time.perf_counter()
             self.stats['messages_received'] += 1
-            self.stats['last_message_time'] = datetime.now()
+            self.last_message_at = time.monotonic()
+            stream_name, event_time = None, None
 
             # Handle different message formats from Binance WebSocket
             if 'stream' in data and 'data' in data:
                 # Combined stream format: {"stream": "btcusdt@kline_1m", "data": {...}}
                 stream_name = data['stream']
                 message_data = data['data']
+                event_time = message_data.get('E')
 
-                if 'k' in message_data:  # Kline data
+                handler = self.stream_handlers.get(stream_name)
+                if handler is not None:
+                    handler(message_data)
+                elif 'k' in message_data:  # Kline data
                     self._process_kline_data(stream_name, message_data['k'])
                     self.logger.debug(f"📊 Combined stream kline: {stream_name}")
                 elif 'e' in message_data and message_data['e'] == 'kline':
@@ -261,6 +320,7 @@ class WebSocketKlineManager:
                 symbol = data['s'].lower()
                 interval = data['k']['i']
                 stream_name = f"{symbol}@kline_{interval}"
+                event_time = data.get('E')
                 self._process_kline_data(stream_name, data['k'])
                 self.logger.debug(f"📊 Direct kline: {stream_name}")
 
@@ -277,6 +337,11 @@ class WebSocketKlineManager:
                 if self.stats['messages_received'] % 100 == 1:  # Log every 100th unknown message
                     self.logger.debug(f"🔍 Unknown message format: {list(data.keys())[:5]}")
 
+            if stream_name is not None:
+                finished = time.perf_counter()
+                self.metrics.record_message(stream_name, event_time, decoded_at - decode_start,
+                                            finished - decoded_at)
+
         except json.JSONDecodeError as e:
             self.logger.error(f"JSON decode error: {e}")
             self.logger.debug(f"Raw message: {message[:200]}...")
@@ -286,12 +351,17 @@ class WebSocketKlineManager:
             import traceback
             self.logger.debug(f"Traceback: {traceback.format_exc()}")
 
-    def _on_error(self, ws, error):
-        """WebSocket error handler with comprehensive error analysis"""
+    def _on_open(self, shard: StreamShard):
+        """Shard connection opened"""
+        self.stats['connection_uptime'] = time.time()
+        self.stats['reconnections'] += 1
+        self.logger.info(f"✅ WebSocket shard {shard.shard_id} connected | Streams: {len(shard.streams)}")
+
+    def _on_error(self, shard: StreamShard, error: Exception):
+        """Shard error handler with error categorization"""
         error_str = str(error)
 
-        # Log the raw error for debugging
-        self.logger.error(f"🚫 WebSocket Error: {error}")
+        self.logger.error(f"🚫 WebSocket Error (shard {shard.shard_id}): {type(error).__name__}: {error}")
 
         # Categorize error types for better debugging
         if "403" in error_str or "Forbidden" in error_str:
@@ -300,104 +370,85 @@ class WebSocketKlineManager:
             self.logger.error("⚠️ Rate Limit - Will retry with backoff")
         elif "timeout" in error_str.lower() or "timed out" in error_str.lower():
             self.logger.error("⏱️ Connection Timeout - Network or server issue")
-        elif "connection" in error_str.lower():
-            self.logger.error("🔌 Connection Issue - Will retry connection")
         elif "ssl" in error_str.lower() or "certificate" in error_str.lower():
             self.logger.error("🔒 SSL/TLS Issue - Certificate or encryption problem")
-        elif "websocket" in error_str.lower():
-            self.logger.error("📡 WebSocket Protocol Issue")
-        else:
-            self.logger.error("❓ Unknown Error Type")
-
-        # Add detailed error info for debugging
-        self.logger.error(f"🔍 Error details: {type(error).__name__}: {error}")
-
-        # Import traceback for full error context in deployment
-        import traceback
-        self.logger.error(f"🔍 Full traceback: {traceback.format_exc()}")
-
-        self.is_connected = False
-
-    def _on_close(self, ws, close_status_code, close_msg):
-        """WebSocket connection closed with enhanced auto-reconnect"""
-        self.is_connected = False
-
-        # Handle normal closure vs error closure
-        if close_status_code in [1000, 1001]:  # Normal closure codes
-            self.logger.info(f"WebSocket closed normally: {close_status_code}")
-        else:
-            self.logger.warning(f"WebSocket closed: {close_status_code} - {close_msg}")
+        elif "connection" in error_str.lower():
+            self.logger.error("🔌 Connection Issue - Will retry connection")
+        # Cached data is preserved while the shard reconnects
 
-        # PRESERVE EXISTING CACHE DATA during reconnection
-        cache_sizes = {}
-        for symbol in self.kline_cache:
-            cache_sizes[symbol] = {}
-            for interval in self.kline_cache[symbol]:
-                cache_sizes[symbol][interval] = len(self.kline_cache[symbol][interval])
-        
-        if cache_sizes:
-            self.logger.info(f"📊 Preserving cached data during reconnection: {cache_sizes}")
-
-        # Immediate reconnect if we're supposed to be running
-        if self.is_running and self.connection_recovery_mode:
-            self.logger.info("🔄 Enhanced WebSocket reconnection...")
-            # Start reconnection immediately in a separate thread with higher priority
-            import threading
-            reconnect_thread = threading.Thread(target=self._enhanced_reconnect, daemon=True)
-            reconnect_thread.priority = 10  # Higher priority thread
-            reconnect_thread.start()
-
-    def _enhanced_reconnect(self):
-        """Enhanced reconnection with validation test support"""
-        max_immediate_attempts = 5  # Increased attempts for validation tests
-        for attempt in range(max_immediate_attempts):
-            if not self.is_running:
-                break
-                
+    def _immediate_reconnect(self):
+        """Cut the backoff wait short for any disconnected shard (non-blocking)"""
+        if not self.loop or not self.loop.is_running():
+            return
+        for shard in self.shards:
+            if not shard.is_connected:
+                self.loop.call_soon_threadsafe(shard.wake)
+
+    def _get_buffer(self, symbol: str, interval: str) -> KlineRingBuffer:
+        """Get (or lazily create) the ring buffer for a symbol/interval stream"""
+        buffer = self.kline_cache[symbol].get(interval)
+        if buffer is None:
+            buffer = KlineRingBuffer(self.cache_capacity, interval_ms=interval_to_ms(interval))
+            self._restore_from_store(symbol, interval, buffer)
+            self.kline_cache[symbol][interval] = buffer
+        return buffer
+
+    def set_kline_store(self, kline_store):
+        """Persist closed candles to `kline_store` and warm the cache from it"""
+        self.kline_store = kline_store
+        for symbol, intervals in list(self.kline_cache.items()):
+            for interval, buffer in list(intervals.items()):
+                self._call_on_loop(self._restore_from_store, symbol, interval, buffer)
+
+    def _restore_from_store(self, symbol: str, interval: str, buffer: KlineRingBuffer):
+        if self.kline_store is None:
+            return
+        rows = self.kline_store.load(symbol, interval, self.cache_capacity)
+        if len(rows):
+            buffer.merge_closed(rows)
+            self.logger.info(f"💾 Restored {len(rows)} {symbol} {interval} candles from disk")
+            self._notify_history(symbol, interval)
+
+    def _persist_closed(self, symbol: str, interval: str, open_time: int, close_time: int,
+                        open_: float, high: float, low: float, close: float, volume: float):
+        try:
+            self.kline_store.append(symbol, interval, open_time, close_time, open_, high, low, close, volume)
+        except OSError as e:
+            self.logger.error(f"❌ Could not persist {symbol} {interval} candle: {e}")
+
+    def _merge_rows(self, symbol: str, interval: str, buffer: KlineRingBuffer, rows) -> int:
+        """Merge out-of-band closed candles into a buffer and persist the ones it did not have"""
+        rows = np.asarray(rows)
+        if len(rows) == 0:
+            return 0
+        rows = rows[:, :7].astype(np.float64)
+        new_rows = rows[~np.isin(rows[:, 0].astype(np.int64), buffer.view()['timestamp'])]
+        added = buffer.merge_closed(rows)
+        if self.kline_store is not None and len(new_rows):
+            try:
+                self.kline_store.append_rows(symbol, interval, new_rows)
+            except OSError as e:
+                self.logger.error(f"❌ Could not persist {symbol} {interval} candles: {e}")
+        if added:
+            self._notify_history(symbol, interval)
+        return added
+
+    def _notify_history(self, symbol: str, interval: str):
+        """Tell history listeners that candles arrived outside the live stream (seed, backfill, restore)"""
+        for callback in self.history_callbacks:
             try:
-                self.logger.info(f"🔄 Enhanced reconnect attempt {attempt + 1}/{max_immediate_attempts}")
-                
-                # Close any existing connection first
-                if self.ws:
-                    try:
-                        self.ws.close()
-                    except:
-                        pass
-                    
-                self._connect_websocket()
-                
-                # Wait for stable connection
-                stable_wait = 0
-                while stable_wait < 10 and self.is_connected:
-                    time.sleep(0.5)
-                    stable_wait += 0.5
-                    
-                if self.is_connected:
-                    self.logger.info(f"✅ Enhanced reconnection successful after {stable_wait}s!")
-                    return
-                    
+                callback(symbol, interval)
             except Exception as e:
-                self.logger.error(f"Enhanced reconnect attempt {attempt + 1} failed: {e}")
-                time.sleep(2)  # Longer delay for stability
-        
-        # If enhanced reconnection fails, fall back to regular reconnection
-        self._attempt_reconnect()
+                self.logger.error(f"❌ History callback failed for {symbol} {interval}: {e}")
 
-    def _immediate_reconnect(self):
-        """Fallback to enhanced reconnect for compatibility"""
-        self._enhanced_reconnect()
+    def _call_on_loop(self, fn, *args):
+        """Run `fn` on the event loop thread (where stream ingest happens) and wait for it"""
+        if not self.loop or not self.loop.is_running() or threading.current_thread() is self.loop_thread:
+            return fn(*args)
 
-    def _attempt_reconnect(self):
-        """Attempt to reconnect WebSocket with backoff"""
-        if self.is_running and not self.is_connected:
-            try:
-                self.logger.info("🔄 Attempting WebSocket reconnection...")
-                self._connect_websocket()
-            except Exception as e:
-                self.logger.error(f"Reconnection failed: {e}")
-                if self.reconnect_attempts < self.max_reconnect_attempts:
-                    import threading
-                    threading.Timer(5.0, self._attempt_reconnect).start()
+        async def call():
+            return fn(*args)
+        return self._run_on_loop(call()).result(timeout=10.0)
 
     def _process_kline_data(self, stream_name: str, kline: Dict[str, Any]):
         """Process incoming kline data and update cache"""
@@ -416,38 +467,21 @@ class WebSocketKlineManager:
 
             self.logger.debug(f"🔍 Parsed: {symbol} {interval}")
 
-            # Create standardized kline data
-            processed_kline = {
-                'timestamp': int(kline['t']),
-                'open': float(kline['o']),
-                'high': float(kline['h']),
-                'low': float(kline['l']),
-                'close': float(kline['c']),
-                'volume': float(kline['v']),
-                'close_time': int(kline['T']),
-                'is_closed': kline['x'],  # True if this kline is closed
-                'received_at': time.time()
-            }
-
-            # Update cache
-            self.kline_cache[symbol][interval].append(processed_kline)
-            self.latest_klines[symbol][interval] = processed_kline
-            self.last_updates[symbol][interval] = datetime.now()
-
-            self.stats['klines_processed'] += 1
+            # Straight into the ring buffer - a dict is only built if a callback wants one
+            open_time, close_time, open_, high, low, close, volume, is_closed = kline_values(kline)
+            received_at = time.time()
 
-            self.logger.debug(f"✅ Kline processed: {symbol} {interval} @ ${processed_kline['close']:.4f} | Total processed: {self.stats['klines_processed']}")
-
-            # Log closed klines (completed candles)
-            if processed_kline['is_closed']:
-                self.logger.info(f"📊 Kline closed: {symbol} {interval} @ ${processed_kline['close']:.4f}")
+            if not self._ingest_values(symbol, interval, open_time, close_time, open_, high, low,
+                                       close, volume, is_closed, received_at):
+                return
 
-            # Notify callbacks
-            for callback in self.update_callbacks:
-                try:
-                    callback(symbol, interval, processed_kline)
-                except Exception as e:
-                    self.logger.error(f"Error in update callback: {e}")
+            # Feed higher timeframes built from this stream
+            aggregator = self.aggregators.get(symbol)
+            if aggregator is not None and aggregator.base_interval == interval:
+                for target, target_kline in aggregator.update(
+                    open_time, open_, high, low, close, volume, is_closed, received_at
+                ):
+                    self._ingest(symbol, target, target_kline)
 
         except Exception as e:
             self.logger.error(f"Error processing kline data for {stream_name}: {e}")
@@ -455,23 +489,99 @@ class WebSocketKlineManager:
             import traceback
             traceback.print_exc()
 
-    def _send_ping(self):
-        """Send ping to keep connection alive - disabled to prevent socket errors"""
-        try:
-            # Skip all ping operations to prevent NoneType socket errors
-            # Binance WebSocket maintains connection without manual pings
-            self.last_ping = time.time()
-            self.logger.debug("📤 Ping disabled - relying on server-side keepalive")
-        except Exception as e:
-            self.logger.debug(f"Ping operation skipped: {e}")
+    def _ingest(self, symbol: str, interval: str, processed_kline: Dict[str, Any]) -> bool:
+        """Apply an aggregated (or otherwise pre-built) kline dict to the cache"""
+        return self._ingest_values(
+            symbol, interval, processed_kline['timestamp'], processed_kline['close_time'],
+            processed_kline['open'], processed_kline['high'], processed_kline['low'],
+            processed_kline['close'], processed_kline['volume'],
+            processed_kline['is_closed'], processed_kline['received_at'], processed_kline
+        )
+
+    def _ingest_values(self, symbol: str, interval: str, open_time: int, close_time: int,
+                       open_: float, high: float, low: float, close: float, volume: float,
+                       is_closed: bool, received_at: float, processed_kline: Optional[Dict[str, Any]] = None) -> bool:
+        """Apply a kline to the cache and notify callbacks"""
+        # Update cache - the forming candle is updated in place, the buffer
+        # only advances once the exchange marks the candle as closed
+        buffer = self._get_buffer(symbol, interval)
+        expected_open = buffer.expected_next_open_time
+        if expected_open is not None and open_time > expected_open:
+            self._record_gap(symbol, interval, expected_open, open_time - buffer.interval_ms)
+        if not buffer.update(open_time, close_time, open_, high, low, close, volume, is_closed, received_at):
+            self.logger.debug(f"⏭️ Ignoring stale kline: {symbol} {interval} @ {open_time}")
+            return False
+        self.last_updates[symbol][interval] = time.monotonic()
+
+        self.stats['klines_processed'] += 1
+        if is_closed:
+            self.metrics.record_close(symbol, interval)
+            if self.kline_store is not None:
+                self._persist_closed(symbol, interval, open_time, close_time, open_, high, low, close, volume)
 
-    def _update_subscription(self):
-        """Update WebSocket subscription (for dynamic stream management)"""
-        # For now, we'll reconnect to update streams
-        # In production, you might want to use the subscription management API
-        if self.is_connected:
-            self.logger.info("🔄 Updating WebSocket subscription...")
-            self.ws.close()  # This will trigger reconnection with new streams
+            # Log closed klines (completed candles)
+            self.logger.info(f"📊 Kline closed: {symbol} {interval} @ ${close:.4f}")
+
+        # Notify callbacks off the receive path
+        if self.update_callbacks:
+            if processed_kline is None:
+                processed_kline = {
+                    'timestamp': open_time,
+                    'open': open_,
+                    'high': high,
+                    'low': low,
+                    'close': close,
+                    'volume': volume,
+                    'close_time': close_time,
+                    'is_closed': is_closed,  # True if this kline is closed
+                    'received_at': received_at
+                }
+            self.dispatcher.dispatch(symbol, interval, processed_kline)
+        return True
+
+    def set_backfill_client(self, binance_client):
+        """REST client used to refetch candles missed during a disconnect"""
+        self.backfiller.set_client(binance_client)
+
+    def _record_gap(self, symbol: str, interval: str, start_ms: int, end_ms: int):
+        """Count a hole in the closed-candle series and queue a REST backfill for it"""
+        gap = self.gap_stats[symbol].setdefault(interval, {'gaps': 0, 'candles_missing': 0, 'last_gap': None})
+        if gap['last_gap'] is not None and gap['last_gap'][0] <= start_ms and end_ms <= gap['last_gap'][1]:
+            return  # Forming ticks keep hitting a gap that is already being backfilled
+
+        missing = (end_ms - start_ms) // interval_to_ms(interval) + 1
+        self.stats['gaps_detected'] += 1
+        self.stats['candles_missing'] += missing
+
+        gap['gaps'] += 1
+        gap['candles_missing'] += missing
+        gap['last_gap'] = (start_ms, end_ms)
+
+        self.logger.warning(f"🕳️ Kline gap: {symbol} {interval} missing {missing} candles from {start_ms}")
+        self.backfiller.request(symbol, interval, start_ms, end_ms)
+
+    def _merge_backfill(self, symbol: str, interval: str, rows: List):
+        """Merge backfilled candles on the event loop thread so they never race stream ingest"""
+        buffer = self.kline_cache.get(symbol, {}).get(interval)
+        if buffer is None:
+            return
+        self._call_on_loop(self._merge_rows, symbol, interval, buffer, rows)
+
+    def seed_klines(self, symbol: str, interval: str, rows: List) -> int:
+        """Seed the cache with closed candles from a REST bootstrap (Binance REST row layout)"""
+        symbol = symbol.upper()
+        rows = rows if isinstance(rows, np.ndarray) else rest_klines_to_array(rows)
+        closed = rows[rows[:, 6] < time.time() * 1000]
+        buffer = self._get_buffer(symbol, interval)
+        return self._call_on_loop(self._merge_rows, symbol, interval, buffer, closed)
+
+    def is_continuous(self, symbol: str, interval: str, limit: Optional[int] = None) -> bool:
+        """True if the cached closed candles (the last `limit` of them) have no missing open times"""
+        buffer = self.kline_cache.get(symbol.upper(), {}).get(interval)
+        if buffer is None or not buffer.interval_ms:
+            return False
+        open_times = buffer.view(limit)['timestamp']
+        return bool(np.all(np.diff(open_times) == buffer.interval_ms))
 
     def get_cached_klines(self, symbol: str, interval: str, limit: int = 100) -> Optional[List[Dict]]:
         """Get cached kline data for a symbol/interval"""
@@ -481,50 +591,77 @@ class WebSocketKlineManager:
             self.logger.debug(f"No cached data for {symbol} {interval}")
             return None
 
-        klines = list(self.kline_cache[symbol][interval])
-        if not klines:
+        buffer = self.kline_cache[symbol][interval]
+        if len(buffer) == 0:
             return None
 
-        # Return most recent klines up to limit
-        return klines[-limit:] if len(klines) > limit else klines
+        # Return most recent klines up to limit (closed candles plus the forming one)
+        return buffer.to_dicts(limit)
+
+    def get_kline_arrays(self, symbol: str, interval: str, limit: Optional[int] = None,
+                         include_forming: bool = False) -> Optional[Dict[str, np.ndarray]]:
+        """Get read-only NumPy column views over the cached closed klines (no copy)"""
+        buffer = self.kline_cache.get(symbol.upper(), {}).get(interval)
+        if buffer is None or len(buffer) == 0:
+            return None
+        return buffer.view(limit, include_forming)
+
+    def get_kline_dataframe(self, symbol: str, interval: str, limit: Optional[int] = None,
+                            include_forming: bool = False, time_offset_ms: int = 0,
+                            copy: bool = False) -> Optional[pd.DataFrame]:
+        """Get a DataFrame backed by the cached kline arrays without copying them (unless `copy`)"""
+        buffer = self.kline_cache.get(symbol.upper(), {}).get(interval)
+        if buffer is None or len(buffer) == 0:
+            return None
+        return buffer.to_dataframe(limit, include_forming, time_offset_ms, copy)
+
+    def restore_klines(self, symbol: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+        """Closed-candle views for a stream, loading its buffer from the kline store if needed"""
+        buffer = self._get_buffer(symbol.upper(), interval)
+        if buffer.closed_count == 0:
+            return None
+        return buffer.view()
+
+    def get_last_closed_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Open time (ms) of the newest cached closed candle"""
+        buffer = self.kline_cache.get(symbol.upper(), {}).get(interval)
+        return buffer.last_closed_open_time if buffer is not None else None
 
     def get_latest_kline(self, symbol: str, interval: str) -> Optional[Dict]:
         """Get the most recent kline for a symbol/interval"""
         symbol = symbol.upper()
 
-        if symbol in self.latest_klines and interval in self.latest_klines[symbol]:
-            return self.latest_klines[symbol][interval]
+        if symbol in self.kline_cache and interval in self.kline_cache[symbol]:
+            return self.kline_cache[symbol][interval].latest()
         return None
 
     def get_current_price(self, symbol: str) -> Optional[float]:
-        """Get current price from latest kline data with connection check"""
-        # Ensure connection is active
-        if not self.is_connected and self.is_running:
-            self.logger.warning("⚠️ WebSocket not connected, attempting reconnection...")
-            self._immediate_reconnect()
-            
+        """Get current price from latest kline data
+
+        Pure cache read - shards reconnect on their own, so a read never touches the connection.
+        """
         # Try to get from any available interval, preferring shorter timeframes
         symbol = symbol.upper()
 
         for interval in ['1m', '3m', '5m', '15m', '1h', '4h', '1d']:
-            latest = self.get_latest_kline(symbol, interval)
-            if latest:
-                return latest['close']
+            buffer = self.kline_cache.get(symbol, {}).get(interval)
+            if buffer is not None and len(buffer) > 0:
+                return buffer.latest_close()
 
         return None
 
     def is_data_fresh(self, symbol: str, interval: str, max_age_seconds: int = 60) -> bool:
-        """Check if cached data is fresh enough with startup grace period"""
+        """Check if cached data is fresh enough with startup grace period (O(1), monotonic clock)"""
         symbol = symbol.upper()
 
         # First check if we have any data at all
-        if symbol in self.kline_cache and interval in self.kline_cache[symbol]:
-            cached_data = list(self.kline_cache[symbol][interval])
-            if len(cached_data) > 0:
+        buffer = self.kline_cache.get(symbol, {}).get(interval)
+        if buffer is not None:
+            if len(buffer) > 0:
                 # If we have recent data, check timestamp
-                if symbol in self.last_updates and interval in self.last_updates[symbol]:
-                    last_update = self.last_updates[symbol][interval]
-                    age = (datetime.now() - last_update).total_seconds()
+                last_update = self.last_updates.get(symbol, {}).get(interval)
+                if last_update is not None:
+                    age = time.monotonic() - last_update
 
                     # Be more lenient during the first few minutes after connection
                     connection_time = time.time() - self.stats.get('connection_uptime', time.time())
@@ -534,22 +671,32 @@ class WebSocketKlineManager:
                     return age <= max_age_seconds
                 else:
                     # Have data but no timestamp - check if data itself is recent
-                    latest_kline = cached_data[-1]
-                    data_age = time.time() - latest_kline.get('received_at', 0)
+                    data_age = time.time() - (buffer.latest_received_at() or 0)
                     if data_age <= max_age_seconds * 2:  # Double tolerance for received_at
                         self.logger.debug(f"💡 Using received_at timestamp for freshness check: {data_age:.1f}s")
                         return True
 
         return False
 
-    def add_update_callback(self, callback: Callable):
-        """Add callback function for real-time updates"""
+    def add_update_callback(self, callback: Callable, policy: str = DROP_OLDEST, max_queue: Optional[int] = None):
+        """Add callback function for real-time updates
+
+        `policy` decides what happens when the callback falls behind: `drop_oldest`
+        discards its oldest queued update, `coalesce` keeps only the newest forming
+        tick per stream (closed candles are always delivered).
+        """
         self.update_callbacks.append(callback)
+        self.dispatcher.register(callback, policy, max_queue)
+
+    def add_history_callback(self, callback: Callable):
+        """Call `callback(symbol, interval)` whenever seeded, backfilled or restored candles change a cache"""
+        self.history_callbacks.append(callback)
 
     def remove_update_callback(self, callback: Callable):
         """Remove callback function"""
         if callback in self.update_callbacks:
             self.update_callbacks.remove(callback)
+            self.dispatcher.unregister(callback)
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get WebSocket connection statistics"""
@@ -557,6 +704,18 @@ class WebSocketKlineManager:
         stats['is_connected'] = self.is_connected
         stats['subscribed_streams'] = len(self.subscribed_streams)
         stats['cached_symbols'] = len(self.kline_cache)
+        stats['shards'] = self.get_shard_health()
+        stats['gaps'] = {symbol: dict(intervals) for symbol, intervals in self.gap_stats.items()}
+        stats['backfill'] = self.backfiller.get_statistics()
+        stats['callbacks'] = self.dispatcher.get_statistics()
+        stats['stream_metrics'] = self.metrics.get_statistics()
+        stats['json_decoder'] = self.json_decoder.name
+
+        # Wall-clock view of the monotonic receive time, for existing consumers
+        last_message_age = self.last_message_age()
+        stats['last_message_age_seconds'] = last_message_age
+        stats['last_message_time'] = (datetime.now() - timedelta(seconds=last_message_age)
+                                      if last_message_age is not None else None)
 
         if stats['connection_uptime'] > 0:
             stats['uptime_seconds'] = time.time() - stats['connection_uptime']
@@ -565,6 +724,10 @@ class WebSocketKlineManager:
 
         return stats
 
+    def last_message_age(self) -> Optional[float]:
+        """Seconds since any frame was received"""
+        return time.monotonic() - self.last_message_at if self.last_message_at is not None else None
+
     def get_cache_status(self) -> Dict[str, Any]:
         """Get detailed cache status"""
         status = {}
@@ -574,10 +737,13 @@ class WebSocketKlineManager:
             for interval in self.kline_cache[symbol]:
                 cache_size = len(self.kline_cache[symbol][interval])
                 last_update = self.last_updates.get(symbol, {}).get(interval)
+                age = time.monotonic() - last_update if last_update is not None else None
 
                 status[symbol][interval] = {
                     'cached_klines': cache_size,
-                    'last_update': last_update.isoformat() if last_update else None,
+                    'last_update': (datetime.now() - timedelta(seconds=age)).isoformat() if age is not None else None,
+                    'last_update_age_seconds': age,
+                    'last_close_age_seconds': self.metrics.last_close_age(symbol, interval),
                     'is_fresh': self.is_data_fresh(symbol, interval)
                 }
 
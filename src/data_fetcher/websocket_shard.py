@@ -0,0 +1,337 @@
+import asyncio
+import json
+import logging
+import random
+import ssl
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import websockets
+
+
+class StreamShard:
+    """One combined-stream WebSocket connection carrying a subset of the subscribed streams
+
+    Each shard owns its connection lifecycle: it reconnects on its own with
+    jittered exponential backoff, so one bad socket never stalls the streams
+    carried by the other shards.
+
+    Stream changes on a live connection are sent as SUBSCRIBE/UNSUBSCRIBE
+    requests instead of reconnecting. Requests are batched, paced under the
+    per-connection message-rate limit and acknowledged by request id. A
+    request left unacknowledged for ACK_TIMEOUT is re-sent, up to
+    MAX_ACK_RETRIES times per stream.
+    """
+
+    MAX_PARAMS_PER_MESSAGE = 50
+    MESSAGE_INTERVAL = 0.2  # 5 msg/s - Binance allows 10 incoming messages/s per connection
+    ACK_TIMEOUT = 10.0
+    MAX_ACK_RETRIES = 2
+
+    def __init__(self, shard_id: int, streams: Iterable[str], base_url: str,
+                 on_message: Callable[['StreamShard', Any], None],
+                 on_error: Optional[Callable[['StreamShard', Exception], None]] = None,
+                 on_open: Optional[Callable[['StreamShard'], None]] = None,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.shard_id = shard_id
+        self.streams = set(streams)
+        self.base_url = base_url
+        self.on_message = on_message
+        self.on_error = on_error
+        self.on_open = on_open
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.logger = logging.getLogger(__name__)
+
+        self.ws = None
+        self.is_connected = False
+        self.is_running = False
+        self._wake = None  # asyncio.Event created on the shard's loop
+
+        # Live subscription management
+        self._pending_ops: Dict[str, str] = {}  # stream -> SUBSCRIBE/UNSUBSCRIBE, in request order
+        self._ops_ready = None  # asyncio.Event created on the shard's loop
+        self._next_request_id = 1
+        self.pending_acks: Dict[int, Dict[str, Any]] = {}
+        self._ack_retries: Dict[str, int] = {}  # stream -> re-sends after an ack timeout
+
+        # Health tracking
+        self.reconnect_attempts = 0
+        self.reconnections = 0
+        self.messages_received = 0
+        self.connected_since = None
+        self.last_message_time = None
+        self.last_error = None
+        self.subscription_messages_sent = 0
+        self.subscription_acks = 0
+        self.subscription_errors = 0
+        self.ack_timeouts = 0
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/".join(sorted(self.streams))
+
+    def _ssl_context(self) -> ssl.SSLContext:
+        # Same relaxed TLS settings the deployment has always used for the market-data socket
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+    async def run(self):
+        """Connect and keep the shard connected until stop() is called"""
+        self.is_running = True
+        self._wake = asyncio.Event()
+        self._ops_ready = asyncio.Event()
+
+        while self.is_running:
+            if not self.streams:
+                # Nothing to carry - wait until streams are assigned
+                await self._sleep_or_wake(self.max_backoff)
+                continue
+
+            sender = None
+            try:
+                url_streams = set(self.streams)
+                url = self.base_url + "/".join(sorted(url_streams))
+                self.logger.info(f"🔗 Shard {self.shard_id}: connecting with {len(self.streams)} streams")
+                ssl_context = self._ssl_context() if url.startswith('wss://') else None
+                async with websockets.connect(url, ssl=ssl_context, ping_interval=20,
+                                              ping_timeout=20, close_timeout=5,
+                                              max_size=2 ** 22) as ws:
+                    self.ws = ws
+                    self.is_connected = True
+                    self.reconnect_attempts = 0
+                    self.reconnections += 1
+                    self.connected_since = time.time()
+                    if self.on_open:
+                        self.on_open(self)
+
+                    # The URL carries the stream set; only changes made while connecting remain
+                    self._pending_ops.clear()
+                    self._queue_diff(url_streams)
+                    sender = asyncio.create_task(self._send_subscriptions(ws))
+                    sender.add_done_callback(lambda task, ws=ws: self._on_sender_done(task, ws))
+
+                    async for message in ws:
+                        self.messages_received += 1
+                        self.last_message_time = time.time()
+                        if self.pending_acks and self._handle_response(message):
+                            continue
+                        self.on_message(self, message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._report_error(e)
+            finally:
+                if sender is not None:
+                    sender.cancel()
+                self.ws = None
+                self.is_connected = False
+                self.connected_since = None
+                self.pending_acks.clear()
+                self._ack_retries.clear()
+
+            if not self.is_running:
+                break
+
+            self.reconnect_attempts += 1
+            delay = self._backoff_delay()
+            self.logger.info(f"🔄 Shard {self.shard_id}: reconnecting in {delay:.1f}s (attempt {self.reconnect_attempts})")
+            await self._sleep_or_wake(delay)
+
+        self.logger.info(f"🛑 Shard {self.shard_id} stopped")
+
+    def _report_error(self, error: Exception):
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.on_error:
+            self.on_error(self, error)
+        else:
+            self.logger.error(f"🚫 Shard {self.shard_id} error: {error}")
+
+    def _on_sender_done(self, task: asyncio.Task, ws):
+        """Report a failed subscription sender and close the socket, so the shard reconnects with its stream set"""
+        if task.cancelled() or task.exception() is None:
+            return
+        self._report_error(task.exception())
+        asyncio.ensure_future(ws.close())
+
+    def subscribe(self, streams: Iterable[str]):
+        """Add streams to this shard over the live connection (call on the shard's loop)"""
+        for stream in streams:
+            if stream not in self.streams:
+                self.streams.add(stream)
+                self._queue_op('SUBSCRIBE', stream)
+
+    def unsubscribe(self, streams: Iterable[str]):
+        """Remove streams from this shard over the live connection (call on the shard's loop)"""
+        for stream in streams:
+            if stream in self.streams:
+                self.streams.discard(stream)
+                self._queue_op('UNSUBSCRIBE', stream)
+
+    def _queue_op(self, method: str, stream: str):
+        queued = self._pending_ops.get(stream)
+        if queued is not None and queued != method:
+            # Opposite request not sent yet - the two cancel out
+            del self._pending_ops[stream]
+        else:
+            self._pending_ops[stream] = method
+
+        if self._ops_ready is not None:
+            self._ops_ready.set()
+        if not self.is_connected and self.streams:
+            # Not connected (or idle with no streams) - connect with the new set now
+            self.wake()
+
+    def _queue_diff(self, url_streams: set):
+        for stream in sorted(self.streams - url_streams):
+            self._queue_op('SUBSCRIBE', stream)
+        for stream in sorted(url_streams - self.streams):
+            self._queue_op('UNSUBSCRIBE', stream)
+
+    def _next_batch(self):
+        """Pop the oldest run of same-method requests, up to the per-message limit"""
+        method = next(iter(self._pending_ops.values()))
+        batch = []
+        for stream, queued in list(self._pending_ops.items()):
+            if queued != method or len(batch) >= self.MAX_PARAMS_PER_MESSAGE:
+                break
+            batch.append(stream)
+            del self._pending_ops[stream]
+        return method, batch
+
+    async def _send_subscriptions(self, ws):
+        """Drain queued subscription changes, paced under the connection's message-rate limit
+
+        Also wakes when the oldest unacknowledged request times out, so expiry
+        does not depend on further subscription changes.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._ops_ready.wait(), timeout=self._ack_wait())
+            except asyncio.TimeoutError:
+                pass
+            self._ops_ready.clear()
+            self._expire_acks()
+
+            while self._pending_ops:
+                method, params = self._next_batch()
+                request_id = self._next_request_id
+                self._next_request_id += 1
+
+                self.pending_acks[request_id] = {'method': method, 'params': params, 'sent_at': time.time()}
+                await ws.send(json.dumps({'method': method, 'params': params, 'id': request_id}))
+                self.subscription_messages_sent += 1
+                self.logger.info(f"📡 Shard {self.shard_id}: {method} {len(params)} streams (id {request_id})")
+
+                await asyncio.sleep(self.MESSAGE_INTERVAL)
+
+    def _ack_wait(self) -> Optional[float]:
+        """Seconds until the oldest unacknowledged request times out (None if nothing is awaited)"""
+        if not self.pending_acks:
+            return None
+        oldest = min(request['sent_at'] for request in self.pending_acks.values())
+        return max(0.0, oldest + self.ACK_TIMEOUT - time.time())
+
+    def _expire_acks(self):
+        """Drop timed-out requests and re-queue their streams that still need the change"""
+        now = time.time()
+        for request_id, request in list(self.pending_acks.items()):
+            if now - request['sent_at'] < self.ACK_TIMEOUT:
+                continue
+            del self.pending_acks[request_id]
+            self.ack_timeouts += 1
+
+            method, requeued, given_up = request['method'], [], []
+            for stream in request['params']:
+                if (stream in self.streams) != (method == 'SUBSCRIBE') or stream in self._pending_ops:
+                    continue  # Changed again since - the newer request covers it
+                retries = self._ack_retries.get(stream, 0)
+                if retries >= self.MAX_ACK_RETRIES:
+                    given_up.append(stream)
+                    continue
+                self._ack_retries[stream] = retries + 1
+                self._pending_ops[stream] = method
+                requeued.append(stream)
+
+            self.logger.warning(f"⏱️ Shard {self.shard_id}: no ack for {method} id {request_id} - "
+                                f"re-sending {len(requeued)} of {len(request['params'])} streams")
+            if given_up:
+                self.logger.error(f"🚫 Shard {self.shard_id}: {method} unacknowledged after "
+                                  f"{self.MAX_ACK_RETRIES} retries: {', '.join(given_up)}")
+
+    def _handle_response(self, message) -> bool:
+        """Consume a SUBSCRIBE/UNSUBSCRIBE response. Returns False for market data frames."""
+        if '"stream"' in message[:16]:
+            return False
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return False
+        if not isinstance(data, dict) or 'id' not in data:
+            return False
+
+        request = self.pending_acks.pop(data['id'], None)
+        for stream in request['params'] if request else ():
+            self._ack_retries.pop(stream, None)
+        if 'error' in data:
+            self.subscription_errors += 1
+            self.logger.error(f"🚫 Shard {self.shard_id}: request {data['id']} rejected: {data['error']}")
+        else:
+            self.subscription_acks += 1
+            if request:
+                latency = time.time() - request['sent_at']
+                self.logger.debug(f"✅ Shard {self.shard_id}: {request['method']} id {data['id']} acked in {latency:.3f}s")
+        return True
+
+    def _backoff_delay(self) -> float:
+        """Exponential backoff with full jitter so shards don't reconnect in lockstep"""
+        ceiling = min(self.max_backoff, self.base_backoff * (2 ** (self.reconnect_attempts - 1)))
+        return random.uniform(self.base_backoff / 2, max(ceiling, self.base_backoff / 2))
+
+    async def _sleep_or_wake(self, delay: float):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._wake.clear()
+
+    def wake(self):
+        """Skip the next (or current) backoff wait and reconnect now (call on the shard's loop)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def restart(self):
+        """Drop the current connection and reconnect immediately with the current stream set"""
+        if self.ws is not None:
+            await self.ws.close()
+        self.wake()
+
+    async def stop(self):
+        self.is_running = False
+        if self.ws is not None:
+            await self.ws.close()
+        self.wake()
+
+    def get_health(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'shard_id': self.shard_id,
+            'streams': len(self.streams),
+            'is_connected': self.is_connected,
+            'reconnect_attempts': self.reconnect_attempts,
+            'reconnections': self.reconnections,
+            'messages_received': self.messages_received,
+            'uptime_seconds': now - self.connected_since if self.connected_since else 0,
+            'last_message_age': now - self.last_message_time if self.last_message_time else None,
+            'last_error': self.last_error,
+            'pending_subscriptions': len(self._pending_ops),
+            'awaiting_acks': len(self.pending_acks),
+            'subscription_messages_sent': self.subscription_messages_sent,
+            'subscription_acks': self.subscription_acks,
+            'subscription_errors': self.subscription_errors,
+            'ack_timeouts': self.ack_timeouts
+        }
@@ -5,8 +5,65 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 import json
 from src.binance_client.client import BinanceClientWrapper
+from src.indicators.rsi import latest_rsi
 from src.strategy_processor.signal_processor import TradingSignal, SignalType
 
+def fallback_symbol_info(symbol: str) -> Dict:
+    """Hardcoded lot size rules, used when exchange info is unavailable"""
+    symbol_upper = symbol.upper()
+
+    if 'ETH' in symbol_upper:
+        # ETHUSDT minimum position size is 20 USDT, precision is 2 decimals
+        return {'min_qty': 0.01, 'step_size': 0.01, 'precision': 2}
+    elif 'SOL' in symbol_upper:
+        return {'min_qty': 0.01, 'step_size': 0.01, 'precision': 2}
+    elif 'BTC' in symbol_upper:
+        return {'min_qty': 0.001, 'step_size': 0.001, 'precision': 3}
+    else:
+        return {'min_qty': 0.1, 'step_size': 0.1, 'precision': 1}
+
+
+def position_quantity(margin: float, leverage: float, entry_price: float, min_qty: float,
+                      step_size: float, precision: int) -> Tuple[float, str]:
+    """Order quantity for `margin` at `leverage`, and which way it was rounded ('DOWN', 'UP' or 'MIN_QTY')
+
+    Rounds to the step size in whichever direction lands the actual margin
+    closest to the target, never below the exchange minimum.
+    """
+    # Method 1: Calculate ideal quantity based on exact margin
+    target_position_value = margin * leverage
+    ideal_quantity = target_position_value / entry_price
+
+    # Method 2: Smart rounding to minimize margin discrepancy
+    # Try both rounding up and down, choose the one closest to target margin
+    quantity_down = (ideal_quantity // step_size) * step_size
+    quantity_up = quantity_down + step_size
+
+    # Calculate actual margins for both options
+    margin_down = (quantity_down * entry_price) / leverage if quantity_down >= min_qty else float('inf')
+    margin_up = (quantity_up * entry_price) / leverage
+
+    # Choose the quantity that gets closest to target margin
+    margin_diff_down = abs(margin_down - margin) if margin_down != float('inf') else float('inf')
+    margin_diff_up = abs(margin_up - margin)
+
+    if margin_diff_down <= margin_diff_up and quantity_down >= min_qty:
+        quantity = quantity_down
+        chosen_direction = "DOWN"
+    else:
+        quantity = quantity_up
+        chosen_direction = "UP"
+
+    # Apply precision rounding
+    quantity = round(quantity, precision)
+
+    # Ensure minimum quantity (final safety check)
+    if quantity < min_qty:
+        quantity = min_qty
+        chosen_direction = "MIN_QTY"
+    return quantity, chosen_direction
+
+
 @dataclass
 class Position:
     strategy_name: str
@@ -602,17 +659,7 @@ class OrderManager:
 
     def _get_fallback_symbol_info(self, symbol: str) -> Dict:
         """Fallback symbol info if API fails"""
-        symbol_upper = symbol.upper()
-
-        if 'ETH' in symbol_upper:
-            # ETHUSDT minimum position size is 20 USDT, precision is 2 decimals
-            return {'min_qty': 0.01, 'step_size': 0.01, 'precision': 2}
-        elif 'SOL' in symbol_upper:
-            return {'min_qty': 0.01, 'step_size': 0.01, 'precision': 2}
-        elif 'BTC' in symbol_upper:
-            return {'min_qty': 0.001, 'step_size': 0.001, 'precision': 3}
-        else:
-            return {'min_qty': 0.1, 'step_size': 0.1, 'precision': 1}
+        return fallback_symbol_info(symbol)
 
     def _calculate_position_size(self, signal: TradingSignal, strategy_config: Dict) -> float:
         """Calculate position size based on margin and leverage with improved accuracy"""
@@ -631,37 +678,12 @@ class OrderManager:
             step_size = symbol_info['step_size']
             precision = strategy_config.get('decimals', symbol_info['precision'])
 
-            # Method 1: Calculate ideal quantity based on exact margin
-            target_position_value = margin * leverage
-            ideal_quantity = target_position_value / signal.entry_price
-
-            # Method 2: Smart rounding to minimize margin discrepancy
-            # Try both rounding up and down, choose the one closest to target margin
-            quantity_down = (ideal_quantity // step_size) * step_size
-            quantity_up = quantity_down + step_size
-
-            # Calculate actual margins for both options
-            margin_down = (quantity_down * signal.entry_price) / leverage if quantity_down >= min_qty else float('inf')
-            margin_up = (quantity_up * signal.entry_price) / leverage
-
-            # Choose the quantity that gets closest to target margin
-            margin_diff_down = abs(margin_down - margin) if margin_down != float('inf') else float('inf')
-            margin_diff_up = abs(margin_up - margin)
-
-            if margin_diff_down <= margin_diff_up and quantity_down >= min_qty:
-                quantity = quantity_down
-                chosen_direction = "DOWN"
-            else:
-                quantity = quantity_up
-                chosen_direction = "UP"
-
-            # Apply precision rounding
-            quantity = round(quantity, precision)
+            # Quantity rounded to the step size that lands closest to the target margin
+            ideal_quantity = margin * leverage / signal.entry_price
+            quantity, chosen_direction = position_quantity(margin, leverage, signal.entry_price,
+                                                           min_qty, step_size, precision)
 
-            # Ensure minimum quantity (final safety check)
-            if quantity < min_qty:
-                quantity = min_qty
-                chosen_direction = "MIN_QTY"
+            if chosen_direction == "MIN_QTY":
                 self.logger.warning(f"⚠️ MARGIN ADJUSTMENT: Quantity increased to minimum {min_qty} - margin will be higher than configured")
 
             # Calculate actual values after rounding
@@ -880,27 +902,8 @@ class OrderManager:
     def _calculate_rsi(self, prices: list, period: int = 14) -> float:
         """Calculate RSI indicator"""
         try:
-            if len(prices) < period + 1:
-                return None
-
-            gains, losses = [], []
-            for i in range(1, len(prices)):
-                change = prices[i] - prices[i-1]
-                gains.append(max(change, 0))
-                losses.append(max(-change, 0))
-
-            if len(gains) < period:
-                return None
-
-            avg_gain = sum(gains[-period:]) / period
-            avg_loss = sum(losses[-period:]) / period
-
-            if avg_loss == 0:
-                return 100
-
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-            return round(rsi, 2)
+            rsi = latest_rsi(prices, period)
+            return round(rsi, 2) if rsi is not None else None
 
         except Exception:
             return None
@@ -1,8 +1,14 @@
 import pandas as pd
 import numpy as np
 import logging
+import time
+from collections import deque
 from typing import Optional, Dict, Any
 from datetime import datetime
+from src.data_fetcher.kline_buffer import interval_to_ms
+from src.indicators.incremental import WilderRSI
+from src.indicators.indicator_cache import frozen_columns, indicator_cache
+from src.indicators.rsi import rsi_series
 from src.strategy_processor.signal_processor import TradingSignal, SignalType
 
 class EngulfingPatternStrategy:
@@ -48,8 +54,10 @@ class EngulfingPatternStrategy:
             if 'timestamp' in df.columns:
                 df = df.sort_values('timestamp').reset_index(drop=True)
 
-            # Calculate RSI
-            df['rsi'] = self._calculate_rsi(df['close'], self.rsi_period)
+            # Calculate RSI (shared with other strategies on this symbol/timeframe)
+            df['rsi'] = indicator_cache.for_frame(
+                self.config.get('symbol'), self.config.get('timeframe'), df, 'rsi', {'period': self.rsi_period},
+                lambda: frozen_columns({'rsi': self._calculate_rsi(df['close'], self.rsi_period)}))['rsi']
 
             # Calculate True Range
             df['true_range'] = self._calculate_true_range(df)
@@ -88,27 +96,7 @@ class EngulfingPatternStrategy:
     def _calculate_rsi(self, prices: pd.Series, period: int) -> pd.Series:
         """Calculate RSI indicator with proper Wilder's smoothing"""
         try:
-            delta = prices.diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-
-            # Use exponential weighted moving average (Wilder's smoothing)
-            # Alpha = 1/period for Wilder's smoothing
-            alpha = 1.0 / period
-
-            avg_gain = gain.ewm(alpha=alpha, adjust=False).mean()
-            avg_loss = loss.ewm(alpha=alpha, adjust=False).mean()
-
-            # Avoid division by zero
-            avg_loss = avg_loss.replace(0, np.finfo(float).eps)
-
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-
-            # Ensure RSI is within valid range
-            rsi = rsi.clip(0, 100)
-
-            return rsi
+            return rsi_series(prices, period)
 
         except Exception as e:
             self.logger.error(f"Error calculating RSI: {e}")
@@ -244,6 +232,17 @@ class EngulfingPatternStrategy:
 
             close_5_ago = df[f'close_{self.price_lookback_bars}_ago'].iloc[current_idx]
 
+            return self._entry_signal(current_price, current_rsi, bullish_engulfing, bearish_engulfing,
+                                      stable_candle, close_5_ago)
+
+        except Exception as e:
+            self.logger.error(f"Error evaluating entry signal for {self.strategy_name}: {e}")
+            return None
+
+    def _entry_signal(self, current_price: float, current_rsi: float, bullish_engulfing: bool,
+                      bearish_engulfing: bool, stable_candle: bool, close_5_ago: float) -> Optional[TradingSignal]:
+        """Entry decision from the last candle's pattern flags, RSI and lookback close"""
+        try:
             # Calculate stop loss parameters
             margin = self.config.get('margin', 50.0)
             leverage = self.config.get('leverage', 5)
@@ -314,27 +313,30 @@ class EngulfingPatternStrategy:
             if df.empty or 'rsi' not in df.columns:
                 return None
 
-            current_rsi = df['rsi'].iloc[-1]
-            position_side = position.get('side', 'BUY')
-
-            if pd.isna(current_rsi):
-                return None
+            return self._exit_reason(df['rsi'].iloc[-1], position)
 
-            # Long position exit: RSI reaches exit level
-            if position_side == 'BUY' and current_rsi >= self.rsi_long_exit:
-                self.logger.info(f"🟢→🚪 ENGULFING LONG EXIT: RSI {current_rsi:.1f} >= {self.rsi_long_exit}")
-                return f"Take Profit (RSI {self.rsi_long_exit}+)"
+        except Exception as e:
+            self.logger.error(f"Error evaluating exit signal for {self.strategy_name}: {e}")
+            return None
 
-            # Short position exit: RSI reaches exit level
-            elif position_side == 'SELL' and current_rsi <= self.rsi_short_exit:
-                self.logger.info(f"🔴→🚪 ENGULFING SHORT EXIT: RSI {current_rsi:.1f} <= {self.rsi_short_exit}")
-                return f"Take Profit (RSI {self.rsi_short_exit}-)"
+    def _exit_reason(self, current_rsi: Optional[float], position: Dict) -> Optional[str]:
+        """RSI take-profit decision for an open position"""
+        position_side = position.get('side', 'BUY')
 
+        if current_rsi is None or pd.isna(current_rsi):
             return None
 
-        except Exception as e:
-            self.logger.error(f"Error evaluating exit signal for {self.strategy_name}: {e}")
-            return None
+        # Long position exit: RSI reaches exit level
+        if position_side == 'BUY' and current_rsi >= self.rsi_long_exit:
+            self.logger.info(f"🟢→🚪 ENGULFING LONG EXIT: RSI {current_rsi:.1f} >= {self.rsi_long_exit}")
+            return f"Take Profit (RSI {self.rsi_long_exit}+)"
+
+        # Short position exit: RSI reaches exit level
+        elif position_side == 'SELL' and current_rsi <= self.rsi_short_exit:
+            self.logger.info(f"🔴→🚪 ENGULFING SHORT EXIT: RSI {current_rsi:.1f} <= {self.rsi_short_exit}")
+            return f"Take Profit (RSI {self.rsi_short_exit}-)"
+
+        return None
 
     def get_strategy_status(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Get current strategy status for monitoring"""
@@ -363,4 +365,145 @@ class EngulfingPatternStrategy:
 
         except Exception as e:
             self.logger.error(f"Error getting strategy status: {e}")
-            return {'status': 'error', 'error': str(e)}
\ No newline at end of file
+            return {'status': 'error', 'error': str(e)}
+
+
+class IncrementalEngulfingEvaluator:
+    """Engulfing entry conditions on the last closed candle, updated in O(1) per candle
+
+    Keeps only the state the entry decision reads: Wilder RSI averages, the
+    previous candle, and the closes of the last `price_lookback_bars` candles.
+    The flags use the same arithmetic as the strategy's vectorized
+    `calculate_indicators`, so decisions are identical on the same history.
+
+    RSI is carried forward across evaluations, whereas the DataFrame path
+    re-seeds it on each evaluation window. Over a 200-candle window the seed's
+    weight has decayed to (1 - 1/14)^186, about 1e-6, so the two agree within
+    `RSI_WINDOW_TOLERANCE` points; decisions can differ only when RSI sits
+    that close to a threshold.
+    """
+
+    RSI_WINDOW_TOLERANCE = 1e-4
+
+    def __init__(self, strategy: EngulfingPatternStrategy):
+        self.strategy = strategy
+        self.config = dict(strategy.config)
+        self.interval_ms = interval_to_ms(strategy.config.get('timeframe', ''))
+        self.min_candles = max(50, strategy.rsi_period + strategy.price_lookback_bars + 5)
+        self.reset()
+
+    def reset(self):
+        self.rsi = WilderRSI(self.strategy.rsi_period)
+        self.closes = deque(maxlen=self.strategy.price_lookback_bars + 1)
+        self.prev_open = None
+        self.prev_close = None
+        self.last_key = None  # Close time of the newest candle applied
+        self.count = 0
+        self.state: Dict[str, Any] = {}
+
+    def config_changed(self, config: Dict[str, Any]) -> bool:
+        return dict(config, name=self.strategy.strategy_name) != self.config
+
+    def update(self, open_: float, high: float, low: float, close: float) -> Dict[str, Any]:
+        """Apply one closed candle and return its entry-condition state"""
+        strategy = self.strategy
+        rsi = self.rsi.update(close)
+        self.closes.append(close)
+        self.count += 1
+
+        # True range - the first candle has no previous close
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        body = abs(open_ - close)
+        body_ratio = body / (true_range if true_range != 0 else np.finfo(float).eps)
+        stable = body_ratio > strategy.stable_candle_ratio and body > close * 0.0005
+
+        bullish = bearish = False
+        if self.prev_open is not None:
+            prev_body = abs(self.prev_open - self.prev_close)
+            sized = body > prev_body * 0.3 and prev_body > close * 0.0002 and body > close * 0.0002
+            bullish = (sized and self.prev_close < self.prev_open and close > open_ and
+                       open_ < self.prev_close and close > self.prev_open)
+            bearish = (sized and self.prev_close > self.prev_open and close < open_ and
+                       open_ > self.prev_close and close < self.prev_open)
+
+        self.prev_open, self.prev_close = open_, close
+        self.state = {
+            'close': close,
+            'rsi': rsi,
+            'close_n_ago': self.closes[0] if len(self.closes) == self.closes.maxlen else None,
+            'bullish_engulfing': bullish,
+            'bearish_engulfing': bearish,
+            'stable_candle': stable
+        }
+        return self.state
+
+    def sync(self, df: pd.DataFrame, now_ms: Optional[int] = None) -> int:
+        """Apply the closed candles of `df` not seen yet; returns how many were applied
+
+        Candles are identified by `close_time` and count as closed once it has
+        passed. A candle that does not follow the last one applied (a gap, or
+        a different window) restarts the state from `df`.
+        """
+        if df.empty:
+            return 0
+        close_time = df['close_time'].to_numpy(dtype=np.int64) if 'close_time' in df.columns else None
+        return self.sync_arrays(close_time, *(df[column].to_numpy(dtype=np.float64)
+                                              for column in ('open', 'high', 'low', 'close')), now_ms=now_ms)
+
+    def sync_arrays(self, close_time: Optional[np.ndarray], open_: np.ndarray, high: np.ndarray,
+                    low: np.ndarray, close: np.ndarray, now_ms: Optional[int] = None) -> int:
+        """`sync` on column arrays; without close times every row is treated as new, closed history"""
+        if close_time is not None:
+            keys = close_time
+            now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+            closed = keys < now_ms
+        else:
+            keys = np.arange(len(close), dtype=np.int64)
+            closed = np.ones(len(close), dtype=bool)
+            self.reset()
+
+        new = closed & (keys > self.last_key) if self.last_key is not None else closed
+        if not new.any():
+            return 0
+        first = int(np.argmax(new))
+        if (self.last_key is not None and self.interval_ms
+                and keys[first] != self.last_key + self.interval_ms):
+            self.reset()
+            new = closed
+
+        rows = np.flatnonzero(new)
+        for row in rows:
+            self.update(float(open_[row]), float(high[row]), float(low[row]), float(close[row]))
+        self.last_key = int(keys[rows[-1]])
+        return len(rows)
+
+    @property
+    def name(self) -> str:
+        return self.strategy.strategy_name
+
+    def evaluate_entry(self, frame) -> Optional[TradingSignal]:
+        """ArrayStrategy entry: sync the frame's closed candles, then decide on the last one"""
+        self.sync_arrays(frame.close_time, frame.open, frame.high, frame.low, frame.close)
+        return self.evaluate_entry_signal()
+
+    def evaluate_exit(self, frame, position: Dict) -> Optional[str]:
+        """ArrayStrategy exit: RSI take-profit on the last closed candle"""
+        self.sync_arrays(frame.close_time, frame.open, frame.high, frame.low, frame.close)
+        return self.strategy._exit_reason(self.state.get('rsi'), position)
+
+    @property
+    def ready(self) -> bool:
+        return (self.count >= self.min_candles and self.state.get('rsi') is not None
+                and self.state.get('close_n_ago') is not None)
+
+    def evaluate_entry_signal(self) -> Optional[TradingSignal]:
+        """The strategy's entry decision for the last closed candle"""
+        if not self.ready:
+            return None
+        state = self.state
+        return self.strategy._entry_signal(state['close'], state['rsi'], state['bullish_engulfing'],
+                                           state['bearish_engulfing'], state['stable_candle'],
+                                           state['close_n_ago'])
@@ -4,6 +4,7 @@ import numpy as np
 import logging
 from typing import Optional, Dict, Any
 from datetime import datetime
+from src.indicators.indicator_cache import frozen_columns, indicator_cache
 from src.strategy_processor.signal_processor import TradingSignal, SignalType
 
 class MACDDivergenceStrategy:
@@ -20,6 +21,7 @@ class MACDDivergenceStrategy:
 
     def __init__(self, config: Dict[str, Any]):
         self.strategy_name = config.get('name', 'macd_divergence')
+        self.name = self.strategy_name
         self.config = config
         self.logger = logging.getLogger(__name__)
 
@@ -42,11 +44,12 @@ class MACDDivergenceStrategy:
             if df.empty or len(df) < max(50, self.macd_slow + self.macd_signal):
                 return df
 
-            df['ema_fast'] = df['close'].ewm(span=self.macd_fast).mean()
-            df['ema_slow'] = df['close'].ewm(span=self.macd_slow).mean()
-            df['macd'] = df['ema_fast'] - df['ema_slow']
-            df['macd_signal'] = df['macd'].ewm(span=self.macd_signal).mean()
-            df['macd_histogram'] = df['macd'] - df['macd_signal']
+            # Adjusted EWM, unlike the pipeline's MACD, so it is cached under its own name
+            params = {'fast': self.macd_fast, 'slow': self.macd_slow, 'signal': self.macd_signal}
+            columns = indicator_cache.for_frame(self.config.get('symbol'), self.config.get('timeframe'), df,
+                                                'macd_ewm_adjusted', params, lambda: self._macd_columns(df['close']))
+            for column, values in columns.items():
+                df[column] = values
 
             return df
 
@@ -54,6 +57,14 @@ class MACDDivergenceStrategy:
             self.logger.error(f"Error calculating MACD indicators for {self.strategy_name}: {e}")
             return df
 
+    def _macd_columns(self, close: pd.Series) -> Dict[str, np.ndarray]:
+        ema_fast = close.ewm(span=self.macd_fast).mean()
+        ema_slow = close.ewm(span=self.macd_slow).mean()
+        macd = ema_fast - ema_slow
+        macd_signal = macd.ewm(span=self.macd_signal).mean()
+        return frozen_columns({'ema_fast': ema_fast, 'ema_slow': ema_slow, 'macd': macd,
+                               'macd_signal': macd_signal, 'macd_histogram': macd - macd_signal})
+
     def evaluate_entry_signal(self, df):
         """Evaluate MACD divergence before crossover - catching momentum at the bottom/tip"""
         try:
@@ -70,6 +81,39 @@ class MACDDivergenceStrategy:
 
             current_price = df['close'].iloc[-1]
 
+            return self._entry_signal(current_macd, current_signal, current_histogram, prev_histogram,
+                                      prev2_histogram, current_price)
+
+        except Exception as e:
+            print(f"❌ Error in MACD divergence signal evaluation: {e}")
+            return None
+
+    def evaluate_exit_signal(self, df: pd.DataFrame, position: Dict) -> Optional[str]:
+        """Exit when momentum peaks and starts reversing (before crossover happens)"""
+        try:
+            if df.empty or 'macd_histogram' not in df.columns:
+                return None
+
+            histogram = df['macd_histogram'].iloc[-4:]  # Look at last 4 candles
+
+            if len(histogram) < 4:
+                return None
+
+            current_hist = histogram.iloc[-1]
+            prev_hist = histogram.iloc[-2]
+            prev2_hist = histogram.iloc[-3]
+            prev3_hist = histogram.iloc[-4]
+
+            return self._exit_reason(position.get('side', 'BUY'), current_hist, prev_hist, prev2_hist)
+
+        except Exception as e:
+            self.logger.error(f"Error evaluating exit signal for {self.strategy_name}: {e}")
+            return None
+
+    def _entry_signal(self, current_macd: float, current_signal: float, current_histogram: float,
+                      prev_histogram: float, prev2_histogram: float, current_price: float) -> Optional[TradingSignal]:
+        """Pre-crossover entry decision from the latest MACD values"""
+        try:
             # Calculate momentum trend in histogram (key for divergence)
             momentum_change = current_histogram - prev_histogram
             momentum_trend = current_histogram - prev2_histogram
@@ -116,57 +160,71 @@ class MACDDivergenceStrategy:
             print(f"❌ Error in MACD divergence signal evaluation: {e}")
             return None
 
-    def evaluate_exit_signal(self, df: pd.DataFrame, position: Dict) -> Optional[str]:
-        """Exit when momentum peaks and starts reversing (before crossover happens)"""
+    def _exit_reason(self, position_side: str, current_hist: float, prev_hist: float,
+                     prev2_hist: float) -> Optional[str]:
+        """Momentum peak/bottom exit decision from the last three histogram values"""
+        # Calculate momentum changes
+        current_momentum = current_hist - prev_hist
+        prev_momentum = prev_hist - prev2_hist
+
+        # --- LONG EXIT: Peak momentum detected before crossover ---
+        if position_side == 'BUY':
+            # Exit when histogram momentum peaks and starts declining
+            # (This happens BEFORE the actual crossover)
+            if (current_hist > 0 and  # We're in positive territory
+                prev_hist > prev2_hist and  # Previous candle was still growing
+                current_momentum < prev_momentum and  # Momentum is slowing
+                abs(current_momentum) >= self.exit_threshold):  # Significant momentum change
+                
+                self.logger.info(f"🟢→🔴 LONG EXIT: MACD momentum peak detected before crossover")
+                return "Take Profit (MACD Momentum Peak)"
+
+        # --- SHORT EXIT: Bottom momentum detected before crossover ---
+        elif position_side == 'SELL':
+            # Exit when histogram momentum bottoms and starts rising
+            # (This happens BEFORE the actual crossover)
+            if (current_hist < 0 and  # We're in negative territory
+                prev_hist < prev2_hist and  # Previous candle was still falling
+                current_momentum > prev_momentum and  # Momentum is reversing up
+                abs(current_momentum) >= self.exit_threshold):  # Significant momentum change
+                
+                self.logger.info(f"🔴→🟢 SHORT EXIT: MACD momentum bottom detected before crossover")
+                return "Take Profit (MACD Momentum Bottom)"
+
+        return None
+
+    def evaluate_entry(self, frame) -> Optional[TradingSignal]:
+        """`evaluate_entry_signal` on a CandleFrame, without building a DataFrame"""
         try:
-            if df.empty or 'macd_histogram' not in df.columns:
-                return None
-
-            position_side = position.get('side', 'BUY')
-            histogram = df['macd_histogram'].iloc[-4:]  # Look at last 4 candles
-
-            if len(histogram) < 4:
+            if len(frame) < max(50, self.macd_slow + self.macd_signal):
                 return None
-
-            current_hist = histogram.iloc[-1]
-            prev_hist = histogram.iloc[-2]
-            prev2_hist = histogram.iloc[-3]
-            prev3_hist = histogram.iloc[-4]
-
-            # Calculate momentum changes
-            current_momentum = current_hist - prev_hist
-            prev_momentum = prev_hist - prev2_hist
-
-            # --- LONG EXIT: Peak momentum detected before crossover ---
-            if position_side == 'BUY':
-                # Exit when histogram momentum peaks and starts declining
-                # (This happens BEFORE the actual crossover)
-                if (current_hist > 0 and  # We're in positive territory
-                    prev_hist > prev2_hist and  # Previous candle was still growing
-                    current_momentum < prev_momentum and  # Momentum is slowing
-                    abs(current_momentum) >= self.exit_threshold):  # Significant momentum change
-                    
-                    self.logger.info(f"🟢→🔴 LONG EXIT: MACD momentum peak detected before crossover")
-                    return "Take Profit (MACD Momentum Peak)"
-
-            # --- SHORT EXIT: Bottom momentum detected before crossover ---
-            elif position_side == 'SELL':
-                # Exit when histogram momentum bottoms and starts rising
-                # (This happens BEFORE the actual crossover)
-                if (current_hist < 0 and  # We're in negative territory
-                    prev_hist < prev2_hist and  # Previous candle was still falling
-                    current_momentum > prev_momentum and  # Momentum is reversing up
-                    abs(current_momentum) >= self.exit_threshold):  # Significant momentum change
-                    
-                    self.logger.info(f"🔴→🟢 SHORT EXIT: MACD momentum bottom detected before crossover")
-                    return "Take Profit (MACD Momentum Bottom)"
-
+            histogram, macd, signal = self._frame_macd(frame)
+            return self._entry_signal(macd[-1], signal[-1], histogram[-1], histogram[-2], histogram[-3],
+                                      float(frame.close[-1]))
+        except Exception as e:
+            self.logger.error(f"Error evaluating MACD entry for {self.strategy_name}: {e}")
             return None
 
+    def evaluate_exit(self, frame, position: Dict) -> Optional[str]:
+        """`evaluate_exit_signal` on a CandleFrame"""
+        try:
+            if len(frame) < max(50, self.macd_slow + self.macd_signal):
+                return None
+            histogram = self._frame_macd(frame)[0]
+            return self._exit_reason(position.get('side', 'BUY'), histogram[-1], histogram[-2], histogram[-3])
         except Exception as e:
             self.logger.error(f"Error evaluating exit signal for {self.strategy_name}: {e}")
             return None
 
+    def _frame_macd(self, frame) -> tuple:
+        params = {'fast': self.macd_fast, 'slow': self.macd_slow, 'signal': self.macd_signal}
+        candle = frame.last_open_time if frame.symbol and frame.interval else None  # Uncached without a stream
+        columns = indicator_cache.get_or_compute(frame.symbol, frame.interval, candle,
+                                                 'macd_ewm_adjusted', params,
+                                                 lambda: self._macd_columns(pd.Series(frame.close)),
+                                                 frame.fingerprint())
+        return columns['macd_histogram'], columns['macd'], columns['macd_signal']
+
     def get_strategy_status(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Get current strategy status for monitoring"""
         try:
@@ -1,8 +1,12 @@
 
 from typing import Dict, Any, List, Optional
+from src.data_fetcher.callback_dispatcher import COALESCE
+from src.data_fetcher.kline_buffer import interval_to_ms
+from src.indicators.smart_money import SwingTracker, find_sweep, liquidity_zones
 from src.strategy_processor.signal_processor import TradingSignal, SignalType
 import numpy as np
 import logging
+import threading
 from datetime import datetime, time
 import pytz
 
@@ -67,6 +71,13 @@ class SmartMoneyStrategy:
         self.daily_trade_count = 0
         self.last_trade_date = None
         self.recent_sweeps = []  # Track recent sweeps to avoid false signals
+        self.clock = None  # Returns the current UTC datetime for the session and daily filters; backtests use candle time
+
+        # Incremental mode: swings kept up to date from closed candles (see attach)
+        self.manager = None
+        self.swing_tracker = SwingTracker(capacity=max(200, self.swing_lookback_period + 60),
+                                          interval_ms=interval_to_ms(self.timeframe))
+        self._tracker_lock = threading.Lock()
         
         self.logger.info(f"🧠 SMART MONEY STRATEGY INITIALIZED | {self.symbol} | {self.timeframe}")
         self.logger.info(f"   📊 Swing Lookback: {self.swing_lookback_period} candles")
@@ -84,99 +95,182 @@ class SmartMoneyStrategy:
                 self.logger.warning(f"🧠 SMART MONEY | {self.symbol} | Insufficient data: {len(klines) if klines else 0} candles")
                 return None
 
-            # Reset daily trade count if new day
-            self._reset_daily_count_if_needed()
-
-            # Check daily trade limit
-            if self.daily_trade_count >= self.max_daily_trades:
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | ❌ DAILY LIMIT REACHED | Trades today: {self.daily_trade_count}/{self.max_daily_trades}")
-                return None
-
-            # Check session filter
-            if not self._is_trading_session_active():
-                current_session = self._get_current_session()
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | ⏰ SESSION FILTER | Current: {current_session} | Allowed: {self.allowed_sessions} | Status: INACTIVE")
+            if not self._passes_daily_and_session_filters():
                 return None
 
             # Extract price and volume data
-            highs = [float(kline[2]) for kline in klines]
-            lows = [float(kline[3]) for kline in klines]
-            closes = [float(kline[4]) for kline in klines]
-            volumes = [float(kline[5]) for kline in klines]
+            data = np.array([kline[2:6] for kline in klines], dtype=np.float64)
+            highs, lows, closes, volumes = data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+            zones = liquidity_zones(highs, lows, self.swing_lookback_period, self.min_swing_distance_pct)
 
-            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🔍 SCANNING FOR LIQUIDITY SWEEPS | Price: ${current_price:.4f}")
+            return self._analyze(highs, lows, closes, volumes, zones, current_price)
 
-            # Step 1: Identify liquidity zones (swing highs/lows)
-            swing_highs, swing_lows = self._identify_liquidity_zones(highs, lows)
-            
-            if not swing_highs and not swing_lows:
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📊 NO SIGNIFICANT LIQUIDITY ZONES | Lookback: {self.swing_lookback_period} candles")
-                return None
+        except Exception as e:
+            self.logger.error(f"🧠 SMART MONEY | {self.symbol} | ❌ ERROR in market analysis: {e}")
+            return None
+
+    def _passes_daily_and_session_filters(self) -> bool:
+        # Reset daily trade count if new day
+        self._reset_daily_count_if_needed()
 
-            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🎯 LIQUIDITY ZONES FOUND | Swing Highs: {len(swing_highs)} | Swing Lows: {len(swing_lows)}")
+        # Check daily trade limit
+        if self.daily_trade_count >= self.max_daily_trades:
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | ❌ DAILY LIMIT REACHED | Trades today: {self.daily_trade_count}/{self.max_daily_trades}")
+            return False
 
-            # Step 2: Check for recent liquidity sweeps
-            sweep_signal = self._detect_liquidity_sweep(
-                highs, lows, closes, volumes, swing_highs, swing_lows, current_price
-            )
+        # Check session filter
+        if not self._is_trading_session_active():
+            current_session = self._get_current_session()
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | ⏰ SESSION FILTER | Current: {current_session} | Allowed: {self.allowed_sessions} | Status: INACTIVE")
+            return False
+        return True
 
-            if not sweep_signal:
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🔍 NO LIQUIDITY SWEEP DETECTED | Continuing to monitor...")
-                return None
+    def _analyze(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray,
+                 zones: tuple, current_price: float) -> Optional[TradingSignal]:
+        """Sweep, volume, trend and signal steps on candle arrays and their swing indices"""
+        self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🔍 SCANNING FOR LIQUIDITY SWEEPS | Price: ${current_price:.4f}")
 
-            # Step 3: Confirm with volume spike
-            if not self._confirm_volume_spike(volumes):
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📊 VOLUME CONFIRMATION FAILED | Recent volume too low for liquidity hunt")
+        # Step 1: Identify liquidity zones (swing highs/lows)
+        swing_highs, swing_lows = zones
+
+        if not len(swing_highs) and not len(swing_lows):
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📊 NO SIGNIFICANT LIQUIDITY ZONES | Lookback: {self.swing_lookback_period} candles")
+            return None
+
+        self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🎯 LIQUIDITY ZONES FOUND | Swing Highs: {len(swing_highs)} | Swing Lows: {len(swing_lows)}")
+
+        # Step 2: Check for recent liquidity sweeps
+        sweep_signal = self._sweep_direction(highs, lows, closes, highs[swing_highs], lows[swing_lows])
+
+        if not sweep_signal:
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🔍 NO LIQUIDITY SWEEP DETECTED | Continuing to monitor...")
+            return None
+
+        # Step 3: Confirm with volume spike
+        if not self._confirm_volume_spike(volumes):
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📊 VOLUME CONFIRMATION FAILED | Recent volume too low for liquidity hunt")
+            return None
+
+        # Step 4: Check trend filter if enabled
+        if self.trend_filter_enabled:
+            trend_direction = self._get_trend_direction(closes)
+            if not self._is_signal_aligned_with_trend(sweep_signal, trend_direction):
+                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📈 TREND FILTER | Signal: {sweep_signal} | Trend: {trend_direction} | ❌ NOT ALIGNED")
                 return None
+            else:
+                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📈 TREND FILTER | Signal: {sweep_signal} | Trend: {trend_direction} | ✅ ALIGNED")
 
-            # Step 4: Check trend filter if enabled
-            if self.trend_filter_enabled:
-                trend_direction = self._get_trend_direction(closes)
-                if not self._is_signal_aligned_with_trend(sweep_signal, trend_direction):
-                    self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📈 TREND FILTER | Signal: {sweep_signal} | Trend: {trend_direction} | ❌ NOT ALIGNED")
-                    return None
-                else:
-                    self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📈 TREND FILTER | Signal: {sweep_signal} | Trend: {trend_direction} | ✅ ALIGNED")
+        # Step 5: Generate trading signal
+        signal = self._generate_trading_signal(sweep_signal, current_price, highs, lows)
 
-            # Step 5: Generate trading signal
-            signal = self._generate_trading_signal(sweep_signal, current_price, highs, lows)
-            
-            if signal:
-                self.daily_trade_count += 1
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | ✅ LIQUIDITY SWEEP SIGNAL GENERATED | Direction: {sweep_signal} | Entry: ${signal.entry_price:.4f}")
-                self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📊 TRADE COUNT | Today: {self.daily_trade_count}/{self.max_daily_trades}")
-                
-            return signal
+        if signal:
+            self.daily_trade_count += 1
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | ✅ LIQUIDITY SWEEP SIGNAL GENERATED | Direction: {sweep_signal} | Entry: ${signal.entry_price:.4f}")
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 📊 TRADE COUNT | Today: {self.daily_trade_count}/{self.max_daily_trades}")
+
+        return signal
+
+    def evaluate_entry(self, frame) -> Optional[TradingSignal]:
+        """ArrayStrategy entry: `analyze_market` on a CandleFrame's columns, priced at the last close"""
+        try:
+            if len(frame) < self.swing_lookback_period + 10:
+                self.logger.warning(f"🧠 SMART MONEY | {self.symbol} | Insufficient data: {len(frame)} candles")
+                return None
+            if not self._passes_daily_and_session_filters():
+                return None
+            zones = liquidity_zones(frame.high, frame.low, self.swing_lookback_period, self.min_swing_distance_pct)
+            return self._analyze(frame.high, frame.low, frame.close, frame.volume, zones, float(frame.close[-1]))
 
         except Exception as e:
             self.logger.error(f"🧠 SMART MONEY | {self.symbol} | ❌ ERROR in market analysis: {e}")
             return None
 
-    def _identify_liquidity_zones(self, highs: List[float], lows: List[float]) -> tuple:
-        """Identify swing highs and lows where liquidity is likely to be hunted"""
+    def evaluate_exit(self, frame, position) -> Optional[str]:
+        """ArrayStrategy exit: stop loss and take profit handle Smart Money exits"""
+        return None
+
+    def attach(self, websocket_manager):
+        """Incremental mode: keep swings up to date from the manager's closed candles"""
+        if self.manager is websocket_manager:
+            return
+        self.manager = websocket_manager
+        websocket_manager.add_update_callback(self.on_kline, policy=COALESCE)
+        with self._tracker_lock:
+            self._reload_tracker()
+
+    def detach(self):
+        """Stop following the manager's candles (the strategy was reconfigured or disabled)"""
+        if self.manager is not None:
+            self.manager.remove_update_callback(self.on_kline)
+            self.manager = None
+
+    def evaluate_tracked(self, frame) -> Optional[TradingSignal]:
+        """Entry on the live path: `analyze_tracked` once attached, else `evaluate_entry`
+
+        Candles of `frame` the tracker has not seen yet (update callbacks may
+        lag the candle close) are added first, so the decision is made on
+        the same closed candles as the frame.
+        """
+        if self.manager is None or frame.symbol != self.symbol.upper() or frame.interval != self.timeframe:
+            return self.evaluate_entry(frame)
+
+        with self._tracker_lock:
+            last = self.swing_tracker.last_open_time
+            start = 0 if last is None else int(np.searchsorted(frame.open_time, last, side='right'))
+            for i in range(start, len(frame)):
+                self.swing_tracker.update(int(frame.open_time[i]), float(frame.high[i]), float(frame.low[i]),
+                                          float(frame.close[i]), float(frame.volume[i]))
+        return self.analyze_tracked(float(frame.close[-1]))
+
+    def _reload_tracker(self):
+        buffer = self.manager.kline_cache.get(self.symbol.upper(), {}).get(self.timeframe)
+        if buffer is None:
+            return
+        view = buffer.view(self.swing_tracker.capacity)
+        self.swing_tracker.load(np.column_stack([view['timestamp'], view['open'], view['high'], view['low'],
+                                                 view['close'], view['volume'], view['close_time']]))
+
+    def on_kline(self, symbol: str, interval: str, kline: Dict):
+        """WebSocket update callback - add closed candles of this strategy's stream to the tracker"""
+        if not kline.get('is_closed') or symbol != self.symbol.upper() or interval != self.timeframe:
+            return
+        with self._tracker_lock:
+            self.swing_tracker.update(kline['timestamp'], kline['high'], kline['low'], kline['close'],
+                                      kline['volume'])
+
+    def analyze_tracked(self, current_price: float) -> Optional[TradingSignal]:
+        """`analyze_market` on the tracked candles, without rebuilding or rescanning the window"""
         try:
-            swing_highs = []
-            swing_lows = []
-            
-            # More sensitive swing detection - only need 1 candle on each side
-            for i in range(1, len(highs) - 1):
-                if highs[i] > highs[i-1] and highs[i] > highs[i+1]:
-                    swing_highs.append({'price': highs[i], 'index': i})
+            with self._tracker_lock:
+                tracker = self.swing_tracker
+                # Refill after startup or a gap, once the manager's cache is continuous again
+                if (len(tracker) < self.swing_lookback_period + 10 and self.manager is not None
+                        and self.manager.is_continuous(self.symbol.upper(), self.timeframe)):
+                    self._reload_tracker()
+
+                if len(tracker) < self.swing_lookback_period + 10:
+                    self.logger.warning(f"🧠 SMART MONEY | {self.symbol} | Insufficient data: {len(tracker)} candles")
+                    return None
 
-            for i in range(1, len(lows) - 1):
-                if lows[i] < lows[i-1] and lows[i] < lows[i+1]:
-                    swing_lows.append({'price': lows[i], 'index': i})
+                if not self._passes_daily_and_session_filters():
+                    return None
 
-            # Filter by minimum distance to avoid noise
-            swing_highs = self._filter_swing_points_by_distance(swing_highs, highs[-1])
-            swing_lows = self._filter_swing_points_by_distance(swing_lows, highs[-1])
+                zones = tracker.liquidity_zones(self.swing_lookback_period, self.min_swing_distance_pct)
+                return self._analyze(tracker.highs, tracker.lows, tracker.closes, tracker.volumes, zones,
+                                     current_price)
 
-            # Keep only recent swings within lookback period
-            recent_start = max(0, len(highs) - self.swing_lookback_period)
-            swing_highs = [s for s in swing_highs if s['index'] >= recent_start]
-            swing_lows = [s for s in swing_lows if s['index'] >= recent_start]
+        except Exception as e:
+            self.logger.error(f"🧠 SMART MONEY | {self.symbol} | ❌ ERROR in market analysis: {e}")
+            return None
 
-            return swing_highs, swing_lows
+    def _identify_liquidity_zones(self, highs: List[float], lows: List[float]) -> tuple:
+        """Identify swing highs and lows where liquidity is likely to be hunted"""
+        try:
+            highs, lows = np.asarray(highs, dtype=np.float64), np.asarray(lows, dtype=np.float64)
+            swing_highs, swing_lows = liquidity_zones(highs, lows, self.swing_lookback_period,
+                                                      self.min_swing_distance_pct)
+            return ([{'price': float(highs[i]), 'index': int(i)} for i in swing_highs],
+                    [{'price': float(lows[i]), 'index': int(i)} for i in swing_lows])
 
         except Exception as e:
             self.logger.error(f"Error identifying liquidity zones: {e}")
@@ -185,14 +279,8 @@ class SmartMoneyStrategy:
     def _filter_swing_points_by_distance(self, swing_points: List[Dict], current_price: float) -> List[Dict]:
         """Filter swing points that are too close to current price"""
         try:
-            filtered_points = []
             min_distance = current_price * (self.min_swing_distance_pct / 100)
-            
-            for point in swing_points:
-                if abs(point['price'] - current_price) >= min_distance:
-                    filtered_points.append(point)
-                    
-            return filtered_points
+            return [point for point in swing_points if abs(point['price'] - current_price) >= min_distance]
         except Exception:
             return swing_points
 
@@ -200,46 +288,20 @@ class SmartMoneyStrategy:
                               volumes: List[float], swing_highs: List[Dict], swing_lows: List[Dict], 
                               current_price: float) -> Optional[str]:
         """Detect if a liquidity sweep has occurred"""
+        return self._sweep_direction(highs, lows, closes, [s['price'] for s in swing_highs],
+                                     [s['price'] for s in swing_lows])
+
+    def _sweep_direction(self, highs, lows, closes, swing_high_prices, swing_low_prices) -> Optional[str]:
+        """LONG after a swept swing low, SHORT after a swept swing high (last 3 swings of each)"""
         try:
-            recent_candles = min(self.reversion_candles, len(closes) - 1)
-            
-            # Check for sweep of swing lows (hunt for long stop losses)
-            for swing_low in swing_lows[-3:]:  # Check last 3 swing lows
-                sweep_level = swing_low['price']
-                sweep_threshold = sweep_level * (1 - self.sweep_threshold_pct / 100)
-                
-                # Check if price pierced below swing low in recent candles
-                for i in range(len(lows) - recent_candles, len(lows)):
-                    if i >= 0 and lows[i] <= sweep_threshold:
-                        # Check if price recovered (closed back above swing low)
-                        recovery_candles = 0
-                        for j in range(i + 1, min(i + self.reversion_candles + 1, len(closes))):
-                            if j < len(closes) and closes[j] > sweep_level:
-                                recovery_candles += 1
-                                
-                        if recovery_candles >= 1:  # At least 1 candle closed back above
-                            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🎯 LOW SWEEP DETECTED | Level: ${sweep_level:.4f} | Pierce: ${lows[i]:.4f} | Recovery: {recovery_candles} candles")
-                            return "LONG"  # Sweep low suggests bullish reversal
-
-            # Check for sweep of swing highs (hunt for short stop losses)
-            for swing_high in swing_highs[-3:]:  # Check last 3 swing highs
-                sweep_level = swing_high['price']
-                sweep_threshold = sweep_level * (1 + self.sweep_threshold_pct / 100)
-                
-                # Check if price pierced above swing high in recent candles
-                for i in range(len(highs) - recent_candles, len(highs)):
-                    if i >= 0 and highs[i] >= sweep_threshold:
-                        # Check if price recovered (closed back below swing high)
-                        recovery_candles = 0
-                        for j in range(i + 1, min(i + self.reversion_candles + 1, len(closes))):
-                            if j < len(closes) and closes[j] < sweep_level:
-                                recovery_candles += 1
-                                
-                        if recovery_candles >= 1:  # At least 1 candle closed back below
-                            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🎯 HIGH SWEEP DETECTED | Level: ${sweep_level:.4f} | Pierce: ${highs[i]:.4f} | Recovery: {recovery_candles} candles")
-                            return "SHORT"  # Sweep high suggests bearish reversal
+            sweep = find_sweep(highs, lows, closes, swing_high_prices, swing_low_prices,
+                               self.sweep_threshold_pct, self.reversion_candles)
+            if sweep is None:
+                return None
 
-            return None
+            side = "LOW" if sweep.direction == "LONG" else "HIGH"
+            self.logger.info(f"🧠 SMART MONEY | {self.symbol} | 🎯 {side} SWEEP DETECTED | Level: ${sweep.level:.4f} | Pierce: ${sweep.pierce:.4f} | Recovery: {sweep.recovery_candles} candles")
+            return sweep.direction
 
         except Exception as e:
             self.logger.error(f"Error detecting liquidity sweep: {e}")
@@ -360,7 +422,7 @@ class SmartMoneyStrategy:
     def _get_current_session(self) -> str:
         """Get current trading session based on UTC time"""
         try:
-            utc_now = datetime.now(pytz.UTC)
+            utc_now = self._now(pytz.UTC)
             hour = utc_now.hour
             
             # Define session times (UTC)
@@ -376,10 +438,13 @@ class SmartMoneyStrategy:
         except Exception:
             return "UNKNOWN"
 
+    def _now(self, tz=None) -> datetime:
+        return self.clock() if self.clock is not None else datetime.now(tz)
+
     def _reset_daily_count_if_needed(self):
         """Reset daily trade count if it's a new day"""
         try:
-            today = datetime.now().date()
+            today = self._now().date()
             if self.last_trade_date != today:
                 self.daily_trade_count = 0
                 self.last_trade_date = today
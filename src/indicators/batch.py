@@ -0,0 +1,176 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data_fetcher.kline_buffer import interval_to_ms
+from src.indicators.rsi import wilder_rsi, wilder_smooth
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MarketMatrix:
+    """Closed candles of many symbols aligned on one open-time grid
+
+    Price arrays are (symbols x time), oldest candle first. Only symbols with
+    every candle of the window are included; the rest are listed in `skipped`.
+    """
+    symbols: List[str]
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    skipped: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_rows(cls, rows_by_symbol: Mapping[str, np.ndarray], interval: str, length: int) -> 'MarketMatrix':
+        """Align (n, 7) arrays in Binance REST column order on the newest `length` candles
+
+        The grid ends at the newest open time seen for any symbol, so a symbol
+        whose stream is behind, has gaps or is too young to fill the window is
+        skipped rather than shifted.
+        """
+        interval_ms = interval_to_ms(interval)
+        rows_by_symbol = {symbol: rows for symbol, rows in rows_by_symbol.items() if len(rows)}
+        if interval_ms is None or not rows_by_symbol:
+            return cls.empty(list(rows_by_symbol))
+
+        end = max(int(rows[-1, 0]) for rows in rows_by_symbol.values())
+        grid = end - interval_ms * np.arange(length - 1, -1, -1, dtype=np.int64)
+
+        symbols, skipped, windows = [], [], []
+        for symbol, rows in rows_by_symbol.items():
+            open_times = rows[:, 0].astype(np.int64)
+            positions = np.searchsorted(open_times, grid)
+            if positions[-1] >= len(rows) or not np.array_equal(open_times[positions], grid):
+                skipped.append(symbol)
+                continue
+            symbols.append(symbol)
+            windows.append(rows[positions, 1:6])
+
+        if not symbols:
+            return cls.empty(skipped)
+        stacked = np.stack(windows)  # (symbols, time, ohlcv)
+        return cls(symbols, grid, *(np.ascontiguousarray(stacked[:, :, column]) for column in range(5)),
+                   skipped=skipped)
+
+    @classmethod
+    def from_store(cls, kline_store, symbols: Iterable[str], interval: str, length: int) -> 'MarketMatrix':
+        """Matrix of the newest `length` candles persisted in a KlineStore"""
+        return cls.from_rows({symbol.upper(): kline_store.load(symbol, interval, length) for symbol in symbols},
+                             interval, length)
+
+    @classmethod
+    def from_manager(cls, manager, symbols: Iterable[str], interval: str, length: int) -> 'MarketMatrix':
+        """Matrix of the newest `length` closed candles held by a WebSocketKlineManager"""
+        rows_by_symbol = {}
+        for symbol in symbols:
+            buffer = manager.kline_cache.get(symbol.upper(), {}).get(interval)
+            if buffer is None:
+                continue
+            view = buffer.view(length)
+            rows_by_symbol[symbol.upper()] = np.column_stack(
+                [view['timestamp'], view['open'], view['high'], view['low'], view['close'], view['volume'],
+                 view['close_time']])
+        return cls.from_rows(rows_by_symbol, interval, length)
+
+    @classmethod
+    def empty(cls, skipped: List[str]) -> 'MarketMatrix':
+        blank = np.empty((0, 0))
+        return cls([], np.empty(0, dtype=np.int64), blank, blank, blank, blank, blank, skipped=skipped)
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """EMA along the time axis, as pandas `ewm(span, adjust=False)`"""
+    return pd.DataFrame(values.T).ewm(span=span, adjust=False).mean().to_numpy().T
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean along the time axis; the first `window - 1` values are NaN"""
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        result[:, window - 1:] = sliding_window_view(values, window, axis=1).mean(axis=2)
+    return result
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sample standard deviation (ddof=1, as pandas)"""
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        result[:, window - 1:] = sliding_window_view(values, window, axis=1).std(axis=2, ddof=1)
+    return result
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {'macd': line, 'macd_signal': signal_line, 'macd_histogram': line - signal_line}
+
+
+def bollinger(close: np.ndarray, window: int = 20, num_std: float = 2) -> Dict[str, np.ndarray]:
+    middle = sma(close, window)
+    deviation = rolling_std(close, window) * num_std
+    return {'bb_upper': middle + deviation, 'bb_lower': middle - deviation, 'bb_middle': middle}
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; the first candle has no previous close and uses high - low"""
+    prev_close = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    tr[:, 0] = high[:, 0] - low[:, 0]
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder ATR, seeded with the mean of the first `period` true ranges"""
+    tr = true_range(high, low, close)
+    result = np.full(tr.shape, np.nan)
+    if tr.shape[1] >= period:
+        result[:, period - 1:] = wilder_smooth(tr, period)
+    return result
+
+
+def engulfing(open_: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Bullish/bearish engulfing flags, the same rules as PriceFetcher.calculate_indicators"""
+    bullish = np.zeros(open_.shape, dtype=bool)
+    bearish = np.zeros(open_.shape, dtype=bool)
+    prev_open, prev_close = open_[:, :-1], close[:, :-1]
+    cur_open, cur_close = open_[:, 1:], close[:, 1:]
+    bullish[:, 1:] = (prev_close < prev_open) & (cur_close > cur_open) & (cur_open < prev_close) & (cur_close > prev_open)
+    bearish[:, 1:] = (prev_close > prev_open) & (cur_close < cur_open) & (cur_open > prev_close) & (cur_close < prev_open)
+    return {'bullish_engulfing': bullish, 'bearish_engulfing': bearish}
+
+
+def batch_indicators(matrix: MarketMatrix, rsi_period: int = 14, macd_params=(12, 26, 9),
+                     sma_windows=(20, 50), bb_window: int = 20, bb_std: float = 2,
+                     atr_period: int = 14) -> Dict[str, np.ndarray]:
+    """All pipeline indicators for every symbol of the matrix, each a (symbols x time) array"""
+    if not matrix.symbols:
+        return {}
+    indicators = {'rsi': wilder_rsi(matrix.close, rsi_period)}
+    indicators.update(macd(matrix.close, *macd_params))
+    for window in sma_windows:
+        indicators[f'sma_{window}'] = sma(matrix.close, window)
+    indicators.update(bollinger(matrix.close, bb_window, bb_std))
+    indicators['atr'] = atr(matrix.high, matrix.low, matrix.close, atr_period)
+    indicators.update(engulfing(matrix.open, matrix.close))
+    return indicators
+
+
+def market_scan(matrix: MarketMatrix, **params) -> pd.DataFrame:
+    """Newest value of every indicator, one row per symbol"""
+    indicators = batch_indicators(matrix, **params)
+    if not indicators:
+        return pd.DataFrame()
+    scan = pd.DataFrame({name: values[:, -1] for name, values in indicators.items()}, index=matrix.symbols)
+    scan.insert(0, 'close', matrix.close[:, -1])
+    scan.index.name = 'symbol'
+    if matrix.skipped:
+        logger.debug(f"🔎 Market scan skipped {len(matrix.skipped)} symbols without a full window")
+    return scan
@@ -0,0 +1,469 @@
+import inspect
+import logging
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.data_fetcher.callback_dispatcher import COALESCE
+from src.data_fetcher.kline_buffer import interval_to_ms
+
+
+def wilder_rsi_value(avg_gain: float, avg_loss: float) -> float:
+    """RSI from Wilder averages; a flat market (no gains or losses) reads 50"""
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class _Indicator:
+    """Streaming indicator state
+
+    `update()` consumes one closed candle in O(1) and returns the new value
+    (None while warming up); `peek()` returns the value the forming candle
+    would produce without changing state.
+    """
+
+    outputs: Tuple[str, ...] = ()
+
+    def update(self, close: float, high: float, low: float):
+        raise NotImplementedError
+
+    def peek(self, close: float, high: float, low: float):
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        """Plain-data copy of the streaming state"""
+        return {name: (list(value) if isinstance(value, deque) else
+                       value.state() if isinstance(value, _Indicator) else value)
+                for name, value in vars(self).items()}
+
+    def load_state(self, state: Dict[str, Any]):
+        for name, value in state.items():
+            current = getattr(self, name)
+            if isinstance(current, deque):
+                current.clear()
+                current.extend(value)
+            elif isinstance(current, _Indicator):
+                current.load_state(value)
+            else:
+                setattr(self, name, value)
+
+
+class EMA(_Indicator):
+    """Exponential moving average seeded with the first value (pandas `ewm(span, adjust=False)`)"""
+
+    outputs = ('ema',)
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value = None
+        self.count = 0
+
+    def _next(self, x: float) -> float:
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def update(self, close, high=None, low=None):
+        self.value = self._next(close)
+        self.count += 1
+        return self.value
+
+    def peek(self, close, high=None, low=None):
+        return self._next(close)
+
+
+class WilderRSI(_Indicator):
+    """Wilder RSI - averages seeded with the SMA of the first `period` changes"""
+
+    outputs = ('rsi',)
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0  # Price changes seen
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _next(self, close: float):
+        change = close - self.prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        count = self.count + 1
+        if count < self.period:
+            return count, self.avg_gain + gain, self.avg_loss + loss  # Running sums until seeded
+        if count == self.period:
+            return count, (self.avg_gain + gain) / self.period, (self.avg_loss + loss) / self.period
+        return (count, (self.avg_gain * (self.period - 1) + gain) / self.period,
+                (self.avg_loss * (self.period - 1) + loss) / self.period)
+
+    def update(self, close, high=None, low=None):
+        if self.prev_close is None:
+            self.prev_close = close
+            return None
+        self.count, self.avg_gain, self.avg_loss = self._next(close)
+        self.prev_close = close
+        return wilder_rsi_value(self.avg_gain, self.avg_loss) if self.count >= self.period else None
+
+    def peek(self, close, high=None, low=None):
+        if self.prev_close is None:
+            return None
+        count, avg_gain, avg_loss = self._next(close)
+        return wilder_rsi_value(avg_gain, avg_loss) if count >= self.period else None
+
+
+class MACD(_Indicator):
+    """MACD line, signal line and histogram from three EMAs"""
+
+    outputs = ('macd', 'macd_signal', 'macd_histogram')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close, high=None, low=None):
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+    def peek(self, close, high=None, low=None):
+        macd = self.fast.peek(close) - self.slow.peek(close)
+        signal = self.signal.peek(macd)
+        return macd, signal, macd - signal
+
+
+class RollingMeanStd(_Indicator):
+    """Rolling mean and sample standard deviation (pandas `rolling(window).mean()/.std()`)
+
+    Running sums make each update O(1); they are recomputed from the window
+    once per full turn so floating-point drift cannot accumulate.
+    """
+
+    outputs = ('mean', 'std')
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.since_resync = 0
+
+    def _stats(self, total: float, total_sq: float, n: int):
+        if n < self.window:
+            return None
+        mean = total / n
+        variance = max((total_sq - total * mean) / (n - 1), 0.0) if n > 1 else 0.0
+        return mean, math.sqrt(variance)
+
+    def update(self, close, high=None, low=None):
+        if len(self.values) == self.window:
+            oldest = self.values[0]
+            self.total -= oldest
+            self.total_sq -= oldest * oldest
+        self.values.append(close)
+        self.total += close
+        self.total_sq += close * close
+
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(value * value for value in self.values)
+            self.since_resync = 0
+        return self._stats(self.total, self.total_sq, len(self.values))
+
+    def peek(self, close, high=None, low=None):
+        total, total_sq, n = self.total + close, self.total_sq + close * close, len(self.values) + 1
+        if len(self.values) == self.window:
+            oldest = self.values[0]
+            total, total_sq, n = total - oldest, total_sq - oldest * oldest, n - 1
+        return self._stats(total, total_sq, n)
+
+
+class TrueRange(_Indicator):
+    """max(high - low, |high - previous close|, |low - previous close|)"""
+
+    outputs = ('true_range',)
+
+    def __init__(self):
+        self.prev_close = None
+
+    def _value(self, close, high, low):
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def update(self, close, high, low):
+        value = self._value(close, high, low)
+        self.prev_close = close
+        return value
+
+    def peek(self, close, high, low):
+        return self._value(close, high, low)
+
+
+class ATR(_Indicator):
+    """Wilder average true range, seeded with the SMA of the first `period` true ranges"""
+
+    outputs = ('atr',)
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.true_range = TrueRange()
+        self.count = 0
+        self.value = 0.0
+
+    def _next(self, true_range: float):
+        count = self.count + 1
+        if count < self.period:
+            return count, self.value + true_range
+        if count == self.period:
+            return count, (self.value + true_range) / self.period
+        return count, (self.value * (self.period - 1) + true_range) / self.period
+
+    def update(self, close, high, low):
+        self.count, self.value = self._next(self.true_range.update(close, high, low))
+        return self.value if self.count >= self.period else None
+
+    def peek(self, close, high, low):
+        count, value = self._next(self.true_range.peek(close, high, low))
+        return value if count >= self.period else None
+
+
+INDICATORS: Dict[str, Callable[..., _Indicator]] = {
+    'ema': EMA,
+    'rsi': WilderRSI,
+    'macd': MACD,
+    'rolling': RollingMeanStd,
+    'true_range': TrueRange,
+    'atr': ATR
+}
+
+IndicatorKey = Tuple[str, str, str, Tuple[Tuple[str, Any], ...]]  # (symbol, interval, name, params)
+
+
+class _Tracked:
+    """One indicator on one stream, with its recent closed values"""
+
+    __slots__ = ('indicator', 'last_open_time', 'history', 'provisional')
+
+    def __init__(self, indicator: _Indicator, history: int):
+        self.indicator = indicator
+        self.last_open_time = None
+        self.history = deque(maxlen=history)  # Newest last
+        self.provisional = None  # Value including the forming candle
+
+
+class IndicatorEngine:
+    """Streaming indicators per (symbol, interval, indicator, params)
+
+    Closed candles advance each indicator in O(1), so the cost of an
+    evaluation no longer depends on how much history is cached. The forming
+    candle only produces a provisional value. A tracked stream is warmed up
+    once from the kline cache. If a close arrives after a gap, or candles are
+    seeded, backfilled or restored into the cache, the stream is rebuilt from
+    the cache on the next read (once the cache is continuous).
+    """
+
+    def __init__(self, history: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.history = history
+        self.manager = None
+        self._tracked: Dict[IndicatorKey, _Tracked] = {}
+        self._streams: Dict[Tuple[str, str], List[IndicatorKey]] = {}
+        self._stale = set()  # (symbol, interval) streams to rebuild from the cache
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(symbol: str, interval: str, name: str, **params) -> IndicatorKey:
+        return symbol.upper(), interval, name, tuple(sorted(params.items()))
+
+    def attach(self, websocket_manager):
+        """Follow candle updates from a WebSocketKlineManager and warm up from its cache"""
+        if self.manager is websocket_manager:
+            return
+        self.manager = websocket_manager
+        websocket_manager.add_update_callback(self.on_kline, policy=COALESCE)
+        websocket_manager.add_history_callback(self.on_history)
+        with self._lock:
+            for key in self._tracked:
+                self._warm_up(key)
+
+    def track(self, symbol: str, interval: str, name: str, **params) -> IndicatorKey:
+        """Start maintaining an indicator (no-op if already tracked)"""
+        key = self.key(symbol, interval, name, **params)
+        with self._lock:
+            if key in self._tracked:
+                return key
+            if name not in INDICATORS:
+                raise ValueError(f"Unknown indicator: {name}")
+            self._tracked[key] = _Tracked(INDICATORS[name](**params), self.history)
+            self._streams.setdefault(key[:2], []).append(key)
+            self._warm_up(key)
+        return key
+
+    def untrack(self, symbol: str, interval: str, name: str, **params):
+        key = self.key(symbol, interval, name, **params)
+        with self._lock:
+            if self._tracked.pop(key, None) is not None:
+                self._streams[key[:2]].remove(key)
+
+    def _warm_up(self, key: IndicatorKey):
+        """Feed the closed candles already in the kline cache"""
+        if self.manager is None:
+            return
+        view = self.manager.get_kline_arrays(key[0], key[1])
+        if view is not None:
+            self._feed(key, view['timestamp'], view['close'], view['high'], view['low'])
+
+    def _feed(self, key: IndicatorKey, open_times, closes, highs, lows):
+        tracked = self._tracked[key]
+        start = 0
+        if tracked.last_open_time is not None:
+            start = int((open_times <= tracked.last_open_time).sum())
+        update = tracked.indicator.update
+        for open_time, close, high, low in zip(open_times[start:].tolist(), closes[start:].tolist(),
+                                               highs[start:].tolist(), lows[start:].tolist()):
+            value = update(close, high, low)
+            tracked.history.append(value)
+            tracked.last_open_time = open_time
+
+    def warm_up(self, symbol: str, interval: str, arrays: Dict[str, Any]):
+        """Feed closed candles (timestamp/close/high/low arrays) to every indicator on a stream"""
+        with self._lock:
+            for key in self._streams.get((symbol.upper(), interval), []):
+                self._feed(key, arrays['timestamp'], arrays['close'], arrays['high'], arrays['low'])
+
+    def on_kline(self, symbol: str, interval: str, kline: Dict):
+        """WebSocket update callback - advance on closes, refresh provisional values on ticks"""
+        keys = self._streams.get((symbol, interval))
+        if not keys:
+            return
+
+        close, high, low = kline['close'], kline['high'], kline['low']
+        with self._lock:
+            if not kline.get('is_closed'):
+                for key in keys:
+                    tracked = self._tracked[key]
+                    tracked.provisional = tracked.indicator.peek(close, high, low)
+                return
+
+            interval_ms = interval_to_ms(interval)
+            for key in keys:
+                tracked = self._tracked[key]
+                if tracked.last_open_time is not None:
+                    if kline['timestamp'] <= tracked.last_open_time:
+                        continue  # Already applied
+                    if interval_ms and kline['timestamp'] > tracked.last_open_time + interval_ms:
+                        self._stale.add((symbol, interval))
+                        continue
+                tracked.history.append(tracked.indicator.update(close, high, low))
+                tracked.last_open_time = kline['timestamp']
+                tracked.provisional = None
+
+    def on_history(self, symbol: str, interval: str):
+        """History callback - candles merged into the cache out of band are folded in on the next read"""
+        with self._lock:
+            if self._streams.get((symbol, interval)):
+                self._stale.add((symbol, interval))
+
+    def _rebuild_if_stale(self, symbol: str, interval: str):
+        stream = (symbol, interval)
+        if stream not in self._stale or self.manager is None:
+            return
+        if not self.manager.is_continuous(symbol, interval):
+            return  # Wait for the gap backfill
+        for key in self._streams.get(stream, []):
+            tracked = self._tracked[key]
+            tracked.indicator = type(tracked.indicator)(**dict(key[3]))
+            tracked.history.clear()
+            tracked.last_open_time = None
+            tracked.provisional = None
+            self._warm_up(key)
+        self._stale.discard(stream)
+        self.logger.info(f"🔁 Rebuilt {symbol} {interval} indicators from the kline cache")
+
+    def value(self, symbol: str, interval: str, name: str, provisional: bool = False,
+              offset: int = 0, **params):
+        """Latest value (`offset` closed candles back), or the forming candle's provisional value"""
+        key = self.key(symbol, interval, name, **params)
+        with self._lock:
+            self._rebuild_if_stale(key[0], key[1])
+            tracked = self._tracked.get(key)
+            if tracked is None:
+                return None
+            if provisional and tracked.provisional is not None:
+                return tracked.provisional
+            if offset >= len(tracked.history):
+                return None
+            return tracked.history[-1 - offset]
+
+    def latest(self, symbol: str, interval: str, open_time: Optional[int] = None) -> Dict[str, Any]:
+        """Newest closed value of every indicator tracked on a stream, by output name
+
+        With `open_time`, values are returned only if every indicator has
+        consumed exactly that candle (otherwise an empty dict).
+        """
+        symbol = symbol.upper()
+        values = {}
+        with self._lock:
+            self._rebuild_if_stale(symbol, interval)
+            keys = self._streams.get((symbol, interval), [])
+            if open_time is not None and any(self._tracked[key].last_open_time != open_time for key in keys):
+                return {}
+            for key in keys:
+                tracked = self._tracked[key]
+                value = tracked.history[-1] if tracked.history else None
+                params = dict(key[3])
+                suffix = '_'.join(str(params[name]) for name in inspect.signature(INDICATORS[key[2]]).parameters
+                                  if name in params)
+                outputs = tracked.indicator.outputs
+                if len(outputs) == 1:
+                    values[f"{outputs[0]}_{suffix}" if suffix else outputs[0]] = value
+                else:
+                    for index, output in enumerate(outputs):
+                        label = f"{output}_{suffix}" if suffix else output
+                        values[label] = value[index] if value is not None else None
+        return values
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-data state of every tracked indicator (restorable with `restore`)"""
+        with self._lock:
+            return {
+                'history': self.history,
+                'indicators': [
+                    {
+                        'symbol': key[0], 'interval': key[1], 'name': key[2], 'params': dict(key[3]),
+                        'state': tracked.indicator.state(), 'last_open_time': tracked.last_open_time,
+                        'history': list(tracked.history)
+                    }
+                    for key, tracked in self._tracked.items()
+                ]
+            }
+
+    def restore(self, snapshot: Dict[str, Any]):
+        """Load indicator states saved by `snapshot`; newer cached candles are fed on top"""
+        with self._lock:
+            for entry in snapshot['indicators']:
+                key = self.key(entry['symbol'], entry['interval'], entry['name'], **entry['params'])
+                if key not in self._tracked:
+                    self._tracked[key] = _Tracked(INDICATORS[key[2]](**entry['params']), self.history)
+                    self._streams.setdefault(key[:2], []).append(key)
+                tracked = self._tracked[key]
+                tracked.indicator.load_state(entry['state'])
+                tracked.last_open_time = entry['last_open_time']
+                tracked.history.clear()
+                tracked.history.extend(tuple(value) if isinstance(value, list) else value
+                                       for value in entry['history'])
+                self._warm_up(key)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'tracked_indicators': len(self._tracked),
+                'streams': len(self._streams),
+                'stale_streams': len(self._stale)
+            }
+
+
+# Global indicator engine instance
+indicator_engine = IndicatorEngine()
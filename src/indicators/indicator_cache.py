@@ -0,0 +1,149 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher.websocket_manager import websocket_manager
+
+CacheKey = Tuple[str, str, int, str, Tuple[Tuple[str, Any], ...]]  # (symbol, interval, candle, indicator, params)
+
+
+class IndicatorCache:
+    """Process-wide LRU of indicator results, keyed by candle and parameters
+
+    Entries are keyed by (symbol, interval, open time of the window's last
+    candle, indicator, params). Each entry also records a fingerprint of the
+    input window (length, first/last open time and last close). A different
+    window, or a forming candle that has moved since, counts as a miss.
+    Strategies that share a symbol and timeframe therefore compute each
+    indicator once per candle state, and the dashboard can read what they
+    computed.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[CacheKey, Tuple[Any, Any]]' = OrderedDict()  # key -> (fingerprint, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(symbol: str, interval: str, candle_open_time: int, indicator: str, params: Dict[str, Any]) -> CacheKey:
+        return symbol.upper(), interval, int(candle_open_time), indicator, tuple(sorted(params.items()))
+
+    def get_or_compute(self, symbol: str, interval: str, candle_open_time: Optional[int], indicator: str,
+                       params: Dict[str, Any], compute: Callable[[], Any], fingerprint: Any = None) -> Any:
+        """Cached result for this candle and params, or `compute()` it and cache it"""
+        if candle_open_time is None:
+            return compute()
+
+        key = self.key(symbol, interval, candle_open_time, indicator, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (fingerprint, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def for_frame(self, symbol: Optional[str], interval: Optional[str], df: pd.DataFrame, indicator: str,
+                  params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """`get_or_compute` for a DataFrame of candles, keyed by its own open times
+
+        Without a symbol/interval, or without open times (a 'timestamp'
+        column or a DatetimeIndex) to identify the window, the result is
+        computed and not cached.
+        """
+        fingerprint = frame_fingerprint(df) if symbol and interval else None
+        if fingerprint is None:
+            return compute()
+        return self.get_or_compute(symbol, interval, fingerprint[2], indicator, params, compute, fingerprint)
+
+    def latest(self, symbol: str, interval: str, indicator: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Newest cached result for a stream, if it was computed on the current closed candle"""
+        candle_open_time = websocket_manager.get_last_closed_open_time(symbol, interval)
+        if candle_open_time is None:
+            return None
+        key = self.key(symbol, interval, candle_open_time, indicator, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+
+def frozen_columns(columns: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Column name -> read-only array, the form DataFrame indicator results are cached in
+
+    Read-only so one caller cannot alter a result through its DataFrame
+    that another caller will read.
+    """
+    frozen = {}
+    for column, values in columns.items():
+        values = np.array(values)
+        values.flags.writeable = False
+        frozen[column] = values
+    return frozen
+
+
+def frame_open_times(df: pd.DataFrame) -> Optional[Tuple[int, int]]:
+    """First and last candle open time (ms), from a 'timestamp' column or a DatetimeIndex
+
+    None when the DataFrame has neither, e.g. after a reset to a RangeIndex.
+    """
+    if df.empty:
+        return None
+    if 'timestamp' in df.columns:
+        times = df['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(times):
+            return times.iloc[0].value // 1_000_000, times.iloc[-1].value // 1_000_000
+        if pd.api.types.is_numeric_dtype(times):
+            return int(times.iloc[0]), int(times.iloc[-1])
+        return None
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index[0].value // 1_000_000, df.index[-1].value // 1_000_000
+    return None
+
+
+def frame_fingerprint(df: pd.DataFrame) -> Optional[Tuple]:
+    """Identifies the input window: indicators like Wilder RSI depend on where it starts"""
+    open_times = frame_open_times(df)
+    if open_times is None:
+        return None
+    return len(df), *open_times, float(df['close'].iloc[-1])
+
+
+# Global indicator cache instance
+indicator_cache = IndicatorCache()
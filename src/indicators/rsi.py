@@ -0,0 +1,58 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder moving average along the last axis of a 2D array
+
+    The first output is the SMA of the first `period` values; after that
+    avg = (avg * (period - 1) + x) / period, which is an EWM with
+    alpha = 1 / period started at the seed. The recursion runs in pandas'
+    compiled ewm kernel rather than a Python loop (scipy.signal.lfilter
+    would work as well, but no indicator path imports scipy). Output has
+    `values.shape[1] - period + 1` columns.
+    """
+    seeded = values[:, period - 1:].copy()
+    seeded[:, 0] = values[:, :period].mean(axis=1)
+    smoothed = pd.DataFrame(seeded.T).ewm(alpha=1.0 / period, adjust=False).mean()
+    return smoothed.to_numpy().T
+
+
+def wilder_rsi(closes, period: int = 14) -> np.ndarray:
+    """Wilder RSI for a 1D series or a 2D (symbols x time) batch of closes
+
+    Matches the textbook / Binance method: gains and losses are seeded with
+    the simple average of the first `period` changes, then smoothed with
+    Wilder's recursion. The first `period` values are NaN. When there are no
+    losses the RSI is 100, or 50 if the price did not move at all. Rows of a
+    batch must be aligned and gap-free.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    batch = np.atleast_2d(closes)
+    rsi = np.full(batch.shape, np.nan)
+
+    if batch.shape[1] > period:
+        deltas = np.diff(batch, axis=1)
+        avg_gain = wilder_smooth(np.clip(deltas, 0, None), period)
+        avg_loss = wilder_smooth(np.clip(-deltas, 0, None), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = 100 - 100 / (1 + avg_gain / avg_loss)
+        flat = avg_loss == 0
+        values[flat] = np.where(avg_gain[flat] > 0, 100.0, 50.0)
+        rsi[:, period:] = values
+
+    return rsi if closes.ndim > 1 else rsi[0]
+
+
+def rsi_series(prices: pd.Series, period: int = 14) -> pd.Series:
+    """Wilder RSI aligned to a price Series' index"""
+    return pd.Series(wilder_rsi(prices.to_numpy(dtype=np.float64), period), index=prices.index)
+
+
+def latest_rsi(prices: Sequence[float], period: int = 14) -> Optional[float]:
+    """Wilder RSI of the newest price, or None with fewer than `period + 1` prices"""
+    if len(prices) < period + 1:
+        return None
+    return float(wilder_rsi(prices, period)[-1])
@@ -0,0 +1,209 @@
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Sweep(NamedTuple):
+    direction: str  # "LONG" after a swing low sweep, "SHORT" after a swing high sweep
+    level: float
+    pierce: float
+    recovery_candles: int
+
+
+def swing_points(highs: np.ndarray, lows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices of swing highs and lows: strictly beyond the candle on each side"""
+    highs, lows = np.asarray(highs, dtype=np.float64), np.asarray(lows, dtype=np.float64)
+    if len(highs) < 3:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    swing_high = (highs[1:-1] > highs[:-2]) & (highs[1:-1] > highs[2:])
+    swing_low = (lows[1:-1] < lows[:-2]) & (lows[1:-1] < lows[2:])
+    return np.flatnonzero(swing_high) + 1, np.flatnonzero(swing_low) + 1
+
+
+def distance_mask(prices: np.ndarray, reference: float, min_distance_pct: float) -> np.ndarray:
+    """True where a price is at least `min_distance_pct` percent away from `reference`"""
+    return np.abs(np.asarray(prices) - reference) >= reference * (min_distance_pct / 100)
+
+
+def liquidity_zones(highs: np.ndarray, lows: np.ndarray, lookback: int,
+                    min_distance_pct: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Swing high/low indices within the last `lookback` candles and far enough from the last high"""
+    swing_highs, swing_lows = swing_points(highs, lows)
+    start = max(0, len(highs) - lookback)
+    reference = highs[-1]
+    swing_highs = swing_highs[swing_highs >= start]
+    swing_lows = swing_lows[swing_lows >= start]
+    swing_highs = swing_highs[distance_mask(highs[swing_highs], reference, min_distance_pct)]
+    swing_lows = swing_lows[distance_mask(lows[swing_lows], reference, min_distance_pct)]
+    return swing_highs, swing_lows
+
+
+def _first_sweep(extremes: np.ndarray, closes: np.ndarray, levels: np.ndarray, thresholds: np.ndarray,
+                 reversion_candles: int, below: bool) -> Optional[Tuple[int, int, int]]:
+    """(level index, candle index, recovery count) of the first pierce followed by a recovery close
+
+    Levels are tried in order and, for each level, the last `reversion_candles`
+    candles oldest first - the order the original nested loops used.
+    """
+    n = len(closes)
+    recent = min(reversion_candles, n - 1)
+    if recent <= 0 or not len(levels):
+        return None
+    candles = np.arange(n - recent, n)
+
+    if below:
+        pierced = extremes[candles][None, :] <= thresholds[:, None]
+    else:
+        pierced = extremes[candles][None, :] >= thresholds[:, None]
+
+    # Closes in the reversion window after each candle, NaN past the end of the data
+    following = candles[:, None] + np.arange(1, reversion_candles + 1)[None, :]
+    window = np.where(following < n, closes[np.minimum(following, n - 1)], np.nan)
+    with np.errstate(invalid='ignore'):
+        if below:
+            recovered = window[None, :, :] > levels[:, None, None]
+        else:
+            recovered = window[None, :, :] < levels[:, None, None]
+    recovery = recovered.sum(axis=2)
+
+    hits = pierced & (recovery >= 1)
+    if not hits.any():
+        return None
+    level, candle = np.unravel_index(np.argmax(hits), hits.shape)
+    return int(level), int(candles[candle]), int(recovery[level, candle])
+
+
+def find_sweep(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, swing_high_prices: Sequence[float],
+               swing_low_prices: Sequence[float], sweep_threshold_pct: float,
+               reversion_candles: int) -> Optional[Sweep]:
+    """Most recent liquidity sweep of the last three swing lows, then highs
+
+    A sweep is a recent candle piercing a swing level by `sweep_threshold_pct`
+    percent, with at least one close back on the other side of the level
+    within `reversion_candles`. Swing lows are checked first.
+    """
+    highs, lows, closes = (np.asarray(values, dtype=np.float64) for values in (highs, lows, closes))
+
+    levels = np.asarray(swing_low_prices[-3:], dtype=np.float64)
+    found = _first_sweep(lows, closes, levels, levels * (1 - sweep_threshold_pct / 100), reversion_candles,
+                         below=True)
+    if found:
+        level, candle, recovery = found
+        return Sweep("LONG", float(levels[level]), float(lows[candle]), recovery)
+
+    levels = np.asarray(swing_high_prices[-3:], dtype=np.float64)
+    found = _first_sweep(highs, closes, levels, levels * (1 + sweep_threshold_pct / 100), reversion_candles,
+                         below=False)
+    if found:
+        level, candle, recovery = found
+        return Sweep("SHORT", float(levels[level]), float(highs[candle]), recovery)
+    return None
+
+
+class SwingTracker:
+    """Closed candles and confirmed swing points of one stream, maintained as candles close
+
+    A candle is confirmed as a swing once the candle after it closes, so each
+    close does O(1) work instead of rescanning the window. Data lives in
+    preallocated arrays of twice the capacity that are compacted when full,
+    so `highs` etc. are always contiguous views. A gap in open times clears
+    the tracker, since swings must come from consecutive candles.
+    """
+
+    FIELDS = ('high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity: int = 500, interval_ms: Optional[int] = None):
+        self.capacity = capacity
+        self.interval_ms = interval_ms
+        self._data = np.zeros((len(self.FIELDS), 2 * capacity), dtype=np.float64)
+        self._is_swing_high = np.zeros(2 * capacity, dtype=bool)
+        self._is_swing_low = np.zeros(2 * capacity, dtype=bool)
+        self._start = 0
+        self._end = 0
+        self.last_open_time: Optional[int] = None
+        self.resets = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def clear(self):
+        self._start = self._end = 0
+        self.last_open_time = None
+
+    def update(self, open_time: int, high: float, low: float, close: float, volume: float) -> bool:
+        """Add a closed candle; False if it was a duplicate of one already added"""
+        if self.last_open_time is not None:
+            if open_time <= self.last_open_time:
+                return False
+            if self.interval_ms and open_time != self.last_open_time + self.interval_ms:
+                self.clear()
+                self.resets += 1
+
+        if self._end == self._data.shape[1]:
+            self._compact()
+        self._data[:, self._end] = (high, low, close, volume)
+        self._is_swing_high[self._end] = self._is_swing_low[self._end] = False
+        self._end += 1
+        self.last_open_time = open_time
+
+        # The previous candle now has a neighbour on both sides
+        if len(self) >= 3:
+            i = self._end - 2
+            highs, lows = self._data[0], self._data[1]
+            self._is_swing_high[i] = highs[i] > highs[i - 1] and highs[i] > highs[i + 1]
+            self._is_swing_low[i] = lows[i] < lows[i - 1] and lows[i] < lows[i + 1]
+
+        if len(self) > self.capacity:
+            self._start += 1
+        return True
+
+    def load(self, rows: np.ndarray):
+        """Replace contents with (n, 7) closed candles in Binance REST column order"""
+        self.clear()
+        for row in rows[-self.capacity:]:
+            self.update(int(row[0]), row[2], row[3], row[4], row[5])
+
+    def _compact(self):
+        count = len(self)
+        for array in (self._data, self._is_swing_high, self._is_swing_low):
+            array[..., :count] = array[..., self._start:self._end]
+        self._start, self._end = 0, count
+
+    def _column(self, row: int) -> np.ndarray:
+        view = self._data[row, self._start:self._end]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def highs(self) -> np.ndarray:
+        return self._column(0)
+
+    @property
+    def lows(self) -> np.ndarray:
+        return self._column(1)
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self._column(2)
+
+    @property
+    def volumes(self) -> np.ndarray:
+        return self._column(3)
+
+    def liquidity_zones(self, lookback: int, min_distance_pct: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Same result as `liquidity_zones(self.highs, self.lows, ...)`, from the maintained swing flags"""
+        count = len(self)
+        if count == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        start = max(self._start, self._end - lookback)
+        # The first candle in the window has no left neighbour inside it
+        start = max(start, self._start + 1)
+        swing_highs = np.flatnonzero(self._is_swing_high[start:self._end]) + (start - self._start)
+        swing_lows = np.flatnonzero(self._is_swing_low[start:self._end]) + (start - self._start)
+        highs, lows = self.highs, self.lows
+        reference = highs[-1]
+        swing_highs = swing_highs[distance_mask(highs[swing_highs], reference, min_distance_pct)]
+        swing_lows = swing_lows[distance_mask(lows[swing_lows], reference, min_distance_pct)]
+        return swing_highs, swing_lows
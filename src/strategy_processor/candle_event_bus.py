@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.data_fetcher.callback_dispatcher import COALESCE
+
+
+@dataclass
+class CandleCloseEvent:
+    """A closed candle that a subscriber should be evaluated on"""
+    subscriber: str
+    symbol: str
+    interval: str
+    open_time: int
+    close: float
+    closed_at: float  # time.time() when the close was received
+    coalesced: int = 0  # Earlier closes for this subscriber folded into this event
+
+
+class CandleCloseEventBus:
+    """Queues strategy evaluations when a subscribed symbol/interval candle closes
+
+    The bus is fed by `WebSocketKlineManager` update callbacks on a dispatcher
+    worker thread and drained by an async consumer (the bot's main loop). Closes that
+    arrive for a subscriber before the consumer drains its queue collapse into
+    one event for the newest candle, so a slow evaluation never builds a backlog.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._subscribers: Dict[Tuple[str, str], Set[str]] = defaultdict(set)  # (symbol, interval) -> names
+        self._pending: Dict[str, CandleCloseEvent] = {}  # subscriber -> newest queued event
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+
+        self.stats = {
+            'closes_received': 0,
+            'events_queued': 0,
+            'events_coalesced': 0,
+            'events_dispatched': 0,
+            'last_dispatch_latency_ms': None,
+            'max_dispatch_latency_ms': 0.0
+        }
+
+    def subscribe(self, subscriber: str, symbol: str, interval: str):
+        """Evaluate `subscriber` whenever a `symbol` `interval` candle closes"""
+        with self._lock:
+            self._unsubscribe_locked(subscriber)
+            self._subscribers[(symbol.upper(), interval)].add(subscriber)
+
+    def unsubscribe(self, subscriber: str):
+        with self._lock:
+            self._unsubscribe_locked(subscriber)
+            self._pending.pop(subscriber, None)
+
+    def _unsubscribe_locked(self, subscriber: str):
+        for key in [key for key, names in self._subscribers.items() if subscriber in names]:
+            self._subscribers[key].discard(subscriber)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+    def subscriptions(self) -> Dict[str, Tuple[str, str]]:
+        """subscriber -> (symbol, interval)"""
+        with self._lock:
+            return {name: key for key, names in self._subscribers.items() for name in names}
+
+    def attach(self, websocket_manager):
+        """Receive candle updates from a WebSocketKlineManager"""
+        websocket_manager.add_update_callback(self.on_kline, policy=COALESCE)
+
+    def on_kline(self, symbol: str, interval: str, kline: Dict):
+        """WebSocket update callback - queues evaluations for closed candles only"""
+        if not kline.get('is_closed'):
+            return
+
+        now = time.time()
+        with self._lock:
+            self.stats['closes_received'] += 1
+            subscribers = self._subscribers.get((symbol, interval))
+            if not subscribers:
+                return
+            for subscriber in subscribers:
+                previous = self._pending.get(subscriber)
+                coalesced = 0
+                if previous is not None:
+                    coalesced = previous.coalesced + 1
+                    self.stats['events_coalesced'] += 1
+                self._pending[subscriber] = CandleCloseEvent(
+                    subscriber, symbol, interval, kline['timestamp'], kline['close'],
+                    kline.get('received_at') or now, coalesced
+                )
+                self.stats['events_queued'] += 1
+            loop, ready = self._loop, self._ready
+
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(ready.set)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self) -> List[CandleCloseEvent]:
+        """Take every queued event, oldest close first"""
+        with self._lock:
+            events = sorted(self._pending.values(), key=lambda event: event.closed_at)
+            self._pending.clear()
+
+        now = time.time()
+        for event in events:
+            latency_ms = (now - event.closed_at) * 1000
+            self.stats['last_dispatch_latency_ms'] = latency_ms
+            self.stats['max_dispatch_latency_ms'] = max(self.stats['max_dispatch_latency_ms'], latency_ms)
+        self.stats['events_dispatched'] += len(events)
+        return events
+
+    async def wait_for_events(self, timeout: Optional[float] = None) -> List[CandleCloseEvent]:
+        """Sleep until a subscribed candle closes (or `timeout`), then drain the queue"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                self._loop = loop
+                self._ready = asyncio.Event()
+            ready = self._ready
+            if self._pending:
+                ready.set()
+
+        try:
+            await asyncio.wait_for(ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        ready.clear()
+        return self.drain()
+
+    def stop(self):
+        """Wake a consumer blocked in wait_for_events so it can notice shutdown"""
+        with self._lock:
+            loop, ready = self._loop, self._ready
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(ready.set)
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['subscriptions'] = sum(len(names) for names in self._subscribers.values())
+            stats['pending'] = len(self._pending)
+        return stats
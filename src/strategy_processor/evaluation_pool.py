@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class _Job:
+    fn: Callable
+    args: Tuple
+    future: Future = field(default_factory=Future)
+    submitted: float = field(default_factory=time.perf_counter)
+    started: bool = False
+
+
+class EvaluationPool:
+    """Runs strategy evaluations on worker threads, one at a time per symbol
+
+    Jobs with the same key (the symbol) run strictly in submission order, so
+    two strategies on one symbol cannot race into duplicate positions. Jobs
+    for different keys run concurrently on up to `max_workers` threads.
+    Each key's next job is handed to the executor only when the previous
+    one finishes, so a backlog on one symbol never occupies extra workers.
+    """
+
+    def __init__(self, max_workers: int = 4, thread_name_prefix: str = 'strategy-eval'):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._lanes: Dict[str, Deque[_Job]] = {}  # key -> jobs; the head is running or handed to the executor
+        self._queued = 0  # Submitted but not yet started
+        self._running = 0
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'max_queue_depth': 0,
+            'max_running': 0,
+            'last_wait_ms': None,
+            'max_wait_ms': 0.0,
+            'last_run_ms': None,
+            'max_run_ms': 0.0
+        }
+
+    def submit(self, key: str, fn: Callable, *args) -> Future:
+        """Run `fn(*args)` after every job already submitted for `key`"""
+        job = _Job(fn, args)
+        with self._lock:
+            lane = self._lanes.get(key)
+            idle = lane is None
+            if idle:
+                lane = self._lanes[key] = deque()
+            lane.append(job)
+            self._queued += 1
+            self.stats['submitted'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queued)
+        if idle:
+            self._hand_off(key, job)
+        return job.future
+
+    def _hand_off(self, key: str, job: _Job):
+        try:
+            self._executor.submit(self._run, key, job)
+        except RuntimeError as e:
+            # Shut down - fail the lane's waiting jobs rather than leave their futures pending
+            with self._lock:
+                abandoned = list(self._lanes.pop(key, ()))
+                self._queued -= len(abandoned)
+            for waiting in abandoned:
+                waiting.future.set_exception(e)
+
+    async def run_all(self, jobs: Iterable[Tuple[str, Callable, Tuple]]) -> List[Any]:
+        """Submit (key, fn, args) jobs and wait for all of them; failures are returned as exceptions"""
+        futures = [asyncio.wrap_future(self.submit(key, fn, *args)) for key, fn, args in jobs]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    def _run(self, key: str, job: _Job):
+        started = time.perf_counter()
+        wait_ms = (started - job.submitted) * 1000
+        with self._lock:
+            job.started = True
+            self._queued -= 1
+            self._running += 1
+            self.stats['max_running'] = max(self.stats['max_running'], self._running)
+            self.stats['last_wait_ms'] = wait_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+
+        result = error = None
+        try:
+            result = job.fn(*job.args)
+        except BaseException as e:
+            error = e
+            self.logger.error(f"❌ Evaluation for {key} failed: {e}")
+
+        run_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._running -= 1
+            self.stats['failed' if error is not None else 'completed'] += 1
+            self.stats['last_run_ms'] = run_ms
+            self.stats['max_run_ms'] = max(self.stats['max_run_ms'], run_ms)
+            lane = self._lanes[key]
+            lane.popleft()
+            next_job = lane[0] if lane else None
+            if next_job is None:
+                del self._lanes[key]
+        if next_job is not None:
+            self._hand_off(key, next_job)
+
+        # Resolve last, so a waiter sees the bookkeeping already done
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    def queue_depth(self, key: Optional[str] = None) -> int:
+        """Jobs waiting to start, overall or for one key"""
+        with self._lock:
+            if key is None:
+                return self._queued
+            return sum(not job.started for job in self._lanes.get(key, ()))
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['max_workers'] = self.max_workers
+            stats['queue_depth'] = self._queued
+            stats['running'] = self._running
+            stats['busy_symbols'] = len(self._lanes)
+        return stats
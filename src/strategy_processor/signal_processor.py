@@ -31,6 +31,8 @@ class SignalProcessor:
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._engulfing_evaluators = {}  # strategy name -> IncrementalEngulfingEvaluator
+        self._smart_money = {}  # strategy name -> SmartMoneyStrategy, kept for its swing tracker and trade count
 
     def evaluate_entry_conditions(self, df: pd.DataFrame, strategy_config: Dict) -> Optional[TradingSignal]:
         """Evaluate entry conditions based on strategy"""
@@ -49,9 +51,11 @@ class SignalProcessor:
             elif 'engulfing' in strategy_name.lower():
                 return self._evaluate_engulfing_pattern(df, current_price, strategy_config)
             elif 'smart' in strategy_name.lower() and 'money' in strategy_name.lower():
-                # Smart Money strategy is handled directly by the strategy class
-                # Signal processor doesn't need to generate signals for it
-                return None
+                from src.strategy_processor.strategy_interface import CandleFrame
+
+                frame = CandleFrame.from_dataframe(df, strategy_config.get('symbol', ''),
+                                                   strategy_config.get('timeframe', ''))
+                return self.smart_money_strategy(strategy_config).evaluate_entry(frame)
             else:
                 self.logger.warning(f"Unknown strategy type: {strategy_name}")
                 return None
@@ -98,7 +102,15 @@ class SignalProcessor:
                 self.logger.warning("❌ RSI column not found in dataframe")
                 return None
 
-            rsi_current = df['rsi'].iloc[-1]
+            return self._rsi_signal(df['rsi'].iloc[-1], current_price, config)
+
+        except Exception as e:
+            self.logger.error(f"Error in RSI strategy evaluation: {e}")
+            return None
+
+    def _rsi_signal(self, rsi_current: float, current_price: float, config: Dict) -> Optional[TradingSignal]:
+        """RSI entry decision from the latest RSI value"""
+        try:
             margin = config.get('margin', 50.0)
             leverage = config.get('leverage', 5)
             max_loss_pct = config.get('max_loss_pct', 5)
@@ -198,16 +210,12 @@ class SignalProcessor:
     def _evaluate_engulfing_pattern(self, df: pd.DataFrame, current_price: float, config: Dict) -> Optional[TradingSignal]:
         """Engulfing Pattern strategy evaluation"""
         try:
-            from src.execution_engine.strategies.engulfing_pattern_strategy import EngulfingPatternStrategy
-
-            strategy_name = config.get('name', 'engulfing_pattern')
-            strategy = EngulfingPatternStrategy(strategy_name, config)
-
-            # Calculate indicators
-            df_with_indicators = strategy.calculate_indicators(df.copy())
+            # Incremental state per strategy: only candles closed since the last call are processed
+            evaluator = self._engulfing_evaluator(config)
+            evaluator.sync(df)
 
-            # Evaluate signal
-            signal = strategy.evaluate_entry_signal(df_with_indicators)
+            # Evaluate signal on the last closed candle
+            signal = evaluator.evaluate_entry_signal()
 
             return signal
 
@@ -215,6 +223,131 @@ class SignalProcessor:
             self.logger.error(f"Error in Engulfing Pattern evaluation: {e}")
             return None
 
+    def array_strategy(self, strategy_config: Dict):
+        """The frame-native (ArrayStrategy) implementation of a configured strategy"""
+        from src.strategy_processor.strategy_interface import as_array_strategy
+
+        strategy_name = strategy_config.get('name', '').lower()
+        if 'macd' in strategy_name:
+            from src.execution_engine.strategies.macd_divergence_strategy import MACDDivergenceStrategy
+            return as_array_strategy(MACDDivergenceStrategy(strategy_config))
+        if 'engulfing' in strategy_name:
+            return self._engulfing_evaluator(strategy_config)
+        return None
+
+    def smart_money_strategy(self, config: Dict):
+        """The SmartMoneyStrategy for a configured strategy, rebuilt (and detached) when its config changes"""
+        from src.execution_engine.strategies.smart_money_config import SmartMoneyStrategy
+
+        strategy_name = config.get('name', 'smart_money')
+        strategy = self._smart_money.get(strategy_name)
+        if strategy is None or strategy.config != config:
+            if strategy is not None:
+                strategy.detach()
+            strategy = SmartMoneyStrategy(dict(config))
+            self._smart_money[strategy_name] = strategy
+        return strategy
+
+    def release_strategy(self, strategy_name: str):
+        """Drop the per-strategy state kept for a strategy that is no longer evaluated"""
+        self._engulfing_evaluators.pop(strategy_name, None)
+        strategy = self._smart_money.pop(strategy_name, None)
+        if strategy is not None:
+            strategy.detach()
+
+    def _engulfing_evaluator(self, config: Dict):
+        from src.execution_engine.strategies.engulfing_pattern_strategy import (
+            EngulfingPatternStrategy, IncrementalEngulfingEvaluator)
+
+        strategy_name = config.get('name', 'engulfing_pattern')
+        evaluator = self._engulfing_evaluators.get(strategy_name)
+        if evaluator is None or evaluator.config_changed(config):
+            evaluator = IncrementalEngulfingEvaluator(EngulfingPatternStrategy(strategy_name, config))
+            self._engulfing_evaluators[strategy_name] = evaluator
+        return evaluator
+
+    def evaluate_entry_frame(self, frame, strategy_config: Dict) -> Optional[TradingSignal]:
+        """`evaluate_entry_conditions` on a CandleFrame - no DataFrame on the per-candle path"""
+        try:
+            if len(frame) < 50:
+                return None
+
+            strategy_name = strategy_config.get('name', 'unknown').lower()
+            if 'rsi' in strategy_name and 'engulfing' not in strategy_name:
+                return self._rsi_signal(self._frame_rsi(frame), float(frame.close[-1]), strategy_config)
+            if 'smart' in strategy_name and 'money' in strategy_name:
+                return self.smart_money_strategy(strategy_config).evaluate_tracked(frame)
+
+            strategy = self.array_strategy(strategy_config)
+            if strategy is None:
+                self.logger.warning(f"Unknown strategy type: {strategy_config.get('name')}")
+                return None
+            return strategy.evaluate_entry(frame)
+
+        except Exception as e:
+            self.logger.error(f"Error evaluating entry conditions: {e}")
+            return None
+
+    def evaluate_exit_frame(self, frame, position: Dict, strategy_config: Dict):
+        """`evaluate_exit_conditions` on a CandleFrame"""
+        try:
+            strategy_name = strategy_config.get('name', '').lower()
+            if 'rsi' in strategy_name and 'engulfing' not in strategy_name:
+                return self._rsi_exit_reason(self._frame_rsi(frame), position.get('side', 'BUY'),
+                                             strategy_config) or False
+
+            strategy = self.array_strategy(strategy_config)
+            if strategy is not None:
+                return strategy.evaluate_exit(frame, position) or False
+
+            # Fallback to traditional TP/SL for non-RSI strategies
+            if frame.close[-1] >= position['take_profit']:
+                return "Take Profit"
+            return False
+
+        except Exception as e:
+            self.logger.error(f"Error evaluating exit conditions: {e}")
+            return False
+
+    def _rsi_exit_reason(self, rsi_current: float, position_side: str, strategy_config: Dict) -> Optional[str]:
+        """RSI take-profit decision for an open position"""
+        # Get configurable RSI exit levels
+        rsi_long_exit = strategy_config.get('rsi_long_exit', 70)
+        rsi_short_exit = strategy_config.get('rsi_short_exit', 30)
+
+        # Long position: Take profit when RSI reaches configured exit level
+        if position_side == 'BUY' and rsi_current >= rsi_long_exit:
+            self.logger.info(f"LONG TAKE PROFIT: RSI {rsi_current:.2f} >= {rsi_long_exit}")
+            return f"Take Profit (RSI {rsi_long_exit}+)"
+
+        # Short position: Take profit when RSI reaches configured exit level
+        elif position_side == 'SELL' and rsi_current <= rsi_short_exit:
+            self.logger.info(f"SHORT TAKE PROFIT: RSI {rsi_current:.2f} <= {rsi_short_exit}")
+            return f"Take Profit (RSI {rsi_short_exit}-)"
+
+        return None
+
+    def stream_indicators(self, strategy_config: Dict) -> List[Tuple[str, Dict]]:
+        """Incremental indicators (name, params) the frame path reads from `frame.state` for a strategy"""
+        strategy_name = strategy_config.get('name', '').lower()
+        if 'rsi' in strategy_name and 'engulfing' not in strategy_name:
+            return [('rsi', {'period': 14})]
+        return []
+
+    def _frame_rsi(self, frame) -> float:
+        """Latest 14-period RSI of a frame - the streaming engine's value, else shared through the indicator cache"""
+        from src.indicators.indicator_cache import frozen_columns, indicator_cache
+        from src.indicators.rsi import wilder_rsi
+
+        if frame.state.get('rsi_14') is not None:
+            return float(frame.state['rsi_14'])
+
+        candle = frame.last_open_time if frame.symbol and frame.interval else None
+        columns = indicator_cache.get_or_compute(frame.symbol, frame.interval, candle, 'rsi', {'period': 14},
+                                                 lambda: frozen_columns({'rsi': wilder_rsi(frame.close, 14)}),
+                                                 frame.fingerprint())
+        return float(columns['rsi'][-1])
+
     def evaluate_exit_conditions(self, df: pd.DataFrame, position: Dict, strategy_config: Dict) -> bool:
         """Evaluate if position should be closed"""
         try:
@@ -233,21 +366,9 @@ class SignalProcessor:
 
             # RSI-based exit conditions for RSI strategies (excluding engulfing)
             if 'rsi' in strategy_name.lower() and 'engulfing' not in strategy_name.lower() and 'rsi' in df.columns:
-                rsi_current = df['rsi'].iloc[-1]
-
-                # Get configurable RSI exit levels
-                rsi_long_exit = strategy_config.get('rsi_long_exit', 70)
-                rsi_short_exit = strategy_config.get('rsi_short_exit', 30)
-
-                # Long position: Take profit when RSI reaches configured exit level
-                if position_side == 'BUY' and rsi_current >= rsi_long_exit:
-                    self.logger.info(f"LONG TAKE PROFIT: RSI {rsi_current:.2f} >= {rsi_long_exit}")
-                    return f"Take Profit (RSI {rsi_long_exit}+)"
-
-                # Short position: Take profit when RSI reaches configured exit level
-                elif position_side == 'SELL' and rsi_current <= rsi_short_exit:
-                    self.logger.info(f"SHORT TAKE PROFIT: RSI {rsi_current:.2f} <= {rsi_short_exit}")
-                    return f"Take Profit (RSI {rsi_short_exit}-)"
+                exit_reason = self._rsi_exit_reason(df['rsi'].iloc[-1], position_side, strategy_config)
+                if exit_reason:
+                    return exit_reason
 
             # Engulfing Pattern exit conditions
             elif 'engulfing' in strategy_name.lower():
@@ -0,0 +1,165 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional, Protocol, runtime_checkable
+
+import numpy as np
+import pandas as pd
+
+from src.strategy_processor.signal_processor import TradingSignal
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+@dataclass(frozen=True)
+class CandleFrame:
+    """Candles of one stream as NumPy column views, oldest first
+
+    The per-candle alternative to a DataFrame: building one from the kline
+    cache copies nothing, and strategies read scalars with plain indexing
+    (`frame.close[-1]`) rather than `.iloc`. `indicators` holds columns
+    aligned with the candles; `state` holds the latest incremental
+    indicator values (as returned by `IndicatorEngine.latest`).
+    """
+    symbol: str
+    interval: str
+    open_time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    close_time: Optional[np.ndarray] = None
+    indicators: Dict[str, np.ndarray] = field(default_factory=dict)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @classmethod
+    def from_buffer(cls, buffer, symbol: str, interval: str, limit: Optional[int] = None,
+                    include_forming: bool = False, state: Optional[Dict[str, Any]] = None,
+                    copy: bool = False) -> 'CandleFrame':
+        """Read-only views over a KlineRingBuffer (a snapshot with `copy`)"""
+        view = buffer.view(limit, include_forming, copy)
+        return cls(symbol.upper(), interval, view['timestamp'], *(view[name] for name in PRICE_FIELDS),
+                   close_time=view['close_time'], state=state or {})
+
+    @classmethod
+    def from_manager(cls, manager, symbol: str, interval: str, limit: Optional[int] = None,
+                     include_forming: bool = False, engine=None, copy: bool = False) -> Optional['CandleFrame']:
+        """Frame over a WebSocketKlineManager's cache, with `engine`'s latest values as state
+
+        State is left empty while the engine has not consumed the cache's last closed candle.
+        Frames handed to another thread should be taken with `copy`, since a backfill
+        merge rewrites the cache in place.
+        """
+        buffer = manager.kline_cache.get(symbol.upper(), {}).get(interval)
+        if buffer is None:
+            return None
+        state = None
+        if engine is not None and buffer.last_closed_open_time is not None:
+            state = engine.latest(symbol.upper(), interval, buffer.last_closed_open_time)
+        return cls.from_buffer(buffer, symbol, interval, limit, include_forming, state, copy)
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, symbol: str = '', interval: str = '') -> 'CandleFrame':
+        """Frame over (n, 7) candles in Binance REST column order, e.g. from `KlineStore.load`"""
+        rows = np.asarray(rows, dtype=np.float64)
+        return cls(symbol.upper(), interval, rows[:, 0].astype(np.int64),
+                   *(rows[:, column] for column in range(1, 6)), close_time=rows[:, 6].astype(np.int64))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, symbol: str = '', interval: str = '') -> 'CandleFrame':
+        """Frame sharing memory with a DataFrame's columns; other numeric columns become indicators"""
+        if 'timestamp' in df.columns:
+            open_time = df['timestamp'].to_numpy()
+        elif isinstance(df.index, pd.DatetimeIndex):
+            open_time = df.index.values.astype('datetime64[ms]').astype(np.int64)
+        else:
+            open_time = np.arange(len(df), dtype=np.int64)
+        close_time = df['close_time'].to_numpy(dtype=np.int64) if 'close_time' in df.columns else None
+
+        skip = set(PRICE_FIELDS) | {'timestamp', 'close_time'}
+        indicators = {name: df[name].to_numpy() for name in df.columns
+                      if name not in skip and pd.api.types.is_numeric_dtype(df[name])}
+        return cls(symbol.upper(), interval, np.asarray(open_time, dtype=np.int64),
+                   *(df[name].to_numpy(dtype=np.float64) for name in PRICE_FIELDS),
+                   close_time=close_time, indicators=indicators)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame indexed by open time, for strategies that still take one"""
+        columns = {name: getattr(self, name) for name in PRICE_FIELDS}
+        if self.close_time is not None:
+            columns['close_time'] = self.close_time
+        columns.update(self.indicators)
+        index = pd.DatetimeIndex(pd.to_datetime(self.open_time, unit='ms'), name='timestamp')
+        return pd.DataFrame(columns, index=index)
+
+    def slice(self, start: int, end: int) -> 'CandleFrame':
+        """Views over candles [start, end), indicators included"""
+        return replace(self, open_time=self.open_time[start:end],
+                       **{name: getattr(self, name)[start:end] for name in PRICE_FIELDS},
+                       close_time=None if self.close_time is None else self.close_time[start:end],
+                       indicators={name: values[start:end] for name, values in self.indicators.items()})
+
+    def with_indicators(self, **columns: np.ndarray) -> 'CandleFrame':
+        return replace(self, indicators={**self.indicators, **columns})
+
+    def column(self, name: str) -> np.ndarray:
+        return getattr(self, name) if name in PRICE_FIELDS else self.indicators[name]
+
+    def last(self, name: str, offset: int = 0) -> float:
+        """Value of a column `offset` candles before the newest"""
+        return float(self.column(name)[-1 - offset])
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        return int(self.open_time[-1]) if len(self.open_time) else None
+
+    def fingerprint(self) -> tuple:
+        """Identifies the window for the indicator cache, like `frame_fingerprint` for DataFrames"""
+        if not len(self):
+            return (0,)
+        return len(self), int(self.open_time[0]), int(self.open_time[-1]), float(self.close[-1])
+
+
+@runtime_checkable
+class ArrayStrategy(Protocol):
+    """A strategy evaluated directly on a CandleFrame"""
+
+    name: str
+
+    def evaluate_entry(self, frame: CandleFrame) -> Optional[TradingSignal]:
+        ...
+
+    def evaluate_exit(self, frame: CandleFrame, position: Dict) -> Optional[str]:
+        ...
+
+
+class DataFrameStrategyAdapter:
+    """ArrayStrategy over a strategy with the DataFrame interface
+
+    Wraps classes with `calculate_indicators(df)`, `evaluate_entry_signal(df)`
+    and `evaluate_exit_signal(df, position)`. The DataFrame is built from the
+    frame on each call, so this is for strategies not yet ported.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.name = getattr(strategy, 'strategy_name', None) or getattr(strategy, 'name', type(strategy).__name__)
+
+    def _dataframe(self, frame: CandleFrame) -> pd.DataFrame:
+        df = frame.to_dataframe()
+        calculate = getattr(self.strategy, 'calculate_indicators', None)
+        return calculate(df) if calculate else df
+
+    def evaluate_entry(self, frame: CandleFrame) -> Optional[TradingSignal]:
+        return self.strategy.evaluate_entry_signal(self._dataframe(frame))
+
+    def evaluate_exit(self, frame: CandleFrame, position: Dict) -> Optional[str]:
+        evaluate = getattr(self.strategy, 'evaluate_exit_signal', None)
+        return evaluate(self._dataframe(frame), position) if evaluate else None
+
+
+def as_array_strategy(strategy) -> ArrayStrategy:
+    """The strategy itself if it is frame-native, otherwise a DataFrame adapter around it"""
+    return strategy if isinstance(strategy, ArrayStrategy) else DataFrameStrategyAdapter(strategy)
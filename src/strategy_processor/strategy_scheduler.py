@@ -0,0 +1,192 @@
+import heapq
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.data_fetcher.kline_buffer import interval_to_ms
+
+
+@dataclass
+class ScheduledStrategy:
+    """Timing state of one scheduled strategy"""
+    name: str
+    interval: float  # seconds between assessments
+    candle_seconds: Optional[float]  # length of the strategy's candle, for alignment
+    next_due: float = 0.0
+    token: int = 0  # Sequence of the entry's live heap item; any other item is stale
+    runs: int = 0
+    overruns: int = 0
+    skipped: int = 0  # Fires missed because the loop was late
+    last_duration: Optional[float] = None
+    max_duration: float = 0.0
+
+
+class StrategyScheduler:
+    """Fires each strategy at its own assessment interval from a min-heap of due times
+
+    Fire times are aligned to candle boundaries plus `settle_seconds`: an
+    interval shorter than the candle repeats from each candle open, a longer
+    one falls on epoch multiples of itself (which are candle boundaries for
+    Binance intervals). Popping due strategies costs O(log n) per fire, so a
+    loop waiting on `seconds_until_next()` does no per-strategy work while
+    idle. Unscheduling is lazy: stale heap entries are skipped when popped.
+    """
+
+    def __init__(self, settle_seconds: float = 2.0, clock: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self._entries: Dict[str, ScheduledStrategy] = {}
+        self._heap: List[Tuple[float, int, str]] = []  # (due, sequence, name)
+        self._sequence = 0
+
+        self.stats = {
+            'fires': 0,
+            'overruns': 0,
+            'skipped': 0,
+            'max_lateness_ms': 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def schedule(self, name: str, interval_seconds: float, timeframe: Optional[str] = None) -> float:
+        """Fire `name` every `interval_seconds`, aligned to `timeframe` candles; returns the next due time
+
+        Re-scheduling with the same interval and timeframe keeps the current due time.
+        """
+        if interval_seconds <= 0:
+            raise ValueError(f"assessment interval must be positive, got {interval_seconds}")
+        candle_ms = interval_to_ms(timeframe) if timeframe else None
+        candle_seconds = candle_ms / 1000 if candle_ms else None
+
+        entry = self._entries.get(name)
+        if entry is not None and (entry.interval, entry.candle_seconds) == (interval_seconds, candle_seconds):
+            return entry.next_due
+
+        if entry is None:
+            entry = self._entries[name] = ScheduledStrategy(name, interval_seconds, candle_seconds)
+        else:
+            entry.interval, entry.candle_seconds = interval_seconds, candle_seconds
+        entry.next_due = self.next_fire_time(interval_seconds, candle_seconds, self.clock())
+        self._push(entry)
+        return entry.next_due
+
+    def unschedule(self, name: str) -> bool:
+        entry = self._entries.pop(name, None)
+        self._compact_if_bloated()
+        return entry is not None
+
+    def schedules(self) -> Dict[str, Tuple[float, Optional[float]]]:
+        """name -> (interval seconds, candle seconds)"""
+        return {name: (entry.interval, entry.candle_seconds) for name, entry in self._entries.items()}
+
+    def next_fire_time(self, interval: float, candle_seconds: Optional[float], now: float) -> float:
+        """First aligned fire time strictly after `now`"""
+        settle = self.settle_seconds
+        if not candle_seconds or interval >= candle_seconds:
+            return (math.floor((now - settle) / interval) + 1) * interval + settle
+
+        # Repeat from each candle open; the next candle open restarts the sequence
+        candle_start = math.floor((now - settle) / candle_seconds) * candle_seconds + settle
+        due = candle_start + (math.floor((now - candle_start) / interval) + 1) * interval
+        return min(due, candle_start + candle_seconds)
+
+    def next_due(self) -> Optional[float]:
+        """Earliest due time of any scheduled strategy"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def seconds_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        due = self.next_due()
+        if due is None:
+            return None
+        return max(0.0, due - (self.clock() if now is None else now))
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Names of the strategies due by `now`, each rescheduled for its next aligned fire"""
+        now = self.clock() if now is None else now
+        due = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            fire_time, _, name = heapq.heappop(self._heap)
+            entry = self._entries[name]
+
+            lateness = now - fire_time
+            self.stats['max_lateness_ms'] = max(self.stats['max_lateness_ms'], lateness * 1000)
+            entry.next_due = self.next_fire_time(entry.interval, entry.candle_seconds, now)
+            # Fires that fell between this one and the next were never run
+            missed = max(0, math.ceil((entry.next_due - fire_time) / entry.interval) - 1)
+            if missed:
+                entry.skipped += missed
+                self.stats['skipped'] += missed
+            self._push(entry)
+
+            entry.runs += 1
+            self.stats['fires'] += 1
+            due.append(name)
+        return due
+
+    def record_run(self, name: str, duration: float) -> bool:
+        """Record how long an evaluation took; True (and a warning) if it overran its interval"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        entry.last_duration = duration
+        entry.max_duration = max(entry.max_duration, duration)
+        if duration <= entry.interval:
+            return False
+
+        entry.overruns += 1
+        self.stats['overruns'] += 1
+        self.logger.warning(f"⏱️ {name}: evaluation took {duration:.2f}s, longer than its "
+                            f"{entry.interval:g}s assessment interval")
+        return True
+
+    def _push(self, entry: ScheduledStrategy):
+        self._compact_if_bloated()
+        self._sequence += 1
+        entry.token = self._sequence
+        heapq.heappush(self._heap, (entry.next_due, self._sequence, entry.name))
+
+    def _is_stale(self, item: Tuple[float, int, str]) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is None or entry.token != item[1]
+
+    def _drop_stale(self):
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _compact_if_bloated(self):
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [item for item in self._heap if not self._is_stale(item)]
+        heapq.heapify(self._heap)
+
+    def get_statistics(self) -> Dict:
+        stats = dict(self.stats)
+        stats['scheduled'] = len(self._entries)
+        stats['heap_size'] = len(self._heap)
+        stats['next_due_in'] = self.seconds_until_next()
+        stats['strategies'] = {
+            name: {
+                'interval': entry.interval,
+                'next_due': entry.next_due,
+                'runs': entry.runs,
+                'overruns': entry.overruns,
+                'skipped': entry.skipped,
+                'last_duration': entry.last_duration,
+                'max_duration': entry.max_duration
+            }
+            for name, entry in self._entries.items()
+        }
+        return stats
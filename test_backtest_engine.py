@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Backtest Engine Test
+====================
+
+Verifies that replaying candles through the live strategy code reaches the
+same trades and PnL as the vectorized parameter sweep, that positions are
+sized exactly as OrderManager sizes them, that fills, fees and slippage
+follow the fill model, that Smart Money's session and daily filters run on
+candle time, and that a replay is fast enough for months of 1m candles.
+"""
+
+import logging
+import tempfile
+import time
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from src.backtesting.backtest_engine import Backtester, FillModel
+from src.backtesting.parameter_sweep import ParameterSweep
+from src.data_fetcher.kline_store import KlineStore
+from src.execution_engine.order_manager import OrderManager, position_quantity
+from src.strategy_processor.signal_processor import SignalType, TradingSignal
+from src.strategy_processor.strategy_interface import CandleFrame
+from test_parameter_sweep import make_frame
+
+HOUR_MS = 3_600_000
+FINE_LOTS = {'min_qty': 1e-9, 'step_size': 1e-9, 'precision': 9}  # Quantity equals margin * leverage / price
+
+RSI_CONFIG = {'name': 'rsi_oversold', 'symbol': 'BTCUSDT', 'timeframe': '1m', 'margin': 12.5, 'leverage': 25,
+              'max_loss_pct': 10, 'rsi_long_entry': 40, 'rsi_short_entry': 60}
+
+
+def smart_money_frame(n, seed=4):
+    """Hourly random walk with regular volume spikes, starting on an hour boundary"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.uniform(0, 2, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 2, n)
+    volume = np.where(rng.random(n) < 0.15, 30.0, rng.uniform(1, 10, n))
+    open_time = 1_699_999_200_000 + np.arange(n, dtype=np.int64) * HOUR_MS
+    rows = np.column_stack([open_time, open_, high, low, close, volume, open_time + HOUR_MS - 1])
+    return CandleFrame.from_rows(rows, 'BTCUSDT', '1h')
+
+
+class TestBacktestEngine(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('src').setLevel(logging.CRITICAL)
+        self.frame = make_frame(600)
+
+    def test_matches_parameter_sweep(self):
+        configs = [RSI_CONFIG,
+                   {'name': 'macd_divergence', 'symbol': 'BTCUSDT', 'timeframe': '1m',
+                    'min_histogram_threshold': 0.05, 'macd_exit_threshold': 0.01},
+                   {'name': 'engulfing_btc', 'symbol': 'BTCUSDT', 'timeframe': '1m', 'margin': 20.0,
+                    'leverage': 10, 'max_loss_pct': 20}]
+        for config in configs:
+            result = Backtester(config, self.frame, FillModel(fee_rate=0.0), FINE_LOTS, window=None).run()
+            summary = result.summary()
+            expected = ParameterSweep(config, self.frame, fee_rate=0.0).run([{}]).iloc[0]
+
+            for column in ('trades', 'wins', 'stop_outs'):
+                self.assertEqual(summary[column], expected[column], f"{config['name']} {column}")
+            self.assertAlmostEqual(summary['realized_pnl'], expected['realized_pnl'], places=6)
+            self.assertGreater(summary['trades'], 0)
+
+    def test_sizing_matches_order_manager(self):
+        symbol_info = {'min_qty': 0.001, 'step_size': 0.001, 'precision': 3}
+        order_manager = OrderManager.__new__(OrderManager)
+        order_manager.logger = logging.getLogger('src.execution_engine.order_manager')
+        order_manager._symbol_info_cache = {'BTCUSDT': symbol_info}
+
+        for margin, leverage, price in [(50.0, 5, 97.3), (10.0, 20, 61_234.5), (0.5, 1, 3_000.0)]:
+            signal = TradingSignal(SignalType.BUY, price, 0.0, 0.0, symbol='BTCUSDT')
+            expected = order_manager._calculate_position_size(signal, {'margin': margin, 'leverage': leverage})
+            quantity, _ = position_quantity(margin, leverage, price, **symbol_info)
+            self.assertEqual(quantity, expected)
+        self.assertEqual(position_quantity(0.5, 1, 3_000.0, **symbol_info), (0.001, 'UP'))  # Below one step
+
+        result = Backtester(RSI_CONFIG, self.frame, symbol_info=symbol_info).run()
+        self.assertGreater(len(result.trades), 0)
+        for trade in result.trades:
+            signal = TradingSignal(SignalType.BUY, trade.entry_price, 0.0, 0.0, symbol='BTCUSDT')
+            self.assertEqual(trade.quantity, order_manager._calculate_position_size(signal, RSI_CONFIG))
+            self.assertAlmostEqual(trade.margin, signal.actual_margin_used)
+
+    def test_fills_fees_and_slippage(self):
+        fill_model = FillModel(fee_rate=0.0004, slippage_bps=5)
+        self.assertEqual(fill_model.stop(1, 99.0, 98.0, 100.0, 97.0), 98.0 * (1 - 0.0005))  # Gapped through
+        self.assertEqual(fill_model.stop(-1, 101.0, 100.0, 102.0, 99.0), 101.0 * (1 + 0.0005))
+        self.assertIsNone(fill_model.stop(1, 99.0, 100.0, 101.0, 99.5))
+        self.assertEqual(fill_model.take_profit(1, 105.0, 106.0, 107.0, 105.5), 106.0)
+
+        result = Backtester(RSI_CONFIG, self.frame, fill_model).run()
+        close = dict(zip(self.frame.open_time.tolist(), self.frame.close.tolist()))
+        self.assertGreaterEqual(min(trade.entry_time for trade in result.trades), self.frame.open_time[199])
+        for trade in result.trades:
+            side = 1 if trade.side == 'BUY' else -1
+            self.assertAlmostEqual(trade.entry_price, close[trade.entry_time] * (1 + side * 0.0005))
+            if trade.reason == 'Stop Loss':
+                self.assertLessEqual(side * trade.exit_price, side * trade.stop_loss * (1 - side * 0.0005) + 1e-9)
+            else:
+                self.assertAlmostEqual(trade.exit_price, close[trade.exit_time] * (1 - side * 0.0005))
+            self.assertAlmostEqual(trade.fees, 0.0004 * trade.quantity * (trade.entry_price + trade.exit_price))
+            self.assertAlmostEqual(trade.pnl, side * (trade.exit_price - trade.entry_price) * trade.quantity
+                                   - trade.fees)
+
+        summary = result.summary()
+        self.assertAlmostEqual(result.equity[-1], summary['pnl'])
+        self.assertAlmostEqual(summary['realized_pnl'], sum(trade.pnl for trade in result.trades))
+        self.assertEqual(len(result.trades_frame()), summary['trades'])
+
+    def test_smart_money_filters_use_candle_time(self):
+        frame = smart_money_frame(2000)
+        base = {'name': 'smart_money_btc', 'symbol': 'BTCUSDT', 'timeframe': '1h', 'trend_filter_enabled': False,
+                'min_swing_distance_pct': 0.5, 'max_daily_trades': 100}
+
+        def decision_hours(trades):
+            return {(trade.entry_time + HOUR_MS) // HOUR_MS % 24 for trade in trades}
+
+        unfiltered = Backtester({**base, 'session_filter_enabled': False}, frame).run()
+        self.assertGreater(len(decision_hours(unfiltered.trades)), 12)
+        self.assertEqual({trade.reason for trade in unfiltered.trades}, {'Stop Loss', 'Take Profit'})
+        for trade in unfiltered.trades:
+            if trade.reason == 'Take Profit':
+                self.assertGreaterEqual((1 if trade.side == 'BUY' else -1) * (trade.exit_price - trade.take_profit), 0)
+
+        london = Backtester({**base, 'session_filter_enabled': True, 'allowed_sessions': ['LONDON']}, frame).run()
+        self.assertTrue(london.trades)
+        self.assertTrue(decision_hours(london.trades) <= set(range(7, 16)))
+
+        one_a_day = Backtester({**base, 'session_filter_enabled': False, 'max_daily_trades': 1}, frame).run()
+        days = Counter((trade.entry_time + HOUR_MS) // (24 * HOUR_MS) for trade in one_a_day.trades)
+        self.assertEqual(max(days.values()), 1)
+
+    def test_from_store_and_replay_speed(self):
+        frame = make_frame(3000, seed=5)
+        rows = np.column_stack([frame.open_time, frame.open, frame.high, frame.low, frame.close, frame.volume,
+                                frame.close_time])
+        with tempfile.TemporaryDirectory() as root:
+            store = KlineStore(root)
+            store.append_rows('BTCUSDT', '1m', rows)
+            backtester = Backtester.from_store(store, RSI_CONFIG)
+            store.close()
+        self.assertEqual(len(backtester.frame), 3000)
+
+        started = time.perf_counter()
+        result = backtester.run()
+        per_candle = (time.perf_counter() - started) / 3000
+        self.assertLess(per_candle * 90 * 1440, 600)  # Three months of 1m candles in under ten minutes
+        self.assertEqual(result.summary(), Backtester(RSI_CONFIG, frame).run().summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
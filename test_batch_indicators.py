@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Batch Indicators Test
+=====================
+
+Verifies that the (symbols x time) batch indicators match the per-symbol
+pandas pipeline and streaming ATR, and that market matrices only include
+symbols with a complete, aligned window.
+"""
+
+import logging
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher.kline_store import KlineStore
+from src.data_fetcher.price_fetcher import PriceFetcher
+from src.indicators.batch import MarketMatrix, batch_indicators, market_scan
+from src.indicators.incremental import ATR
+
+MINUTE_MS = 60_000
+
+
+def make_rows(n, seed, start=0):
+    """(n, 7) candles in Binance REST column order"""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    open_time = (start + np.arange(n)) * MINUTE_MS
+    return np.column_stack([open_time, open_, high, low, close, rng.uniform(1, 10, n), open_time + MINUTE_MS - 1])
+
+
+class TestBatchIndicators(unittest.TestCase):
+    def setUp(self):
+        self.rows = {f'SYM{i}USDT': make_rows(150, seed=i) for i in range(5)}
+        self.matrix = MarketMatrix.from_rows(self.rows, '1m', 150)
+
+    def test_matches_per_symbol_pipeline(self):
+        fetcher = PriceFetcher.__new__(PriceFetcher)
+        fetcher.logger = logging.getLogger(__name__)
+        batch = batch_indicators(self.matrix)
+
+        for row, symbol in enumerate(self.matrix.symbols):
+            rows = self.rows[symbol]
+            df = pd.DataFrame(rows[:, 1:6], columns=['open', 'high', 'low', 'close', 'volume'])
+            expected = fetcher.calculate_indicators(df)
+            for column in ('rsi', 'macd', 'macd_signal', 'macd_histogram', 'sma_20', 'sma_50',
+                           'bb_upper', 'bb_lower', 'bb_middle'):
+                np.testing.assert_allclose(batch[column][row], expected[column].to_numpy(), rtol=1e-9,
+                                           err_msg=column)
+            for column in ('bullish_engulfing', 'bearish_engulfing'):
+                np.testing.assert_array_equal(batch[column][row], expected[column].to_numpy())
+
+            streaming = ATR(14)
+            atr = [streaming.update(c, h, l) for h, l, c in rows[:, 2:5]]
+            np.testing.assert_allclose(batch['atr'][row, 13:], atr[13:], rtol=1e-9)
+
+    def test_alignment_skips_incomplete_symbols(self):
+        rows = dict(self.rows)
+        rows['GAPUSDT'] = np.delete(make_rows(150, seed=9), 100, axis=0)
+        rows['LATEUSDT'] = make_rows(149, seed=10)  # Stream one candle behind
+        rows['NEWUSDT'] = make_rows(40, seed=11, start=110)  # Listed recently
+        rows['LONGUSDT'] = make_rows(300, seed=12, start=-150)
+        matrix = MarketMatrix.from_rows(rows, '1m', 150)
+
+        self.assertEqual(matrix.symbols, list(self.rows) + ['LONGUSDT'])
+        self.assertEqual(sorted(matrix.skipped), ['GAPUSDT', 'LATEUSDT', 'NEWUSDT'])
+        self.assertEqual(matrix.close.shape, (6, 150))
+        np.testing.assert_array_equal(matrix.close[-1], rows['LONGUSDT'][150:, 4])
+        np.testing.assert_array_equal(matrix.open_time, self.rows['SYM0USDT'][:, 0])
+
+    def test_from_store_and_scan(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = KlineStore(root)
+            for symbol, rows in self.rows.items():
+                store.append_rows(symbol, '1m', rows)
+            matrix = MarketMatrix.from_store(store, self.rows, '1m', 100)
+            store.close()
+
+        np.testing.assert_array_equal(matrix.close, self.matrix.close[:, -100:])
+        scan = market_scan(matrix)
+        self.assertEqual(list(scan.index), list(self.rows))
+        self.assertAlmostEqual(scan.loc['SYM2USDT', 'close'], self.rows['SYM2USDT'][-1, 4])
+        self.assertIn('atr', scan.columns)
+
+    def test_empty_matrix(self):
+        matrix = MarketMatrix.from_rows({'EMPTYUSDT': np.empty((0, 7))}, '1m', 50)
+        self.assertEqual(matrix.symbols, [])
+        self.assertEqual(batch_indicators(matrix), {})
+        self.assertTrue(market_scan(matrix).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
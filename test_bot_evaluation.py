@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Bot Evaluation Test
+===================
+
+Verifies that a candle close is evaluated on the WebSocket cache only while
+the stream is fresh and gap-free, and that otherwise the REST-backed path is
+used, on closed candles only, like the cache path. The cache path reads RSI
+from the streaming indicator engine. Timed assessments are skipped
+altogether unless the stream is fresh and gap-free.
+"""
+
+import logging
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.bot_manager import BotManager
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+from src.indicators.incremental import IndicatorEngine
+from src.strategy_processor.candle_event_bus import CandleCloseEvent
+from src.strategy_processor.signal_processor import SignalProcessor
+
+MINUTE_MS = 60_000
+CONFIG = {'name': 'rsi_oversold', 'symbol': 'BTCUSDT', 'timeframe': '1m', 'margin': 10.0, 'leverage': 5}
+
+
+def closed_rows(count, end_ms):
+    """`count` closed 1m candles, the last one closing just before `end_ms`"""
+    open_time = (end_ms // MINUTE_MS - count) * MINUTE_MS + np.arange(count, dtype=np.int64) * MINUTE_MS
+    close = 100 + np.sin(np.arange(count) / 5)
+    return np.column_stack([open_time, close, close + 1, close - 1, close, np.full(count, 10.0),
+                            open_time + MINUTE_MS - 1])
+
+
+class FakePriceFetcher:
+    def __init__(self):
+        self.loads = []
+
+    def load_market_data(self, symbol, interval, limit=100, include_forming=True):
+        self.loads.append((symbol, interval, limit, include_forming))
+        return None
+
+
+class FakeSignalProcessor:
+    def __init__(self):
+        self.frames = []
+
+    def evaluate_entry_frame(self, frame, config):
+        self.frames.append(frame)
+        return None
+
+
+class TestBotEvaluation(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('src').setLevel(logging.CRITICAL)
+        self.manager = WebSocketKlineManager()
+        self.rows = closed_rows(300, int(time.time() * 1000))
+        self.manager.seed_klines('BTCUSDT', '1m', self.rows)
+        self.engine = IndicatorEngine()
+        self.engine.attach(self.manager)
+
+        self.bot = BotManager()
+        self.bot.price_fetcher = FakePriceFetcher()
+        self.bot.signal_processor = FakeSignalProcessor()
+        self.bot.order_manager = mock.Mock(active_positions={})
+
+        patches = [mock.patch('src.bot_manager.websocket_manager', self.manager),
+                   mock.patch('src.bot_manager.indicator_engine', self.engine),
+                   mock.patch('src.bot_manager.trading_config_manager.get_strategy_config', return_value=CONFIG)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def evaluate(self):
+        open_time = int(self.rows[-1, 0])
+        self.bot._evaluate_strategy(CandleCloseEvent('rsi_oversold', 'BTCUSDT', '1m', open_time, 100.0, time.time()))
+
+    def mark_updated(self, seconds_ago):
+        self.manager.last_updates.setdefault('BTCUSDT', {})['1m'] = time.monotonic() - seconds_ago
+
+    def test_fresh_continuous_stream_uses_cache(self):
+        for name, params in SignalProcessor().stream_indicators(CONFIG):
+            self.engine.track('BTCUSDT', '1m', name, **params)
+        self.mark_updated(1)
+        self.evaluate()
+        self.assertEqual(self.bot.price_fetcher.loads, [])
+        self.assertEqual(len(self.bot.signal_processor.frames), 1)
+        frame = self.bot.signal_processor.frames[0]
+        self.assertEqual(frame.open_time[-1], self.rows[-1, 0])
+
+        # RSI comes from the streaming engine, not a rescan of the window
+        rsi = self.engine.value('BTCUSDT', '1m', 'rsi', period=14)
+        self.assertEqual(frame.state, {'rsi_14': rsi})
+        self.assertEqual(SignalProcessor()._frame_rsi(frame), rsi)
+
+    def test_stale_stream_falls_back_to_closed_candles(self):
+        self.mark_updated(600)
+        self.evaluate()
+        self.assertEqual(self.bot.signal_processor.frames, [])
+        self.assertEqual(self.bot.price_fetcher.loads, [('BTCUSDT', '1m', 200, False)])
+
+    def test_gapped_stream_falls_back_to_closed_candles(self):
+        self.manager.kline_cache['BTCUSDT']['1m'].clear()
+        self.manager.seed_klines('BTCUSDT', '1m', np.delete(self.rows, 250, axis=0))
+        self.mark_updated(1)
+        self.assertFalse(self.manager.is_continuous('BTCUSDT', '1m', 200))
+        self.evaluate()
+        self.assertEqual(self.bot.signal_processor.frames, [])
+        self.assertEqual(self.bot.price_fetcher.loads, [('BTCUSDT', '1m', 200, False)])
+
+        # A gap older than the evaluation window does not hold back the cache path
+        self.manager.kline_cache['BTCUSDT']['1m'].clear()
+        self.manager.seed_klines('BTCUSDT', '1m', np.delete(self.rows, 20, axis=0))
+        self.evaluate()
+        self.assertEqual(len(self.bot.signal_processor.frames), 1)
+
+    def test_assessment_requires_a_trusted_stream(self):
+        with mock.patch.object(self.bot, '_evaluate_strategy') as evaluate:
+            self.mark_updated(600)
+            self.bot._assess_strategy('rsi_oversold')
+            evaluate.assert_not_called()
+
+            self.mark_updated(1)
+            self.bot._assess_strategy('rsi_oversold')
+            self.assertEqual(evaluate.call_args[0][0].open_time, self.rows[-1, 0])
+
+            self.bot._last_evaluated['rsi_oversold'] = int(self.rows[-1, 0])
+            self.bot._assess_strategy('rsi_oversold')  # Candle already evaluated
+            self.assertEqual(evaluate.call_count, 1)
+
+            self.manager.kline_cache['BTCUSDT']['1m'].clear()
+            self.bot.order_manager.active_positions = {'rsi_oversold': object()}
+            self.bot._assess_strategy('rsi_oversold')  # No closed candle yet
+            self.assertEqual(evaluate.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
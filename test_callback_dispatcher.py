@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Callback Dispatcher Test
+========================
+
+Verifies that kline update callbacks run on worker threads with bounded
+per-subscriber queues, so a slow consumer never stalls the socket thread.
+"""
+
+import threading
+import time
+import unittest
+
+from src.data_fetcher.callback_dispatcher import COALESCE, DROP_OLDEST, CallbackDispatcher
+
+
+def tick(open_time, close, is_closed):
+    return {'timestamp': open_time, 'close': close, 'is_closed': is_closed}
+
+
+class TestCallbackDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = CallbackDispatcher(workers=2, max_queue=3)
+
+    def test_slow_callback_does_not_block_dispatch(self):
+        release = threading.Event()
+        fast_seen = []
+        self.dispatcher.register(lambda symbol, interval, kline: release.wait(5))
+        self.dispatcher.register(lambda symbol, interval, kline: fast_seen.append(kline['close']))
+
+        started = time.perf_counter()
+        for price in range(3):
+            self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, price, False))
+        self.assertLess(time.perf_counter() - started, 0.1)
+
+        # The fast subscriber keeps running on the other worker while the slow one is stuck
+        deadline = time.monotonic() + 2
+        while len(fast_seen) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(fast_seen, [0, 1, 2])
+
+        release.set()
+        self.assertTrue(self.dispatcher.flush())
+
+    def test_drop_oldest_keeps_newest_events_in_order(self):
+        gate = threading.Event()
+        seen = []
+
+        def slow(symbol, interval, kline):
+            gate.wait(5)
+            seen.append(kline['close'])
+
+        self.dispatcher.register(slow, DROP_OLDEST)
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 0, False))  # Picked up immediately
+        time.sleep(0.05)
+        for price in range(1, 10):
+            self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, price, False))
+        gate.set()
+        self.assertTrue(self.dispatcher.flush())
+
+        # First event was already running; the rest overflowed a queue of 3
+        self.assertEqual(seen, [0, 7, 8, 9])
+        self.assertEqual(self.dispatcher.get_statistics()['dropped'], 6)
+
+    def test_coalesce_keeps_every_close_and_latest_tick(self):
+        gate = threading.Event()
+        seen = []
+
+        def slow(symbol, interval, kline):
+            gate.wait(5)
+            seen.append((kline['timestamp'], kline['close'], kline['is_closed']))
+
+        self.dispatcher.register(slow, COALESCE, max_queue=100)
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 1, False))  # Picked up immediately
+        time.sleep(0.05)
+        for price in range(2, 6):
+            self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, price, False))
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 6, True))
+        for price in range(7, 10):
+            self.dispatcher.dispatch('BTCUSDT', '1m', tick(60_000, price, False))
+        gate.set()
+        self.assertTrue(self.dispatcher.flush())
+
+        # Queued forming ticks collapse into the newest one; the close is never folded away
+        self.assertEqual(seen, [(0, 1, False), (0, 6, True), (60_000, 9, False)])
+        stats = next(iter(self.dispatcher.get_statistics()['callbacks'].values()))
+        self.assertEqual(stats['coalesced'], 6)
+
+    def test_coalesce_overflow_evicts_forming_ticks_before_closes(self):
+        gate = threading.Event()
+        seen = []
+
+        def slow(symbol, interval, kline):
+            gate.wait(5)
+            seen.append((symbol, kline['timestamp'], kline['close'], kline['is_closed']))
+
+        self.dispatcher.register(slow, COALESCE, max_queue=3)
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 1, False))  # Picked up immediately
+        time.sleep(0.05)
+        with self.assertLogs('src.data_fetcher.callback_dispatcher', 'WARNING') as logs:
+            for symbol, event in [('ETHUSDT', tick(0, 10, False)), ('BTCUSDT', tick(0, 2, True)),
+                                  ('BTCUSDT', tick(60_000, 3, False)),  # Queue is now full
+                                  ('SOLUSDT', tick(0, 20, False)), ('ETHUSDT', tick(0, 11, True)),
+                                  ('SOLUSDT', tick(0, 21, True)),  # Every forming tick evicted
+                                  ('BTCUSDT', tick(60_000, 4, True)),  # Queued past the bound
+                                  ('ETHUSDT', tick(60_000, 12, False))]:  # Nothing to evict: dropped
+                self.dispatcher.dispatch(symbol, '1m', event)
+        gate.set()
+        self.assertTrue(self.dispatcher.flush())
+
+        self.assertEqual(seen, [('BTCUSDT', 0, 1, False), ('BTCUSDT', 0, 2, True), ('ETHUSDT', 0, 11, True),
+                                ('SOLUSDT', 0, 21, True), ('BTCUSDT', 60_000, 4, True)])
+        stats = next(iter(self.dispatcher.get_statistics()['callbacks'].values()))
+        self.assertEqual(stats['dropped'], 4)
+        self.assertEqual(stats['closed_overflow'], 1)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_errors_and_latency_are_reported(self):
+        def failing(symbol, interval, kline):
+            raise ValueError("boom")
+
+        self.dispatcher.register(failing)
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 1, True))
+        self.assertTrue(self.dispatcher.flush())
+
+        stats = next(iter(self.dispatcher.get_statistics()['callbacks'].values()))
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['errors'], 1)
+        self.assertGreaterEqual(stats['max_queue_wait_ms'], 0.0)
+
+    def test_unregistered_callback_stops_receiving(self):
+        seen = []
+        callback = lambda symbol, interval, kline: seen.append(kline['close'])
+        self.dispatcher.register(callback)
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 1, False))
+        self.assertTrue(self.dispatcher.flush())
+        self.dispatcher.unregister(callback)
+        self.dispatcher.dispatch('BTCUSDT', '1m', tick(0, 2, False))
+        self.assertTrue(self.dispatcher.flush())
+        self.assertEqual(seen, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Candle Aggregation Test
+=======================
+
+Verifies that a symbol requested at several timeframes is streamed once at
+its lowest timeframe and that the higher timeframes built locally match the
+exchange candles, including the forming-candle state.
+"""
+
+import unittest
+
+from src.data_fetcher.candle_aggregator import CandleAggregator, base_interval_for
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def make_kline(open_time, open_, high, low, close, is_closed, interval='1m'):
+    return {
+        't': open_time, 'T': open_time + MINUTE_MS - 1, 'i': interval,
+        'o': str(open_), 'h': str(high), 'l': str(low),
+        'c': str(close), 'v': '1', 'x': is_closed
+    }
+
+
+class TestBaseIntervalSelection(unittest.TestCase):
+    def test_lowest_common_timeframe(self):
+        self.assertEqual(base_interval_for(['5m', '15m', '1h']), '5m')
+        self.assertEqual(base_interval_for(['3m', '5m']), '1m')
+        self.assertEqual(base_interval_for(['4h', '1d']), '4h')
+        self.assertIsNone(base_interval_for(['1w']))
+
+    def test_rejects_non_multiple_target(self):
+        with self.assertRaises(ValueError):
+            CandleAggregator('3m', ['5m'])
+
+
+class TestCandleAggregator(unittest.TestCase):
+    def test_five_minute_candle_from_one_minute_ticks(self):
+        aggregator = CandleAggregator('1m', ['5m'])
+        candles = [(10, 12, 9, 11), (11, 15, 10, 14), (14, 14, 8, 9), (9, 10, 9, 10), (10, 11, 10, 10.5)]
+
+        for minute, (open_, high, low, close) in enumerate(candles):
+            # Forming tick first, then the close
+            forming = aggregator.update(minute * MINUTE_MS, open_, high, low, close, 1, False)
+            self.assertFalse(forming[0][1]['is_closed'])
+            closed = aggregator.update(minute * MINUTE_MS, open_, high, low, close, 1, True)
+
+        interval, kline = closed[0]
+        self.assertEqual(interval, '5m')
+        self.assertTrue(kline['is_closed'])
+        self.assertEqual((kline['open'], kline['high'], kline['low'], kline['close'], kline['volume']),
+                         (10, 15, 8, 10.5, 5))
+        self.assertEqual(kline['close_time'], 5 * MINUTE_MS - 1)
+
+        # Forming state of the next bucket reflects only its own base candles
+        interval, kline = aggregator.update(5 * MINUTE_MS, 20, 21, 19, 20.5, 1, False)[0]
+        self.assertEqual((kline['timestamp'], kline['open'], kline['volume']), (5 * MINUTE_MS, 20, 1))
+
+    def test_bucket_with_missing_base_candle_is_not_closed(self):
+        aggregator = CandleAggregator('1m', ['5m'])
+        for minute in (0, 1, 3, 4):
+            ticks = aggregator.update(minute * MINUTE_MS, 1, 1, 1, 1, 1, True)
+        self.assertFalse(ticks[0][1]['is_closed'])
+
+        # Joining mid-bucket is incomplete too
+        late = CandleAggregator('1m', ['5m'])
+        for minute in (7, 8, 9):
+            ticks = late.update(minute * MINUTE_MS, 1, 1, 1, 1, 1, True)
+        self.assertFalse(ticks[0][1]['is_closed'])
+
+
+class TestManagerAggregation(unittest.TestCase):
+    def test_single_stream_serves_all_timeframes(self):
+        manager = WebSocketKlineManager()
+        for interval in ('1m', '5m', '15m'):
+            manager.add_symbol_interval('BTCUSDT', interval)
+        self.assertEqual(manager.subscribed_streams, {'btcusdt@kline_1m'})
+
+        closed_events = []
+        manager.add_update_callback(
+            lambda symbol, interval, kline: kline['is_closed'] and closed_events.append(interval))
+
+        for minute in range(15):
+            price = 100 + minute
+            manager._process_kline_data('btcusdt@kline_1m',
+                                        make_kline(minute * MINUTE_MS, price, price + 1, price - 1, price, True))
+        manager.dispatcher.flush()
+
+        fifteen = manager.get_cached_klines('BTCUSDT', '15m')
+        self.assertEqual(len(fifteen), 1)
+        self.assertEqual((fifteen[0]['open'], fifteen[0]['high'], fifteen[0]['low'], fifteen[0]['close']),
+                         (100, 115, 99, 114))
+        self.assertEqual([k['timestamp'] for k in manager.get_cached_klines('BTCUSDT', '5m')],
+                         [0, 5 * MINUTE_MS, 10 * MINUTE_MS])
+        self.assertEqual(closed_events.count('5m'), 3)
+        self.assertEqual(closed_events.count('15m'), 1)
+
+    def test_lower_timeframe_replaces_stream(self):
+        manager = WebSocketKlineManager()
+        manager.add_symbol_interval('ETHUSDT', '15m')
+        self.assertEqual(manager.subscribed_streams, {'ethusdt@kline_15m'})
+
+        manager.add_symbol_interval('ETHUSDT', '5m')
+        self.assertEqual(manager.subscribed_streams, {'ethusdt@kline_5m'})
+        self.assertEqual(manager.aggregators['ETHUSDT'].targets, ['15m'])
+
+        manager.remove_symbol_interval('ETHUSDT', '5m')
+        self.assertEqual(manager.subscribed_streams, {'ethusdt@kline_15m'})
+        self.assertNotIn('ETHUSDT', manager.aggregators)
+        self.assertEqual(set(manager.kline_cache['ETHUSDT']), {'15m'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Candle Close Event Bus Test
+===========================
+
+Verifies that strategies are queued for evaluation only when a candle of
+their symbol/timeframe closes, that bursts of closes coalesce, and that a
+waiting consumer wakes as soon as a close arrives from the stream thread.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+from src.strategy_processor.candle_event_bus import CandleCloseEventBus
+
+MINUTE_MS = 60_000
+
+
+def make_kline(open_time, close, is_closed):
+    return {
+        't': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m',
+        'o': str(close), 'h': str(close), 'l': str(close),
+        'c': str(close), 'v': '1', 'x': is_closed
+    }
+
+
+class TestCandleCloseEventBus(unittest.TestCase):
+    def setUp(self):
+        self.manager = WebSocketKlineManager()
+        self.bus = CandleCloseEventBus()
+        self.bus.attach(self.manager)
+        self.bus.subscribe('rsi_oversold', 'BTCUSDT', '1m')
+        self.bus.subscribe('macd_divergence', 'BTCUSDT', '5m')
+        self.bus.subscribe('engulfing_eth', 'ETHUSDT', '1m')
+        for interval in ('1m', '5m'):
+            self.manager.add_symbol_interval('BTCUSDT', interval)
+        self.manager.add_symbol_interval('ETHUSDT', '1m')
+
+    def test_only_matching_subscribers_are_queued(self):
+        self.manager._process_kline_data('btcusdt@kline_1m', make_kline(0, 100, False))
+        self.manager.dispatcher.flush()
+        self.assertEqual(self.bus.pending_count(), 0)
+
+        self.manager._process_kline_data('btcusdt@kline_1m', make_kline(0, 100, True))
+        self.manager.dispatcher.flush()
+        events = self.bus.drain()
+        self.assertEqual([event.subscriber for event in events], ['rsi_oversold'])
+
+        # The 5m strategy fires when the locally aggregated 5m candle closes
+        for minute in range(1, 5):
+            self.manager._process_kline_data('btcusdt@kline_1m', make_kline(minute * MINUTE_MS, 100 + minute, True))
+        self.manager.dispatcher.flush()
+        subscribers = {event.subscriber for event in self.bus.drain()}
+        self.assertEqual(subscribers, {'rsi_oversold', 'macd_divergence'})
+
+    def test_burst_of_closes_coalesces(self):
+        for minute in range(3):
+            self.manager._process_kline_data('ethusdt@kline_1m', make_kline(minute * MINUTE_MS, 10 + minute, True))
+        self.manager.dispatcher.flush()
+
+        events = self.bus.drain()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].open_time, 2 * MINUTE_MS)
+        self.assertEqual(events[0].coalesced, 2)
+        self.assertEqual(self.bus.get_statistics()['events_coalesced'], 2)
+
+    def test_consumer_wakes_on_close_from_stream_thread(self):
+        async def consume():
+            feeder = threading.Timer(0.05, lambda: self.manager._process_kline_data(
+                'ethusdt@kline_1m', make_kline(0, 10, True)))
+            feeder.start()
+            started = time.monotonic()
+            events = await self.bus.wait_for_events(timeout=5.0)
+            return events, time.monotonic() - started
+
+        events, waited = asyncio.run(consume())
+        self.assertEqual([event.subscriber for event in events], ['engulfing_eth'])
+        self.assertLess(waited, 1.0)
+
+    def test_unsubscribe_drops_pending_event(self):
+        self.manager._process_kline_data('ethusdt@kline_1m', make_kline(0, 10, True))
+        self.manager.dispatcher.flush()
+        self.bus.unsubscribe('engulfing_eth')
+        self.assertEqual(self.bus.drain(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Evaluation Pool Test
+====================
+
+Verifies that strategy evaluations for one symbol run in submission order
+and never overlap, that different symbols run concurrently up to the worker
+limit, that a scan takes as long as its slowest evaluation rather than the
+sum, and that queue depth and failures are reported.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from collections import defaultdict
+
+from src.strategy_processor.evaluation_pool import EvaluationPool
+
+
+class TestEvaluationPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = EvaluationPool(max_workers=4)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_per_symbol_order_without_overlap(self):
+        lock = threading.Lock()
+        active = defaultdict(int)
+        overlaps = []
+        order = defaultdict(list)
+
+        def evaluate(symbol, index):
+            with lock:
+                active[symbol] += 1
+                if active[symbol] > 1:
+                    overlaps.append(symbol)
+            time.sleep(0.002)
+            with lock:
+                order[symbol].append(index)
+                active[symbol] -= 1
+
+        futures = [self.pool.submit(symbol, evaluate, symbol, i)
+                   for i in range(20) for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT')]
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertEqual(overlaps, [])
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT'):
+            self.assertEqual(order[symbol], list(range(20)))
+        self.assertGreater(self.pool.get_statistics()['max_running'], 1)
+
+    def test_concurrency_limit_and_scan_latency(self):
+        durations = [0.2] + [0.05] * 7
+        jobs = [(f'SYM{i}USDT', time.sleep, (duration,)) for i, duration in enumerate(durations)]
+
+        started = time.perf_counter()
+        results = asyncio.run(self.pool.run_all(jobs))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results, [None] * len(durations))
+        self.assertLess(elapsed, 0.35)  # Slowest job plus one extra round, not the 0.55s sum
+        stats = self.pool.get_statistics()
+        self.assertEqual(stats['max_running'], 4)
+        self.assertEqual(stats['completed'], len(durations))
+
+    def test_queue_depth_and_failures(self):
+        release = threading.Event()
+        for i in range(4):
+            self.pool.submit(f'BLOCK{i}', release.wait)
+        self.pool.submit('BTCUSDT', lambda: 1)
+        self.pool.submit('BTCUSDT', lambda: 2)
+        deadline = time.monotonic() + 5
+        while self.pool.get_statistics()['running'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.005)  # Let every worker pick up its blocking job
+
+        self.assertEqual(self.pool.queue_depth(), 2)
+        self.assertEqual(self.pool.queue_depth('BTCUSDT'), 2)
+        self.assertGreaterEqual(self.pool.get_statistics()['max_queue_depth'], 2)
+        release.set()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertLogs('src.strategy_processor.evaluation_pool', 'ERROR'):
+            results = asyncio.run(self.pool.run_all([('ETHUSDT', fail, ()), ('ETHUSDT', lambda: 'next', ())]))
+        self.assertIsInstance(results[0], RuntimeError)
+        self.assertEqual(results[1], 'next')
+
+        stats = self.pool.get_statistics()
+        self.assertEqual((stats['failed'], stats['queue_depth'], stats['running'], stats['busy_symbols']),
+                         (1, 0, 0, 0))
+
+    def test_shutdown_fails_waiting_jobs(self):
+        running = self.pool.submit('BTCUSDT', time.sleep, 0.05)
+        waiting = self.pool.submit('BTCUSDT', lambda: 1)
+        self.pool.shutdown()
+        self.assertIsNone(running.result(timeout=1))
+        self.assertIsInstance(waiting.exception(timeout=1), RuntimeError)
+        self.assertEqual(self.pool.queue_depth(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
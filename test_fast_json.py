@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Fast JSON Decoding Test
+=======================
+
+Verifies that every JSON backend decodes frames identically, that stream
+klines go into the ring buffer without an intermediate dict, and that REST
+kline rows parse straight into float64 columns.
+"""
+
+import json
+import time
+import unittest
+
+import numpy as np
+
+from src.data_fetcher import fast_json
+from src.data_fetcher.fast_json import (benchmark_decoders, get_decoder, kline_values,
+                                        rest_klines_to_array, rest_klines_to_dataframe)
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def kline_frame(open_time, close, is_closed):
+    kline = {'t': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m', 'o': str(close),
+             'h': str(close + 1), 'l': str(close - 1), 'c': str(close), 'v': '2.5', 'x': is_closed}
+    return json.dumps({'stream': 'btcusdt@kline_1m', 'data': {'e': 'kline', 'E': open_time, 's': 'BTCUSDT', 'k': kline}})
+
+
+def rest_row(open_time, close):
+    return [open_time, str(close), str(close + 1), str(close - 1), str(close), '2.5',
+            open_time + MINUTE_MS - 1, '0', 10, '0', '0', '0']
+
+
+class TestFastJson(unittest.TestCase):
+    def test_backends_decode_identically(self):
+        frame = kline_frame(0, 100.5, True)
+        decoded = [fast_json.DECODERS[name]().loads(frame) for name in fast_json.available_decoders()]
+        self.assertTrue(all(result == decoded[0] for result in decoded))
+        self.assertEqual(decoded[0]['data']['k']['c'], '100.5')
+
+        for name in fast_json.available_decoders():
+            with self.assertRaises(json.JSONDecodeError):
+                fast_json.DECODERS[name]().loads('{"stream": ')
+
+    def test_unknown_backend_falls_back_to_stdlib(self):
+        self.assertEqual(get_decoder('simdjson-not-installed').name, 'json')
+        self.assertEqual(get_decoder('auto').name, 'orjson' if fast_json.ORJSON_AVAILABLE else 'json')
+
+    def test_kline_values_match_buffer_update_order(self):
+        values = kline_values(json.loads(kline_frame(MINUTE_MS, 100, False))['data']['k'])
+        self.assertEqual(values, (MINUTE_MS, 2 * MINUTE_MS - 1, 100.0, 101.0, 99.0, 100.0, 2.5, False))
+
+    def test_stream_frames_fill_buffer_and_callbacks(self):
+        for name in fast_json.available_decoders():
+            manager = WebSocketKlineManager()
+            manager.json_decoder = get_decoder(name)
+            manager.add_symbol_interval('BTCUSDT', '1m')
+            seen = []
+            manager.add_update_callback(lambda symbol, interval, kline: seen.append(kline))
+
+            manager._on_message(None, kline_frame(0, 100, False))
+            manager._on_message(None, kline_frame(0, 101, True).encode())  # orjson / websockets may hand bytes
+            manager.dispatcher.flush()
+
+            view = manager.kline_cache['BTCUSDT']['1m'].view()
+            self.assertEqual(list(view['close']), [101.0])
+            self.assertEqual([kline['close'] for kline in seen], [100.0, 101.0])
+            self.assertEqual(seen[-1]['high'], 102.0)
+            self.assertTrue(seen[-1]['is_closed'])
+
+    def test_rest_rows_parse_to_float_columns(self):
+        rows = [rest_row(minute * MINUTE_MS, 100 + minute) for minute in range(5)]
+        array = rest_klines_to_array(rows)
+        self.assertEqual(array.shape, (5, 7))
+        self.assertEqual(array.dtype, np.float64)
+
+        df = rest_klines_to_dataframe(array)
+        self.assertEqual(list(df['close']), [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertTrue(all(df[column].dtype == np.float64 for column in ['open', 'high', 'low', 'close', 'volume']))
+        self.assertEqual(df.index[1].value // 1_000_000, MINUTE_MS)
+        self.assertEqual(rest_klines_to_array([]).shape, (0, 7))
+
+    def test_seed_keeps_only_closed_rows(self):
+        manager = WebSocketKlineManager()
+        now_minute = int(time.time() * 1000) // MINUTE_MS * MINUTE_MS
+        rows = [rest_row(now_minute - offset * MINUTE_MS, 100 + offset) for offset in (3, 2, 1, 0)]
+        self.assertEqual(manager.seed_klines('BTCUSDT', '1m', rows), 3)
+
+    def test_benchmark_reports_every_backend(self):
+        frames = [kline_frame(minute * MINUTE_MS, 100, True) for minute in range(50)]
+        results = benchmark_decoders(frames, repeat=1)
+        self.assertEqual(set(results), set(fast_json.available_decoders()))
+        self.assertTrue(all(result['frames'] == 50 for result in results.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
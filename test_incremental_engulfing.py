@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Incremental Engulfing Evaluator Test
+====================================
+
+Verifies that the O(1)-per-candle engulfing evaluator reaches the same
+pattern flags, RSI and entry decisions as the strategy's vectorized
+indicator path, and that syncing from DataFrames only applies newly closed
+candles.
+"""
+
+import logging
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.execution_engine.strategies.engulfing_pattern_strategy import (
+    EngulfingPatternStrategy, IncrementalEngulfingEvaluator)
+from src.strategy_processor.signal_processor import SignalProcessor
+
+MINUTE_MS = 60_000
+
+
+def make_frame(n, seed=1):
+    """Choppy candles whose opens gap past the previous close, so engulfing patterns are common"""
+    rng = np.random.default_rng(seed)
+    close = np.empty(n)
+    open_ = np.empty(n)
+    price = 100.0
+    for i in range(n):
+        open_[i] = price + rng.normal(0, 0.3)
+        close[i] = open_[i] + rng.normal(0, 1.0)
+        price = close[i]
+    high = np.maximum(open_, close) + rng.uniform(0, 0.3, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.3, n)
+    open_time = np.arange(n, dtype=np.int64) * MINUTE_MS
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': 1.0,
+                         'close_time': open_time + MINUTE_MS - 1},
+                        index=pd.to_datetime(open_time, unit='ms'))
+
+
+class TestIncrementalEngulfing(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('src.execution_engine.strategies.engulfing_pattern_strategy').setLevel(logging.WARNING)
+        self.config = {'symbol': 'BTCUSDT', 'timeframe': '1m', 'rsi_threshold': 50}
+        self.df = make_frame(400)
+
+    def test_matches_vectorized_path(self):
+        strategy = EngulfingPatternStrategy('engulfing_test', dict(self.config))
+        evaluator = IncrementalEngulfingEvaluator(EngulfingPatternStrategy('engulfing_test', dict(self.config)))
+        vectorized = strategy.calculate_indicators(self.df.copy())
+        lookback = f'close_{strategy.price_lookback_bars}_ago'
+
+        patterns = signals = 0
+        for i, (open_, high, low, close) in enumerate(self.df[['open', 'high', 'low', 'close']].to_numpy()):
+            state = evaluator.update(open_, high, low, close)
+            row = vectorized.iloc[i]
+            self.assertEqual(state['bullish_engulfing'], bool(row['bullish_engulfing']))
+            self.assertEqual(state['bearish_engulfing'], bool(row['bearish_engulfing']))
+            self.assertEqual(state['stable_candle'], bool(row['stable_candle']))
+            if pd.isna(row[lookback]):
+                self.assertIsNone(state['close_n_ago'])
+            else:
+                self.assertEqual(state['close_n_ago'], row[lookback])
+            if pd.isna(row['rsi']):
+                self.assertIsNone(state['rsi'])
+            else:
+                self.assertAlmostEqual(state['rsi'], row['rsi'], places=9)
+            patterns += state['bullish_engulfing'] or state['bearish_engulfing']
+
+            # Entry decisions on every prefix long enough to evaluate
+            if i + 1 >= 60:
+                expected = strategy.evaluate_entry_signal(vectorized.iloc[:i + 1])
+                actual = evaluator.evaluate_entry_signal()
+                self.assertEqual(actual is None, expected is None, f"candle {i}")
+                if expected is not None:
+                    signals += 1
+                    self.assertEqual(actual.signal_type, expected.signal_type)
+                    self.assertEqual(actual.entry_price, expected.entry_price)
+        self.assertGreater(patterns, 20)
+        self.assertGreater(signals, 0)
+
+    def test_matches_windowed_path_within_tolerance(self):
+        strategy = EngulfingPatternStrategy('engulfing_test', dict(self.config))
+        evaluator = IncrementalEngulfingEvaluator(EngulfingPatternStrategy('engulfing_test', dict(self.config)))
+        tolerance = IncrementalEngulfingEvaluator.RSI_WINDOW_TOLERANCE
+        evaluator.sync(self.df.iloc[:199], now_ms=10 ** 15)
+
+        # The DataFrame path re-seeds RSI on every 200-candle window; the evaluator never does
+        worst = 0.0
+        for end in range(200, len(self.df) + 1):
+            evaluator.sync(self.df.iloc[end - 200:end], now_ms=10 ** 15)
+            window = strategy.calculate_indicators(self.df.iloc[end - 200:end].copy())
+            rsi = window['rsi'].iloc[-1]
+            worst = max(worst, abs(evaluator.state['rsi'] - rsi))
+            if abs(rsi - strategy.rsi_threshold) > tolerance:
+                expected = strategy.evaluate_entry_signal(window)
+                actual = evaluator.evaluate_entry_signal()
+                self.assertEqual(actual is None, expected is None, f"window ending at {end}")
+        self.assertGreater(worst, 0.0)
+        self.assertLess(worst, tolerance)
+
+    def test_sync_applies_only_new_closed_candles(self):
+        evaluator = IncrementalEngulfingEvaluator(EngulfingPatternStrategy('engulfing_test', dict(self.config)))
+        now_ms = int(self.df['close_time'].iloc[-1])  # Last row is still forming
+        self.assertEqual(evaluator.sync(self.df.iloc[:300], now_ms), 300)
+        self.assertEqual(evaluator.sync(self.df.iloc[100:300], now_ms), 0)
+        self.assertEqual(evaluator.sync(self.df.iloc[101:302], now_ms), 2)
+        self.assertEqual(evaluator.sync(self.df, now_ms), 97)
+        self.assertEqual(evaluator.count, 399)
+
+        reference = IncrementalEngulfingEvaluator(EngulfingPatternStrategy('engulfing_test', dict(self.config)))
+        reference.sync(self.df, now_ms)
+        self.assertEqual(evaluator.state, reference.state)
+
+    def test_gap_restarts_from_frame(self):
+        evaluator = IncrementalEngulfingEvaluator(EngulfingPatternStrategy('engulfing_test', dict(self.config)))
+        evaluator.sync(self.df.iloc[:200], now_ms=10 ** 15)
+        evaluator.sync(self.df.iloc[210:], now_ms=10 ** 15)
+        self.assertEqual(evaluator.count, 190)
+
+    def test_signal_processor_reuses_evaluator(self):
+        processor = SignalProcessor()
+        config = dict(self.config, name='engulfing_test')
+        processor.evaluate_entry_conditions(self.df.iloc[:200], config)
+        evaluator = processor._engulfing_evaluators['engulfing_test']
+        processor.evaluate_entry_conditions(self.df.iloc[1:201], config)
+        self.assertIs(processor._engulfing_evaluators['engulfing_test'], evaluator)
+        self.assertEqual(evaluator.count, 201)
+
+        processor.evaluate_entry_conditions(self.df.iloc[1:201], dict(config, rsi_threshold=40))
+        self.assertIsNot(processor._engulfing_evaluators['engulfing_test'], evaluator)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Incremental Indicator Engine Test
+=================================
+
+Verifies that the streaming indicators match their batch (pandas / Wilder
+reference) counterparts, that provisional values for the forming candle
+leave state untouched, and that engine state survives snapshot/restore,
+gaps in the stream, and candles seeded into the cache after tracking began.
+"""
+
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+from src.indicators.incremental import ATR, EMA, MACD, IndicatorEngine, RollingMeanStd, TrueRange, WilderRSI
+
+MINUTE_MS = 60_000
+
+
+def make_candles(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    return close, high, low
+
+
+def reference_rsi(closes, period):
+    """Textbook Wilder RSI, value for the last close"""
+    deltas = np.diff(closes)
+    gains, losses = np.maximum(deltas, 0), np.maximum(-deltas, 0)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def kline(open_time, close, high, low, is_closed):
+    return {'t': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m', 'o': str(close), 'h': str(high),
+            'l': str(low), 'c': str(close), 'v': '1', 'x': is_closed}
+
+
+class TestStreamingIndicators(unittest.TestCase):
+    def setUp(self):
+        self.close, self.high, self.low = make_candles(300)
+
+    def run_indicator(self, indicator):
+        return [indicator.update(c, h, l) for c, h, l in zip(self.close, self.high, self.low)]
+
+    def test_ema_and_macd_match_pandas(self):
+        series = pd.Series(self.close)
+        ema = self.run_indicator(EMA(12))
+        np.testing.assert_allclose(ema, series.ewm(span=12, adjust=False).mean(), rtol=1e-12)
+
+        macd = np.array(self.run_indicator(MACD(12, 26, 9)))
+        line = series.ewm(span=12, adjust=False).mean() - series.ewm(span=26, adjust=False).mean()
+        signal = line.ewm(span=9, adjust=False).mean()
+        np.testing.assert_allclose(macd[:, 0], line, rtol=1e-10)
+        np.testing.assert_allclose(macd[:, 1], signal, rtol=1e-10)
+        np.testing.assert_allclose(macd[:, 2], line - signal, atol=1e-10)
+
+    def test_rsi_matches_wilder_reference(self):
+        values = self.run_indicator(WilderRSI(14))
+        self.assertTrue(all(value is None for value in values[:14]))
+        for end in (15, 50, 300):
+            self.assertAlmostEqual(values[end - 1], reference_rsi(self.close[:end], 14), places=9)
+
+    def test_rolling_mean_std_match_pandas(self):
+        values = self.run_indicator(RollingMeanStd(20))
+        series = pd.Series(self.close)
+        means = [value[0] if value else np.nan for value in values]
+        stds = [value[1] if value else np.nan for value in values]
+        np.testing.assert_allclose(means, series.rolling(20).mean(), rtol=1e-10)
+        np.testing.assert_allclose(stds, series.rolling(20).std(), rtol=1e-7)
+
+    def test_true_range_and_atr(self):
+        true_range = np.array(self.run_indicator(TrueRange()))
+        prev_close = pd.Series(self.close).shift(1)
+        expected = pd.concat([pd.Series(self.high - self.low), (self.high - prev_close).abs(),
+                              (self.low - prev_close).abs()], axis=1).max(axis=1)
+        np.testing.assert_allclose(true_range, expected)
+
+        atr = self.run_indicator(ATR(14))
+        reference = true_range[:14].mean()
+        for value in true_range[14:]:
+            reference = (reference * 13 + value) / 14
+        self.assertAlmostEqual(atr[-1], reference, places=10)
+
+    def test_peek_matches_update_without_changing_state(self):
+        for indicator in (WilderRSI(14), MACD(), RollingMeanStd(20), ATR(14)):
+            for c, h, l in zip(self.close[:-1], self.high[:-1], self.low[:-1]):
+                indicator.update(c, h, l)
+            before = json.dumps(indicator.state())
+            provisional = indicator.peek(self.close[-1], self.high[-1], self.low[-1])
+            self.assertEqual(json.dumps(indicator.state()), before)
+            np.testing.assert_allclose(provisional, indicator.update(self.close[-1], self.high[-1], self.low[-1]),
+                                       rtol=1e-9)
+
+
+class TestIndicatorEngine(unittest.TestCase):
+    def setUp(self):
+        self.close, self.high, self.low = make_candles(120)
+        self.manager = WebSocketKlineManager()
+        self.manager.add_symbol_interval('BTCUSDT', '1m')
+        self.engine = IndicatorEngine()
+        self.engine.attach(self.manager)
+
+    def feed(self, start, end, is_closed=True):
+        for i in range(start, end):
+            self.manager._process_kline_data(
+                'btcusdt@kline_1m', kline(i * MINUTE_MS, self.close[i], self.high[i], self.low[i], is_closed))
+        self.manager.dispatcher.flush()
+
+    def test_warm_up_then_stream(self):
+        self.feed(0, 100)
+        self.engine.track('BTCUSDT', '1m', 'rsi', period=14)  # Warmed up from the cache
+        self.feed(100, 120)
+        self.assertAlmostEqual(self.engine.value('BTCUSDT', '1m', 'rsi', period=14),
+                               reference_rsi(self.close, 14), places=9)
+        self.assertAlmostEqual(self.engine.value('BTCUSDT', '1m', 'rsi', offset=1, period=14),
+                               reference_rsi(self.close[:-1], 14), places=9)
+
+    def test_forming_candle_gives_provisional_value(self):
+        self.engine.track('BTCUSDT', '1m', 'rsi', period=14)
+        self.feed(0, 60)
+        closed = self.engine.value('BTCUSDT', '1m', 'rsi', period=14)
+        self.feed(60, 61, is_closed=False)
+        provisional = self.engine.value('BTCUSDT', '1m', 'rsi', provisional=True, period=14)
+        self.assertAlmostEqual(provisional, reference_rsi(self.close[:61], 14), places=9)
+        self.assertEqual(self.engine.value('BTCUSDT', '1m', 'rsi', period=14), closed)
+
+    def test_snapshot_restore_round_trip(self):
+        self.engine.track('BTCUSDT', '1m', 'macd', fast=12, slow=26, signal=9)
+        self.engine.track('BTCUSDT', '1m', 'rolling', window=20)
+        self.feed(0, 80)
+        snapshot = json.loads(json.dumps(self.engine.snapshot()))
+
+        restored = IndicatorEngine()
+        restored.restore(snapshot)
+        self.assertEqual(restored.latest('BTCUSDT', '1m'), self.engine.latest('BTCUSDT', '1m'))
+        self.assertIn('macd_histogram_12_26_9', restored.latest('BTCUSDT', '1m'))
+
+    def test_gap_rebuilds_after_backfill(self):
+        self.engine.track('BTCUSDT', '1m', 'rsi', period=14)
+        self.feed(0, 50)
+        self.feed(55, 60)  # Candles 50-54 missed during a disconnect
+        self.assertEqual(self.engine.get_statistics()['stale_streams'], 1)
+
+        rows = [[i * MINUTE_MS, self.close[i], self.high[i], self.low[i], self.close[i], 1, i * MINUTE_MS + MINUTE_MS - 1]
+                for i in range(50, 55)]
+        self.manager._merge_backfill('BTCUSDT', '1m', rows)
+        self.assertAlmostEqual(self.engine.value('BTCUSDT', '1m', 'rsi', period=14),
+                               reference_rsi(self.close[:60], 14), places=9)
+        self.assertEqual(self.engine.get_statistics()['stale_streams'], 0)
+
+    def test_seeded_history_rebuilds_tracked_stream(self):
+        self.engine.track('BTCUSDT', '1m', 'rsi', period=14)  # Tracked before any history is cached
+        rows = np.array([[i * MINUTE_MS, self.close[i], self.high[i], self.low[i], self.close[i], 1,
+                          i * MINUTE_MS + MINUTE_MS - 1] for i in range(100)])
+        self.manager.seed_klines('BTCUSDT', '1m', rows)
+        self.assertAlmostEqual(self.engine.value('BTCUSDT', '1m', 'rsi', period=14),
+                               reference_rsi(self.close[:100], 14), places=9)
+
+        self.feed(100, 101)  # The live stream continues from the seeded history
+        self.assertAlmostEqual(self.engine.value('BTCUSDT', '1m', 'rsi', period=14),
+                               reference_rsi(self.close[:101], 14), places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Indicator Cache Test
+====================
+
+Verifies that indicator results are shared per closed candle and params,
+that a moving forming candle or a different window forces a recompute,
+that windows are identified by their own open times (and not cached
+without them), that the LRU stays bounded, and that strategies on the same
+symbol and timeframe share one RSI computation.
+"""
+
+import logging
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher.price_fetcher import PriceFetcher
+from src.data_fetcher.websocket_manager import websocket_manager
+from src.execution_engine.strategies.engulfing_pattern_strategy import EngulfingPatternStrategy
+from src.indicators.indicator_cache import IndicatorCache, indicator_cache
+from src.indicators.rsi import wilder_rsi
+
+MINUTE_MS = 60_000
+
+
+def kline(open_time, close, is_closed=True):
+    return {'t': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m', 'o': str(close), 'h': str(close + 0.2),
+            'l': str(close - 0.2), 'c': str(close), 'v': '1', 'x': is_closed}
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.prices = 100 + np.cumsum(rng.normal(0, 0.5, 120))
+        index = pd.DatetimeIndex(pd.to_datetime(np.arange(120) * MINUTE_MS, unit='ms'), name='timestamp')
+        self.df = pd.DataFrame({'open': self.prices, 'high': self.prices + 0.2, 'low': self.prices - 0.2,
+                                'close': self.prices, 'volume': 1.0}, index=index)
+
+        websocket_manager.add_symbol_interval('CACHEUSDT', '1m')
+        for i, price in enumerate(self.prices):
+            websocket_manager._process_kline_data('cacheusdt@kline_1m', kline(i * MINUTE_MS, price))
+        indicator_cache.clear()
+        indicator_cache.hits = indicator_cache.misses = 0
+
+    def tearDown(self):
+        websocket_manager.remove_symbol_interval('CACHEUSDT', '1m')
+        indicator_cache.clear()
+
+    def test_hit_on_same_candle(self):
+        compute = mock.Mock(return_value=wilder_rsi(self.prices))
+        for _ in range(3):
+            indicator_cache.for_frame('CACHEUSDT', '1m', self.df, 'rsi', {'period': 14}, compute)
+        self.assertEqual(compute.call_count, 1)
+        stats = indicator_cache.get_statistics()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+
+    def test_forming_candle_or_new_window_recomputes(self):
+        compute = mock.Mock(return_value=None)
+        indicator_cache.for_frame('CACHEUSDT', '1m', self.df, 'rsi', {'period': 14}, compute)
+
+        moved = self.df.copy()
+        moved.loc[moved.index[-1], 'close'] += 1  # Forming candle ticked
+        indicator_cache.for_frame('CACHEUSDT', '1m', moved, 'rsi', {'period': 14}, compute)
+        indicator_cache.for_frame('CACHEUSDT', '1m', self.df.iloc[20:], 'rsi', {'period': 14}, compute)
+        indicator_cache.for_frame('CACHEUSDT', '1m', self.df, 'rsi', {'period': 21}, compute)
+        self.assertEqual(compute.call_count, 4)
+
+    def test_uncached_without_stream_or_open_times(self):
+        compute = mock.Mock(return_value=None)
+        indicator_cache.for_frame(None, None, self.df, 'rsi', {'period': 14}, compute)
+        indicator_cache.for_frame(None, None, self.df, 'rsi', {'period': 14}, compute)
+        unindexed = self.df.reset_index(drop=True)
+        indicator_cache.for_frame('CACHEUSDT', '1m', unindexed, 'rsi', {'period': 14}, compute)
+        indicator_cache.for_frame('CACHEUSDT', '1m', unindexed, 'rsi', {'period': 14}, compute)
+        self.assertEqual(compute.call_count, 4)
+        self.assertEqual(indicator_cache.get_statistics()['entries'], 0)
+
+    def test_windows_keyed_by_their_own_open_times(self):
+        strategy = EngulfingPatternStrategy('cache_test', {'symbol': 'CACHEUSDT', 'timeframe': '1m'})
+        framed = self.df.reset_index()
+        framed['timestamp'] = np.arange(120) * MINUTE_MS  # Open times as a column; the strategy resets the index
+
+        # Same length, different windows - neither is the live cache's latest candle
+        first = strategy.calculate_indicators(framed.iloc[:80].copy())
+        second = strategy.calculate_indicators(framed.iloc[10:90].copy())
+        np.testing.assert_allclose(first['rsi'].to_numpy(), wilder_rsi(self.prices[:80]))
+        np.testing.assert_allclose(second['rsi'].to_numpy(), wilder_rsi(self.prices[10:90]))
+        self.assertEqual(indicator_cache.get_statistics()['entries'], 2)
+
+        strategy.calculate_indicators(framed.iloc[10:90].copy())
+        self.assertEqual(indicator_cache.get_statistics()['hits'], 1)
+
+    def test_lru_eviction(self):
+        cache = IndicatorCache(max_entries=2)
+        for candle in (1, 2, 1, 3):
+            cache.get_or_compute('BTCUSDT', '1m', candle, 'rsi', {'period': 14}, lambda: candle)
+        stats = cache.get_statistics()
+        self.assertEqual((stats['entries'], stats['evictions']), (2, 1))
+        # Candle 2 was least recently used
+        self.assertEqual(cache.get_or_compute('BTCUSDT', '1m', 1, 'rsi', {'period': 14}, lambda: None), 1)
+        self.assertIsNone(cache.get_or_compute('BTCUSDT', '1m', 2, 'rsi', {'period': 14}, lambda: None))
+
+    def test_latest_only_for_current_candle(self):
+        indicator_cache.for_frame('CACHEUSDT', '1m', self.df, 'rsi', {'period': 14}, lambda: 'current')
+        self.assertEqual(indicator_cache.latest('cacheusdt', '1m', 'rsi', {'period': 14}), 'current')
+
+        websocket_manager._process_kline_data('cacheusdt@kline_1m', kline(len(self.prices) * MINUTE_MS, 101.0))
+        self.assertIsNone(indicator_cache.latest('CACHEUSDT', '1m', 'rsi', {'period': 14}))
+
+    def test_pipeline_and_strategy_share_rsi(self):
+        fetcher = PriceFetcher.__new__(PriceFetcher)
+        fetcher.logger = logging.getLogger(__name__)
+        strategy = EngulfingPatternStrategy('cache_test', {'symbol': 'CACHEUSDT', 'timeframe': '1m'})
+
+        with mock.patch('src.indicators.rsi.wilder_rsi', side_effect=wilder_rsi) as rsi:
+            piped = fetcher.calculate_indicators(self.df, 'CACHEUSDT', '1m')
+            strategy_df = strategy.calculate_indicators(self.df.copy())
+            fetcher.calculate_indicators(self.df, 'CACHEUSDT', '1m')
+        self.assertEqual(rsi.call_count, 1)
+        np.testing.assert_array_equal(strategy_df['rsi'].to_numpy(), piped['rsi'].to_numpy())
+        np.testing.assert_array_equal(piped['rsi'].to_numpy(), wilder_rsi(self.prices))
+
+
+if __name__ == '__main__':
+    unittest.main()
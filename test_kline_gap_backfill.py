@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Kline Gap Backfill Test
+=======================
+
+Verifies that a jump in candle open times after a reconnect is detected,
+that only the missing range is refetched over REST, and that the backfilled
+candles are merged into the cache in open-time order.
+"""
+
+import time
+import unittest
+
+from src.data_fetcher.gap_backfill import KlineGapBackfiller
+from src.data_fetcher.kline_buffer import KlineRingBuffer, interval_to_ms
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def make_kline(open_time, close, is_closed, interval='1m'):
+    return {
+        't': open_time, 'T': open_time + MINUTE_MS - 1, 'i': interval,
+        'o': str(close), 'h': str(close), 'l': str(close),
+        'c': str(close), 'v': '10', 'x': is_closed
+    }
+
+
+def make_rest_row(open_time, close):
+    return [open_time, str(close), str(close), str(close), str(close), '10',
+            open_time + MINUTE_MS - 1, '0', 0, '0', '0', '0']
+
+
+class FakeClientWrapper:
+    """Stands in for BinanceClientWrapper.get_klines_range"""
+
+    def __init__(self, closes_by_minute):
+        self.closes_by_minute = closes_by_minute
+        self.requests = []
+
+    def get_klines_range(self, symbol, interval, start_time, end_time, limit=1000):
+        self.requests.append((symbol, interval, start_time, end_time, limit))
+        rows = [make_rest_row(minute * MINUTE_MS, close)
+                for minute, close in sorted(self.closes_by_minute.items())
+                if start_time <= minute * MINUTE_MS <= end_time]
+        return rows[:limit]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestMergeClosed(unittest.TestCase):
+    def test_merge_orders_dedups_and_keeps_forming(self):
+        buffer = KlineRingBuffer(capacity=10, interval_ms=MINUTE_MS)
+        for minute in (0, 1, 5):
+            buffer.update(minute * MINUTE_MS, (minute + 1) * MINUTE_MS - 1, 1, 1, 1, float(minute), 1, True)
+        buffer.update(6 * MINUTE_MS, 7 * MINUTE_MS - 1, 1, 1, 1, 6.5, 1, False)
+
+        rows = [make_rest_row(minute * MINUTE_MS, 100.0 + minute) for minute in (1, 2, 3, 4, 6)]
+        added = buffer.merge_closed(rows)
+
+        self.assertEqual(added, 3)
+        closed = buffer.view()
+        self.assertEqual(list(closed['timestamp'] // MINUTE_MS), [0, 1, 2, 3, 4, 5])
+        # The cached candle wins over the REST duplicate
+        self.assertEqual(closed['close'][1], 1.0)
+        self.assertEqual(buffer.latest()['close'], 6.5)
+        self.assertFalse(buffer.latest()['is_closed'])
+
+    def test_merge_respects_capacity(self):
+        buffer = KlineRingBuffer(capacity=3, interval_ms=MINUTE_MS)
+        buffer.merge_closed([make_rest_row(minute * MINUTE_MS, minute) for minute in range(6)])
+        self.assertEqual(list(buffer.view()['close']), [3.0, 4.0, 5.0])
+        self.assertEqual(buffer.expected_next_open_time, 6 * MINUTE_MS)
+
+    def test_interval_to_ms(self):
+        self.assertEqual(interval_to_ms('15m'), 15 * MINUTE_MS)
+        self.assertEqual(interval_to_ms('4h'), 4 * 60 * MINUTE_MS)
+        self.assertIsNone(interval_to_ms('1M'))
+
+
+class TestGapBackfill(unittest.TestCase):
+    def test_gap_is_detected_and_backfilled(self):
+        manager = WebSocketKlineManager()
+        manager.add_symbol_interval('BTCUSDT', '1m')
+        client = FakeClientWrapper({minute: 200.0 + minute for minute in range(10)})
+        manager.set_backfill_client(client)
+
+        for minute in (0, 1, 2):
+            manager._process_kline_data('btcusdt@kline_1m', make_kline(minute * MINUTE_MS, minute, True))
+        # Stream comes back after missing minutes 3-5
+        manager._process_kline_data('btcusdt@kline_1m', make_kline(6 * MINUTE_MS, 6, True))
+
+        self.assertEqual(manager.stats['gaps_detected'], 1)
+        self.assertEqual(manager.stats['candles_missing'], 3)
+        self.assertTrue(wait_for(lambda: manager.is_continuous('BTCUSDT', '1m')))
+
+        self.assertEqual(client.requests, [('BTCUSDT', '1m', 3 * MINUTE_MS, 5 * MINUTE_MS, 3)])
+        closes = [k['close'] for k in manager.get_cached_klines('BTCUSDT', '1m', limit=10)]
+        self.assertEqual(closes, [0.0, 1.0, 2.0, 203.0, 204.0, 205.0, 6.0])
+
+        stats = manager.get_statistics()
+        self.assertEqual(stats['gaps']['BTCUSDT']['1m']['candles_missing'], 3)
+        self.assertTrue(wait_for(lambda: manager.backfiller.stats['candles_backfilled'] == 3))
+
+    def test_weight_budget_paces_requests(self):
+        self.assertEqual(KlineGapBackfiller.request_weight(99), 1)
+        self.assertEqual(KlineGapBackfiller.request_weight(499), 2)
+        self.assertEqual(KlineGapBackfiller.request_weight(1000), 5)
+
+        backfiller = KlineGapBackfiller(lambda *args: None, weight_per_minute=6000)
+        backfiller._tokens = 0.0
+        started = time.monotonic()
+        backfiller._acquire(5)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+        self.assertGreaterEqual(backfiller.stats['budget_waits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Kline Ring Buffer Test
+======================
+
+Verifies that the WebSocket kline cache stores one row per real candle:
+forming-candle ticks are updated in place and the buffer only advances
+when a candle closes.
+"""
+
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from src.data_fetcher.kline_buffer import KlineRingBuffer
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def make_kline(open_time, close, is_closed, interval='1m'):
+    return {
+        't': open_time, 'T': open_time + MINUTE_MS - 1, 'i': interval,
+        'o': str(close - 1), 'h': str(close + 1), 'l': str(close - 2),
+        'c': str(close), 'v': '10', 'x': is_closed
+    }
+
+
+class TestKlineRingBuffer(unittest.TestCase):
+    def test_forming_candle_updates_in_place(self):
+        buffer = KlineRingBuffer(capacity=5)
+        for price in (100.0, 101.0, 102.0):
+            buffer.update(0, MINUTE_MS - 1, 99, 103, 98, price, 1, False)
+
+        self.assertEqual(buffer.closed_count, 0)
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.latest_close(), 102.0)
+
+        buffer.update(0, MINUTE_MS - 1, 99, 103, 98, 102.5, 1, True)
+        self.assertEqual(buffer.closed_count, 1)
+        self.assertFalse(buffer.has_forming)
+        self.assertEqual(buffer.latest()['close'], 102.5)
+
+    def test_capacity_holds_real_candles(self):
+        buffer = KlineRingBuffer(capacity=3)
+        for i in range(5):
+            open_time = i * MINUTE_MS
+            buffer.update(open_time, open_time + MINUTE_MS - 1, 1, 1, 1, float(i), 1, False)
+            buffer.update(open_time, open_time + MINUTE_MS - 1, 1, 1, 1, float(i), 1, True)
+
+        rows = buffer.to_dicts()
+        self.assertEqual([row['close'] for row in rows], [2.0, 3.0, 4.0])
+        self.assertTrue(all(row['is_closed'] for row in rows))
+
+        buffer.update(5 * MINUTE_MS, 6 * MINUTE_MS - 1, 1, 1, 1, 5.0, 1, False)
+        rows = buffer.to_dicts(limit=3)
+        self.assertEqual([row['close'] for row in rows], [3.0, 4.0, 5.0])
+        self.assertFalse(rows[-1]['is_closed'])
+
+    def test_stale_ticks_are_ignored(self):
+        buffer = KlineRingBuffer(capacity=3)
+        buffer.update(MINUTE_MS, 2 * MINUTE_MS - 1, 1, 1, 1, 1.0, 1, True)
+        self.assertFalse(buffer.update(0, MINUTE_MS - 1, 1, 1, 1, 9.0, 1, True))
+        self.assertEqual(buffer.closed_count, 1)
+
+
+class TestKlineViews(unittest.TestCase):
+    def _filled_buffer(self, candles, capacity):
+        buffer = KlineRingBuffer(capacity=capacity)
+        for i in range(candles):
+            open_time = i * MINUTE_MS
+            buffer.update(open_time, open_time + MINUTE_MS - 1, i, i + 1, i - 1, float(i), 1, True)
+        return buffer
+
+    def test_views_are_contiguous_after_wrap(self):
+        buffer = self._filled_buffer(candles=13, capacity=5)
+        buffer.update(13 * MINUTE_MS, 14 * MINUTE_MS - 1, 1, 1, 1, 13.0, 1, False)
+
+        closed = buffer.view(limit=4)
+        np.testing.assert_array_equal(closed['close'], [9.0, 10.0, 11.0, 12.0])
+
+        with_forming = buffer.view(include_forming=True)
+        np.testing.assert_array_equal(with_forming['close'], [8.0, 9.0, 10.0, 11.0, 12.0, 13.0])
+        self.assertTrue(np.shares_memory(with_forming['close'], buffer.prices))
+        self.assertFalse(with_forming['close'].flags.writeable)
+
+    def test_dataframe_shares_memory_and_applies_offset(self):
+        buffer = self._filled_buffer(candles=8, capacity=6)
+        offset_ms = 4 * 3600 * 1000
+
+        df = buffer.to_dataframe(limit=3, time_offset_ms=offset_ms)
+        self.assertEqual(list(df['close']), [5.0, 6.0, 7.0])
+        self.assertTrue(np.shares_memory(df['close'].to_numpy(), buffer.prices))
+        self.assertEqual(df.index[0].value // 1_000_000, 5 * MINUTE_MS + offset_ms)
+
+    def test_copied_view_survives_merge(self):
+        buffer = self._filled_buffer(candles=8, capacity=6)
+        live = buffer.view(limit=3)
+        snapshot = buffer.view(limit=3, copy=True)
+        self.assertFalse(np.shares_memory(snapshot['close'], buffer.prices))
+
+        # A backfill merge rewrites the ring in place: live views change under the reader, snapshots do not
+        buffer.merge_closed([[0, 1, 1, 1, 0.0, 1, MINUTE_MS - 1]])
+        np.testing.assert_array_equal(snapshot['close'], [5.0, 6.0, 7.0])
+        self.assertNotEqual(list(live['close']), [5.0, 6.0, 7.0])
+
+        # A copy taken while a merge is in progress waits for it to finish
+        buffer.version += 1
+        finish = threading.Timer(0.05, lambda: setattr(buffer, 'version', buffer.version + 1))
+        finish.start()
+        started = time.monotonic()
+        df = buffer.to_dataframe(limit=3, copy=True)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+        self.assertEqual(list(df['close']), [5.0, 6.0, 7.0])
+        self.assertFalse(np.shares_memory(df['close'].to_numpy(), buffer.prices))
+
+
+class TestWebSocketCacheIngest(unittest.TestCase):
+    def test_manager_caches_one_row_per_candle(self):
+        manager = WebSocketKlineManager()
+        manager.add_symbol_interval('BTCUSDT', '1m')
+
+        for minute in range(3):
+            open_time = minute * MINUTE_MS
+            for tick in range(10):
+                manager._process_kline_data('btcusdt@kline_1m', make_kline(open_time, 100 + tick, False))
+            manager._process_kline_data('btcusdt@kline_1m', make_kline(open_time, 110, True))
+
+        klines = manager.get_cached_klines('BTCUSDT', '1m', limit=100)
+        self.assertEqual(len(klines), 3)
+        self.assertEqual([k['timestamp'] for k in klines], [0, MINUTE_MS, 2 * MINUTE_MS])
+        self.assertEqual(manager.get_current_price('BTCUSDT'), 110.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Kline Store Test
+================
+
+Verifies that closed candles written by the WebSocket manager survive a
+restart: a fresh manager pointed at the same store directory starts with
+the candles already cached, and only candles past the stored tail are new.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.data_fetcher.kline_store import KlineStore, RECORD_DTYPE
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def make_kline(open_time, close, is_closed):
+    return {
+        't': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m',
+        'o': str(close), 'h': str(close + 1), 'l': str(close - 1),
+        'c': str(close), 'v': '10', 'x': is_closed
+    }
+
+
+class TestKlineStore(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tempdir.name, 'klines')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_load_sorts_dedups_and_ignores_torn_record(self):
+        store = KlineStore(self.root)
+        for minute, close in ((0, 1.0), (2, 3.0), (1, 2.0), (2, 9.0)):
+            store.append('BTCUSDT', '1m', minute * MINUTE_MS, (minute + 1) * MINUTE_MS - 1,
+                         close, close, close, close, 1.0)
+        store.close()
+        with open(os.path.join(self.root, 'BTCUSDT_1m.klines'), 'ab') as handle:
+            handle.write(b'\x00' * 10)
+
+        rows = KlineStore(self.root).load('BTCUSDT', '1m', limit=10)
+        self.assertEqual(list(rows[:, 0] // MINUTE_MS), [0, 1, 2])
+        # The last write for a candle wins
+        self.assertEqual(list(rows[:, 4]), [1.0, 2.0, 9.0])
+        self.assertEqual(rows[-1, 6], 3 * MINUTE_MS - 1)
+
+    def test_append_after_torn_record_stays_aligned(self):
+        store = KlineStore(self.root)
+        store.append('BTCUSDT', '1m', 0, MINUTE_MS - 1, 1.0, 1.0, 1.0, 1.0, 1.0)
+        store.close()
+        path = os.path.join(self.root, 'BTCUSDT_1m.klines')
+        with open(path, 'ab') as handle:
+            handle.write(b'\x01\x02\x03')
+
+        store = KlineStore(self.root)
+        with self.assertLogs('src.data_fetcher.kline_store', 'WARNING'):
+            store.append('BTCUSDT', '1m', MINUTE_MS, 2 * MINUTE_MS - 1, 2.0, 2.5, 1.5, 2.0, 5.0)
+        rows = store.load('BTCUSDT', '1m', limit=10)
+        store.close()
+
+        self.assertEqual(os.path.getsize(path), 2 * RECORD_DTYPE.itemsize)
+        np.testing.assert_array_equal(rows, [[0, 1.0, 1.0, 1.0, 1.0, 1.0, MINUTE_MS - 1],
+                                             [MINUTE_MS, 2.0, 2.5, 1.5, 2.0, 5.0, 2 * MINUTE_MS - 1]])
+
+    def test_compaction_keeps_newest_candles(self):
+        store = KlineStore(self.root, max_records=10)
+        rows = np.array([[m * MINUTE_MS, 1, 1, 1, float(m), 1, (m + 1) * MINUTE_MS - 1] for m in range(25)])
+        store.append_rows('ETHUSDT', '1m', rows)
+
+        loaded = store.load('ETHUSDT', '1m', limit=100)
+        self.assertEqual(list(loaded[:, 4]), [20.0, 21.0, 22.0, 23.0, 24.0])
+        size = os.path.getsize(os.path.join(self.root, 'ETHUSDT_1m.klines'))
+        self.assertEqual(size, 5 * RECORD_DTYPE.itemsize)
+
+    def test_warm_restart_restores_cache(self):
+        manager = WebSocketKlineManager()
+        manager.set_kline_store(KlineStore(self.root))
+        manager.add_symbol_interval('BTCUSDT', '1m')
+        for minute in range(5):
+            manager._process_kline_data('btcusdt@kline_1m', make_kline(minute * MINUTE_MS, 100 + minute, False))
+            manager._process_kline_data('btcusdt@kline_1m', make_kline(minute * MINUTE_MS, 100 + minute, True))
+        manager.kline_store.close()
+
+        restarted = WebSocketKlineManager()
+        restarted.set_kline_store(KlineStore(self.root))
+        restarted.add_symbol_interval('BTCUSDT', '1m')
+
+        klines = restarted.get_cached_klines('BTCUSDT', '1m', limit=10)
+        self.assertEqual([k['close'] for k in klines], [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertEqual(restarted.get_kline_arrays('BTCUSDT', '1m')['timestamp'][-1], 4 * MINUTE_MS)
+
+        # The stream resumes right after the stored tail without reporting a gap
+        restarted._process_kline_data('btcusdt@kline_1m', make_kline(5 * MINUTE_MS, 105, True))
+        self.assertEqual(restarted.stats['gaps_detected'], 0)
+        self.assertTrue(restarted.is_continuous('BTCUSDT', '1m'))
+
+
+if __name__ == '__main__':
+    unittest.main()
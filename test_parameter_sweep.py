@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep Test
+====================
+
+Verifies that the vectorized sweep reaches the same entries, exits, stop
+outs and PnL as a candle-by-candle replay driven by the live RSI, MACD and
+engulfing decision code, that indicator work is shared across parameter
+sets, and that thousands of configurations run in seconds.
+"""
+
+import logging
+import time
+import unittest
+
+import numpy as np
+
+from src.backtesting.parameter_sweep import ParameterSweep, parameter_grid, strategy_kind
+from src.execution_engine.strategies.engulfing_pattern_strategy import EngulfingPatternStrategy
+from src.execution_engine.strategies.macd_divergence_strategy import MACDDivergenceStrategy
+from src.indicators.rsi import wilder_rsi
+from src.strategy_processor.signal_processor import SignalProcessor, SignalType
+from src.strategy_processor.strategy_interface import CandleFrame
+
+MINUTE_MS = 60_000
+FEE_RATE = 0.0004
+
+
+def make_frame(n, seed=2):
+    """Choppy candles whose opens gap past the previous close, so engulfing patterns are common"""
+    rng = np.random.default_rng(seed)
+    close, open_ = np.empty(n), np.empty(n)
+    price = 100.0
+    for i in range(n):
+        open_[i] = price + rng.normal(0, 0.3)
+        close[i] = open_[i] + rng.normal(0, 1.0)
+        price = close[i]
+    high = np.maximum(open_, close) + rng.uniform(0, 0.3, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.3, n)
+    open_time = np.arange(n, dtype=np.int64) * MINUTE_MS
+    rows = np.column_stack([open_time, open_, high, low, close, np.ones(n), open_time + MINUTE_MS - 1])
+    return CandleFrame.from_rows(rows, 'BTCUSDT', '1m')
+
+
+def replay(frame, config, entry, exit_reason):
+    """Candle-by-candle reference: entry(t) -> TradingSignal or None, exit_reason(t, side) -> reason or None"""
+    notional = config['margin'] * config['leverage']
+    side, entry_price, stop = 0, 0.0, 0.0
+    realized, trades, wins, stop_outs, signals = 0.0, 0, 0, 0, 0
+
+    def settle(fill):
+        nonlocal realized, trades, wins, side
+        pnl = side * (fill - entry_price) / entry_price * notional - 2 * FEE_RATE * notional
+        realized += pnl
+        trades += 1
+        wins += pnl > 0
+        side = 0
+
+    for t in range(len(frame)):
+        if side == 1 and frame.low[t] <= stop:
+            stop_outs += 1
+            settle(min(frame.open[t], stop))
+        elif side == -1 and frame.high[t] >= stop:
+            stop_outs += 1
+            settle(max(frame.open[t], stop))
+
+        exited = False
+        if side != 0 and exit_reason(t, side):
+            settle(frame.close[t])
+            exited = True
+
+        signal = entry(t)
+        signals += signal is not None
+        if signal is not None and side == 0 and not exited:
+            side = 1 if signal.signal_type == SignalType.BUY else -1
+            entry_price, stop = frame.close[t], signal.stop_loss
+    return {'signals': signals, 'trades': trades, 'wins': wins, 'stop_outs': stop_outs, 'realized_pnl': realized}
+
+
+class TestParameterSweep(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('src').setLevel(logging.CRITICAL)  # The invalid RSI configs below log errors
+        self.frame = make_frame(900)
+        self.df = self.frame.to_dataframe()
+
+    def assert_matches(self, results, expected):
+        for i, row in enumerate(expected):
+            for column in ('signals', 'trades', 'wins', 'stop_outs'):
+                self.assertEqual(results[column].iloc[i], row[column], f"set {i} {column}")
+            self.assertAlmostEqual(results['realized_pnl'].iloc[i], row['realized_pnl'], places=6)
+
+    def test_rsi_matches_signal_processor(self):
+        base = {'name': 'rsi_oversold', 'margin': 12.5, 'leverage': 25, 'max_loss_pct': 10}
+        grid = parameter_grid(rsi_long_entry=[30, 40, 55], rsi_short_entry=[60, 70], rsi_long_exit=[55, 70])
+        results = ParameterSweep(base, self.frame, FEE_RATE).run(grid)
+
+        processor = SignalProcessor()
+        rsi = wilder_rsi(self.frame.close, 14)
+        expected = []
+        for params in grid:
+            config = {**base, 'rsi_short_exit': 30, **params}
+            entry = lambda t: processor._rsi_signal(rsi[t], self.frame.close[t], config) if t >= 49 else None
+            exit_reason = lambda t, side: processor._rsi_exit_reason(rsi[t], 'BUY' if side == 1 else 'SELL', config)
+            expected.append(replay(self.frame, config, entry, exit_reason))
+
+        self.assert_matches(results, expected)
+        invalid = results['rsi_long_entry'] == 55
+        self.assertTrue((results[invalid]['signals'] == 0).all())
+        self.assertGreater(results[~invalid]['trades'].min(), 0)
+        self.assertGreater(results['stop_outs'].sum(), 0)
+
+    def test_macd_matches_strategy(self):
+        base = {'name': 'macd_divergence', 'margin': 50.0, 'leverage': 5}
+        grid = parameter_grid(min_histogram_threshold=[0.01, 0.1], macd_exit_threshold=[0.01, 0.05],
+                              macd_fast=[8, 12])
+        results = ParameterSweep(base, self.frame, FEE_RATE).run(grid)
+
+        expected = []
+        for params in grid:
+            strategy = MACDDivergenceStrategy({**base, **params})
+            df = strategy.calculate_indicators(self.df.copy())
+            warmup = max(50, strategy.macd_slow + strategy.macd_signal)
+            entry = lambda t: strategy.evaluate_entry_signal(df.iloc[:t + 1]) if t + 1 >= warmup else None
+            exit_reason = lambda t, side: strategy.evaluate_exit_signal(df.iloc[:t + 1],
+                                                                        {'side': 'BUY' if side == 1 else 'SELL'})
+            expected.append(replay(self.frame, {**base, **params}, entry, exit_reason))
+
+        self.assert_matches(results, expected)
+        self.assertGreater(results['trades'].min(), 0)
+
+    def test_engulfing_matches_strategy_and_shares_indicators(self):
+        base = {'name': 'engulfing_btc', 'symbol': 'BTCUSDT', 'timeframe': '1m', 'margin': 20.0, 'leverage': 10,
+                'max_loss_pct': 20}
+        grid = parameter_grid(stable_candle_ratio=[0.2, 0.5], rsi_threshold=[45, 50, 55],
+                              price_lookback_bars=[3, 5], rsi_long_exit=[60, 70])
+        sweep = ParameterSweep(base, self.frame, FEE_RATE)
+        results = sweep.run(grid)
+        self.assertEqual(len(sweep._indicators), 2)  # One RSI/lookback computation per lookback value
+
+        expected = []
+        for params in grid:
+            strategy = EngulfingPatternStrategy('engulfing_btc', {**base, **params})
+            df = strategy.calculate_indicators(self.df.copy())
+            warmup = max(50, strategy.rsi_period + strategy.price_lookback_bars + 5)
+            rsi = df['rsi'].to_numpy()
+            entry = lambda t: strategy.evaluate_entry_signal(df.iloc[:t + 1]) if t + 1 >= warmup else None
+            exit_reason = lambda t, side: strategy._exit_reason(rsi[t], {'side': 'BUY' if side == 1 else 'SELL'})
+            expected.append(replay(self.frame, {**base, **params}, entry, exit_reason))
+
+        self.assert_matches(results, expected)
+        self.assertGreater(results['signals'].min(), 0)
+
+    def test_entry_signals_and_validation(self):
+        sweep = ParameterSweep({'name': 'rsi_test'}, self.frame)
+        signals = sweep.entry_signals([{'rsi_long_entry': 35}, {'rsi_long_entry': 25}])
+        rsi = wilder_rsi(self.frame.close, 14)
+        np.testing.assert_array_equal(signals[0, 49:] == 1, rsi[49:] <= 35)
+        self.assertFalse(signals[:, :49].any())
+        self.assertLessEqual((signals[1] == 1).sum(), (signals[0] == 1).sum())
+
+        with self.assertRaises(ValueError):
+            sweep.run([{'macd_entry_threshold': 0.1}])  # Not read by any entry or exit rule
+        with self.assertRaises(ValueError):
+            ParameterSweep({'name': 'smart_money_btc'}, self.frame)
+        self.assertEqual(strategy_kind('RSI_engulfing'), 'engulfing')
+        self.assertTrue(sweep.run([]).empty)
+
+    def test_thousands_of_configurations(self):
+        frame = make_frame(5000, seed=9)
+        grid = parameter_grid(rsi_long_entry=np.arange(15, 45), rsi_short_entry=np.arange(55, 85, 3),
+                              rsi_long_exit=[60, 65, 70, 75], rsi_short_exit=[25, 30, 35, 40, 45])
+        self.assertEqual(len(grid), 6000)
+
+        started = time.perf_counter()
+        results = ParameterSweep({'name': 'rsi_oversold', 'margin': 10.0, 'leverage': 10}, frame).run(grid)
+        self.assertLess(time.perf_counter() - started, 10.0)
+        self.assertEqual(len(results), 6000)
+        self.assertTrue(np.isfinite(results['pnl']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
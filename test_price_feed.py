@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Price Feed Test
+===============
+
+Verifies that mark-price and bookTicker frames routed through the kline
+manager update the price feed, that lookups report their age, and that
+reading a price never tries to reconnect the socket, subscribes a stream or
+falls back to REST unless asked to.
+"""
+
+import json
+import time
+import unittest
+from unittest import mock
+
+from src.data_fetcher.price_feed import PriceFeed
+from src.data_fetcher.price_fetcher import PriceFetcher
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+
+def combined_frame(stream, payload):
+    return json.dumps({'stream': stream, 'data': payload})
+
+
+class TestPriceFeed(unittest.TestCase):
+    def setUp(self):
+        self.manager = WebSocketKlineManager()
+        self.feed = PriceFeed(self.manager, max_age_seconds=0.2)
+        self.feed.track('BTCUSDT')
+
+    def test_track_subscribes_streams(self):
+        self.assertIn('btcusdt@markPrice@1s', self.manager.subscribed_streams)
+        self.assertIn('btcusdt@bookTicker', self.manager.subscribed_streams)
+
+        self.feed.untrack('BTCUSDT')
+        self.assertFalse(self.manager.subscribed_streams)
+        self.assertFalse(self.feed.is_tracked('BTCUSDT'))
+
+    def test_book_ticker_then_mark_price(self):
+        self.assertEqual(self.feed.get_price('BTCUSDT'), (None, None))
+
+        self.manager._on_message(None, combined_frame('btcusdt@bookTicker', {
+            'e': 'bookTicker', 's': 'BTCUSDT', 'b': '100.0', 'B': '1', 'a': '102.0', 'A': '1', 'E': 1
+        }))
+        self.assertEqual(self.feed.get_quote('BTCUSDT')['price'], 101.0)
+
+        self.manager._on_message(None, combined_frame('btcusdt@markPrice@1s', {
+            'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '101.5', 'E': 2
+        }))
+        quote = self.feed.get_quote('BTCUSDT')
+        self.assertEqual((quote['price'], quote['bid'], quote['ask']), (101.5, 100.0, 102.0))
+        self.assertFalse(quote['is_stale'])
+        # Price frames never reach the kline cache
+        self.assertEqual(self.manager.stats['klines_processed'], 0)
+
+    def test_staleness_is_reported(self):
+        self.manager._on_message(None, combined_frame('btcusdt@markPrice@1s', {
+            'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '50.0'
+        }))
+        time.sleep(0.25)
+        price, age = self.feed.get_price('BTCUSDT')
+        self.assertEqual(price, 50.0)
+        self.assertGreater(age, 0.2)
+        self.assertTrue(self.feed.get_quote('BTCUSDT')['is_stale'])
+        self.assertEqual(self.feed.get_statistics()['stale_symbols'], 1)
+
+    def test_read_does_not_reconnect(self):
+        self.manager.is_running = True  # Running but no shard connected
+        self.manager._immediate_reconnect = lambda: self.fail('read triggered a reconnect')
+        self.assertIsNone(self.manager.get_current_price('BTCUSDT'))
+        self.manager.is_running = False
+
+    def test_price_fetcher_reads_have_no_side_effects(self):
+        fetcher = PriceFetcher.__new__(PriceFetcher)
+        fetcher.logger = mock.Mock()
+        fetcher.price_cache = {}
+        fetcher.binance_client = mock.Mock()
+        fetcher.binance_client.get_symbol_ticker.return_value = {'price': '0.25'}
+
+        with mock.patch('src.data_fetcher.price_fetcher.price_feed', self.feed):
+            self.assertIsNone(fetcher.get_price_quote('DOGEUSDT'))
+            self.assertIsNone(fetcher.get_current_price('DOGEUSDT'))
+            self.assertFalse(self.feed.is_tracked('DOGEUSDT'))
+            fetcher.binance_client.get_symbol_ticker.assert_not_called()
+
+            self.assertEqual(fetcher.get_current_price('DOGEUSDT', allow_rest=True), 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
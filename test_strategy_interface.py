@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Strategy Interface Test
+=======================
+
+Verifies that CandleFrame views share memory with the kline cache, that the
+frame-native MACD, RSI and engulfing paths reach the same decisions as the
+DataFrame paths, and that the DataFrame adapter keeps unported strategies
+working.
+"""
+
+import logging
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher.price_fetcher import PriceFetcher
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+from src.execution_engine.strategies.engulfing_pattern_strategy import (
+    EngulfingPatternStrategy, IncrementalEngulfingEvaluator)
+from src.execution_engine.strategies.macd_divergence_strategy import MACDDivergenceStrategy
+from src.execution_engine.strategies.smart_money_config import SmartMoneyStrategy
+from src.indicators.incremental import IndicatorEngine
+from src.strategy_processor.signal_processor import SignalProcessor
+from src.strategy_processor.strategy_interface import (
+    ArrayStrategy, CandleFrame, DataFrameStrategyAdapter, as_array_strategy)
+
+MINUTE_MS = 60_000
+
+
+def make_rows(n, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.8, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 0.5, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.5, n)
+    open_time = np.arange(n) * MINUTE_MS
+    return np.column_stack([open_time, open_, high, low, close, rng.uniform(1, 5, n), open_time + MINUTE_MS - 1])
+
+
+class TestCandleFrame(unittest.TestCase):
+    def setUp(self):
+        self.rows = make_rows(300)
+        self.manager = WebSocketKlineManager()
+        self.manager.add_symbol_interval('BTCUSDT', '1m')
+        self.manager.seed_klines('BTCUSDT', '1m', self.rows)
+
+    def test_views_over_cache(self):
+        engine = IndicatorEngine()
+        engine.attach(self.manager)
+        engine.track('BTCUSDT', '1m', 'rsi', period=14)
+
+        frame = CandleFrame.from_manager(self.manager, 'btcusdt', '1m', 200, engine=engine)
+        buffer = self.manager.kline_cache['BTCUSDT']['1m']
+        self.assertEqual(len(frame), 200)
+        self.assertTrue(np.shares_memory(frame.close, buffer.prices))
+        self.assertFalse(frame.close.flags.writeable)
+        np.testing.assert_array_equal(frame.close, self.rows[-200:, 4])
+        self.assertEqual(frame.last_open_time, int(self.rows[-1, 0]))
+        self.assertIn('rsi_14', frame.state)
+        self.assertIsNone(CandleFrame.from_manager(self.manager, 'ETHUSDT', '1m'))
+
+        behind = IndicatorEngine()
+        behind.track('BTCUSDT', '1m', 'rsi', period=14)  # Not attached, so it has consumed no candles
+        self.assertEqual(CandleFrame.from_manager(self.manager, 'BTCUSDT', '1m', 200, engine=behind).state, {})
+
+    def test_dataframe_round_trip(self):
+        frame = CandleFrame.from_manager(self.manager, 'BTCUSDT', '1m', 100)
+        df = frame.with_indicators(rsi=np.arange(100.0)).to_dataframe()
+        self.assertEqual(list(df.columns), ['open', 'high', 'low', 'close', 'volume', 'close_time', 'rsi'])
+
+        back = CandleFrame.from_dataframe(df, 'BTCUSDT', '1m')
+        np.testing.assert_array_equal(back.open_time, frame.open_time)
+        np.testing.assert_array_equal(back.close_time, frame.close_time)
+        self.assertEqual(back.last('rsi', offset=1), 98.0)
+        self.assertEqual(back.fingerprint(), frame.fingerprint())
+
+    def test_protocol_membership(self):
+        macd = MACDDivergenceStrategy({'name': 'macd_test'})
+        engulfing = EngulfingPatternStrategy('engulfing_test', {'timeframe': '1m'})
+        self.assertIsInstance(macd, ArrayStrategy)
+        self.assertIsInstance(SmartMoneyStrategy({'name': 'smart_money_test'}), ArrayStrategy)
+        self.assertIsInstance(IncrementalEngulfingEvaluator(engulfing), ArrayStrategy)
+        self.assertNotIsInstance(engulfing, ArrayStrategy)
+        self.assertIs(as_array_strategy(macd), macd)
+        self.assertIsInstance(as_array_strategy(engulfing), DataFrameStrategyAdapter)
+
+
+class TestFrameDecisions(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('src').setLevel(logging.WARNING)
+        self.rows = make_rows(400, seed=8)
+        self.df = pd.DataFrame(self.rows[:, 1:6], columns=['open', 'high', 'low', 'close', 'volume'])
+        self.df['close_time'] = self.rows[:, 6].astype(np.int64)
+        self.df.index = pd.to_datetime(self.rows[:, 0].astype(np.int64), unit='ms')
+
+    def frames(self, start=60):
+        for end in range(start, len(self.df) + 1):
+            yield end, CandleFrame.from_dataframe(self.df.iloc[:end])
+
+    def test_macd_native_matches_dataframe_path(self):
+        config = {'name': 'macd_test', 'min_histogram_threshold': 0.01, 'macd_exit_threshold': 0.01}
+        strategy = MACDDivergenceStrategy(config)
+        entries = exits = 0
+        for end, frame in self.frames():
+            df = strategy.calculate_indicators(self.df.iloc[:end].copy())
+            expected = strategy.evaluate_entry_signal(df)
+            actual = strategy.evaluate_entry(frame)
+            self.assertEqual(getattr(actual, 'signal_type', None), getattr(expected, 'signal_type', None))
+            entries += expected is not None
+            for side in ('BUY', 'SELL'):
+                expected_exit = strategy.evaluate_exit_signal(df, {'side': side})
+                self.assertEqual(strategy.evaluate_exit(frame, {'side': side}), expected_exit)
+                exits += expected_exit is not None
+        self.assertGreater(entries, 10)
+        self.assertGreater(exits, 5)
+
+    def test_rsi_frame_matches_dataframe_path(self):
+        fetcher = PriceFetcher.__new__(PriceFetcher)
+        fetcher.logger = logging.getLogger(__name__)
+        processor = SignalProcessor()
+        config = {'name': 'rsi_test', 'rsi_long_entry': 40, 'rsi_short_entry': 60}
+        signals = 0
+        for end, frame in self.frames():
+            df = fetcher.calculate_indicators(self.df.iloc[:end])
+            expected = processor.evaluate_entry_conditions(df, config)
+            actual = processor.evaluate_entry_frame(frame, config)
+            self.assertEqual(getattr(actual, 'signal_type', None), getattr(expected, 'signal_type', None))
+            signals += expected is not None
+            for side in ('BUY', 'SELL'):
+                position = {'side': side, 'entry_price': 1.0, 'stop_loss': 0.0, 'take_profit': 1e9}
+                self.assertEqual(processor.evaluate_exit_frame(frame, position, config),
+                                 processor.evaluate_exit_conditions(df, position, config))
+        self.assertGreater(signals, 10)
+
+    def test_smart_money_frame_matches_klines(self):
+        config = {'symbol': 'BTCUSDT', 'timeframe': '1m', 'session_filter_enabled': False,
+                  'trend_filter_enabled': False, 'max_daily_trades': 10 ** 6, 'min_swing_distance_pct': 0.1}
+        strategy = SmartMoneyStrategy(config)
+        klines = [[row[0], str(row[1]), str(row[2]), str(row[3]), str(row[4]), str(row[5]), row[6]]
+                  for row in self.rows]
+        for end, frame in self.frames(start=40):
+            expected = strategy.analyze_market(klines[:end], self.rows[end - 1, 4])
+            actual = strategy.evaluate_entry(frame)
+            self.assertEqual(getattr(actual, 'signal_type', None), getattr(expected, 'signal_type', None))
+
+    def test_adapter_matches_incremental_evaluator(self):
+        config = {'timeframe': '1m'}
+        adapter = DataFrameStrategyAdapter(EngulfingPatternStrategy('engulfing_test', dict(config)))
+        evaluator = IncrementalEngulfingEvaluator(EngulfingPatternStrategy('engulfing_test', dict(config)))
+        for end, frame in self.frames():
+            expected = adapter.evaluate_entry(frame)
+            actual = evaluator.evaluate_entry(frame)
+            self.assertEqual(getattr(actual, 'signal_type', None), getattr(expected, 'signal_type', None))
+            position = {'side': 'BUY'}
+            self.assertEqual(evaluator.evaluate_exit(frame, position), adapter.evaluate_exit(frame, position))
+
+
+if __name__ == '__main__':
+    unittest.main()
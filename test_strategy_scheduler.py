@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Strategy Scheduler Test
+=======================
+
+Verifies that strategies fire at their own assessment intervals aligned to
+candle boundaries plus the settle offset, that late loops and slow
+evaluations are reported, and that popping due strategies stays cheap with
+hundreds of strategies scheduled.
+"""
+
+import time
+import unittest
+
+from src.strategy_processor.strategy_scheduler import StrategyScheduler
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestStrategyScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1_699_999_200.0)  # An hour boundary
+        self.scheduler = StrategyScheduler(settle_seconds=2.0, clock=self.clock)
+
+    def test_fires_aligned_to_boundaries_plus_settle(self):
+        base = self.clock.now
+        self.assertEqual(self.scheduler.schedule('rsi_oversold', 60, '15m'), base + 2)
+        self.assertEqual(self.scheduler.schedule('macd_divergence', 30, '5m'), base + 2)
+        self.assertEqual(self.scheduler.schedule('swing', 3600, '1h'), base + 2)
+
+        fired = []
+        for second in range(0, 181):
+            self.clock.now = base + second
+            fired.extend((second, name) for name in self.scheduler.pop_due())
+        self.assertEqual([s for s, name in fired if name == 'rsi_oversold'], [2, 62, 122])
+        self.assertEqual([s for s, name in fired if name == 'macd_divergence'], [2, 32, 62, 92, 122, 152])
+        self.assertEqual([s for s, name in fired if name == 'swing'], [2])
+
+    def test_interval_not_dividing_candle_restarts_each_candle(self):
+        base = self.clock.now
+        self.scheduler.schedule('odd', 45, '1m')
+        fires = []
+        for second in range(0, 181):
+            self.clock.now = base + second
+            if self.scheduler.pop_due():
+                fires.append(second)
+        self.assertEqual(fires, [2, 47, 62, 107, 122, 167])
+
+    def test_reschedule_and_unschedule(self):
+        base = self.clock.now
+        self.scheduler.schedule('rsi_oversold', 60, '15m')
+        self.assertEqual(self.scheduler.schedule('rsi_oversold', 60, '15m'), base + 2)  # Unchanged
+        self.clock.now = base + 10
+        self.assertEqual(self.scheduler.schedule('rsi_oversold', 300, '15m'), base + 302)
+        self.assertEqual(self.scheduler.pop_due(base + 100), [])
+
+        self.assertTrue(self.scheduler.unschedule('rsi_oversold'))
+        self.assertIsNone(self.scheduler.next_due())
+        self.scheduler.schedule('rsi_oversold', 60, '15m')
+        self.assertEqual(self.scheduler.pop_due(base + 62), ['rsi_oversold'])
+        self.assertEqual(self.scheduler.pop_due(base + 62), [])
+
+        with self.assertRaises(ValueError):
+            self.scheduler.schedule('off', 0)
+
+    def test_late_loop_and_overrun_are_reported(self):
+        base = self.clock.now
+        self.scheduler.schedule('rsi_oversold', 60, '15m')
+        self.assertEqual(self.scheduler.pop_due(base + 200), ['rsi_oversold'])  # Fires at 2, 62, 122, 182 due
+        stats = self.scheduler.get_statistics()
+        self.assertEqual(stats['skipped'], 3)
+        self.assertAlmostEqual(stats['max_lateness_ms'], 198_000)
+        self.assertEqual(self.scheduler.next_due(), base + 242)
+
+        with self.assertLogs('src.strategy_processor.strategy_scheduler', 'WARNING'):
+            self.assertTrue(self.scheduler.record_run('rsi_oversold', 75.0))
+        self.assertFalse(self.scheduler.record_run('rsi_oversold', 0.5))
+        strategy = self.scheduler.get_statistics()['strategies']['rsi_oversold']
+        self.assertEqual((strategy['overruns'], strategy['max_duration']), (1, 75.0))
+
+    def test_hundreds_of_strategies(self):
+        base = self.clock.now
+        for i in range(500):
+            self.scheduler.schedule(f'strategy_{i}', (30, 60, 300)[i % 3], ('1m', '5m', '15m')[i % 3])
+        self.assertEqual(len(self.scheduler.pop_due(base + 2)), 500)
+
+        # Idle checks only look at the heap top
+        started = time.perf_counter()
+        for _ in range(10_000):
+            self.scheduler.pop_due(base + 3)
+            self.scheduler.seconds_until_next(base + 3)
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+        for i in range(0, 500, 2):
+            self.scheduler.unschedule(f'strategy_{i}')
+        self.assertLessEqual(self.scheduler.get_statistics()['heap_size'], 2 * len(self.scheduler) + 16)
+        self.assertEqual(len(self.scheduler.pop_due(base + 32)), len([i for i in range(1, 500, 2) if i % 3 == 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
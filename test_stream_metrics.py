@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Stream Metrics Test
+===================
+
+Verifies per-stream exchange lag, decode/processing time, throughput and
+closed-candle age reported by the WebSocket manager, and that freshness
+checks run on the monotonic clock.
+"""
+
+import json
+import time
+import unittest
+from unittest import mock
+
+from src.data_fetcher.stream_metrics import LatencyHistogram, StreamMetrics
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def kline_frame(open_time, close, is_closed, event_time):
+    kline = {'t': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m', 'o': str(close),
+             'h': str(close), 'l': str(close), 'c': str(close), 'v': '1', 'x': is_closed}
+    return json.dumps({'stream': 'btcusdt@kline_1m',
+                       'data': {'e': 'kline', 'E': event_time, 's': 'BTCUSDT', 'k': kline}})
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram()
+        for value in [0.3] * 90 + [40] * 9 + [7000]:
+            histogram.add(value)
+
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['p50_ms'], 0.5)
+        self.assertEqual(summary['p99_ms'], 50)
+        self.assertEqual(summary['max_ms'], 7000)
+        self.assertEqual(summary['buckets'], {'<=0.5': 90, '<=50': 9, '>5000': 1})
+
+
+class TestStreamMetrics(unittest.TestCase):
+    def test_rate_is_measured_over_window(self):
+        metrics = StreamMetrics(rate_window=0.05)
+        for _ in range(20):
+            metrics.record_message('btcusdt@kline_1m', None, 0.0, 0.0)
+        time.sleep(0.06)
+        rate = metrics.get_statistics()['streams']['btcusdt@kline_1m']['messages_per_second']
+        self.assertGreater(rate, 100)
+        self.assertLess(rate, 20 / 0.05)
+
+    def test_manager_reports_lag_decode_and_close_age(self):
+        manager = WebSocketKlineManager()
+        manager.add_symbol_interval('BTCUSDT', '1m')
+
+        now_ms = int(time.time() * 1000)
+        manager._on_message(None, kline_frame(0, 100, False, now_ms - 250))
+        manager._on_message(None, kline_frame(0, 101, True, now_ms - 250))
+
+        stats = manager.get_statistics()
+        stream = stats['stream_metrics']['streams']['btcusdt@kline_1m']
+        self.assertEqual(stream['messages'], 2)
+        self.assertGreaterEqual(stream['event_lag']['min_ms'], 250)
+        self.assertLess(stream['event_lag']['max_ms'], 5000)
+        self.assertEqual(stream['decode']['count'], 2)
+        self.assertIn('BTCUSDT 1m', stats['stream_metrics']['last_close_age_seconds'])
+        self.assertLess(stats['last_message_age_seconds'], 5)
+
+        status = manager.get_cache_status()['BTCUSDT']['1m']
+        self.assertLess(status['last_close_age_seconds'], 5)
+        self.assertTrue(status['is_fresh'])
+
+    def test_freshness_uses_monotonic_clock(self):
+        manager = WebSocketKlineManager()
+        manager.add_symbol_interval('BTCUSDT', '1m')
+        manager._on_message(None, kline_frame(0, 100, True, int(time.time() * 1000)))
+
+        self.assertTrue(manager.is_data_fresh('BTCUSDT', '1m', max_age_seconds=30))
+        # Age comes from the monotonic clock, not from datetime.now()
+        with mock.patch('src.data_fetcher.websocket_manager.time.monotonic',
+                        return_value=time.monotonic() + 400):
+            self.assertFalse(manager.is_data_fresh('BTCUSDT', '1m', max_age_seconds=30))
+
+
+if __name__ == '__main__':
+    unittest.main()
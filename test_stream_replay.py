@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Stream Record / Replay Test
+===========================
+
+Verifies that frames recorded by the WebSocket manager replay into a fresh
+manager with the same resulting kline cache, and that paced replay honours
+the recorded timing.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from src.data_fetcher.stream_recorder import StreamRecorder, StreamReplayer
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+
+MINUTE_MS = 60_000
+
+
+def kline_frame(open_time, close, is_closed):
+    kline = {'t': open_time, 'T': open_time + MINUTE_MS - 1, 'i': '1m', 'o': str(close),
+             'h': str(close), 'l': str(close), 'c': str(close), 'v': '1', 'x': is_closed}
+    return json.dumps({'stream': 'btcusdt@kline_1m', 'data': {'e': 'kline', 's': 'BTCUSDT', 'k': kline}})
+
+
+class TestStreamReplay(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, 'session.log.gz')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_recorded_session_replays_identically(self):
+        live = WebSocketKlineManager()
+        live.add_symbol_interval('BTCUSDT', '1m')
+        live.start_recording(self.path)
+        for minute in range(5):
+            live._on_message(object(), kline_frame(minute * MINUTE_MS, 100 + minute, False))
+            live._on_message(object(), kline_frame(minute * MINUTE_MS, 100 + minute, True))
+        live.stop_recording()
+
+        replayed = WebSocketKlineManager()
+        replayed.add_symbol_interval('BTCUSDT', '1m')
+        stats = StreamReplayer(self.path).replay_into(replayed)
+
+        self.assertEqual(stats['frames'], 10)
+        strip = lambda klines: [{k: v for k, v in kline.items() if k != 'received_at'} for kline in klines]
+        self.assertEqual(strip(replayed.get_cached_klines('BTCUSDT', '1m')),
+                         strip(live.get_cached_klines('BTCUSDT', '1m')))
+        # Replayed frames are not re-recorded
+        self.assertIsNone(replayed.recorder)
+
+    def test_sessions_append_and_truncated_tail_is_tolerated(self):
+        for session in range(2):
+            recorder = StreamRecorder(self.path)
+            recorder.record(kline_frame(session * MINUTE_MS, 1, True), received_at=1000.0 + session)
+            recorder.close()
+        with open(self.path, 'ab') as log:
+            log.write(gzip.compress(b'1002.0\tpartial')[:12])
+
+        frames = list(StreamReplayer(self.path).frames())
+        self.assertEqual([received_at for received_at, _ in frames], [1000.0, 1001.0])
+
+    def test_paced_replay_follows_recorded_timing(self):
+        recorder = StreamRecorder(self.path)
+        for i in range(3):
+            recorder.record(kline_frame(i * MINUTE_MS, 1, True), received_at=100.0 + i * 0.1)
+        recorder.close()
+
+        received = []
+        stats = StreamReplayer(self.path).replay(received.append, speed=2.0)
+        self.assertEqual(len(received), 3)
+        self.assertGreaterEqual(stats['elapsed_seconds'], 0.09)
+        self.assertAlmostEqual(stats['recorded_seconds'], 0.2, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
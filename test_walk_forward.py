@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Optimizer Test
+===========================
+
+Verifies train/test window layout, that windows evaluated in worker
+processes over shared-memory candles pick the same parameters and reach the
+same out-of-sample results as an in-process sweep and replay, that tasks
+stay small whatever the history length, and that shared memory is released.
+"""
+
+import logging
+import os
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting.backtest_engine import Backtester, FillModel
+from src.backtesting.parameter_sweep import ParameterSweep, parameter_grid
+from src.backtesting.walk_forward import WalkForwardOptimizer, _Block, summarize, walk_forward_windows
+from src.strategy_processor.strategy_interface import CandleFrame
+from test_parameter_sweep import MINUTE_MS, make_frame
+
+STRATEGIES = [
+    ({'name': 'rsi_oversold', 'margin': 12.5, 'leverage': 25, 'max_loss_pct': 10},
+     {'rsi_long_entry': [30, 40], 'rsi_short_entry': [60, 70]}),
+    ({'name': 'engulfing_pattern', 'margin': 20.0, 'leverage': 10, 'max_loss_pct': 20},
+     {'rsi_threshold': [45, 55], 'stable_candle_ratio': [0.2, 0.5]}),
+    ({'name': 'smart_money', 'session_filter_enabled': False, 'trend_filter_enabled': False,
+      'max_daily_trades': 100, 'min_swing_distance_pct': 0.5},
+     {'volume_spike_multiplier': [1.5, 2.0]}),
+]
+
+
+def make_rows(n, seed):
+    """Choppy 1m candles with regular volume spikes, in KlineStore row order"""
+    frame = make_frame(n, seed)
+    volume = np.where(np.random.default_rng(seed).random(n) < 0.15, 30.0, 5.0)
+    return np.column_stack([frame.open_time, frame.open, frame.high, frame.low, frame.close, volume,
+                            frame.close_time])
+
+
+def shared_blocks():
+    if not os.path.isdir('/dev/shm'):
+        return set()
+    return {name for name in os.listdir('/dev/shm') if name.startswith('psm_')}
+
+
+class TestWalkForward(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('src').setLevel(logging.CRITICAL)
+
+    def test_windows(self):
+        self.assertEqual(walk_forward_windows(1000, 500, 200), [(0, 500, 700), (200, 700, 900)])
+        self.assertEqual(walk_forward_windows(1000, 500, 200, step=100)[-1], (300, 800, 1000))
+        self.assertEqual(walk_forward_windows(1000, 500, 200, anchored=True), [(0, 500, 700), (0, 700, 900)])
+        self.assertEqual(walk_forward_windows(600, 500, 200), [])
+        with self.assertRaises(ValueError):
+            walk_forward_windows(1000, 0, 200)
+
+    def test_parallel_windows_match_in_process_evaluation(self):
+        candles = {'BTCUSDT': make_rows(1200, 2), 'ETHUSDT': make_rows(1200, 7)}
+        before = shared_blocks()
+        results = WalkForwardOptimizer(candles, '1m', STRATEGIES, train=500, test=200, max_workers=2).run()
+        self.assertEqual(shared_blocks(), before)
+
+        self.assertEqual(len(results), 2 * len(STRATEGIES) * 3)
+        self.assertEqual(results.groupby(['symbol', 'strategy']).size().tolist(), [3] * 6)
+        self.assertGreater(results['test_trades'].sum(), 0)
+        self.assertEqual(results.loc[results['window'] == 1, 'test_start'].iloc[0], 700 * MINUTE_MS)
+
+        # Recompute every ETHUSDT window in this process, from the same candles
+        frame = CandleFrame.from_rows(candles['ETHUSDT'], 'ETHUSDT', '1m')
+        for (config, grid), strategy in zip(STRATEGIES, ('rsi_oversold', 'engulfing_pattern', 'smart_money')):
+            rows = results[(results['symbol'] == 'ETHUSDT') & (results['strategy'] == strategy)]
+            config = {**config, 'symbol': 'ETHUSDT', 'timeframe': '1m'}
+            for (train_start, test_start, test_end), (_, row) in zip(walk_forward_windows(1200, 500, 200),
+                                                                     rows.iterrows()):
+                train = frame.slice(train_start, test_start)
+                candidates = parameter_grid(**grid)
+                if strategy == 'smart_money':
+                    table = pd.DataFrame([Backtester({**config, **params}, train).run().summary()
+                                          for params in candidates])
+                else:
+                    table = ParameterSweep(config, train).run(candidates)
+                eligible = table[table['trades'] >= 1]
+                best = (eligible if not eligible.empty else table)['pnl'].idxmax()
+                self.assertEqual(row['params'], candidates[best])
+
+                test = Backtester({**config, **row['params']}, frame.slice(test_start - 199, test_end),
+                                  FillModel()).run().summary()
+                self.assertEqual(row['test_trades'], test['trades'])
+                self.assertAlmostEqual(row['test_pnl'], test['pnl'], places=9)
+
+        summary = summarize(results)
+        self.assertEqual(len(summary), 6)
+        self.assertTrue((summary['windows'] == 3).all())
+        self.assertAlmostEqual(summary['test_pnl'].sum(), results['test_pnl'].sum())
+
+    def test_tasks_carry_no_candles(self):
+        optimizer = WalkForwardOptimizer({}, '1m', STRATEGIES, train=20_000, test=5_000)
+        tasks = optimizer._tasks({'BTCUSDT': _Block('psm_test', 500_000)})  # 500k candles are 28 MB of float64
+        self.assertEqual(len(tasks), len(STRATEGIES) * 96)
+        self.assertLess(max(len(pickle.dumps(task)) for task in tasks), 2048)
+
+        with self.assertRaises(ValueError):
+            WalkForwardOptimizer({}, '1m', STRATEGIES, train=10, test=5, objective='sharpe')
+        with self.assertRaises(ValueError):
+            WalkForwardOptimizer({}, '1m', [({'name': 'mystery'}, {})], train=10, test=5)
+        self.assertTrue(summarize(WalkForwardOptimizer({}, '1m', STRATEGIES, train=10, test=5).run()).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
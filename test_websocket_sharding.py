@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+WebSocket Sharding Test
+=======================
+
+Runs the sharded kline manager against a local WebSocket server that speaks
+the Binance combined-stream format, so no exchange connection is needed.
+Also verifies that a subscription the server never acknowledges is re-sent
+and eventually given up on, without further subscription changes, and that
+a failed subscription sender reconnects its shard.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+
+from src.data_fetcher.websocket_manager import WebSocketKlineManager
+from src.data_fetcher.websocket_shard import StreamShard
+
+
+class FakeBinanceStreamServer:
+    """Local combined-stream server that pushes one closed kline per stream per tick"""
+
+    def __init__(self):
+        self.connections = []
+        self.requests = []
+        self.ack = True
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self._ready = threading.Event()
+        self._open_time = 0
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self):
+        self._stopped = True
+        self._thread.join(5)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._serve())
+
+    async def _serve(self):
+        async with websockets.serve(self._handler, '127.0.0.1', 0) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            while not self._stopped:
+                await self._broadcast()
+                await asyncio.sleep(0.05)
+
+    async def _handler(self, ws):
+        query = parse_qs(urlparse(ws.request.path).query)
+        streams = query.get('streams', [''])[0].split('/')
+        self.connections.append((ws, streams))
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                self.requests.append(request)
+                for stream in request['params']:
+                    if request['method'] == 'SUBSCRIBE' and stream not in streams:
+                        streams.append(stream)
+                    elif request['method'] == 'UNSUBSCRIBE' and stream in streams:
+                        streams.remove(stream)
+                if self.ack:
+                    await ws.send(json.dumps({'result': None, 'id': request['id']}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connections = [(c, s) for c, s in self.connections if c is not ws]
+
+    async def _broadcast(self):
+        self._open_time += 60_000
+        for ws, streams in list(self.connections):
+            for stream in streams:
+                symbol, interval = stream.split('@kline_')
+                kline = {'t': self._open_time, 'T': self._open_time + 59_999, 'i': interval,
+                         'o': '1', 'h': '2', 'l': '0.5', 'c': '1.5', 'v': '10', 'x': True}
+                frame = {'stream': stream, 'data': {'e': 'kline', 's': symbol.upper(), 'k': kline}}
+                try:
+                    await ws.send(json.dumps(frame))
+                except websockets.ConnectionClosed:
+                    pass
+
+    def drop_connection(self, stream):
+        for ws, streams in list(self.connections):
+            if stream in streams:
+                asyncio.run_coroutine_threadsafe(ws.close(), self.loop).result(5)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class TestWebSocketSharding(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeBinanceStreamServer()
+        self.manager = WebSocketKlineManager()
+        self.manager.base_url = f"ws://127.0.0.1:{self.server.port}/stream?streams="
+        self.manager.max_streams_per_shard = 2
+        for symbol in ('BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'ADAUSDT'):
+            self.manager.add_symbol_interval(symbol, '1m')
+
+    def tearDown(self):
+        self.manager.stop()
+        self.server.stop()
+
+    def test_streams_are_sharded_under_limit(self):
+        self.manager.start()
+        self.assertTrue(wait_for(lambda: len(self.manager.shards) == 3 and self.manager.is_connected))
+        self.assertTrue(all(len(shard.streams) <= 2 for shard in self.manager.shards))
+        self.assertTrue(wait_for(lambda: self.manager.get_cached_klines('ADAUSDT', '1m') is not None))
+        self.assertEqual(len(self.manager.get_shard_health()), 3)
+
+    def test_one_shard_reconnects_without_stalling_others(self):
+        self.manager.start()
+        self.assertTrue(wait_for(lambda: len(self.manager.shards) == 3 and all(s.is_connected for s in self.manager.shards)))
+
+        dropped = next(s for s in self.manager.shards if 'btcusdt@kline_1m' in s.streams)
+        others = [s for s in self.manager.shards if s is not dropped]
+        before = {s.shard_id: s.reconnections for s in others}
+
+        self.server.drop_connection('btcusdt@kline_1m')
+        self.assertTrue(wait_for(lambda: dropped.reconnections == 2 and dropped.is_connected))
+        self.assertEqual({s.shard_id: s.reconnections for s in others}, before)
+
+    def test_new_stream_subscribes_without_reconnecting(self):
+        self.manager.max_streams_per_shard = 10
+        self.manager.start()
+        self.assertTrue(wait_for(lambda: self.manager.is_connected))
+        shard = self.manager.shards[0]
+
+        for symbol in ('DOGEUSDT', 'LINKUSDT', 'DOTUSDT'):
+            self.manager.add_symbol_interval(symbol, '5m')
+
+        self.assertTrue(wait_for(lambda: self.manager.get_cached_klines('DOTUSDT', '5m') is not None))
+        self.assertEqual(shard.reconnections, 1)
+        self.assertTrue(wait_for(lambda: shard.subscription_acks == shard.subscription_messages_sent))
+        # Changes queued together go out as one batched request
+        self.assertLessEqual(len(self.server.requests), 2)
+
+    def test_unsubscribe_stops_stream(self):
+        self.manager.start()
+        self.assertTrue(wait_for(lambda: len(self.manager.shards) == 3 and all(s.is_connected for s in self.manager.shards)))
+
+        self.manager.remove_symbol_interval('BTCUSDT', '1m')
+        self.assertTrue(wait_for(lambda: any(r['method'] == 'UNSUBSCRIBE' for r in self.server.requests)))
+        self.assertNotIn('btcusdt@kline_1m', {s for shard in self.manager.shards for s in shard.streams})
+        self.assertTrue(all(shard.reconnections == 1 for shard in self.manager.shards))
+
+    def test_unacknowledged_subscribe_is_retried_then_dropped(self):
+        self.server.ack = False
+        self.manager.max_streams_per_shard = 10
+        with mock.patch.object(StreamShard, 'ACK_TIMEOUT', 0.3):
+            self.manager.start()
+            self.assertTrue(wait_for(lambda: self.manager.is_connected))
+            shard = self.manager.shards[0]
+
+            self.manager.add_symbol_interval('DOGEUSDT', '5m')
+            sent = lambda: [r for r in self.server.requests if 'dogeusdt@kline_5m' in r['params']]
+            self.assertTrue(wait_for(lambda: len(sent()) == 1 + StreamShard.MAX_ACK_RETRIES))
+            self.assertTrue(wait_for(lambda: not shard.pending_acks))
+            self.assertEqual(shard.ack_timeouts, 1 + StreamShard.MAX_ACK_RETRIES)
+            time.sleep(0.5)
+            self.assertEqual(len(sent()), 1 + StreamShard.MAX_ACK_RETRIES)  # Given up, not re-sent forever
+            self.assertEqual(shard.reconnections, 1)
+
+    def test_failed_sender_reconnects_shard(self):
+        self.manager.max_streams_per_shard = 10
+        self.manager.start()
+        self.assertTrue(wait_for(lambda: self.manager.is_connected))
+        shard = self.manager.shards[0]
+
+        next_batch = StreamShard._next_batch
+        calls = []
+
+        def failing_once(shard_self):
+            calls.append(shard_self)
+            if len(calls) == 1:
+                raise RuntimeError("send failed")
+            return next_batch(shard_self)
+
+        with mock.patch.object(StreamShard, '_next_batch', failing_once):
+            self.manager.add_symbol_interval('DOGEUSDT', '5m')
+            # The sender's error is reported and the shard reconnects with the new stream in its URL
+            self.assertTrue(wait_for(lambda: shard.reconnections == 2 and shard.is_connected))
+        self.assertEqual(shard.last_error, "RuntimeError: send failed")
+        self.assertTrue(wait_for(lambda: self.manager.get_cached_klines('DOGEUSDT', '5m') is not None))
+
+
+if __name__ == '__main__':
+    unittest.main()
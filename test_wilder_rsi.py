@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Wilder RSI Test
+===============
+
+Verifies that the vectorized Wilder RSI matches the textbook per-row
+reference, works on a 2D batch of symbols, and is the RSI the indicator
+pipeline and strategies produce.
+"""
+
+import logging
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher.price_fetcher import PriceFetcher
+from src.execution_engine.strategies.engulfing_pattern_strategy import EngulfingPatternStrategy
+from src.indicators.incremental import WilderRSI
+from src.indicators.rsi import latest_rsi, rsi_series, wilder_rsi
+
+
+def reference_rsi(prices, period=14):
+    """Per-row Wilder RSI, the loop the vectorized version replaces"""
+    rsi = [np.nan] * len(prices)
+    deltas = np.diff(prices)
+    gains, losses = np.maximum(deltas, 0), np.maximum(-deltas, 0)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for i in range(period, len(prices)):
+        if i > period:
+            avg_gain = (avg_gain * (period - 1) + gains[i - 1]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i - 1]) / period
+        rsi[i] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.array(rsi)
+
+
+class TestWilderRSI(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.prices = 50 + np.cumsum(rng.normal(0, 0.5, 500))
+
+    def test_matches_reference(self):
+        for period in (2, 7, 14, 21):
+            expected = reference_rsi(self.prices, period)
+            actual = wilder_rsi(self.prices, period)
+            self.assertTrue(np.isnan(actual[:period]).all())
+            np.testing.assert_allclose(actual[period:], expected[period:], rtol=0, atol=1e-9)
+
+    def test_matches_streaming_indicator(self):
+        streaming = WilderRSI(14)
+        values = [streaming.update(price) for price in self.prices]
+        np.testing.assert_allclose(wilder_rsi(self.prices)[14:], values[14:], rtol=0, atol=1e-9)
+
+    def test_batch_equals_per_symbol(self):
+        batch = np.vstack([self.prices, self.prices[::-1], self.prices * 3 + 10])
+        result = wilder_rsi(batch)
+        self.assertEqual(result.shape, batch.shape)
+        for row, prices in zip(result, batch):
+            np.testing.assert_array_equal(row, wilder_rsi(prices))
+
+    def test_edge_cases(self):
+        self.assertTrue(np.isnan(wilder_rsi(self.prices[:14])).all())
+        self.assertIsNone(latest_rsi(list(self.prices[:14])))
+        self.assertEqual(latest_rsi([10.0] * 20), 50.0)
+        self.assertEqual(latest_rsi(list(range(20))), 100.0)
+        self.assertEqual(latest_rsi(list(range(20, 0, -1))), 0.0)
+
+    def test_series_keeps_index(self):
+        index = pd.date_range('2025-01-01', periods=len(self.prices), freq='15min')
+        series = rsi_series(pd.Series(self.prices, index=index))
+        self.assertTrue(series.index.equals(index))
+        self.assertAlmostEqual(series.iloc[-1], latest_rsi(self.prices), places=12)
+
+    def test_strategies_and_pipeline_share_one_rsi(self):
+        df = pd.DataFrame({'open': self.prices, 'high': self.prices + 0.2, 'low': self.prices - 0.2,
+                           'close': self.prices, 'volume': 1.0})
+        expected = wilder_rsi(self.prices)
+
+        fetcher = PriceFetcher.__new__(PriceFetcher)
+        fetcher.logger = logging.getLogger(__name__)
+        np.testing.assert_array_equal(fetcher.calculate_indicators(df)['rsi'].to_numpy(), expected)
+        np.testing.assert_array_equal(fetcher._calculate_rsi_manual(list(self.prices)).to_numpy(), expected)
+
+        strategy = EngulfingPatternStrategy('engulfing_test', {'rsi_period': 14})
+        np.testing.assert_array_equal(strategy.calculate_indicators(df.copy())['rsi'].to_numpy(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -243,6 +243,7 @@ try:
     from src.binance_client.client import BinanceClientWrapper
     from src.data_fetcher.price_fetcher import PriceFetcher
     from src.data_fetcher.balance_fetcher import BalanceFetcher
+    from src.indicators.rsi import latest_rsi
     from src.bot_manager import BotManager
     from src.utils.logger import setup_logger
     from src.execution_engine.strategies.rsi_oversold_config import RSIOversoldConfig
@@ -316,6 +317,59 @@ def dashboard_health():
             'timestamp': datetime.now().strftime('%H:%M:%S')
         }), 500
 
+@app.route('/api/websocket/metrics')
+def websocket_metrics():
+    """Market-data feed health: exchange lag, decode/processing time, throughput and candle age"""
+    try:
+        if not IMPORTS_AVAILABLE:
+            return jsonify({'success': False, 'error': 'Market data not available'})
+
+        from src.data_fetcher.websocket_manager import websocket_manager
+        from src.indicators.indicator_cache import indicator_cache
+        stats = websocket_manager.get_statistics()
+        if stats.get('last_message_time'):
+            stats['last_message_time'] = stats['last_message_time'].isoformat()
+
+        return jsonify({
+            'success': True,
+            'statistics': stats,
+            'cache': websocket_manager.get_cache_status(),
+            'indicator_cache': indicator_cache.get_statistics(),
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting WebSocket metrics: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/market/scan')
+def market_scan_endpoint():
+    """Latest indicators for every streamed symbol on one interval, computed as one batch"""
+    try:
+        if not IMPORTS_AVAILABLE:
+            return jsonify({'success': False, 'error': 'Market data not available'})
+
+        from src.data_fetcher.websocket_manager import websocket_manager
+        from src.indicators.batch import MarketMatrix, market_scan
+        interval = request.args.get('interval', '15m')
+        length = min(int(request.args.get('length', 200)), websocket_manager.cache_capacity)
+
+        symbols = [symbol for symbol, buffers in list(websocket_manager.kline_cache.items()) if interval in buffers]
+        matrix = MarketMatrix.from_manager(websocket_manager, symbols, interval, length)
+        scan = market_scan(matrix)
+
+        return jsonify({
+            'success': True,
+            'interval': interval,
+            'symbols': json.loads(scan.to_json(orient='index')) if not scan.empty else {},
+            'skipped': matrix.skipped,
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        })
+
+    except Exception as e:
+        logger.error(f"Error running market scan: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
@@ -1628,11 +1682,21 @@ def get_positions():
                         if not symbol:
                             continue
 
-                        # Get current price for PnL calculation
+                        # Get current price for PnL calculation - streamed quote or kline cache, never REST;
+                        # a stale price is shown with its age instead of being refetched
                         current_price = None
+                        price_age = None
+                        price_source = None
                         try:
                             if price_fetcher:
-                                current_price = price_fetcher.get_current_price(symbol)
+                                quote = price_fetcher.get_price_quote(symbol)
+                                if quote:
+                                    current_price = quote['price']
+                                    price_age = quote['age_seconds']
+                                    price_source = 'stale' if quote['is_stale'] else 'stream'
+                                else:
+                                    current_price = price_fetcher.get_current_price(symbol)
+                                    price_source = 'kline' if current_price else 'unavailable'
                         except Exception as price_error:
                             logger.debug(f"Could not get current price for {symbol}: {price_error}")
                             current_price = trade_data.get('entry_price', 0)
@@ -1665,6 +1729,9 @@ def get_positions():
                             'position_value_usdt': trade_data.get('position_value_usdt', 0),
                             'margin_invested': trade_data.get('margin_used', 0),
                             'current_price': current_price or 0,
+                            'price_age_seconds': price_age,
+                            'price_source': price_source,
+                            'price_stale': price_source in ('stale', 'unavailable'),
                             'pnl': pnl,
                             'pnl_percent': pnl_percent,
                             'trade_id': trade_id
@@ -1688,13 +1755,22 @@ def get_positions():
                             if not position or not hasattr(position, 'symbol'):
                                 continue
 
-                            # Get current price
+                            # Get current price - streamed quote or kline cache, reported with its age
                             current_price = None
+                            price_age = None
+                            price_source = None
                             try:
                                 if IMPORTS_AVAILABLE and price_fetcher:
-                                    current_price = price_fetcher.get_current_price(position.symbol)
-                            except:
-                                pass
+                                    quote = price_fetcher.get_price_quote(position.symbol)
+                                    if quote:
+                                        current_price = quote['price']
+                                        price_age = quote['age_seconds']
+                                        price_source = 'stale' if quote['is_stale'] else 'stream'
+                                    else:
+                                        current_price = price_fetcher.get_current_price(position.symbol)
+                                        price_source = 'kline' if current_price else 'unavailable'
+                            except Exception as price_error:
+                                logger.debug(f"Could not get current price for {position.symbol}: {price_error}")
 
                             position_data = {
                                 'strategy': strategy_name,
@@ -1705,6 +1781,9 @@ def get_positions():
                                 'position_value_usdt': float(position.entry_price) * float(position.quantity),
                                 'margin_invested': getattr(position, 'actual_margin_used', 50.0),
                                 'current_price': current_price or 0,
+                                'price_age_seconds': price_age,
+                                'price_source': price_source,
+                                'price_stale': price_source in ('stale', 'unavailable'),
                                 'pnl': 0,
                                 'pnl_percent': 0
                             }
@@ -1749,6 +1828,14 @@ def get_rsi(symbol):
         if not symbol or len(symbol) < 6:
             return jsonify({'success': False, 'error': 'Invalid symbol'})
 
+        # Reuse the RSI the bot already computed on the current 15m candle
+        from src.indicators.indicator_cache import indicator_cache
+        cached = indicator_cache.latest(symbol, '15m', 'rsi', {'period': 14})
+        if cached is not None:
+            rsi = next((float(value) for value in cached['rsi'][::-1] if value == value), None)  # Last non-NaN
+            if rsi is not None:
+                return jsonify({'success': True, 'rsi': round(rsi, 2), 'cached': True})
+
         # Try to get klines with proper error handling
         try:
             klines = binance_client.get_klines(symbol=symbol, interval='15m', limit=100)
@@ -1810,38 +1897,8 @@ def calculate_rsi(prices, period=14):
             logger.error(f"Invalid price data for RSI calculation: {e}")
             return None
 
-        # Calculate price changes
-        deltas = []
-        for i in range(1, len(prices)):
-            delta = prices[i] - prices[i-1]
-            if not isinstance(delta, (int, float)) or not (-1000 < delta < 1000):  # Sanity check
-                logger.warning(f"Suspicious price delta: {delta}")
-            deltas.append(delta)
-
-        # Separate gains and losses
-        gains = [max(delta, 0) for delta in deltas]
-        losses = [max(-delta, 0) for delta in deltas]
-
-        # Calculate initial averages (Wilder's smoothing method)
-        if len(gains) < period:
-            logger.warning(f"Insufficient gain/loss data for RSI: {len(gains)} < {period}")
-            return None
-
-        avg_gain = sum(gains[:period]) / period
-        avg_loss = sum(losses[:period]) / period
-
-        # Calculate smoothed averages for remaining periods
-        for i in range(period, len(gains)):
-            avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-            avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-
-        # Handle edge cases
-        if avg_loss == 0:
-            return 100.0 if avg_gain > 0 else 50.0
-
-        # Calculate RSI
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        # Wilder's smoothing - the same vectorized RSI the strategies and trade logger use
+        rsi = latest_rsi(prices, period)
 
         # Final validation - RSI must be between 0 and 100
         if not isinstance(rsi, (int, float)) or rsi < 0 or rsi > 100: